@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class AgentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'agents'
-    verbose_name = 'Agents' 
\ No newline at end of file
+    verbose_name = 'Agents'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
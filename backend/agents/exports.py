@@ -0,0 +1,31 @@
+"""
+Streaming exports of agent commissions.
+"""
+
+from shared.exports import Export
+
+from .models import AgentCommission
+
+
+class CommissionExport(Export):
+    name = 'commissions'
+    columns = (
+        ('id', 'id'),
+        ('agent', 'agent.username'),
+        ('order_number', 'order.order_number'),
+        ('commission_rate', 'commission_rate'),
+        ('order_amount', 'order_amount'),
+        ('commission_amount', 'commission_amount'),
+        ('currency', 'currency'),
+        ('status', 'status'),
+        ('payment_date', 'payment_date'),
+        ('payment_reference', 'payment_reference'),
+        ('created_at', 'created_at'),
+    )
+    select_related = ('agent', 'order')
+
+    @classmethod
+    def get_queryset(cls, user, params):
+        if user.is_staff:
+            return AgentCommission.objects.all()
+        return AgentCommission.objects.filter(agent=user)
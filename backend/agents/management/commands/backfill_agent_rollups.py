@@ -0,0 +1,40 @@
+"""
+Rebuild agent daily rollups from orders and commissions.
+
+Signals keep the rollups current as orders and commissions change; run this
+once for existing history, after bulk updates that bypass model signals, or
+to repair drift.
+"""
+
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from agents.rollups import AgentRollupService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily agent rollups of orders, GMV and commissions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--agent', action='append', dest='agents',
+            help='User ID of an agent to rebuild; repeatable, defaults to all agents',
+        )
+        parser.add_argument('--since', help='First day to rebuild (YYYY-MM-DD); defaults to all history')
+
+    def handle(self, *args, **options):
+        try:
+            agent_ids = [uuid.UUID(agent) for agent in options['agents']] if options['agents'] else None
+        except ValueError:
+            raise CommandError('agent must be a user ID.')
+        since = None
+        if options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError('since must be a date as YYYY-MM-DD.')
+
+        self.stdout.write(self.style.NOTICE('Rebuilding agent rollups...'))
+        written = AgentRollupService.rebuild(agent_ids=agent_ids, since=since)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} rollup rows.'))
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.2 on 2026-10-17 05:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('currency', models.CharField(default='USD', max_length=3, verbose_name='Currency')),
+                ('orders_count', models.IntegerField(default=0, verbose_name='Orders')),
+                ('cancelled_orders', models.IntegerField(default=0, verbose_name='Cancelled orders')),
+                ('gmv', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Gross merchandise value')),
+                ('commission_count', models.IntegerField(default=0, verbose_name='Commissions')),
+                ('commission_pending', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Pending commission')),
+                ('commission_approved', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Approved commission')),
+                ('commission_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Paid commission')),
+                ('commission_cancelled', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Cancelled commission')),
+                ('agent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to=settings.AUTH_USER_MODEL, verbose_name='Agent')),
+            ],
+            options={
+                'verbose_name': 'Agent Daily Rollup',
+                'verbose_name_plural': 'Agent Daily Rollups',
+                'ordering': ['-day'],
+                'unique_together': {('agent', 'day', 'currency')},
+            },
+        ),
+    ]
@@ -195,6 +195,44 @@ class AgentCommission(BaseModel):
         return f"{self.agent.username} - {self.order.order_number} - {self.commission_amount}"
 
 
+class AgentDailyRollup(models.Model):
+    """
+    Orders and commissions of one agent on one local day, per currency.
+    
+    Maintained by ``agents.rollups``; ``backfill_agent_rollups`` rebuilds it.
+    """
+    
+    agent = models.ForeignKey(
+        'users.User', 
+        on_delete=models.CASCADE, 
+        related_name='daily_rollups',
+        verbose_name=_('Agent')
+    )
+    day = models.DateField(verbose_name=_('Day'))
+    currency = models.CharField(max_length=3, default='USD', verbose_name=_('Currency'))
+    
+    # Orders
+    orders_count = models.IntegerField(default=0, verbose_name=_('Orders'))
+    cancelled_orders = models.IntegerField(default=0, verbose_name=_('Cancelled orders'))
+    gmv = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name=_('Gross merchandise value'))
+    
+    # Commissions by status
+    commission_count = models.IntegerField(default=0, verbose_name=_('Commissions'))
+    commission_pending = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name=_('Pending commission'))
+    commission_approved = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name=_('Approved commission'))
+    commission_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name=_('Paid commission'))
+    commission_cancelled = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name=_('Cancelled commission'))
+    
+    class Meta:
+        verbose_name = _('Agent Daily Rollup')
+        verbose_name_plural = _('Agent Daily Rollups')
+        unique_together = ['agent', 'day', 'currency']
+        ordering = ['-day']
+    
+    def __str__(self):
+        return f"{self.agent_id} - {self.day} - {self.currency}"
+
+
 class AgentService:
     """
     Service class for agent operations.
@@ -330,15 +368,22 @@ class AgentService:
         return commission
     
     @staticmethod
-    def get_agent_summary(agent):
-        """Get agent summary with statistics."""
+    def get_agent_summary(agent, days=30):
+        """
+        Get agent summary with statistics.
+        
+        Totals and the daily series of the last ``days`` days are read from
+        the daily rollups, so the cost grows with days, not order history.
+        """
+        from .rollups import AgentRollupService
+        
         try:
             profile = agent.agent_profile
         except AgentProfile.DoesNotExist:
             return None
         
         customers = agent.agent_customers.filter(is_active=True)
-        commissions = agent.commissions.all()
+        commissions = agent.commissions.select_related('order')
         orders = agent.agent_orders.all()
         
         summary = {
@@ -352,6 +397,8 @@ class AgentService:
             'currency': 'USD',
             'is_active': profile.is_active,
             'is_verified': profile.is_verified,
+            'totals': AgentRollupService.totals(agent),
+            'daily': AgentRollupService.daily(agent, days),
             'recent_orders': [],
             'recent_commissions': [],
         }
@@ -380,8 +427,12 @@ class AgentService:
     
     @staticmethod
     def get_customer_orders(agent, customer):
-        """Get orders for a specific customer."""
-        orders = agent.agent_orders.filter(user=customer).order_by('-created_at')
+        """
+        Get orders for a specific customer.
+        
+        Large histories should use the streaming order export instead.
+        """
+        orders = agent.agent_orders.filter(user=customer).order_by('-created_at').prefetch_related('items')
         
         order_list = []
         for order in orders:
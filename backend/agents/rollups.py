@@ -0,0 +1,159 @@
+"""
+Daily per-agent rollups of orders and commissions.
+
+``AgentDailyRollup`` holds one row per agent, local day and currency. Every
+order and commission contributes to the row of its agent, creation day and
+currency; signals apply the difference between an object's contribution
+before and after a save (or its removal on delete) as ``F()`` increments in
+the writing transaction, so concurrent writers never overwrite each other.
+
+``AgentRollupService.rebuild`` recomputes rows from the source tables; the
+``backfill_agent_rollups`` command runs it for existing history and after
+bulk changes that bypass model signals.
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import AgentCommission, AgentDailyRollup
+
+
+# Orders in these states count as placed but not towards GMV.
+CANCELLED_ORDER_STATUSES = ('cancelled', 'refunded')
+
+ORDER_FIELDS = ('agent_id', 'created_at', 'currency', 'status', 'total_amount')
+COMMISSION_FIELDS = ('agent_id', 'created_at', 'currency', 'status', 'commission_amount')
+
+COMMISSION_STATUS_FIELDS = {
+    status: f'commission_{status}' for status, _ in AgentCommission.STATUS_CHOICES
+}
+COUNTER_FIELDS = ('orders_count', 'cancelled_orders', 'gmv', 'commission_count', *COMMISSION_STATUS_FIELDS.values())
+
+
+def order_contribution(agent_id, created_at, currency, status, total_amount):
+    """Rollup key and counter values an order adds, or ``None``."""
+    if agent_id is None or created_at is None:
+        return None
+    cancelled = status in CANCELLED_ORDER_STATUSES
+    return (agent_id, timezone.localdate(created_at), currency), {
+        'orders_count': 1,
+        'cancelled_orders': int(cancelled),
+        'gmv': Decimal('0.00') if cancelled else Decimal(total_amount),
+    }
+
+
+def commission_contribution(agent_id, created_at, currency, status, commission_amount):
+    """Rollup key and counter values a commission adds, or ``None``."""
+    if agent_id is None or created_at is None or status not in COMMISSION_STATUS_FIELDS:
+        return None
+    return (agent_id, timezone.localdate(created_at), currency), {
+        'commission_count': 1,
+        COMMISSION_STATUS_FIELDS[status]: Decimal(commission_amount),
+    }
+
+
+class AgentRollupService:
+    """
+    Service class for maintaining and reading agent rollups.
+    """
+
+    @staticmethod
+    def apply(old, new):
+        """
+        Move a contribution from ``old`` to ``new`` (either may be ``None``).
+        """
+        deltas = defaultdict(lambda: defaultdict(int))
+        for contribution, sign in ((old, -1), (new, 1)):
+            if contribution is not None:
+                key, values = contribution
+                for field, value in values.items():
+                    deltas[key][field] += sign * value
+
+        for (agent_id, day, currency), values in deltas.items():
+            values = {field: value for field, value in values.items() if value}
+            if not values:
+                continue
+            AgentDailyRollup.objects.bulk_create(
+                [AgentDailyRollup(agent_id=agent_id, day=day, currency=currency)], ignore_conflicts=True
+            )
+            rollup = AgentDailyRollup.objects.filter(agent_id=agent_id, day=day, currency=currency)
+            rollup.update(**{field: F(field) + value for field, value in values.items()})
+            if any(value < 0 for value in values.values()):
+                # Drop rows left without orders or commissions, as a rebuild would.
+                rollup.filter(orders_count=0, commission_count=0).delete()
+
+    @classmethod
+    @transaction.atomic
+    def rebuild(cls, agent_ids=None, since=None):
+        """
+        Recompute the rollups of the given agents (all by default) from
+        ``since`` (a date, all history by default).
+
+        Returns:
+            int: Number of rollup rows written.
+        """
+        from orders.models import Order
+
+        orders = Order.objects.filter(agent__isnull=False)
+        commissions = AgentCommission.objects.all()
+        rollups = AgentDailyRollup.objects.all()
+        if agent_ids is not None:
+            orders = orders.filter(agent_id__in=agent_ids)
+            commissions = commissions.filter(agent_id__in=agent_ids)
+            rollups = rollups.filter(agent_id__in=agent_ids)
+        if since is not None:
+            start = timezone.make_aware(datetime.combine(since, time.min))
+            orders = orders.filter(created_at__gte=start)
+            commissions = commissions.filter(created_at__gte=start)
+            rollups = rollups.filter(day__gte=since)
+
+        cancelled = Q(status__in=CANCELLED_ORDER_STATUSES)
+        rows = defaultdict(dict)
+        day = TruncDate('created_at', tzinfo=timezone.get_current_timezone())
+        order_groups = orders.annotate(day=day).values('agent_id', 'day', 'currency')
+        for group in order_groups.annotate(
+            orders_count=Count('pk'),
+            cancelled_orders=Count('pk', filter=cancelled),
+            gmv=Sum('total_amount', filter=~cancelled),
+        ).order_by():
+            rows[(group['agent_id'], group['day'], group['currency'])].update(
+                orders_count=group['orders_count'],
+                cancelled_orders=group['cancelled_orders'],
+                gmv=group['gmv'] or Decimal('0.00'),
+            )
+        commission_groups = commissions.annotate(day=day).values('agent_id', 'day', 'currency', 'status')
+        for group in commission_groups.annotate(count=Count('pk'), amount=Sum('commission_amount')).order_by():
+            if group['status'] not in COMMISSION_STATUS_FIELDS:
+                continue
+            row = rows[(group['agent_id'], group['day'], group['currency'])]
+            row['commission_count'] = row.get('commission_count', 0) + group['count']
+            row[COMMISSION_STATUS_FIELDS[group['status']]] = group['amount']
+
+        rollups.delete()
+        AgentDailyRollup.objects.bulk_create([
+            AgentDailyRollup(agent_id=agent_id, day=day, currency=currency, **values)
+            for (agent_id, day, currency), values in rows.items()
+        ], batch_size=1000)
+        return len(rows)
+
+    @staticmethod
+    def totals(agent):
+        """Lifetime counters of an agent per currency."""
+        rows = AgentDailyRollup.objects.filter(agent=agent).values('currency').annotate(
+            **{f'total_{field}': Sum(field) for field in COUNTER_FIELDS}
+        ).order_by('currency')
+        return {row['currency']: {field: row[f'total_{field}'] for field in COUNTER_FIELDS} for row in rows}
+
+    @staticmethod
+    def daily(agent, days=30):
+        """Rollup rows of the last ``days`` days, oldest first."""
+        since = timezone.localdate() - timedelta(days=days - 1)
+        return list(AgentDailyRollup.objects.filter(agent=agent, day__gte=since).order_by('day', 'currency').values(
+            'day', 'currency', *COUNTER_FIELDS
+        ))
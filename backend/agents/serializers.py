@@ -15,14 +15,13 @@ class AgentCommissionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 class AgentSerializer(serializers.ModelSerializer):
-    commissions = AgentCommissionSerializer(many=True, read_only=True)
     class Meta:
         model = Agent
         fields = [
-            'id', 'user', 'agency_name', 'agency_code', 'status',
-            'created_at', 'updated_at', 'commissions'
+            'id', 'user', 'company_name', 'license_number', 'is_active', 'is_verified',
+            'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'commissions']
+        read_only_fields = ['id', 'created_at', 'updated_at']
 
 class AgentSummarySerializer(serializers.Serializer):
     total_orders = serializers.IntegerField()
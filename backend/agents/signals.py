@@ -0,0 +1,73 @@
+"""
+Signal handlers keeping agent daily rollups in sync with orders and commissions.
+"""
+
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import AgentCommission
+from .rollups import (
+    COMMISSION_FIELDS, ORDER_FIELDS, AgentRollupService, commission_contribution, order_contribution,
+)
+
+
+CONTRIBUTIONS = {
+    'orders.Order': (ORDER_FIELDS, order_contribution),
+    'agents.AgentCommission': (COMMISSION_FIELDS, commission_contribution),
+}
+
+# Marks an instance loaded without some rollup fields (e.g. via only()).
+UNKNOWN = object()
+
+
+def _tracking(sender):
+    return CONTRIBUTIONS[sender._meta.label]
+
+
+def _contribution(sender, instance):
+    fields, contribution = _tracking(sender)
+    return contribution(*(getattr(instance, field) for field in fields))
+
+
+@receiver(post_init, sender='orders.Order')
+@receiver(post_init, sender=AgentCommission)
+def remember_rollup_contribution(sender, instance, **kwargs):
+    """Remember what a loaded row contributes so saves only apply the change."""
+    fields, _ = _tracking(sender)
+    # New instances have no created_at yet and contribute nothing.
+    if all(field in instance.__dict__ for field in fields):
+        instance._rollup_contribution = _contribution(sender, instance)
+    else:
+        instance._rollup_contribution = UNKNOWN
+
+
+@receiver(pre_save, sender='orders.Order')
+@receiver(pre_save, sender=AgentCommission)
+@receiver(pre_delete, sender='orders.Order')
+@receiver(pre_delete, sender=AgentCommission)
+def load_rollup_contribution(sender, instance, **kwargs):
+    """Read the stored contribution of rows loaded with deferred fields."""
+    if getattr(instance, '_rollup_contribution', None) is not UNKNOWN:
+        return
+    fields, contribution = _tracking(sender)
+    stored = sender._default_manager.filter(pk=instance.pk).values_list(*fields).first()
+    instance._rollup_contribution = contribution(*stored) if stored else None
+
+
+@receiver(post_save, sender='orders.Order')
+@receiver(post_save, sender=AgentCommission)
+def update_rollups(sender, instance, **kwargs):
+    """Move the row's contribution to its current agent, day and values."""
+    current = _contribution(sender, instance)
+    previous = getattr(instance, '_rollup_contribution', None)
+    if previous is not UNKNOWN and previous != current:
+        AgentRollupService.apply(previous, current)
+    instance._rollup_contribution = current
+
+
+@receiver(post_delete, sender='orders.Order')
+@receiver(post_delete, sender=AgentCommission)
+def remove_from_rollups(sender, instance, **kwargs):
+    """Withdraw the stored contribution of a deleted row."""
+    AgentRollupService.apply(getattr(instance, '_rollup_contribution', None), None)
+    instance._rollup_contribution = None
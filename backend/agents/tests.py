@@ -0,0 +1,93 @@
+"""
+Tests for agent daily rollups.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from orders.models import Order
+from .models import Agent, AgentCommission, AgentDailyRollup, AgentProfile, AgentService
+from .rollups import COUNTER_FIELDS, AgentRollupService
+
+User = get_user_model()
+
+
+class AgentRollupTests(TestCase):
+    """Rollups follow order and commission changes and serve the dashboard."""
+    
+    def setUp(self):
+        self.agent = User.objects.create_user(
+            username='agent', email='agent@example.com', password='pass12345', role='agent'
+        )
+        AgentProfile.objects.create(user=self.agent, company_name='Peykan Agency', commission_rate=10)
+        self.customer = User.objects.create_user(
+            username='customer', email='customer@example.com', password='pass12345'
+        )
+    
+    def create_order(self, total, currency='USD'):
+        return Order.objects.create(
+            user=self.customer, agent=self.agent, currency=currency, customer_name='Customer',
+            customer_email='customer@example.com', customer_phone='123', subtotal=total
+        )
+    
+    def create_commission(self, order):
+        return AgentCommission.objects.create(
+            agent=self.agent, order=order, commission_rate=10, order_amount=order.total_amount,
+            commission_amount=order.total_amount / 10, currency=order.currency
+        )
+    
+    def rollups(self):
+        return {
+            (row['day'], row['currency']): row
+            for row in AgentDailyRollup.objects.filter(agent=self.agent).values('day', 'currency', *COUNTER_FIELDS)
+        }
+    
+    def test_signals_match_a_rebuild(self):
+        first, second = self.create_order(100), self.create_order(200)
+        euro = self.create_order(50, currency='EUR')
+        commission = self.create_commission(first)
+        self.create_commission(second)
+        AgentService.approve_commission(commission)
+        AgentService.pay_commission(commission, {'payment_method': 'bank'})
+        Order.objects.get(pk=second.pk).cancel_order('Changed plans')
+        euro.delete()
+        # Moving an order to another day moves its contribution.
+        moved = Order.objects.only('id', 'status').get(pk=first.pk)
+        moved.created_at = timezone.now() - timedelta(days=2)
+        moved.save()
+        
+        incremental = self.rollups()
+        self.assertEqual(len(incremental), 2)
+        today = incremental[(timezone.localdate(), 'USD')]
+        self.assertEqual((today['orders_count'], today['cancelled_orders'], today['gmv']), (1, 1, Decimal('0.00')))
+        self.assertEqual((today['commission_paid'], today['commission_pending']), (Decimal('10.00'), Decimal('20.00')))
+        
+        self.assertEqual(AgentRollupService.rebuild(), 2)
+        self.assertEqual(self.rollups(), incremental)
+    
+    def test_dashboard_reads_rollups_in_constant_queries(self):
+        Agent.objects.create(user=self.agent, company_name='Peykan Agency')
+        client = APIClient()
+        client.force_authenticate(self.agent)
+        
+        counts = []
+        for _ in range(2):
+            for _ in range(5):
+                self.create_commission(self.create_order(100))
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(reverse('agents:dashboard'))
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+        
+        totals = response.data['summary']['totals']['USD']
+        self.assertEqual((totals['orders_count'], totals['gmv']), (10, Decimal('1000.00')))
+        self.assertEqual(response.data['summary']['daily'][-1]['commission_pending'], Decimal('100.00'))
@@ -11,4 +11,5 @@ urlpatterns = [
     path('dashboard/', views.AgentDashboardView.as_view(), name='dashboard'),
     path('orders/', views.AgentOrderListView.as_view(), name='order_list'),
     path('commissions/', views.AgentCommissionListView.as_view(), name='commission_list'),
+    path('commissions/export/<str:fmt>/', views.AgentCommissionExportView.as_view(), name='commission_export'),
 ] 
\ No newline at end of file
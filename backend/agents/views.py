@@ -6,8 +6,10 @@ from rest_framework import status, generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
+from shared.exports import ExportView
+from .exports import CommissionExport
 from .models import Agent, AgentCommission
-from .serializers import AgentSerializer, AgentSummarySerializer
+from .serializers import AgentSerializer, AgentCommissionSerializer, AgentSummarySerializer
 
 class AgentDashboardView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -15,7 +17,7 @@ class AgentDashboardView(APIView):
         agent = get_object_or_404(Agent, user=request.user)
         # Use AgentService for summary
         from .models import AgentService
-        summary = AgentService.get_agent_summary(agent)
+        summary = AgentService.get_agent_summary(agent.user)
         return Response({'agent': AgentSerializer(agent).data, 'summary': summary})
 
 class AgentOrderListView(APIView):
@@ -28,8 +30,11 @@ class AgentOrderListView(APIView):
         return Response({'orders': OrderSerializer(orders, many=True).data})
 
 class AgentCommissionListView(generics.ListAPIView):
-    serializer_class = AgentSerializer
+    serializer_class = AgentCommissionSerializer
     permission_classes = [permissions.IsAuthenticated]
     def get_queryset(self):
         agent = get_object_or_404(Agent, user=self.request.user)
-        return agent.commissions.all().order_by('-created_at') 
\ No newline at end of file
+        return AgentCommission.objects.filter(agent=agent.user).select_related('order').order_by('-created_at')
+
+class AgentCommissionExportView(ExportView):
+    export_class = CommissionExport
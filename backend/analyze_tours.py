@@ -50,25 +50,6 @@ def analyze_tours():
                 print(f"       ID: {schedule.id}")
                 print(f"       Date: {schedule.start_date}")
                 
-                # Analyze variant_capacities_raw
-                raw_data = schedule.variant_capacities_raw
-                print(f"       variant_capacities_raw: {raw_data}")
-                
-                if raw_data:
-                    keys = list(raw_data.keys())
-                    key_types = [type(k).__name__ for k in keys]
-                    print(f"       Keys: {keys}")
-                    print(f"       Key types: {key_types}")
-                    
-                    # Check if any keys are UUID
-                    uuid_keys = [k for k in keys if hasattr(k, 'hex')]
-                    if uuid_keys:
-                        print(f"       ⚠️  PROBLEM: Found UUID keys: {uuid_keys}")
-                    else:
-                        print(f"       ✅ All keys are strings")
-                else:
-                    print(f"       ℹ️  No variant_capacities_raw data")
-                
                 # Test property
                 safe_data = schedule.variant_capacities
                 print(f"       Property variant_capacities: {safe_data}")
@@ -0,0 +1,35 @@
+"""
+Release expired cart reservations and delete expired carts.
+
+Runs the same reaper as the periodic ``cart.tasks.reap_expired_carts`` task;
+``--stats`` only prints the metrics of the last run.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cart.reaper import CartReaper
+
+
+class Command(BaseCommand):
+    help = 'Release expired cart reservations and delete expired carts in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Rows per batch (defaults to CART_REAPER_BATCH_SIZE)')
+        parser.add_argument('--max-batches', type=int, help='Batches per kind (defaults to CART_REAPER_MAX_BATCHES)')
+        parser.add_argument('--stats', action='store_true', help='Show the metrics of the last run and exit')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            stats = CartReaper.last_run()
+            if stats is None:
+                raise CommandError('The cart reaper has not run yet.')
+        else:
+            for option in ('batch_size', 'max_batches'):
+                if options[option] is not None and options[option] < 1:
+                    raise CommandError(f"{option.replace('_', '-')} must be positive.")
+            self.stdout.write(self.style.NOTICE('Reaping expired carts...'))
+            stats = CartReaper.run(options['batch_size'], options['max_batches'])
+
+        for name, value in stats.items():
+            self.stdout.write(f'  {name:<24} {value}')
+        self.stdout.write(self.style.SUCCESS('Cart reaper done.'))
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-17 05:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['expires_at'], name='cart_expires_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['is_reserved', 'reservation_expires_at'], name='cart_item_reservation_idx'),
+        ),
+    ]
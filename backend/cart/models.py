@@ -45,6 +45,9 @@ class Cart(BaseModel):
         verbose_name = _('Cart')
         verbose_name_plural = _('Carts')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['expires_at'], name='cart_expires_idx'),
+        ]
     
     def __str__(self):
         return f"Cart {self.session_id}"
@@ -70,13 +73,16 @@ class Cart(BaseModel):
         return timezone.now() > self.expires_at
     
     def clear_expired_items(self):
-        """Remove expired items from cart."""
+        """Remove items whose reservation expired, releasing the capacity they held."""
+        from django.db import transaction
         from django.utils import timezone
-        now = timezone.now()
+        from tours.availability import TourAvailabilityService
+        from .reaper import CartReaper
         
-        for item in self.items.all():
-            if item.expires_at and now > item.expires_at:
-                item.delete()
+        expired = self.items.filter(is_reserved=True, reservation_expires_at__lt=timezone.now())
+        with transaction.atomic(), TourAvailabilityService.batched():
+            CartReaper.release_holds(expired.values_list('product_type', 'booking_data', 'quantity'))
+            expired.delete()
 
 
 class CartItem(BaseModel):
@@ -164,6 +170,9 @@ class CartItem(BaseModel):
         verbose_name = _('Cart Item')
         verbose_name_plural = _('Cart Items')
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['is_reserved', 'reservation_expires_at'], name='cart_item_reservation_idx'),
+        ]
     
     def __str__(self):
         return f"{self.cart} - {self.product_type} - {self.quantity}"
@@ -514,18 +523,11 @@ class CartService:
     
     @staticmethod
     def cleanup_expired_carts():
-        """Clean up expired carts and reservations."""
-        from django.utils import timezone
-        
-        # Clear expired carts
-        expired_carts = Cart.objects.filter(expires_at__lt=timezone.now())
-        for cart in expired_carts:
-            cart.clear_expired_items()
+        """
+        Release expired reservations and delete expired carts.
         
-        # Clear expired reservations
-        expired_items = CartItem.objects.filter(
-            is_reserved=True,
-            reservation_expires_at__lt=timezone.now()
-        )
-        for item in expired_items:
-            item.release_reservation() 
\ No newline at end of file
+        Runs ``cart.reaper.CartReaper``, normally scheduled as the
+        ``cart.tasks.reap_expired_carts`` Celery task.
+        """
+        from .reaper import CartReaper
+        return CartReaper.run()
@@ -0,0 +1,193 @@
+"""
+Background reaper for expired cart reservations and carts.
+
+A cart reservation holds capacity on the tour schedule or event performance
+named in the item's ``booking_data``. ``CartReaper.run`` releases expired
+reservations and deletes expired carts in bounded batches, each in its own
+short transaction:
+
+* the items of a batch are flagged released with one ``UPDATE``, and the
+  capacity they held is returned with one conditional ``UPDATE`` per
+  distinct released quantity (``current_capacity = MAX(current_capacity - n,
+  0)`` over all schedules or performances releasing ``n``);
+* expired carts are deleted by primary key, their items cascading, with the
+  tour availability refresh batched into a single rebuild on commit.
+
+Rows are claimed with ``SKIP LOCKED`` where the database supports it, so
+several reapers and the request path never wait on each other. Each run
+stores its metrics (rows released and deleted, duration, lag behind the
+oldest expired row) in the shared cache for the ``reap_carts`` command.
+"""
+
+import logging
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.db.models import F, Min
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Cart, CartItem
+
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = 'cart_reaper:last_run'
+
+
+def _hold_targets():
+    """Product type -> (capacity model, ``booking_data`` key of its row)."""
+    from events.models import EventPerformance
+    from tours.models import TourSchedule
+    return {
+        'tour': (TourSchedule, 'schedule_id'),
+        'event': (EventPerformance, 'performance_id'),
+    }
+
+
+class CartReaper:
+    """
+    Service class for releasing expired reservations and deleting expired carts.
+    """
+
+    @staticmethod
+    def _claim(queryset):
+        if connections[queryset.db].features.has_select_for_update_skip_locked:
+            return queryset.select_for_update(skip_locked=True)
+        return queryset
+
+    @staticmethod
+    def release_holds(rows):
+        """
+        Return the capacity held by ``(product_type, booking_data, quantity)``
+        rows to their schedules and performances.
+
+        Returns:
+            int: Capacity units released.
+        """
+        targets = _hold_targets()
+        held = defaultdict(lambda: defaultdict(int))
+        for product_type, booking_data, quantity in rows:
+            if product_type not in targets:
+                continue
+            target_id = (booking_data or {}).get(targets[product_type][1])
+            try:
+                target_id = uuid.UUID(str(target_id))
+            except ValueError:
+                continue
+            held[product_type][target_id] += quantity
+
+        released = 0
+        for product_type, quantities in held.items():
+            model = targets[product_type][0]
+            by_quantity = defaultdict(list)
+            for target_id, quantity in quantities.items():
+                by_quantity[quantity].append(target_id)
+            for quantity, target_ids in by_quantity.items():
+                updated = model.objects.filter(pk__in=target_ids).update(
+                    current_capacity=Greatest(F('current_capacity') - quantity, 0)
+                )
+                released += updated * quantity
+        return released
+
+    @classmethod
+    def release_expired_reservations(cls, now, batch_size):
+        """
+        Release one batch of reservations that expired before ``now``.
+
+        Returns:
+            tuple: ``(items released, capacity units released)``.
+        """
+        with transaction.atomic():
+            due = CartItem.objects.filter(
+                is_reserved=True, reservation_expires_at__lt=now
+            ).order_by('reservation_expires_at')
+            rows = list(cls._claim(due).values_list('id', 'product_type', 'booking_data', 'quantity')[:batch_size])
+            if not rows:
+                return 0, 0
+            CartItem.objects.filter(id__in=[row[0] for row in rows]).update(
+                is_reserved=False, reservation_expires_at=None
+            )
+            return len(rows), cls.release_holds(row[1:] for row in rows)
+
+    @classmethod
+    def delete_expired_carts(cls, now, batch_size):
+        """
+        Delete one batch of carts that expired before ``now``, releasing the
+        reservations their items still hold.
+
+        Returns:
+            tuple: ``(carts deleted, items deleted, capacity units released)``.
+        """
+        from tours.availability import TourAvailabilityService
+
+        with transaction.atomic():
+            due = Cart.objects.filter(expires_at__lt=now).order_by('expires_at')
+            cart_ids = list(cls._claim(due).values_list('id', flat=True)[:batch_size])
+            if not cart_ids:
+                return 0, 0, 0
+            reserved = cls._claim(CartItem.objects.filter(cart_id__in=cart_ids, is_reserved=True))
+            released = cls.release_holds(reserved.values_list('product_type', 'booking_data', 'quantity'))
+            with TourAvailabilityService.batched():
+                _, deleted = Cart.objects.filter(id__in=cart_ids).delete()
+            return len(cart_ids), deleted.get(CartItem._meta.label, 0), released
+
+    @classmethod
+    def run(cls, batch_size=None, max_batches=None):
+        """
+        Reap until nothing expired is left or ``max_batches`` batches of each
+        kind ran.
+
+        Returns:
+            dict: Metrics of the run, also stored under ``STATS_KEY``.
+        """
+        batch_size = batch_size or settings.CART_REAPER_BATCH_SIZE
+        max_batches = max_batches or settings.CART_REAPER_MAX_BATCHES
+        started = time.perf_counter()
+        now = timezone.now()
+
+        oldest_reservation = CartItem.objects.filter(
+            is_reserved=True, reservation_expires_at__lt=now
+        ).aggregate(oldest=Min('reservation_expires_at'))['oldest']
+        oldest_cart = Cart.objects.filter(expires_at__lt=now).aggregate(oldest=Min('expires_at'))['oldest']
+        stats = {
+            'reservations_released': 0,
+            'carts_deleted': 0,
+            'items_deleted': 0,
+            'capacity_released': 0,
+            'batches': 0,
+            'reservation_lag_seconds': (now - oldest_reservation).total_seconds() if oldest_reservation else 0.0,
+            'cart_lag_seconds': (now - oldest_cart).total_seconds() if oldest_cart else 0.0,
+        }
+
+        for _ in range(max_batches):
+            released, capacity = cls.release_expired_reservations(now, batch_size)
+            stats['reservations_released'] += released
+            stats['capacity_released'] += capacity
+            stats['batches'] += 1
+            if released < batch_size:
+                break
+
+        for _ in range(max_batches):
+            carts, items, capacity = cls.delete_expired_carts(now, batch_size)
+            stats['carts_deleted'] += carts
+            stats['items_deleted'] += items
+            stats['capacity_released'] += capacity
+            stats['batches'] += 1
+            if carts < batch_size:
+                break
+
+        stats['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        stats['finished_at'] = timezone.now().isoformat()
+        caches['shared'].set(STATS_KEY, stats, None)
+        logger.info('Cart reaper: %s', stats)
+        return stats
+
+    @staticmethod
+    def last_run():
+        """Metrics of the most recent run, or ``None``."""
+        return caches['shared'].get(STATS_KEY)
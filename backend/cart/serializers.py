@@ -3,8 +3,22 @@ DRF Serializers for Cart app.
 """
 
 from rest_framework import serializers
+from django.db import models
 from django.utils.translation import gettext_lazy as _
 from .models import Cart, CartItem
+from .services import CartProductResolver
+
+
+class CartItemListSerializer(serializers.ListSerializer):
+    """List serializer that batch-loads products for all cart items up front."""
+    
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        items = list(iterable)
+        resolver = self.context.get('product_resolver')
+        if resolver is None or not all(resolver.has_item(item) for item in items):
+            self.context['product_resolver'] = CartProductResolver(items)
+        return super().to_representation(items)
 
 
 class CartItemSerializer(serializers.ModelSerializer):
@@ -27,85 +41,40 @@ class CartItemSerializer(serializers.ModelSerializer):
             'pricing_breakdown', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
+        list_serializer_class = CartItemListSerializer
+    
+    def _get_resolver(self, obj):
+        """Get the batched product resolver from context, building one if needed."""
+        resolver = self.context.get('product_resolver')
+        if resolver is None or not resolver.has_item(obj):
+            resolver = CartProductResolver([obj])
+            self.context['product_resolver'] = resolver
+        return resolver
     
     def get_product_title(self, obj):
         """Get product title based on product type."""
+        product = self._get_resolver(obj).get_product(obj)
         if obj.product_type == 'tour':
-            from tours.models import Tour
-            try:
-                tour = Tour.objects.get(id=obj.product_id)
-                return tour.title
-            except Tour.DoesNotExist:
-                return 'Tour not found'
+            return product.title if product else 'Tour not found'
         elif obj.product_type == 'event':
-            from events.models import Event
-            try:
-                event = Event.objects.get(id=obj.product_id)
-                return event.title
-            except Event.DoesNotExist:
-                return 'Event not found'
+            return product.title if product else 'Event not found'
         elif obj.product_type == 'transfer':
-            from transfers.models import TransferRoute
-            try:
-                transfer = TransferRoute.objects.get(id=obj.product_id)
-                return transfer.name
-            except TransferRoute.DoesNotExist:
-                return 'Transfer route not found'
+            return product.name if product else 'Transfer route not found'
         return 'Unknown product'
     
     def get_product_slug(self, obj):
         """Get product slug based on product type."""
-        if obj.product_type == 'tour':
-            from tours.models import Tour
-            try:
-                tour = Tour.objects.get(id=obj.product_id)
-                return tour.slug
-            except Tour.DoesNotExist:
-                return ''
-        elif obj.product_type == 'event':
-            from events.models import Event
-            try:
-                event = Event.objects.get(id=obj.product_id)
-                return event.slug
-            except Event.DoesNotExist:
-                return ''
-        elif obj.product_type == 'transfer':
-            from transfers.models import TransferRoute
-            try:
-                transfer = TransferRoute.objects.get(id=obj.product_id)
-                return transfer.id  # TransferRoute doesn't have slug, use ID
-            except TransferRoute.DoesNotExist:
-                return ''
-        return ''
+        product = self._get_resolver(obj).get_product(obj)
+        if product is None:
+            return ''
+        if obj.product_type == 'transfer':
+            return product.id  # TransferRoute doesn't have slug, use ID
+        return product.slug
     
     def get_variant_name(self, obj):
         """Get variant name if exists."""
-        if not obj.variant_id:
-            return None
-        
-        if obj.product_type == 'tour':
-            from tours.models import TourVariant
-            try:
-                variant = TourVariant.objects.get(id=obj.variant_id)
-                return variant.name
-            except TourVariant.DoesNotExist:
-                return None
-        elif obj.product_type == 'event':
-            from events.models import TicketType, Event
-            try:
-                event = Event.objects.get(id=obj.product_id)
-                variant = TicketType.objects.get(id=obj.variant_id, event=event)
-                return variant.name
-            except (TicketType.DoesNotExist, Event.DoesNotExist):
-                return None
-        elif obj.product_type == 'transfer':
-            from transfers.models import TransferRoute
-            try:
-                variant = TransferRoute.objects.get(id=obj.variant_id)
-                return variant.name
-            except TransferRoute.DoesNotExist:
-                return None
-        return None
+        variant = self._get_resolver(obj).get_variant(obj)
+        return variant.name if variant else None
     
     def get_total_price(self, obj):
         """Always return the stored total_price from the database for all product types."""
@@ -114,44 +83,33 @@ class CartItemSerializer(serializers.ModelSerializer):
     def get_origin(self, obj):
         """Get origin for transfer routes."""
         if obj.product_type == 'transfer':
-            from transfers.models import TransferRoute
-            try:
-                transfer = TransferRoute.objects.get(id=obj.product_id)
-                return transfer.origin
-            except TransferRoute.DoesNotExist:
-                return ''
+            route = self._get_resolver(obj).get_product(obj)
+            return route.origin if route else ''
         return ''
     
     def get_destination(self, obj):
         """Get destination for transfer routes."""
         if obj.product_type == 'transfer':
-            from transfers.models import TransferRoute
-            try:
-                transfer = TransferRoute.objects.get(id=obj.product_id)
-                return transfer.destination
-            except TransferRoute.DoesNotExist:
-                return ''
+            route = self._get_resolver(obj).get_product(obj)
+            return route.destination if route else ''
         return ''
 
     def get_pricing_breakdown(self, obj):
         """Get pricing breakdown for transfer items."""
         if obj.product_type == 'transfer':
             try:
-                from transfers.models import TransferRoute, TransferRoutePricing
-                from transfers.services import TransferPricingService
                 from datetime import datetime
                 
-                route = TransferRoute.objects.get(id=obj.product_id)
+                resolver = self._get_resolver(obj)
+                route = resolver.get_product(obj)
+                if route is None:
+                    return None
                 booking_data = obj.booking_data or {}
                 vehicle_type = booking_data.get('vehicle_type', 'sedan')
                 trip_type = booking_data.get('trip_type', 'one_way')
                 
                 # Get pricing
-                pricing = TransferRoutePricing.objects.filter(
-                    route=route,
-                    vehicle_type=vehicle_type,
-                    is_active=True
-                ).first()
+                pricing = resolver.get_transfer_pricing(obj, vehicle_type)
                 
                 if not pricing:
                     return None
@@ -180,7 +138,8 @@ class CartItemSerializer(serializers.ModelSerializer):
                 price_result = pricing.calculate_price(
                     hour=outbound_time.hour if outbound_time else 12,
                     is_round_trip=trip_type == 'round_trip',
-                    selected_options=obj.selected_options
+                    selected_options=obj.selected_options,
+                    options=resolver.transfer_options
                 )
                 
                 return {
@@ -2,7 +2,8 @@
 Cart services for Peykan Tourism Platform.
 """
 
-from typing import List, Dict, Any, Optional
+import uuid
+from typing import List, Dict, Any, Optional, Iterable
 from decimal import Decimal
 from django.db import transaction
 from .models import Cart, CartItem
@@ -12,6 +13,130 @@ from events.logging_config import get_cart_logger
 logger = get_cart_logger()
 
 
+class CartProductResolver:
+    """
+    Batch loader for the products referenced by a set of cart items.
+    
+    Every product type is loaded with a single ``in_bulk`` query (plus one
+    prefetch for parler translations), so serializing a cart costs a fixed
+    number of queries no matter how many items it holds. The resolver is
+    handed to ``CartItemSerializer`` through the ``product_resolver`` context key.
+    """
+    
+    def __init__(self, items: Iterable[CartItem]):
+        self.items = list(items)
+        self.item_ids = {item.pk for item in self.items}
+        self.tours = {}
+        self.tour_variants = {}
+        self.events = {}
+        self.ticket_types = {}
+        self.transfer_routes = {}
+        self.transfer_pricing = {}
+        self.transfer_options = {}
+        self._load()
+    
+    @classmethod
+    def for_cart(cls, cart: Cart) -> 'CartProductResolver':
+        """Build a resolver for all items of a cart."""
+        return cls(cart.items.all())
+    
+    def has_item(self, item: CartItem) -> bool:
+        """Check whether the item was part of the batch this resolver loaded."""
+        return item.pk in self.item_ids
+    
+    def _collect_ids(self, product_type: str, include_variants: bool = False) -> set:
+        ids = set()
+        for item in self.items:
+            if item.product_type != product_type:
+                continue
+            ids.add(item.product_id)
+            if include_variants and item.variant_id:
+                ids.add(item.variant_id)
+        return ids
+    
+    def _collect_variant_ids(self, product_type: str) -> set:
+        return {
+            item.variant_id for item in self.items
+            if item.product_type == product_type and item.variant_id
+        }
+    
+    def _load(self):
+        from tours.models import Tour, TourVariant
+        from transfers.models import TransferRoute, TransferRoutePricing, TransferOption
+        
+        tour_ids = self._collect_ids('tour')
+        if tour_ids:
+            self.tours = Tour.objects.prefetch_related('translations').in_bulk(tour_ids)
+        
+        tour_variant_ids = self._collect_variant_ids('tour')
+        if tour_variant_ids:
+            self.tour_variants = TourVariant.objects.in_bulk(tour_variant_ids)
+        
+        event_ids = self._collect_ids('event')
+        if event_ids:
+            self.events = Event.objects.prefetch_related('translations').in_bulk(event_ids)
+        
+        ticket_type_ids = self._collect_variant_ids('event')
+        if ticket_type_ids:
+            self.ticket_types = TicketType.objects.in_bulk(ticket_type_ids)
+        
+        # Transfer items historically resolve their variant name against
+        # TransferRoute as well, so both ids go into the same batch.
+        route_ids = self._collect_ids('transfer', include_variants=True)
+        if route_ids:
+            self.transfer_routes = TransferRoute.objects.prefetch_related('translations').in_bulk(route_ids)
+        
+        transfer_items = [item for item in self.items if item.product_type == 'transfer']
+        if transfer_items:
+            pricing_qs = TransferRoutePricing.objects.filter(
+                route_id__in={item.product_id for item in transfer_items},
+                is_active=True
+            ).select_related('route')
+            for pricing in pricing_qs:
+                self.transfer_pricing.setdefault((pricing.route_id, pricing.vehicle_type), pricing)
+            
+            option_ids = set()
+            for item in transfer_items:
+                for option_data in item.selected_options or []:
+                    option_id = option_data.get('option_id') if isinstance(option_data, dict) else None
+                    try:
+                        option_ids.add(uuid.UUID(str(option_id)))
+                    except (TypeError, ValueError):
+                        continue
+            if option_ids:
+                options = TransferOption.objects.filter(is_active=True).prefetch_related('translations').in_bulk(option_ids)
+                self.transfer_options = {str(pk): option for pk, option in options.items()}
+    
+    def get_product(self, item: CartItem):
+        """Return the product instance for a cart item, or None if missing."""
+        if item.product_type == 'tour':
+            return self.tours.get(item.product_id)
+        elif item.product_type == 'event':
+            return self.events.get(item.product_id)
+        elif item.product_type == 'transfer':
+            return self.transfer_routes.get(item.product_id)
+        return None
+    
+    def get_variant(self, item: CartItem):
+        """Return the variant instance for a cart item, or None if missing."""
+        if not item.variant_id:
+            return None
+        if item.product_type == 'tour':
+            return self.tour_variants.get(item.variant_id)
+        elif item.product_type == 'event':
+            ticket_type = self.ticket_types.get(item.variant_id)
+            if ticket_type and item.product_id in self.events and ticket_type.event_id == item.product_id:
+                return ticket_type
+            return None
+        elif item.product_type == 'transfer':
+            return self.transfer_routes.get(item.variant_id)
+        return None
+    
+    def get_transfer_pricing(self, item: CartItem, vehicle_type: str):
+        """Return the active pricing row for a transfer item's vehicle type."""
+        return self.transfer_pricing.get((item.product_id, vehicle_type))
+
+
 class EventCartService:
     """Service for handling event cart operations."""
     
@@ -23,11 +148,15 @@ class EventCartService:
         ticket_type_id: str,
         seats: List[Dict[str, Any]],
         selected_options: Optional[List[Dict[str, Any]]] = None,
-        special_requests: str = ""
+        special_requests: str = "",
+        hold_token: Optional[str] = None
     ) -> tuple[CartItem, bool]:
         """
         Add event seats to cart with proper merging logic.
         
+        ``hold_token`` is the token of the seat holds taken through the
+        seat-hold endpoint; checkout sells the held seats with it.
+        
         Returns:
             tuple: (cart_item, is_new_item)
         """
@@ -48,13 +177,13 @@ class EventCartService:
         if existing_item:
             logger.info(f"Merging seats with existing cart item {existing_item.id}")
             return EventCartService._merge_seats_to_existing_item(
-                existing_item, performance_id, ticket_type_id, seats, selected_options, special_requests
+                existing_item, performance_id, ticket_type_id, seats, selected_options, special_requests, hold_token
             ), False
         
         # Create new cart item
         logger.info(f"Creating new cart item for event {event_id}")
         return EventCartService._create_new_cart_item(
-            cart, event_id, performance_id, ticket_type_id, seats, selected_options, special_requests
+            cart, event_id, performance_id, ticket_type_id, seats, selected_options, special_requests, hold_token
         ), True
     
     @staticmethod
@@ -64,7 +193,8 @@ class EventCartService:
         ticket_type_id: str,
         new_seats: List[Dict[str, Any]],
         selected_options: Optional[List[Dict[str, Any]]] = None,
-        special_requests: str = ""
+        special_requests: str = "",
+        hold_token: Optional[str] = None
     ) -> CartItem:
         """Merge new seats with existing cart item."""
         existing_booking_data = existing_item.booking_data or {}
@@ -95,6 +225,8 @@ class EventCartService:
         updated_booking_data = existing_booking_data.copy()
         updated_booking_data['seats'] = all_seats
         updated_booking_data['special_requests'] = special_requests
+        if hold_token:
+            updated_booking_data['hold_token'] = hold_token
         
         # Update selected options
         updated_selected_options = [{
@@ -123,7 +255,8 @@ class EventCartService:
         ticket_type_id: str,
         seats: List[Dict[str, Any]],
         selected_options: Optional[List[Dict[str, Any]]] = None,
-        special_requests: str = ""
+        special_requests: str = "",
+        hold_token: Optional[str] = None
     ) -> CartItem:
         """Create a new cart item for event seats."""
         if selected_options is None:
@@ -194,7 +327,8 @@ class EventCartService:
                     'seats': seats,
                     'section': seats[0].get('section', '') if seats else '',
                     'selected_options': selected_options if selected_options else [],
-                    'special_requests': special_requests
+                    'special_requests': special_requests,
+                    'hold_token': hold_token
                 }
             )
             
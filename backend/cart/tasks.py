@@ -0,0 +1,13 @@
+"""
+Background tasks for carts.
+"""
+
+from celery import shared_task
+
+from .reaper import CartReaper
+
+
+@shared_task(ignore_result=True)
+def reap_expired_carts():
+    """Release expired cart reservations and delete expired carts."""
+    return CartReaper.run()
@@ -0,0 +1,171 @@
+"""
+Tests for cart serialization.
+"""
+
+from datetime import date, time, timedelta
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from events.tests import EventTestDataMixin
+from tours.models import TourAvailabilitySnapshot, TourSchedule
+from tours.tests import TourTestDataMixin
+from transfers.models import TransferRoute, TransferRoutePricing, TransferOption
+from .models import Cart, CartItem
+from .reaper import CartReaper
+from .serializers import CartSerializer
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class CartSerializerQueryTests(TestCase):
+    """Cart serialization should cost a fixed number of queries."""
+    
+    def setUp(self):
+        self.cart = Cart.objects.create(
+            session_id='resolver-test',
+            expires_at=timezone.now() + timedelta(hours=24)
+        )
+        self.option = TransferOption.objects.create(
+            name='Child Seat',
+            description='Safety child seat',
+            option_type='extra_luggage',
+            price_type='fixed',
+            price=10.00,
+            slug='child-seat'
+        )
+    
+    def _add_transfer_items(self, count):
+        offset = self.cart.items.count()
+        for index in range(offset, offset + count):
+            route = TransferRoute.objects.create(
+                name=f'Route {index}',
+                origin=f'Origin {index}',
+                destination=f'Destination {index}',
+            )
+            TransferRoutePricing.objects.create(
+                route=route,
+                vehicle_type='sedan',
+                vehicle_name='Sedan',
+                base_price=50.00,
+                max_passengers=4,
+                max_luggage=3
+            )
+            CartItem.objects.create(
+                cart=self.cart,
+                product_type='transfer',
+                product_id=route.id,
+                booking_date=date.today(),
+                booking_time=time(12, 0),
+                unit_price=50.00,
+                total_price=50.00,
+                selected_options=[{'option_id': str(self.option.id), 'quantity': 1, 'price': 10.00}],
+                booking_data={'vehicle_type': 'sedan', 'outbound_datetime': '2030-01-01 08:00'},
+            )
+    
+    def _count_queries(self):
+        cart = Cart.objects.prefetch_related('items').get(pk=self.cart.pk)
+        with CaptureQueriesContext(connection) as context:
+            data = CartSerializer(cart).data
+        return len(context.captured_queries), data
+    
+    def test_query_count_does_not_grow_with_cart_size(self):
+        self._add_transfer_items(2)
+        small_count, _ = self._count_queries()
+        
+        self._add_transfer_items(6)
+        large_count, data = self._count_queries()
+        
+        self.assertEqual(small_count, large_count)
+        self.assertEqual(len(data['items']), 8)
+    
+    def test_transfer_fields_resolved_from_batch(self):
+        self._add_transfer_items(1)
+        _, data = self._count_queries()
+        
+        item = data['items'][0]
+        self.assertEqual(item['product_title'], 'Route 0')
+        self.assertEqual(item['origin'], 'Origin 0')
+        self.assertEqual(item['pricing_breakdown']['options_total'], 10.0)
+        self.assertEqual(item['pricing_breakdown']['time_surcharge'], 5.0)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class CartReaperTests(TourTestDataMixin, EventTestDataMixin, TestCase):
+    """The reaper releases held capacity set-based and deletes expired carts in batches."""
+    
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_tour_fixture(schedule_count=2)
+            self.create_event_fixture(capacity=50)
+        self.cart = Cart.objects.create(session_id='reaper', expires_at=timezone.now() + timedelta(hours=1))
+    
+    def add_item(self, cart, schedule, quantity, expires_in_minutes):
+        with self.captureOnCommitCallbacks(execute=True):
+            item = CartItem.objects.create(
+                cart=cart, product_type='tour', product_id=self.tour.id, variant_id=self.variant.id,
+                booking_date=schedule.start_date, booking_time=schedule.start_time, quantity=quantity,
+                unit_price=50, booking_data={'schedule_id': str(schedule.id)}
+            )
+            item.create_reservation()
+        CartItem.objects.filter(pk=item.pk).update(
+            reservation_expires_at=timezone.now() + timedelta(minutes=expires_in_minutes)
+        )
+        return item
+    
+    def capacities(self):
+        return [TourSchedule.objects.get(pk=schedule.pk).current_capacity for schedule in self.schedules]
+    
+    def test_releases_expired_reservations_in_grouped_updates(self):
+        first, second = self.schedules
+        for _ in range(3):
+            self.add_item(self.cart, first, 2, expires_in_minutes=-5)
+        self.add_item(self.cart, second, 2, expires_in_minutes=-5)
+        live = self.add_item(self.cart, second, 1, expires_in_minutes=20)
+        event_item = CartItem.objects.create(
+            cart=self.cart, product_type='event', product_id=self.event.id, booking_date=self.performance.date,
+            booking_time=self.performance.start_time, quantity=4, unit_price=100,
+            booking_data={'performance_id': str(self.performance.id)}
+        )
+        event_item.create_reservation()
+        CartItem.objects.filter(pk=event_item.pk).update(reservation_expires_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.capacities(), [6, 3])
+        
+        with CaptureQueriesContext(connection) as queries:
+            released, capacity = CartReaper.release_expired_reservations(timezone.now(), batch_size=100)
+        
+        self.assertEqual((released, capacity), (5, 12))
+        # Flag the items, then one update per released quantity: schedules 6 and 2, performance 4.
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 4)
+        self.assertEqual(self.capacities(), [0, 1])
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.current_capacity, 0)
+        self.assertEqual(list(CartItem.objects.filter(is_reserved=True)), [live])
+    
+    def test_run_deletes_expired_carts_in_batches_and_records_metrics(self):
+        schedule = self.schedules[0]
+        for index in range(5):
+            cart = Cart.objects.create(session_id=f'old-{index}', expires_at=timezone.now() - timedelta(hours=1))
+            self.add_item(cart, schedule, 1, expires_in_minutes=10)
+        self.add_item(self.cart, schedule, 3, expires_in_minutes=10)
+        self.assertEqual(self.capacities()[0], 8)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = CartReaper.run(batch_size=2, max_batches=10)
+        
+        self.assertEqual((stats['carts_deleted'], stats['items_deleted'], stats['capacity_released']), (5, 5, 5))
+        self.assertEqual(stats['reservations_released'], 0)
+        self.assertGreater(stats['cart_lag_seconds'], 3500)
+        self.assertEqual(stats['batches'], 1 + 3)
+        self.assertEqual(list(Cart.objects.all()), [self.cart])
+        self.assertEqual(self.capacities()[0], 3)
+        snapshot = TourAvailabilitySnapshot.objects.get(schedule=schedule, variant=self.variant)
+        self.assertEqual(snapshot.held_capacity, 3)
+        self.assertEqual(CartReaper.last_run(), stats)
@@ -8,11 +8,15 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 from django.db import transaction
+from django.db.models import prefetch_related_objects
 from django.utils import timezone
 import uuid
 from decimal import Decimal
 
+from shared.throttling import RateLimitedMixin
+
 from .models import Cart, CartItem, CartService
+from .services import CartProductResolver
 from .serializers import (
     CartSerializer, CartItemSerializer, AddToCartSerializer,
     UpdateCartItemSerializer, CartItemCreateSerializer
@@ -35,13 +39,21 @@ class CartView(generics.RetrieveAPIView):
             session_id=session_id,
             user=user
         )
+        prefetch_related_objects([cart], 'items')
+        self.product_resolver = CartProductResolver.for_cart(cart)
         return cart
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['product_resolver'] = getattr(self, 'product_resolver', None)
+        return context
 
 
-class AddToCartView(APIView):
+class AddToCartView(RateLimitedMixin, APIView):
     """Add item to cart."""
     
     permission_classes = [permissions.AllowAny]  # Allow guest access
+    throttle_scope = 'cart_add'
     
     def post(self, request):
         serializer = AddToCartSerializer(data=request.data)
@@ -592,6 +604,7 @@ class AddEventSeatsToCartView(APIView):
             seats = request.data['seats']
             selected_options = request.data.get('selected_options', [])
             special_requests = request.data.get('special_requests', '')
+            hold_token = request.data.get('hold_token')
             
             # Validate seats
             if not seats or not isinstance(seats, list):
@@ -613,7 +626,8 @@ class AddEventSeatsToCartView(APIView):
                 ticket_type_id=ticket_type_id,
                 seats=seats,
                 selected_options=selected_options,
-                special_requests=special_requests
+                special_requests=special_requests,
+                hold_token=hold_token
             )
             
             if is_new_item:
@@ -649,8 +663,12 @@ class CartSummaryView(APIView):
             user=user
         )
         
+        prefetch_related_objects([cart], 'items')
+        items = list(cart.items.all())
+        product_resolver = CartProductResolver(items)
+        
         # Calculate totals using correct pricing logic
-        total_items = sum(item.quantity for item in cart.items.all())
+        total_items = sum(item.quantity for item in items)
         
         # Use CartSerializer methods for consistency
         cart_serializer = CartSerializer(cart)
@@ -659,15 +677,19 @@ class CartSummaryView(APIView):
         
         # Get currency (use first item's currency or default)
         currency = 'USD'
-        if cart.items.exists():
-            currency = cart.items.first().currency
+        if items:
+            currency = items[0].currency
         
         return Response({
             'total_items': total_items,
             'subtotal': float(subtotal),
             'total_price': float(total_price),
             'currency': currency,
-            'items': CartItemSerializer(cart.items.all(), many=True).data
+            'items': CartItemSerializer(
+                items,
+                many=True,
+                context={'request': request, 'product_resolver': product_resolver}
+            ).data
         })
 
 
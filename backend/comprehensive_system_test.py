@@ -19,6 +19,7 @@ django.setup()
 from django.contrib.auth import get_user_model
 from django.db import transaction
 from tours.models import Tour, TourVariant, TourPricing, TourSchedule
+from tours.capacity import VariantCapacityService
 from cart.models import Cart, CartItem, CartService
 from orders.models import Order, OrderItem, OrderService
 from users.models import User
@@ -117,7 +118,7 @@ class ComprehensiveSystemTest:
             return False
         
         # Test capacity structure
-        capacities = schedule.variant_capacities_raw
+        capacities = schedule.variant_capacities
         if not isinstance(capacities, dict):
             print(f"    ❌ Invalid capacity structure: {type(capacities)}")
             return False
@@ -349,7 +350,7 @@ class ComprehensiveSystemTest:
         # Verify capacity was updated
         schedule.refresh_from_db()
         variant_id = str(variant.id)
-        capacities = schedule.variant_capacities_raw
+        capacities = schedule.variant_capacities
         
         if variant_id in capacities:
             booked = capacities[variant_id].get('booked', 0)
@@ -378,25 +379,9 @@ class ComprehensiveSystemTest:
         # Test transaction safety
         try:
             with transaction.atomic():
-                # Lock the schedule
-                locked_schedule = TourSchedule.objects.select_for_update().get(id=schedule.id)
-                
-                # Check capacity
-                variant_id = str(variant.id)
-                capacities = locked_schedule.variant_capacities_raw
-                
-                if variant_id in capacities:
-                    current_booked = capacities[variant_id].get('booked', 0)
-                    total_capacity = capacities[variant_id].get('total', 0)
-                    
-                    if current_booked >= total_capacity:
-                        raise ValueError("No capacity available")
-                    
-                    # Update capacity
-                    capacities[variant_id]['booked'] = current_booked + 1
-                    capacities[variant_id]['available'] = total_capacity - (current_booked + 1)
-                    locked_schedule.variant_capacities_raw = capacities
-                    locked_schedule.save()
+                # Book with a conditional update; it fails instead of overbooking
+                if not VariantCapacityService.book(schedule.id, variant.id, 1):
+                    raise ValueError("No capacity available")
             
             print(f"    ✅ Concurrent booking protection working")
             return True
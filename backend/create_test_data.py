@@ -2,7 +2,9 @@ import uuid
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from tours.models import Tour, TourCategory, TourVariant, TourOption, TourSchedule, TourPricing
+from tours.models import (
+    Tour, TourCategory, TourVariant, TourOption, TourSchedule, TourScheduleVariantCapacity, TourPricing
+)
 from events.models import Event, EventCategory, EventPerformance, Seat, TicketType, Venue
 from transfers.models import TransferRoute, TransferRoutePricing
 from cart.models import Cart, CartItem
@@ -279,7 +281,7 @@ def create_tour_test_data():
                     start_time = datetime.strptime(start_time, "%H:%M").time()
                 if isinstance(end_time, str):
                     end_time = datetime.strptime(end_time, "%H:%M").time()
-                TourSchedule.objects.get_or_create(
+                schedule, _ = TourSchedule.objects.get_or_create(
                     tour=tour,
                     start_date=schedule_date,
                     end_date=schedule_date,
@@ -291,14 +293,14 @@ def create_tour_test_data():
                         'max_capacity': tour.max_participants,
                         'current_capacity': 0,
                         'day_of_week': schedule_date.weekday(),
-                        'variant_capacities_raw': {
-                            'eco': tour.max_participants,
-                            'normal': tour.max_participants,
-                            'vip': tour.max_participants,
-                            'vvip': tour.max_participants
-                        }
                     }
                 )
+                for variant in tour.variants.all():
+                    TourScheduleVariantCapacity.objects.get_or_create(
+                        schedule=schedule,
+                        variant=variant,
+                        defaults={'total_capacity': tour.max_participants}
+                    )
         tours.append(tour)
     return tours
 
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class EventsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'events'
-    verbose_name = 'Events' 
\ No newline at end of file
+    verbose_name = 'Events'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -9,6 +9,7 @@ from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.db.models import Sum, Q
 from .models import Event, EventPerformance, EventSection, SectionTicketType, TicketType, Seat
+from .inventory import SeatInventory
 
 
 class CapacityManager:
@@ -124,19 +125,17 @@ class CapacityManager:
     def reserve_seats(performance, ticket_type_id, section_name, count):
         """Reserve seats for a specific ticket type and section."""
         try:
-            section_ticket = SectionTicketType.objects.get(
+            section_ticket = SectionTicketType.objects.select_related('section').get(
                 section__performance=performance,
                 section__name=section_name,
                 ticket_type_id=ticket_type_id
             )
-            
-            section_ticket.reserve_capacity(count)
-            return True, section_ticket
-            
         except SectionTicketType.DoesNotExist:
             return False, "Section ticket type not found"
-        except ValidationError as e:
-            return False, str(e)
+        
+        if not SeatInventory.reserve(section_ticket, count):
+            return False, f'Cannot reserve {count} seats. Only {section_ticket.available_capacity} available.'
+        return True, section_ticket
     
     @staticmethod
     def get_capacity_summary(performance):
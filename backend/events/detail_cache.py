@@ -0,0 +1,155 @@
+"""
+Response-fragment cache for the event detail endpoint.
+
+The serialized event detail is split into two fragments:
+
+- ``static``: descriptive data (texts, category, venue, artists, ticket types,
+  options, reviews) that changes when the event itself is edited.
+- ``volatile``: performances, capacity and price data that changes whenever a
+  performance, section or section ticket type is saved.
+
+Each fragment is cached per event, language and currency under a key that
+embeds a per-event fragment version. Invalidating a fragment replaces its
+version token, which orphans the cached copies for every language and
+currency at once without needing pattern deletes. Version tokens live in the
+shared cache so every process sees an invalidation immediately; fragments
+live in the default (tiered) cache because a versioned key never changes
+content.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache, caches
+
+
+STATIC = 'static'
+VOLATILE = 'volatile'
+FRAGMENTS = (STATIC, VOLATILE)
+
+FRAGMENT_FIELDS = {
+    STATIC: (
+        'id', 'slug', 'title', 'description', 'short_description',
+        'highlights', 'rules', 'required_items', 'image', 'gallery',
+        'style', 'door_open_time', 'start_time', 'end_time',
+        'age_restriction', 'price', 'currency', 'category', 'venue', 'artists',
+        'ticket_types', 'options', 'reviews', 'average_rating', 'review_count',
+        'booking_info', 'available_options', 'is_active', 'created_at', 'updated_at',
+    ),
+    VOLATILE: (
+        'performances', 'available_performances', 'pricing_summary',
+        'performance_calendar', 'seat_map_info', 'capacity_overview',
+    ),
+}
+
+VERSION_KEY = 'events:detail:version:{event_id}:{fragment}'
+FRAGMENT_KEY = 'events:detail:{event_id}:{fragment}:{version}:{language}:{currency}'
+
+
+class EventDetailCache:
+    """
+    Cache of serialized event detail fragments.
+    """
+
+    @staticmethod
+    def _versions_cache():
+        return caches['shared']
+
+    @staticmethod
+    def _timeout(fragment):
+        if fragment == STATIC:
+            return settings.EVENT_DETAIL_CACHE_STATIC_TIMEOUT
+        return settings.EVENT_DETAIL_CACHE_VOLATILE_TIMEOUT
+
+    @classmethod
+    def _versions(cls, event_id):
+        versions_cache = cls._versions_cache()
+        keys = {fragment: VERSION_KEY.format(event_id=event_id, fragment=fragment) for fragment in FRAGMENTS}
+        found = versions_cache.get_many(keys.values())
+
+        versions = {}
+        for fragment, key in keys.items():
+            version = found.get(key)
+            if version is None:
+                versions_cache.add(key, uuid.uuid4().hex, None)
+                version = versions_cache.get(key)
+            versions[fragment] = version
+        return versions
+
+    @classmethod
+    def get(cls, event_id, language, currency, render):
+        """
+        Return the serialized detail of an event.
+
+        Args:
+            event_id: Event primary key.
+            language: Language code the response is rendered in.
+            currency: Currency code the response is rendered for.
+            render: Callable taking a list of fragment names and returning
+                ``{fragment: data}`` for those fragments; only called for
+                fragments that are not cached.
+        """
+        versions = cls._versions(event_id)
+        keys = {
+            fragment: FRAGMENT_KEY.format(
+                event_id=event_id, fragment=fragment, version=versions[fragment],
+                language=language, currency=currency
+            )
+            for fragment in FRAGMENTS
+        }
+        fragments = {}
+        cached = cache.get_many(keys.values())
+        for fragment, key in keys.items():
+            if key in cached:
+                fragments[fragment] = cached[key]
+
+        missing = [fragment for fragment in FRAGMENTS if fragment not in fragments]
+        if missing:
+            rendered = render(missing)
+            for fragment in missing:
+                cache.set(keys[fragment], rendered[fragment], cls._timeout(fragment))
+            fragments.update(rendered)
+
+        return cls.merge(fragments)
+
+    @staticmethod
+    def render(serializer, fragments):
+        """Serialize only the fields that belong to ``fragments``."""
+        wanted = {field for fragment in fragments for field in FRAGMENT_FIELDS[fragment]}
+        for name in list(serializer.fields):
+            if name not in wanted:
+                serializer.fields.pop(name)
+        data = serializer.data
+        return {
+            # Fields the serializer skipped stay absent, as in an uncached response.
+            fragment: {field: data[field] for field in FRAGMENT_FIELDS[fragment] if field in data}
+            for fragment in fragments
+        }
+
+    @staticmethod
+    def merge(fragments):
+        """Merge fragments back into one response, in serializer field order."""
+        from .serializers import EventDetailSerializer
+        merged = {}
+        for fragment in FRAGMENTS:
+            merged.update(fragments[fragment])
+        return {field: merged[field] for field in EventDetailSerializer.Meta.fields if field in merged}
+
+    @classmethod
+    def invalidate(cls, event_id, fragments=FRAGMENTS):
+        """Drop cached fragments of an event for every language and currency."""
+        versions_cache = cls._versions_cache()
+        versions_cache.set_many({
+            VERSION_KEY.format(event_id=event_id, fragment=fragment): uuid.uuid4().hex
+            for fragment in fragments
+        }, None)
+
+    @classmethod
+    def invalidate_sections(cls, section_ids):
+        """Drop the volatile fragment of the events owning ``section_ids``."""
+        from .models import EventSection
+        event_ids = set(
+            EventSection.objects.filter(pk__in=section_ids).values_list('performance__event_id', flat=True)
+        )
+        for event_id in event_ids:
+            cls.invalidate(event_id, [VOLATILE])
@@ -0,0 +1,115 @@
+"""
+Atomic seat inventory engine for Events.
+
+Capacity counters on SectionTicketType and its parent EventSection are moved
+with conditional UPDATE statements (``SET available = available - n WHERE
+available >= n``) instead of read-modify-save, so concurrent reservations can
+never oversell and no row lock is held across a Django round trip.
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+
+from .detail_cache import EventDetailCache
+from .models import EventSection, SectionTicketType
+
+
+class InsufficientInventory(Exception):
+    """Raised internally to roll back a partially applied transition."""
+    pass
+
+
+class SeatInventory:
+    """
+    Counter-based inventory operations for section ticket allocations.
+
+    Each operation moves ``count`` seats from one capacity bucket to another
+    (available → reserved, reserved → available, reserved → sold) on both the
+    SectionTicketType row and its EventSection in a single transaction. The
+    operation either applies to both rows or to neither.
+    """
+
+    CAPACITY_FIELDS = ('available_capacity', 'reserved_capacity', 'sold_capacity')
+
+    @staticmethod
+    def _move(model, pk, source, target, count):
+        """Conditionally move ``count`` units from ``source`` to ``target``."""
+        return model.objects.filter(
+            pk=pk,
+            **{f'{source}__gte': count}
+        ).update(**{
+            source: F(source) - count,
+            target: F(target) + count,
+        })
+
+    @classmethod
+    def transition(cls, section_ticket_id, section_id, count, source, target):
+        """
+        Move capacity between buckets on a ticket allocation and its section.
+
+        Returns:
+            bool: True if both counters were updated, False if either row
+            did not have ``count`` units in ``source``.
+        """
+        if count <= 0:
+            return count == 0
+
+        try:
+            with transaction.atomic():
+                if not cls._move(SectionTicketType, section_ticket_id, source, target, count):
+                    raise InsufficientInventory
+                if not cls._move(EventSection, section_id, source, target, count):
+                    raise InsufficientInventory
+        except InsufficientInventory:
+            return False
+        cls._changed(section_id)
+        return True
+
+    @staticmethod
+    def _changed(section_id):
+        # Counter updates bypass model signals, so invalidate cached event
+        # detail capacity explicitly once the change is committed.
+        transaction.on_commit(partial(EventDetailCache.invalidate_sections, [section_id]))
+
+    @classmethod
+    def _apply(cls, section_ticket, count, source, target, refresh):
+        success = cls.transition(section_ticket.pk, section_ticket.section_id, count, source, target)
+        if refresh:
+            cls.refresh(section_ticket)
+        return success
+
+    @classmethod
+    def refresh(cls, section_ticket):
+        """Reload the capacity counters of an allocation and its cached section."""
+        section_ticket.refresh_from_db(fields=list(cls.CAPACITY_FIELDS))
+        if SectionTicketType.section.is_cached(section_ticket):
+            section_ticket.section.refresh_from_db(fields=list(cls.CAPACITY_FIELDS))
+
+    @classmethod
+    def reserve(cls, section_ticket, count=1, refresh=True):
+        """Reserve ``count`` available seats."""
+        return cls._apply(section_ticket, count, 'available_capacity', 'reserved_capacity', refresh)
+
+    @classmethod
+    def release(cls, section_ticket, count=1, refresh=True):
+        """Return ``count`` reserved seats to the available pool."""
+        return cls._apply(section_ticket, count, 'reserved_capacity', 'available_capacity', refresh)
+
+    @classmethod
+    def sell(cls, section_ticket, count=1, refresh=True):
+        """Convert ``count`` reserved seats to sold."""
+        return cls._apply(section_ticket, count, 'reserved_capacity', 'sold_capacity', refresh)
+
+    @classmethod
+    def move_section(cls, section, count, source, target, refresh=True):
+        """Move capacity on a section that has no ticket allocation involved."""
+        if count <= 0:
+            return count == 0
+        success = bool(cls._move(EventSection, section.pk, source, target, count))
+        if success:
+            cls._changed(section.pk)
+        if refresh:
+            section.refresh_from_db(fields=list(cls.CAPACITY_FIELDS))
+        return success
@@ -0,0 +1,158 @@
+"""
+Micro-benchmark for event price calculation.
+
+Prices every section × ticket type of an event's performances once through
+the scalar ``calculate_ticket_price`` path and once through
+``calculate_matrix``, reports time and query counts, and verifies that both
+paths return identical breakdowns.
+"""
+
+import time
+import uuid
+from datetime import date, time as dt_time, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from events.models import (
+    Event, EventCategory, EventOption, EventPerformance, EventSection,
+    SectionTicketType, TicketType, Venue
+)
+from events.pricing_service import EventPriceCalculator
+
+
+class Command(BaseCommand):
+    help = 'Compare scalar and matrix event price calculation.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--performances', type=int, default=30, help='Performances to price')
+        parser.add_argument('--sections', type=int, default=4, help='Sections per performance')
+        parser.add_argument('--ticket-types', type=int, default=3, help='Ticket types per section')
+        parser.add_argument('--options', type=int, default=2, help='Selected options per calculation')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed repetitions per path')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark fixture afterwards')
+
+    def handle(self, *args, **options):
+        for name in ('performances', 'sections', 'ticket_types', 'repeat'):
+            if options[name] < 1:
+                raise CommandError(f'{name} must be positive.')
+
+        event, selected_options = self._create_fixture(options)
+        try:
+            performances = list(event.performances.order_by('date'))
+            cells = options['performances'] * options['sections'] * options['ticket_types']
+            self.stdout.write(self.style.NOTICE(
+                f"Pricing {cells} cells ({options['performances']} performances × "
+                f"{options['sections']} sections × {options['ticket_types']} ticket types)"
+            ))
+
+            scalar_time, scalar_queries, scalar = self._measure(
+                lambda: self._scalar(event, performances, selected_options), options['repeat']
+            )
+            matrix_time, matrix_queries, matrix = self._measure(
+                lambda: self._matrix(performances, selected_options), options['repeat']
+            )
+        finally:
+            if not options['keep']:
+                event.category.delete()
+                event.venue.delete()
+
+        self.stdout.write(f'  scalar: {scalar_time * 1000:.1f} ms, {scalar_queries} queries')
+        self.stdout.write(f'  matrix: {matrix_time * 1000:.1f} ms, {matrix_queries} queries')
+        if scalar != matrix:
+            raise CommandError('Matrix results differ from the scalar path.')
+        speedup = scalar_time / matrix_time if matrix_time else 0
+        self.stdout.write(self.style.SUCCESS(f'Results identical; matrix is {speedup:.1f}x faster.'))
+
+    def _measure(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                result = func()
+                elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, len(queries.captured_queries), result
+
+    def _scalar(self, event, performances, selected_options):
+        results = {}
+        for performance in performances:
+            calculator = EventPriceCalculator(event, performance)
+            for section in performance.sections.all():
+                for section_ticket in section.ticket_types.all():
+                    results[(str(performance.id), section.name, str(section_ticket.ticket_type_id))] = (
+                        calculator.calculate_ticket_price(
+                            section_name=section.name,
+                            ticket_type_id=section_ticket.ticket_type_id,
+                            selected_options=selected_options,
+                            is_group_booking=True,
+                        )
+                    )
+        return results
+
+    def _matrix(self, performances, selected_options):
+        matrix = EventPriceCalculator.calculate_matrix(
+            performances, selected_options=selected_options, is_group_booking=True
+        )
+        return {
+            (performance_id, section_name, ticket_type_id): breakdown
+            for performance_id, entry in matrix.items()
+            for section_name, cells in entry['sections'].items()
+            for ticket_type_id, breakdown in cells.items()
+        }
+
+    def _create_fixture(self, options):
+        suffix = uuid.uuid4().hex[:8]
+        category = EventCategory.objects.create(
+            slug=f'bench-category-{suffix}', name='Benchmark', description='Benchmark'
+        )
+        venue = Venue.objects.create(
+            slug=f'bench-venue-{suffix}', name='Benchmark Venue', description='Benchmark',
+            address='-', city='Istanbul', country='Turkey', total_capacity=1000
+        )
+        event = Event.objects.create(
+            slug=f'bench-event-{suffix}', title='Benchmark Event', description='Benchmark',
+            short_description='Benchmark', category=category, venue=venue, style='music',
+            price=100, city='Istanbul', country='Turkey',
+            door_open_time=dt_time(18, 0), start_time=dt_time(19, 0), end_time=dt_time(22, 0)
+        )
+        ticket_types = [
+            TicketType.objects.create(
+                event=event, name=f'Type {index}', ticket_type='normal', capacity=1000,
+                price_modifier=Decimal('1.00') + Decimal(index) / 4
+            )
+            for index in range(options['ticket_types'])
+        ]
+        event_options = [
+            EventOption.objects.create(event=event, name=f'Option {index}', price=Decimal('5.00') * (index + 1))
+            for index in range(options['options'])
+        ]
+
+        sections = []
+        for day in range(options['performances']):
+            performance_date = date.today() + timedelta(days=30 + day)
+            performance = EventPerformance.objects.create(
+                event=event, date=performance_date, start_date=performance_date, end_date=performance_date,
+                start_time=dt_time(19, 0), end_time=dt_time(22, 0), max_capacity=1000
+            )
+            sections.extend(
+                EventSection(
+                    performance=performance, name=f'S{index}', total_capacity=100,
+                    available_capacity=100, base_price=Decimal('50.00') * (index + 1)
+                )
+                for index in range(options['sections'])
+            )
+        EventSection.objects.bulk_create(sections)
+        SectionTicketType.objects.bulk_create([
+            SectionTicketType(
+                section=section, ticket_type=ticket_type, allocated_capacity=10, available_capacity=10,
+                price_modifier=ticket_type.price_modifier
+            )
+            for section in sections
+            for ticket_type in ticket_types
+        ])
+
+        selected_options = [{'option_id': str(option.id), 'quantity': 2} for option in event_options]
+        return event, selected_options
@@ -0,0 +1,171 @@
+"""
+Concurrency benchmark for the seat inventory engine.
+
+Runs N threads that keep reserving seats from a single section until it is
+sold out, then reports throughput and oversell. With the atomic engine the
+oversell count must be zero; ``--mode legacy`` replays the old
+read-modify-save path for comparison.
+"""
+
+import threading
+import time
+import uuid
+from datetime import date, time as dt_time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, OperationalError, transaction
+
+from events.inventory import SeatInventory
+from events.models import (
+    Event, EventCategory, EventPerformance, EventSection, SectionTicketType,
+    TicketType, Venue
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent seat reservations against one event section.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Number of concurrent workers')
+        parser.add_argument('--capacity', type=int, default=500, help='Seats allocated to the section')
+        parser.add_argument('--batch', type=int, default=1, help='Seats requested per reservation')
+        parser.add_argument(
+            '--mode',
+            choices=['atomic', 'legacy'],
+            default='atomic',
+            help='atomic: conditional UPDATE engine; legacy: read-modify-save',
+        )
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark fixture afterwards')
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1 or options['capacity'] < 1 or options['batch'] < 1:
+            raise CommandError('threads, capacity and batch must be positive.')
+
+        event, section_ticket = self._create_fixture(options['capacity'])
+        try:
+            result = self._run(section_ticket, options)
+        finally:
+            if not options['keep']:
+                event.category.delete()
+                event.venue.delete()
+
+        self._report(result, options)
+        if result['oversell'] and options['mode'] == 'atomic':
+            raise CommandError(f"Oversold {result['oversell']} seats.")
+
+    def _create_fixture(self, capacity):
+        suffix = uuid.uuid4().hex[:8]
+        category = EventCategory.objects.create(
+            slug=f'bench-category-{suffix}', name='Benchmark', description='Benchmark'
+        )
+        venue = Venue.objects.create(
+            slug=f'bench-venue-{suffix}', name='Benchmark Venue', description='Benchmark',
+            address='-', city='Istanbul', country='Turkey', total_capacity=capacity
+        )
+        event = Event.objects.create(
+            slug=f'bench-event-{suffix}', title='Benchmark Event', description='Benchmark',
+            short_description='Benchmark', category=category, venue=venue, style='music',
+            price=100, city='Istanbul', country='Turkey',
+            door_open_time=dt_time(18, 0), start_time=dt_time(19, 0), end_time=dt_time(22, 0)
+        )
+        ticket_type = TicketType.objects.create(
+            event=event, name='Normal', ticket_type='normal', capacity=capacity
+        )
+        performance_date = date.today() + timedelta(days=30)
+        performance = EventPerformance.objects.create(
+            event=event, date=performance_date, start_date=performance_date, end_date=performance_date,
+            start_time=dt_time(19, 0), end_time=dt_time(22, 0), max_capacity=capacity
+        )
+        section = EventSection.objects.create(
+            performance=performance, name='A', total_capacity=capacity,
+            available_capacity=capacity, base_price=100
+        )
+        section_ticket = SectionTicketType.objects.create(
+            section=section, ticket_type=ticket_type,
+            allocated_capacity=capacity, available_capacity=capacity
+        )
+        return event, section_ticket
+
+    def _run(self, section_ticket, options):
+        batch = options['batch']
+        mode = options['mode']
+        lock = threading.Lock()
+        granted = {'reservations': 0, 'seats': 0, 'attempts': 0, 'retries': 0}
+
+        def reserve_legacy():
+            stt = SectionTicketType.objects.select_related('section').get(pk=section_ticket.pk)
+            if stt.available_capacity < batch:
+                return False
+            stt.available_capacity -= batch
+            stt.reserved_capacity += batch
+            stt.save(update_fields=['available_capacity', 'reserved_capacity'])
+            section = stt.section
+            section.available_capacity -= batch
+            section.reserved_capacity += batch
+            section.save(update_fields=['available_capacity', 'reserved_capacity'])
+            return True
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        if mode == 'atomic':
+                            success = SeatInventory.transition(
+                                section_ticket.pk, section_ticket.section_id, batch,
+                                'available_capacity', 'reserved_capacity'
+                            )
+                        else:
+                            with transaction.atomic():
+                                success = reserve_legacy()
+                    except OperationalError:
+                        # SQLite reports write contention as "database is locked".
+                        with lock:
+                            granted['retries'] += 1
+                        continue
+                    with lock:
+                        granted['attempts'] += 1
+                        if success:
+                            granted['reservations'] += 1
+                            granted['seats'] += batch
+                    if not success:
+                        return
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        section_ticket.refresh_from_db()
+        section = EventSection.objects.get(pk=section_ticket.section_id)
+        return {
+            **granted,
+            'elapsed': elapsed,
+            'oversell': max(0, granted['seats'] - section_ticket.allocated_capacity),
+            'lost_updates': granted['seats'] - section_ticket.reserved_capacity,
+            'ticket_available': section_ticket.available_capacity,
+            'ticket_reserved': section_ticket.reserved_capacity,
+            'section_available': section.available_capacity,
+            'section_reserved': section.reserved_capacity,
+        }
+
+    def _report(self, result, options):
+        throughput = result['attempts'] / result['elapsed'] if result['elapsed'] else 0
+        self.stdout.write(self.style.NOTICE(
+            f"Mode: {options['mode']} | threads: {options['threads']} | "
+            f"capacity: {options['capacity']} | batch: {options['batch']}"
+        ))
+        self.stdout.write(f"Elapsed: {result['elapsed']:.3f}s")
+        self.stdout.write(f"Attempts: {result['attempts']} ({throughput:.1f} ops/s), lock retries: {result['retries']}")
+        self.stdout.write(f"Reservations granted: {result['reservations']} ({result['seats']} seats)")
+        self.stdout.write(
+            f"Ticket counters: available={result['ticket_available']} reserved={result['ticket_reserved']} | "
+            f"Section counters: available={result['section_available']} reserved={result['section_reserved']}"
+        )
+        self.stdout.write(f"Lost updates: {result['lost_updates']}")
+        style = self.style.SUCCESS if result['oversell'] == 0 else self.style.ERROR
+        self.stdout.write(style(f"Oversell: {result['oversell']}"))
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_eventdiscount_eventfee_eventpricingrule'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['created_at', 'id'], name='events_even_created_cdb609_idx'),
+        ),
+    ]
@@ -162,6 +162,9 @@ class Event(BaseProductModel):
     class Meta:
         verbose_name = _('Event')
         verbose_name_plural = _('Events')
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
     
     def __str__(self):
         return self.title or self.slug
@@ -555,30 +558,21 @@ class EventSection(BaseModel):
     
     def reserve_capacity(self, count=1):
         """Reserve capacity in this section."""
-        if not self.can_reserve(count):
+        from .inventory import SeatInventory
+        if not SeatInventory.move_section(self, count, 'available_capacity', 'reserved_capacity'):
             raise ValidationError(f'Cannot reserve {count} seats. Only {self.available_capacity} available.')
-        
-        self.available_capacity -= count
-        self.reserved_capacity += count
-        self.save()
     
     def release_capacity(self, count=1):
         """Release reserved capacity."""
-        if self.reserved_capacity < count:
+        from .inventory import SeatInventory
+        if not SeatInventory.move_section(self, count, 'reserved_capacity', 'available_capacity'):
             raise ValidationError(f'Cannot release {count} seats. Only {self.reserved_capacity} reserved.')
-        
-        self.reserved_capacity -= count
-        self.available_capacity += count
-        self.save()
     
     def sell_capacity(self, count=1):
         """Sell capacity (convert from reserved to sold)."""
-        if self.reserved_capacity < count:
+        from .inventory import SeatInventory
+        if not SeatInventory.move_section(self, count, 'reserved_capacity', 'sold_capacity'):
             raise ValidationError(f'Cannot sell {count} seats. Only {self.reserved_capacity} reserved.')
-        
-        self.reserved_capacity -= count
-        self.sold_capacity += count
-        self.save()
 
 
 class SectionTicketType(BaseModel):
@@ -640,40 +634,23 @@ class SectionTicketType(BaseModel):
         return self.available_capacity >= count
     
     def reserve_capacity(self, count=1):
-        """Reserve capacity for this ticket type."""
-        if not self.can_reserve(count):
+        """Reserve capacity for this ticket type (and its section) atomically."""
+        from .inventory import SeatInventory
+        if not SeatInventory.reserve(self, count):
             raise ValidationError(f'Cannot reserve {count} seats. Only {self.available_capacity} available.')
-        
-        self.available_capacity -= count
-        self.reserved_capacity += count
-        self.save()
-        
-        # Also update section capacity
-        self.section.reserve_capacity(count)
     
     def release_capacity(self, count=1):
-        """Release reserved capacity for this ticket type."""
-        if self.reserved_capacity < count:
+        """Release reserved capacity for this ticket type (and its section) atomically."""
+        from .inventory import SeatInventory
+        if not SeatInventory.release(self, count):
             raise ValidationError(f'Cannot release {count} seats. Only {self.reserved_capacity} reserved.')
-        
-        self.reserved_capacity -= count
-        self.available_capacity += count
-        self.save()
-        
-        # Also update section capacity
-        self.section.release_capacity(count)
     
     def sell_capacity(self, count=1):
-        """Sell capacity for this ticket type."""
-        if self.reserved_capacity < count:
+        """Sell capacity for this ticket type (and its section) atomically."""
+        from .inventory import SeatInventory
+        if not SeatInventory.sell(self, count):
             raise ValidationError(f'Cannot sell {count} seats. Only {self.reserved_capacity} reserved.')
-        
-        self.reserved_capacity -= count
-        self.sold_capacity += count
-        self.save()
-        
-        # Also update section capacity
-        self.section.sell_capacity(count) 
+
 
 
 class EventDiscount(BaseModel):
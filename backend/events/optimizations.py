@@ -2,9 +2,16 @@
 Query optimizations for Events app.
 """
 
+import uuid
+
+from django.db import transaction
 from django.db.models import Prefetch, Q, Count, Avg
-from django.core.cache import cache
-from .models import Event, EventPerformance, TicketType, Seat
+from django.core.cache import cache, caches
+from .detail_cache import EventDetailCache
+from .models import Event, EventPerformance, EventReview, TicketType, Seat
+from .seat_holds import SeatHoldService
+
+PERFORMANCE_SEATS_VERSION_KEY = "performance_seats_version_{performance_id}"
 
 class EventQueryOptimizer:
     """Optimized queries for events."""
@@ -13,15 +20,11 @@ class EventQueryOptimizer:
     def get_event_with_optimized_data(event_id):
         """
         Get event with all related data in optimized queries.
-        """
-        cache_key = f"event_optimized_{event_id}"
-        cached_data = cache.get(cache_key)
         
-        if cached_data:
-            return cached_data
-        
-        # Optimized query with prefetch_related
-        event = Event.objects.select_related(
+        Model instances are not cached; serialized event detail is cached
+        by ``EventDetailCache``.
+        """
+        return Event.objects.select_related(
             'category', 'venue'
         ).prefetch_related(
             Prefetch(
@@ -39,18 +42,14 @@ class EventQueryOptimizer:
                 queryset=EventReview.objects.filter(is_verified=True)[:10]
             )
         ).get(id=event_id)
-        
-        # Cache for 15 minutes
-        cache.set(cache_key, event, 900)
-        
-        return event
     
     @staticmethod
     def get_performance_with_seats(performance_id, section=None, ticket_type_id=None):
         """
         Get performance with optimized seat queries.
         """
-        cache_key = f"performance_seats_{performance_id}_{section}_{ticket_type_id}"
+        version = EventQueryOptimizer._performance_seats_version(performance_id)
+        cache_key = f"performance_seats_{performance_id}_{version}_{section}_{ticket_type_id}"
         cached_data = cache.get(cache_key)
         
         if cached_data:
@@ -107,49 +106,69 @@ class EventQueryOptimizer:
         
         return events
     
+    @staticmethod
+    def get_available_seat_ids(performance_id):
+        """
+        Get IDs of seats not sold or blocked, held or not.
+        """
+        version = EventQueryOptimizer._performance_seats_version(performance_id)
+        cache_key = f"available_seat_ids_{performance_id}_{version}"
+        seat_ids = cache.get(cache_key)
+        if seat_ids is None:
+            seat_ids = [
+                str(pk) for pk in Seat.objects.filter(
+                    performance_id=performance_id,
+                    status='available'
+                ).values_list('id', flat=True)
+            ]
+            # Cache for 2 minutes (very frequent changes)
+            cache.set(cache_key, seat_ids, 120)
+        return seat_ids
+    
     @staticmethod
     def get_available_seats_count(performance_id):
         """
         Get available seats count for a performance.
         """
-        cache_key = f"seats_count_{performance_id}"
-        cached_count = cache.get(cache_key)
-        
-        if cached_count is not None:
-            return cached_count
-        
-        # Optimized count query
-        count = Seat.objects.filter(
-            performance_id=performance_id,
-            status='available'
-        ).count()
-        
-        # Cache for 2 minutes (very frequent changes)
-        cache.set(cache_key, count, 120)
-        
-        return count
+        # Held seats are excluded at read time, so the cache keeps the IDs
+        seat_ids = EventQueryOptimizer.get_available_seat_ids(performance_id)
+        return len(seat_ids) - len(SeatHoldService.hold_map(performance_id, seat_ids))
+    
+    @staticmethod
+    def _versions_cache():
+        # Seat queries are cached in the tiered cache under these versions;
+        # the versions must be shared so no process reads a stale one.
+        return caches['shared']
+    
+    @staticmethod
+    def _performance_seats_version(performance_id):
+        versions_cache = EventQueryOptimizer._versions_cache()
+        key = PERFORMANCE_SEATS_VERSION_KEY.format(performance_id=performance_id)
+        version = versions_cache.get(key)
+        if version is None:
+            versions_cache.add(key, uuid.uuid4().hex, None)
+            version = versions_cache.get(key)
+        return version
     
     @staticmethod
     def invalidate_event_cache(event_id):
         """
         Invalidate cache for a specific event.
         """
-        cache_keys = [
-            f"event_optimized_{event_id}",
-            f"events_list_stats"
-        ]
-        
-        for key in cache_keys:
-            cache.delete(key)
+        cache.delete("events_list_stats")
+        EventDetailCache.invalidate(event_id)
     
     @staticmethod
     def invalidate_performance_cache(performance_id):
         """
         Invalidate cache for a specific performance.
         """
-        # Delete all performance-related cache keys
-        cache.delete_pattern(f"performance_seats_{performance_id}_*")
-        cache.delete(f"seats_count_{performance_id}")
+        # Seat queries are cached under a per-performance version, so
+        # replacing the version drops every section/ticket type variant
+        # without a pattern delete (which only some backends support).
+        EventQueryOptimizer._versions_cache().set(
+            PERFORMANCE_SEATS_VERSION_KEY.format(performance_id=performance_id), uuid.uuid4().hex, None
+        )
 
 class SeatSelectionOptimizer:
     """Optimizations for seat selection."""
@@ -159,12 +178,26 @@ class SeatSelectionOptimizer:
         """
         Get seat availability for a specific section.
         """
-        cache_key = f"section_availability_{performance_id}_{section}"
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return cached_data
-        
+        version = EventQueryOptimizer._performance_seats_version(performance_id)
+        cache_key = f"section_availability_{performance_id}_{version}_{section}"
+        availability = cache.get(cache_key)
+        if availability is None:
+            availability = SeatSelectionOptimizer._load_section_availability(performance_id, section)
+            # Cache for 3 minutes
+            cache.set(cache_key, availability, 180)
+        
+        # Holds change by the second and expire on their own, so they are
+        # applied to the cached seat list on every read.
+        held = SeatHoldService.hold_map(performance_id, [
+            seat['id'] for seats in availability.values() for seat in seats
+        ])
+        return {
+            ticket_type: [seat for seat in seats if str(seat['id']) not in held]
+            for ticket_type, seats in availability.items()
+        }
+    
+    @staticmethod
+    def _load_section_availability(performance_id, section):
         # Optimized query for section availability
         seats = Seat.objects.filter(
             performance_id=performance_id,
@@ -183,78 +216,34 @@ class SeatSelectionOptimizer:
                 availability[ticket_type] = []
             availability[ticket_type].append(seat)
         
-        # Cache for 3 minutes
-        cache.set(cache_key, availability, 180)
-        
         return availability
     
     @staticmethod
-    def reserve_seats(seat_ids, duration_minutes=30):
+    def reserve_seats(seat_ids, duration_minutes=30, holder=None):
         """
-        Reserve seats temporarily.
+        Hold seats of one performance temporarily, all or none.
+        
+        Holds are kept by ``SeatHoldService`` in the shared cache and expire
+        after ``duration_minutes``; seats are only written when sold.
         """
-        from django.utils import timezone
-        from datetime import timedelta
+        performance_ids = set(Seat.objects.filter(id__in=seat_ids).values_list('performance_id', flat=True))
+        if len(performance_ids) != 1:
+            return False, "Seats must belong to one performance"
         
-        # Update seat status to reserved
-        seats = Seat.objects.filter(
-            id__in=seat_ids,
-            status='available'
+        unavailable = SeatHoldService.acquire(
+            performance_ids.pop(), seat_ids, holder or SeatHoldService.new_holder(), ttl=duration_minutes * 60
         )
+        if unavailable:
+            return False, "Some seats are no longer available"
         
-        # Use select_for_update to prevent race conditions
-        with transaction.atomic():
-            seats = seats.select_for_update()
-            
-            # Check if all seats are still available
-            if seats.count() != len(seat_ids):
-                return False, "Some seats are no longer available"
-            
-            # Update seats to reserved
-            seats.update(
-                status='reserved',
-                reservation_expires_at=timezone.now() + timedelta(minutes=duration_minutes)
-            )
-            
-            # Invalidate related caches
-            performance_ids = set(seats.values_list('performance_id', flat=True))
-            for perf_id in performance_ids:
-                SeatSelectionOptimizer.invalidate_performance_cache(perf_id)
-            
-            return True, f"Reserved {len(seat_ids)} seats"
+        return True, f"Reserved {len(seat_ids)} seats"
     
     @staticmethod
-    def release_seats(seat_ids):
+    def release_seats(seat_ids, holder=None):
         """
-        Release reserved seats.
+        Release held seats (of ``holder`` only, if given).
         """
-        # Update seat status back to available
-        seats = Seat.objects.filter(
-            id__in=seat_ids,
-            status='reserved'
-        )
-        
-        updated_count = seats.update(
-            status='available',
-            reservation_expires_at=None
-        )
-        
-        # Invalidate related caches
-        if updated_count > 0:
-            performance_ids = set(seats.values_list('performance_id', flat=True))
-            for perf_id in performance_ids:
-                SeatSelectionOptimizer.invalidate_performance_cache(perf_id)
-        
-        return updated_count
-
-# Import missing models
-try:
-    from .models import EventReview
-except ImportError:
-    # Fallback if EventReview doesn't exist
-    EventReview = None
-
-try:
-    from django.db import transaction
-except ImportError:
-    transaction = None 
\ No newline at end of file
+        released = 0
+        for performance_id in set(Seat.objects.filter(id__in=seat_ids).values_list('performance_id', flat=True)):
+            released += SeatHoldService.release(performance_id, seat_ids, holder)
+        return released
@@ -0,0 +1,224 @@
+"""
+Compiled evaluator for EventPricingRule.
+
+The active rules of an event are compiled once into an immutable
+``CompiledRuleSet``: conditions are parsed out of the JSON field, rules are
+sorted by priority and adjustment factors are precomputed. Evaluating the set
+against many performances is then a loop over plain Python values with no
+database or JSON access. ``EventPriceCalculator`` applies the applicable
+rules of each performance to its ticket prices. Compiled sets are cached per
+process and invalidated through a version key in the shared cache whenever an
+event or one of its rules is saved or deleted.
+"""
+
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.core.cache import caches
+from django.utils import timezone
+
+
+RULESET_VERSION_KEY = 'events:pricing_rules:version:{event_id}'
+
+DEFAULT_DAYS_BEFORE = {
+    'early_bird': 30,
+    'last_minute': 7,
+}
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """Pre-parsed pricing rule."""
+
+    rule_id: str
+    name: str
+    rule_type: str
+    adjustment_type: str
+    adjustment_value: Decimal
+    factor: Decimal
+    priority: int
+    days_before: Optional[int] = None
+    min_occupancy: float = 0
+    max_occupancy: float = 100
+
+    @classmethod
+    def from_rule(cls, rule):
+        conditions = rule.conditions or {}
+        value = rule.adjustment_value
+        if rule.adjustment_type == 'percentage':
+            factor = value / Decimal('100')
+        elif rule.adjustment_type == 'multiplier':
+            factor = value
+        else:
+            factor = Decimal('0')
+
+        days_before = None
+        if rule.rule_type in DEFAULT_DAYS_BEFORE:
+            days_before = int(conditions.get('days_before', DEFAULT_DAYS_BEFORE[rule.rule_type]))
+
+        return cls(
+            rule_id=str(rule.id),
+            name=rule.name,
+            rule_type=rule.rule_type,
+            adjustment_type=rule.adjustment_type,
+            adjustment_value=value,
+            factor=factor,
+            priority=rule.priority,
+            days_before=days_before,
+            min_occupancy=float(conditions.get('min_occupancy', 0)),
+            max_occupancy=float(conditions.get('max_occupancy', 100)),
+        )
+
+    def adjustment(self, base_price: Decimal) -> Decimal:
+        """Same result as ``EventPricingRule.calculate_adjustment``."""
+        if self.adjustment_type == 'fixed':
+            return self.adjustment_value
+        if self.adjustment_type in ('percentage', 'multiplier'):
+            return base_price * self.factor
+        return Decimal('0.00')
+
+
+def performance_occupancy(performance) -> float:
+    """Occupancy of a performance as a percentage of its capacity."""
+    occupancy = getattr(performance, 'occupancy_rate', None)
+    if occupancy is not None:
+        return occupancy
+    if not performance.max_capacity:
+        return 0
+    return (performance.max_capacity - performance.available_capacity) / performance.max_capacity * 100
+
+
+class CompiledRuleSet:
+    """
+    Immutable, priority-ordered set of compiled rules for one event.
+    """
+
+    def __init__(self, event_id, rules: Iterable[CompiledRule], version=None):
+        self.event_id = event_id
+        self.version = version
+        self.rules: Tuple[CompiledRule, ...] = tuple(
+            sorted(rules, key=lambda rule: (-rule.priority, rule.name))
+        )
+
+    def __len__(self):
+        return len(self.rules)
+
+    def _date_thresholds(self, today: date):
+        # Earliest (early bird) or latest (last minute) performance date each
+        # date-based rule accepts, computed once per evaluation.
+        return {
+            rule.rule_id: today + timedelta(days=rule.days_before)
+            for rule in self.rules
+            if rule.days_before is not None
+        }
+
+    @staticmethod
+    def _applies(rule, performance_date, occupancy, thresholds):
+        if rule.rule_type == 'early_bird':
+            return performance_date >= thresholds[rule.rule_id]
+        if rule.rule_type == 'last_minute':
+            return performance_date < thresholds[rule.rule_id]
+        if rule.rule_type == 'capacity_based':
+            return rule.min_occupancy <= occupancy <= rule.max_occupancy
+        return True
+
+    def applicable_rules(self, performance, today: Optional[date] = None) -> Tuple[CompiledRule, ...]:
+        """Rules that apply to ``performance``, highest priority first."""
+        if not self.rules:
+            return ()
+        thresholds = self._date_thresholds(today or timezone.now().date())
+        needs_occupancy = any(rule.rule_type == 'capacity_based' for rule in self.rules)
+        occupancy = performance_occupancy(performance) if needs_occupancy else 0
+        return tuple(
+            rule for rule in self.rules
+            if self._applies(rule, performance.date, occupancy, thresholds)
+        )
+
+    def evaluate(self, performances, base_price: Decimal, today: Optional[date] = None) -> Dict[str, Dict]:
+        """
+        Apply the rule set to many performances.
+
+        Returns:
+            Dict keyed by performance ID with the applied rule names, the total
+            adjustment and the adjusted price.
+        """
+        thresholds = self._date_thresholds(today or timezone.now().date())
+        needs_occupancy = any(rule.rule_type == 'capacity_based' for rule in self.rules)
+
+        results = {}
+        for performance in performances:
+            occupancy = performance_occupancy(performance) if needs_occupancy else 0
+            applied = []
+            adjustment = Decimal('0.00')
+            for rule in self.rules:
+                if self._applies(rule, performance.date, occupancy, thresholds):
+                    applied.append(rule.name)
+                    adjustment += rule.adjustment(base_price)
+            results[str(performance.id)] = {
+                'rules': applied,
+                'adjustment': adjustment,
+                'final_price': base_price + adjustment,
+            }
+        return results
+
+
+class PricingRuleCompiler:
+    """
+    Compiles and caches rule sets per event.
+    """
+
+    _compiled: Dict[str, CompiledRuleSet] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _versions_cache():
+        # Versions must be shared by every process; a tiered local copy
+        # would keep serving a stale set after an invalidation.
+        return caches['shared']
+
+    @staticmethod
+    def _version_key(event_id):
+        return RULESET_VERSION_KEY.format(event_id=event_id)
+
+    @classmethod
+    def _current_version(cls, event_id):
+        # Versions are random tokens, so an evicted key can never make a stale
+        # compiled set look current again.
+        versions_cache = cls._versions_cache()
+        key = cls._version_key(event_id)
+        version = versions_cache.get(key)
+        if version is None:
+            versions_cache.add(key, uuid.uuid4().hex, None)
+            version = versions_cache.get(key)
+        return version
+
+    @classmethod
+    def compile(cls, event_id, version=None) -> CompiledRuleSet:
+        """Compile the active rules of an event from the database."""
+        from .models import EventPricingRule
+        rules = EventPricingRule.objects.filter(event_id=event_id, is_active=True)
+        return CompiledRuleSet(event_id, [CompiledRule.from_rule(rule) for rule in rules], version)
+
+    @classmethod
+    def get_rule_set(cls, event) -> CompiledRuleSet:
+        """Return the compiled rule set for an event or event ID."""
+        event_id = str(getattr(event, 'pk', event))
+        version = cls._current_version(event_id)
+        rule_set = cls._compiled.get(event_id)
+        if rule_set is None or rule_set.version != version:
+            rule_set = cls.compile(event_id, version)
+            with cls._lock:
+                cls._compiled[event_id] = rule_set
+        return rule_set
+
+    @classmethod
+    def invalidate(cls, event_id):
+        """Drop the compiled set for an event in every process."""
+        event_id = str(event_id)
+        cls._versions_cache().set(cls._version_key(event_id), uuid.uuid4().hex, None)
+        with cls._lock:
+            cls._compiled.pop(event_id, None)
@@ -3,9 +3,11 @@ Event Pricing Service for comprehensive price calculation.
 Handles base price, options, discounts, fees, and taxes.
 """
 
+from collections import defaultdict
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Dict, List, Optional, Any
 from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
 from django.utils.translation import gettext_lazy as _
 from .models import Event, EventPerformance, EventSection, SectionTicketType, EventOption, EventBooking
 
@@ -51,125 +53,219 @@ class EventPriceCalculator:
             # Get section and ticket type
             section = self.performance.sections.get(name=section_name)
             section_ticket = section.ticket_types.get(ticket_type_id=ticket_type_id)
+            options = self._load_options(self.event.id, selected_options)
             
-            # Base calculation
-            base_price = section.base_price
-            price_modifier = section_ticket.price_modifier
-            unit_price = base_price * price_modifier
-            
-            # Calculate subtotal
-            subtotal = unit_price * quantity
-            
-            # Initialize breakdown
-            breakdown = {
-                'base_price': base_price,
-                'price_modifier': price_modifier,
-                'unit_price': unit_price,
-                'quantity': quantity,
-                'subtotal': subtotal,
-                'options': [],
-                'options_total': Decimal('0.00'),
-                'discounts': [],
-                'discount_total': Decimal('0.00'),
-                'fees': [],
-                'fees_total': Decimal('0.00'),
-                'taxes': [],
-                'taxes_total': Decimal('0.00'),
-                'final_price': Decimal('0.00')
-            }
-            
-            # Calculate options
-            if selected_options:
-                options_result = self._calculate_options(selected_options, subtotal)
-                breakdown['options'] = options_result['options']
-                breakdown['options_total'] = options_result['total']
-            
-            # Calculate discounts
-            if discount_code or is_group_booking:
-                discounts_result = self._calculate_discounts(
-                    subtotal + breakdown['options_total'],
-                    discount_code,
-                    is_group_booking
-                )
-                breakdown['discounts'] = discounts_result['discounts']
-                breakdown['discount_total'] = discounts_result['total']
-            
-            # Calculate fees
-            if apply_fees:
-                fees_result = self._calculate_fees(
-                    subtotal + breakdown['options_total'] - breakdown['discount_total']
-                )
-                breakdown['fees'] = fees_result['fees']
-                breakdown['fees_total'] = fees_result['total']
-            
-            # Calculate taxes
-            if apply_taxes:
-                taxes_result = self._calculate_taxes(
-                    subtotal + breakdown['options_total'] - breakdown['discount_total'] + breakdown['fees_total']
-                )
-                breakdown['taxes'] = taxes_result['taxes']
-                breakdown['taxes_total'] = taxes_result['total']
-            
-            # Calculate final price
-            breakdown['final_price'] = (
-                subtotal +
-                breakdown['options_total'] -
-                breakdown['discount_total'] +
-                breakdown['fees_total'] +
-                breakdown['taxes_total']
+            return self._build_breakdown(
+                section, section_ticket, quantity, selected_options, options,
+                discount_code, is_group_booking, apply_fees, apply_taxes
             )
             
-            return breakdown
-            
         except Exception as e:
             raise ValidationError(f"Price calculation error: {str(e)}")
     
-    def _calculate_options(self, selected_options: List[Dict], subtotal: Decimal) -> Dict[str, Any]:
-        """Calculate options pricing."""
+    @classmethod
+    def calculate_matrix(
+        cls,
+        performances,
+        quantity: int = 1,
+        selected_options: Optional[List[Dict]] = None,
+        discount_code: Optional[str] = None,
+        is_group_booking: bool = False,
+        apply_fees: bool = True,
+        apply_taxes: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Price every section × ticket type of several performances in one pass.
+        
+        Sections, ticket allocations and selected options are loaded once for
+        all performances; each cell is identical to what
+        ``calculate_ticket_price`` returns for the same arguments.
+        
+        Returns:
+            Dict keyed by performance ID with ``sections``
+            (``{section_name: {ticket_type_id: breakdown}}``) and the
+            ``min_price``/``max_price`` of the cells' final prices.
+        """
+        performances = list(performances)
+        sections = EventSection.objects.filter(
+            performance__in=performances
+        ).prefetch_related(
+            Prefetch('ticket_types', queryset=SectionTicketType.objects.order_by('ticket_type_id'))
+        ).order_by('name')
+        options = cls._load_options(
+            {performance.event_id for performance in performances}, selected_options
+        )
+        
+        options_by_event = defaultdict(dict)
+        for key, option in options.items():
+            options_by_event[option.event_id][key] = option
+        event_ids = {performance.id: performance.event_id for performance in performances}
+        
+        matrix = {
+            str(performance.id): {'sections': {}, 'min_price': None, 'max_price': None}
+            for performance in performances
+        }
+        for section in sections:
+            entry = matrix[str(section.performance_id)]
+            section_options = options_by_event[event_ids[section.performance_id]]
+            cells = entry['sections'].setdefault(section.name, {})
+            for section_ticket in section.ticket_types.all():
+                breakdown = cls._build_breakdown(
+                    section, section_ticket, quantity, selected_options, section_options,
+                    discount_code, is_group_booking, apply_fees, apply_taxes
+                )
+                cells[str(section_ticket.ticket_type_id)] = breakdown
+                final_price = breakdown['final_price']
+                if entry['min_price'] is None or final_price < entry['min_price']:
+                    entry['min_price'] = final_price
+                if entry['max_price'] is None or final_price > entry['max_price']:
+                    entry['max_price'] = final_price
+        
+        return matrix
+    
+    @staticmethod
+    def _load_options(event_ids, selected_options: Optional[List[Dict]]) -> Dict[str, EventOption]:
+        """Load the active options referenced by ``selected_options`` in one query."""
+        option_ids = [option_data.get('option_id') for option_data in selected_options or []]
+        if not option_ids:
+            return {}
+        if not isinstance(event_ids, (set, list, tuple)):
+            event_ids = [event_ids]
+        return {
+            str(option.id): option
+            for option in EventOption.objects.filter(
+                id__in=option_ids,
+                event_id__in=event_ids,
+                is_active=True
+            )
+        }
+    
+    @classmethod
+    def _build_breakdown(
+        cls,
+        section: EventSection,
+        section_ticket: SectionTicketType,
+        quantity: int,
+        selected_options: Optional[List[Dict]],
+        options: Dict[str, EventOption],
+        discount_code: Optional[str],
+        is_group_booking: bool,
+        apply_fees: bool,
+        apply_taxes: bool
+    ) -> Dict[str, Any]:
+        """Build the price breakdown for one section ticket allocation."""
+        # Base calculation
+        base_price = section.base_price
+        price_modifier = section_ticket.price_modifier
+        unit_price = base_price * price_modifier
+        
+        # Calculate subtotal
+        subtotal = unit_price * quantity
+        
+        # Initialize breakdown
+        breakdown = {
+            'base_price': base_price,
+            'price_modifier': price_modifier,
+            'unit_price': unit_price,
+            'quantity': quantity,
+            'subtotal': subtotal,
+            'options': [],
+            'options_total': Decimal('0.00'),
+            'discounts': [],
+            'discount_total': Decimal('0.00'),
+            'fees': [],
+            'fees_total': Decimal('0.00'),
+            'taxes': [],
+            'taxes_total': Decimal('0.00'),
+            'final_price': Decimal('0.00')
+        }
+        
+        # Calculate options
+        if selected_options:
+            options_result = cls._calculate_options(selected_options, subtotal, options)
+            breakdown['options'] = options_result['options']
+            breakdown['options_total'] = options_result['total']
+        
+        # Calculate discounts
+        if discount_code or is_group_booking:
+            discounts_result = cls._calculate_discounts(
+                subtotal + breakdown['options_total'],
+                discount_code,
+                is_group_booking
+            )
+            breakdown['discounts'] = discounts_result['discounts']
+            breakdown['discount_total'] = discounts_result['total']
+        
+        # Calculate fees
+        if apply_fees:
+            fees_result = cls._calculate_fees(
+                subtotal + breakdown['options_total'] - breakdown['discount_total']
+            )
+            breakdown['fees'] = fees_result['fees']
+            breakdown['fees_total'] = fees_result['total']
+        
+        # Calculate taxes
+        if apply_taxes:
+            taxes_result = cls._calculate_taxes(
+                subtotal + breakdown['options_total'] - breakdown['discount_total'] + breakdown['fees_total']
+            )
+            breakdown['taxes'] = taxes_result['taxes']
+            breakdown['taxes_total'] = taxes_result['total']
+        
+        # Calculate final price
+        breakdown['final_price'] = (
+            subtotal +
+            breakdown['options_total'] -
+            breakdown['discount_total'] +
+            breakdown['fees_total'] +
+            breakdown['taxes_total']
+        )
+        
+        return breakdown
+    
+    @staticmethod
+    def _calculate_options(
+        selected_options: List[Dict],
+        subtotal: Decimal,
+        options: Dict[str, EventOption]
+    ) -> Dict[str, Any]:
+        """Calculate options pricing from preloaded options."""
         options_breakdown = []
         options_total = Decimal('0.00')
         
         for option_data in selected_options:
-            option_id = option_data.get('option_id')
+            option = options.get(str(option_data.get('option_id')))
+            if option is None:
+                continue
             quantity = int(option_data.get('quantity', 1))
             
-            try:
-                option = EventOption.objects.get(
-                    id=option_id,
-                    event=self.event,
-                    is_active=True
-                )
-                
-                # Calculate option price
-                if hasattr(option, 'price_percentage') and option.price_percentage > 0:
-                    # Percentage-based pricing
-                    option_price = subtotal * (option.price_percentage / Decimal('100'))
-                else:
-                    # Fixed pricing
-                    option_price = option.price
-                
-                option_total = option_price * quantity
-                options_total += option_total
-                
-                options_breakdown.append({
-                    'option_id': str(option.id),
-                    'name': option.name,
-                    'type': option.option_type,
-                    'price': option_price,
-                    'quantity': quantity,
-                    'total': option_total
-                })
-                
-            except EventOption.DoesNotExist:
-                continue
+            # Calculate option price
+            if hasattr(option, 'price_percentage') and option.price_percentage > 0:
+                # Percentage-based pricing
+                option_price = subtotal * (option.price_percentage / Decimal('100'))
+            else:
+                # Fixed pricing
+                option_price = option.price
+            
+            option_total = option_price * quantity
+            options_total += option_total
+            
+            options_breakdown.append({
+                'option_id': str(option.id),
+                'name': option.name,
+                'type': option.option_type,
+                'price': option_price,
+                'quantity': quantity,
+                'total': option_total
+            })
         
         return {
             'options': options_breakdown,
             'total': options_total
         }
     
+    @staticmethod
     def _calculate_discounts(
-        self,
         amount: Decimal,
         discount_code: Optional[str] = None,
         is_group_booking: bool = False
@@ -207,7 +303,8 @@ class EventPriceCalculator:
             'total': discount_total
         }
     
-    def _calculate_fees(self, amount: Decimal) -> Dict[str, Any]:
+    @staticmethod
+    def _calculate_fees(amount: Decimal) -> Dict[str, Any]:
         """Calculate service fees."""
         fees = []
         fees_total = Decimal('0.00')
@@ -237,7 +334,8 @@ class EventPriceCalculator:
             'total': fees_total
         }
     
-    def _calculate_taxes(self, amount: Decimal) -> Dict[str, Any]:
+    @staticmethod
+    def _calculate_taxes(amount: Decimal) -> Dict[str, Any]:
         """Calculate taxes."""
         taxes = []
         taxes_total = Decimal('0.00')
@@ -0,0 +1,57 @@
+"""
+Search documents for events.
+"""
+
+from collections import defaultdict
+
+from shared.search import join_text
+
+from .models import Artist, Event, Venue
+
+
+class EventSearchSource:
+    """
+    Build one search document per event translation, including the venue
+    and artist names in the same language.
+    """
+
+    model = Event
+
+    @staticmethod
+    def documents(event_ids):
+        """Yield ``(event_id, language, title, body)`` for the given events."""
+        events = {
+            pk: (venue_id, city, country)
+            for pk, venue_id, city, country in Event.objects.filter(pk__in=event_ids).values_list(
+                'pk', 'venue_id', 'city', 'country'
+            )
+        }
+        venue_names = {
+            (master_id, language): name
+            for master_id, language, name in Venue._parler_meta.root_model.objects.filter(
+                master_id__in={venue_id for venue_id, _, _ in events.values()}
+            ).values_list('master_id', 'language_code', 'name')
+        }
+
+        event_artists = defaultdict(list)
+        for event_id, artist_id in Event.artists.through.objects.filter(event_id__in=list(events)).values_list(
+            'event_id', 'artist_id'
+        ):
+            event_artists[event_id].append(artist_id)
+        artist_names = {
+            (master_id, language): name
+            for master_id, language, name in Artist._parler_meta.root_model.objects.filter(
+                master_id__in={artist_id for artists in event_artists.values() for artist_id in artists}
+            ).values_list('master_id', 'language_code', 'name')
+        }
+
+        translations = Event._parler_meta.root_model.objects.filter(master_id__in=list(events)).values_list(
+            'master_id', 'language_code', 'title', 'short_description', 'description', 'highlights'
+        )
+        for event_id, language, title, short_description, description, highlights in translations:
+            venue_id, city, country = events[event_id]
+            yield event_id, language, title, join_text(
+                short_description, description, highlights, venue_names.get((venue_id, language)),
+                *(artist_names.get((artist_id, language)) for artist_id in event_artists[event_id]),
+                city, country
+            )
@@ -0,0 +1,155 @@
+"""
+Seat-hold engine for seat-map events.
+
+A hold reserves individual ``Seat`` rows of a performance for one holder (an
+opaque token handed to the client) for ``SEAT_HOLD_TTL`` seconds. Holds live
+only in the shared cache, one entry per (performance, seat) whose value is
+the holder, and expire lazily with the cache entry: there is no row to
+update while customers pick and drop seats, and nothing to clean up after
+abandoned selections. ``Seat`` rows are written once, when ``sell`` marks the
+seats sold at checkout.
+
+``acquire`` is all or nothing. Seats are claimed in a fixed order with the
+atomic ``cache.add``, and if any seat is held by someone else the seats this
+call claimed are dropped again. Seats the holder already holds are extended
+with ``touch_if_equal``, so a hold that lapsed and was taken by someone else
+is never extended. This relies on the shared cache being Redis, which
+``shared.checks`` enforces in production: the database cache's ``add`` is
+not atomic. ``hold_map`` reads the holds of many seats
+with a single ``get_many`` for the seat-availability endpoints.
+"""
+
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from shared.cache import touch_if_equal
+
+from .models import Seat
+
+
+HOLD_KEY = 'seat_hold:{performance_id}:{seat_id}'
+
+
+class SeatHoldService:
+    """
+    Service class for holding, releasing and selling individual seats.
+    """
+
+    @staticmethod
+    def cache():
+        # Holds must be visible to every process, so never the per-process L1.
+        return caches['shared']
+
+    @staticmethod
+    def new_holder():
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def seat_ids(values):
+        """
+        Normalize seat IDs to unique UUID strings in a stable order.
+
+        Raises:
+            ValueError: If a value is not a UUID.
+        """
+        return sorted({str(uuid.UUID(str(value))) for value in values})
+
+    @staticmethod
+    def _key(performance_id, seat_id):
+        return HOLD_KEY.format(performance_id=performance_id, seat_id=seat_id)
+
+    @classmethod
+    def acquire(cls, performance_id, seat_ids, holder, ttl=None):
+        """
+        Hold all of ``seat_ids`` for ``holder``, or none of them.
+
+        Seats the holder already holds are extended to the new TTL.
+
+        Returns:
+            list: IDs of seats that are sold, blocked, unknown or held by
+            someone else; empty if every seat is now held.
+        """
+        ttl = ttl or settings.SEAT_HOLD_TTL
+        seat_ids = cls.seat_ids(seat_ids)
+        sellable = {
+            str(pk) for pk in Seat.objects.filter(
+                performance_id=performance_id, id__in=seat_ids, status='available'
+            ).values_list('id', flat=True)
+        }
+        unavailable = [seat_id for seat_id in seat_ids if seat_id not in sellable]
+        if unavailable:
+            return unavailable
+
+        cache = cls.cache()
+        claimed = []
+        for seat_id in seat_ids:
+            key = cls._key(performance_id, seat_id)
+            if cache.add(key, holder, ttl):
+                claimed.append(key)
+            elif not touch_if_equal(cache, key, holder, ttl):
+                unavailable.append(seat_id)
+                break
+        if unavailable:
+            cache.delete_many(claimed)
+        return unavailable
+
+    @classmethod
+    def release(cls, performance_id, seat_ids, holder):
+        """
+        Drop the holds of ``holder`` (any holder if ``None``) on ``seat_ids``.
+
+        Returns:
+            int: Number of holds released.
+        """
+        keys = [cls._key(performance_id, seat_id) for seat_id in cls.seat_ids(seat_ids)]
+        cache = cls.cache()
+        mine = [key for key, value in cache.get_many(keys).items() if holder is None or value == holder]
+        cache.delete_many(mine)
+        return len(mine)
+
+    @classmethod
+    def hold_map(cls, performance_id, seat_ids):
+        """
+        Current holds on ``seat_ids``.
+
+        Returns:
+            dict: Seat ID string -> holder, for held seats only.
+        """
+        keys = {cls._key(performance_id, seat_id): str(seat_id) for seat_id in seat_ids}
+        if not keys:
+            return {}
+        return {keys[key]: holder for key, holder in cls.cache().get_many(list(keys)).items()}
+
+    @classmethod
+    def sell(cls, performance_id, seat_ids, holder):
+        """
+        Mark the seats sold for ``holder`` inside the caller's transaction.
+
+        Seats whose hold lapsed are still sold if nobody else took them.
+        The holds are dropped once the transaction commits.
+
+        Raises:
+            ValueError: If a seat is held by someone else or no longer available.
+        """
+        from .optimizations import EventQueryOptimizer
+
+        seat_ids = cls.seat_ids(seat_ids)
+        holds = cls.hold_map(performance_id, seat_ids)
+        taken = sorted(seat_id for seat_id, seat_holder in holds.items() if seat_holder != holder)
+        if taken:
+            raise ValueError(f"Capacity update failed: seat {taken[0]} is held by another customer")
+
+        sold = Seat.objects.filter(
+            performance_id=performance_id, id__in=seat_ids, status='available'
+        ).update(status='sold')
+        if sold != len(seat_ids):
+            raise ValueError('Capacity update failed: some seats are no longer available')
+
+        keys = [cls._key(performance_id, seat_id) for seat_id in seat_ids]
+        transaction.on_commit(partial(cls.cache().delete_many, keys))
+        transaction.on_commit(partial(EventQueryOptimizer.invalidate_performance_cache, performance_id))
+        return sold
@@ -11,6 +11,8 @@ from .models import (
     EventSection, SectionTicketType, EventDiscount, EventFee, EventPricingRule
 )
 from django.db.models import Count, Min, Max, Q
+from .pricing_rules import PricingRuleCompiler
+from .pricing_service import EventPriceCalculator
 
 
 class EventCategorySerializer(serializers.ModelSerializer):
@@ -308,8 +310,13 @@ class EventListSerializer(serializers.ModelSerializer):
             is_available=True
         ).order_by('date')
         
+        performances = list(performances[:5])
+        price_matrix = EventPriceCalculator.calculate_matrix(
+            performances, apply_fees=False, apply_taxes=False
+        )
+        
         calendar_data = []
-        for performance in performances[:5]:  # Limit to first 5 performances for list view
+        for performance in performances:  # Limit to first 5 performances for list view
             # Get basic capacity info
             capacity_summary = {
                 'total_capacity': performance.max_capacity,
@@ -324,6 +331,10 @@ class EventListSerializer(serializers.ModelSerializer):
                 'end_time': performance.end_time,
                 'is_special': performance.is_special,
                 'capacity_summary': capacity_summary,
+                'price_range': {
+                    'min': price_matrix[str(performance.id)]['min_price'],
+                    'max': price_matrix[str(performance.id)]['max_price'],
+                },
                 'booking_cutoff': performance.date - timedelta(hours=2)
             })
         
@@ -653,7 +664,7 @@ class EventDetailSerializer(serializers.ModelSerializer):
             'supports_dynamic_pricing': True,
             'supports_discounts': obj.discounts.filter(is_active=True).exists(),
             'supports_fees': obj.fees.filter(is_active=True).exists(),
-            'supports_pricing_rules': obj.pricing_rules.filter(is_active=True).exists(),
+            'supports_pricing_rules': len(PricingRuleCompiler.get_rule_set(obj)) > 0,
             'currency': 'USD'
         }
     
@@ -680,8 +691,13 @@ class EventDetailSerializer(serializers.ModelSerializer):
             is_available=True
         ).order_by('date')
         
+        performances = list(performances[:10])
+        price_matrix = EventPriceCalculator.calculate_matrix(
+            performances, apply_fees=False, apply_taxes=False
+        )
+        
         calendar_data = []
-        for performance in performances[:10]:  # Limit to first 10 performances
+        for performance in performances:  # Limit to first 10 performances
             # Get basic capacity info
             capacity_summary = {
                 'total_capacity': performance.max_capacity,
@@ -696,6 +712,10 @@ class EventDetailSerializer(serializers.ModelSerializer):
                 'end_time': performance.end_time,
                 'is_special': performance.is_special,
                 'capacity_summary': capacity_summary,
+                'price_range': {
+                    'min': price_matrix[str(performance.id)]['min_price'],
+                    'max': price_matrix[str(performance.id)]['max_price'],
+                },
                 'booking_cutoff': performance.date - timedelta(hours=2)
             })
         
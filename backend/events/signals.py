@@ -0,0 +1,169 @@
+"""
+Signal handlers for the events app.
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from shared.search import SearchIndex
+
+from .detail_cache import FRAGMENTS, STATIC, VOLATILE, EventDetailCache
+from .models import (
+    Artist, Event, EventCategory, EventOption, EventPerformance, EventPricingRule,
+    EventReview, EventSection, Seat, SectionTicketType, TicketType, Venue
+)
+from .pricing_rules import PricingRuleCompiler
+from .seat_map import SeatMap
+
+
+def _invalidate_rule_set(event_id):
+    transaction.on_commit(partial(PricingRuleCompiler.invalidate, event_id))
+
+
+def _invalidate_detail(event_ids, fragments):
+    for event_id in event_ids:
+        if event_id is not None:
+            transaction.on_commit(partial(EventDetailCache.invalidate, event_id, fragments))
+
+
+@receiver(post_save, sender=Event)
+def invalidate_event_rule_set(sender, instance, **kwargs):
+    """Recompile an event's pricing rules after the event is saved."""
+    _invalidate_rule_set(instance.pk)
+
+
+@receiver(post_save, sender=EventPricingRule)
+@receiver(post_delete, sender=EventPricingRule)
+def invalidate_rule_set_for_rule(sender, instance, **kwargs):
+    """Recompile an event's pricing rules after one of them changes."""
+    _invalidate_rule_set(instance.event_id)
+
+
+@receiver(post_save, sender=Event)
+def invalidate_event_detail(sender, instance, **kwargs):
+    """Event fields feed both detail fragments."""
+    _invalidate_detail([instance.pk], FRAGMENTS)
+
+
+@receiver(post_save, sender=TicketType)
+@receiver(post_delete, sender=TicketType)
+def invalidate_detail_for_ticket_type(sender, instance, **kwargs):
+    """Ticket types are listed statically and priced in the volatile fragment."""
+    _invalidate_detail([instance.event_id], FRAGMENTS)
+
+
+@receiver(post_save, sender=EventOption)
+@receiver(post_delete, sender=EventOption)
+@receiver(post_save, sender=EventReview)
+@receiver(post_delete, sender=EventReview)
+def invalidate_static_detail(sender, instance, **kwargs):
+    _invalidate_detail([instance.event_id], [STATIC])
+
+
+@receiver(post_save, sender=EventCategory)
+@receiver(post_save, sender=Venue)
+@receiver(post_save, sender=Artist)
+def invalidate_static_detail_for_related(sender, instance, **kwargs):
+    """Categories, venues and artists are embedded in the static fragment of their events."""
+    _invalidate_detail(instance.events.values_list('id', flat=True), [STATIC])
+
+
+@receiver(m2m_changed, sender=Event.artists.through)
+def invalidate_static_detail_for_artists(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        event_ids = pk_set if pk_set is not None else instance.events.values_list('id', flat=True)
+    else:
+        event_ids = [instance.pk]
+    _invalidate_detail(event_ids, [STATIC])
+
+
+@receiver(post_save, sender=EventPerformance)
+@receiver(post_delete, sender=EventPerformance)
+def invalidate_volatile_detail_for_performance(sender, instance, **kwargs):
+    _invalidate_detail([instance.event_id], [VOLATILE])
+
+
+@receiver(post_save, sender=EventSection)
+@receiver(post_delete, sender=EventSection)
+def invalidate_volatile_detail_for_section(sender, instance, **kwargs):
+    event_id = EventPerformance.objects.filter(
+        pk=instance.performance_id
+    ).values_list('event_id', flat=True).first()
+    _invalidate_detail([event_id], [VOLATILE])
+
+
+@receiver(post_save, sender=SectionTicketType)
+@receiver(post_delete, sender=SectionTicketType)
+def invalidate_volatile_detail_for_section_ticket_type(sender, instance, **kwargs):
+    # When the deletion cascades from a section or performance, the parent
+    # row may already be gone; the parent's own handler covers that case.
+    event_id = EventSection.objects.filter(
+        pk=instance.section_id
+    ).values_list('performance__event_id', flat=True).first()
+    _invalidate_detail([event_id], [VOLATILE])
+
+
+# Event fields, besides translations, that feed its search documents.
+SEARCH_FIELDS = {'venue', 'venue_id', 'city', 'country'}
+
+
+@receiver(post_save, sender=Event)
+def index_event(sender, instance, update_fields=None, **kwargs):
+    """Reindex an event unless the save skipped every indexed field."""
+    if update_fields and not SEARCH_FIELDS & set(update_fields):
+        return
+    SearchIndex.update('event', [instance.pk])
+
+
+@receiver(post_save, sender=Event._parler_meta.root_model)
+def index_event_translation(sender, instance, **kwargs):
+    SearchIndex.update('event', [instance.master_id])
+
+
+@receiver(post_delete, sender=Event._parler_meta.root_model)
+def remove_event_translation(sender, instance, **kwargs):
+    SearchIndex.remove('event', [instance.master_id], instance.language_code)
+
+
+@receiver(post_delete, sender=Event)
+def remove_event_from_index(sender, instance, **kwargs):
+    SearchIndex.remove('event', [instance.pk])
+
+
+@receiver(post_save, sender=Venue._parler_meta.root_model)
+@receiver(post_save, sender=Artist._parler_meta.root_model)
+def index_events_for_related_name(sender, instance, **kwargs):
+    """Venue and artist names are part of the documents of their events."""
+    SearchIndex.update('event', instance.master.events.values_list('id', flat=True))
+
+
+@receiver(m2m_changed, sender=Event.artists.through)
+def index_events_for_artists(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # Clearing an artist's events leaves nothing to look up afterwards.
+        instance._search_event_ids = list(instance.events.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        event_ids = [instance.pk]
+    elif action == 'post_clear':
+        event_ids = getattr(instance, '_search_event_ids', [])
+    else:
+        event_ids = pk_set
+    SearchIndex.update('event', event_ids)
+
+
+@receiver(post_save, sender=Seat)
+@receiver(post_delete, sender=Seat)
+def invalidate_seat_map(sender, instance, **kwargs):
+    """Seat edits change the seat map layout and may change seat states."""
+    from .optimizations import EventQueryOptimizer
+
+    transaction.on_commit(partial(SeatMap.invalidate_layout, instance.performance_id))
+    transaction.on_commit(partial(EventQueryOptimizer.invalidate_performance_cache, instance.performance_id))
@@ -0,0 +1,447 @@
+"""
+Tests for event capacity management.
+"""
+
+import time as clock
+from datetime import date, time, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .capacity_manager import CapacityManager
+from .detail_cache import STATIC, VOLATILE, EventDetailCache
+from .optimizations import PERFORMANCE_SEATS_VERSION_KEY, EventQueryOptimizer, SeatSelectionOptimizer
+from .inventory import SeatInventory
+from .pricing_rules import PricingRuleCompiler
+from .pricing_service import EventPriceCalculator
+from .seat_holds import SeatHoldService
+from .seat_map import HELD, LAYOUT_VERSION_KEY, SOLD, SeatMap
+from .models import (
+    Event, EventCategory, EventOption, EventPerformance, EventPricingRule, EventSection,
+    Seat, SectionTicketType, TicketType, Venue
+)
+
+
+class EventTestDataMixin:
+    """Minimal event → performance → section → allocation fixture."""
+    
+    def create_event_fixture(self, capacity=10):
+        category = EventCategory.objects.create(slug='music', name='Music', description='Music')
+        venue = Venue.objects.create(
+            slug='arena', name='Arena', description='Arena', address='-',
+            city='Istanbul', country='Turkey', total_capacity=capacity
+        )
+        self.event = Event.objects.create(
+            slug='concert', title='Concert', description='Concert', short_description='Concert',
+            category=category, venue=venue, style='music', price=100,
+            city='Istanbul', country='Turkey',
+            door_open_time=time(18, 0), start_time=time(19, 0), end_time=time(22, 0)
+        )
+        self.ticket_type = TicketType.objects.create(
+            event=self.event, name='Normal', ticket_type='normal', capacity=capacity
+        )
+        performance_date = date.today() + timedelta(days=30)
+        self.performance = EventPerformance.objects.create(
+            event=self.event, date=performance_date, start_date=performance_date,
+            end_date=performance_date, start_time=time(19, 0), end_time=time(22, 0),
+            max_capacity=capacity
+        )
+        self.section = EventSection.objects.create(
+            performance=self.performance, name='A', total_capacity=capacity,
+            available_capacity=capacity, base_price=100
+        )
+        self.section_ticket = SectionTicketType.objects.create(
+            section=self.section, ticket_type=self.ticket_type,
+            allocated_capacity=capacity, available_capacity=capacity
+        )
+
+
+class SeatInventoryTests(EventTestDataMixin, TestCase):
+    """Test the conditional-update seat inventory engine."""
+    
+    def setUp(self):
+        self.create_event_fixture(capacity=10)
+    
+    def assertCounters(self, obj, available, reserved, sold):
+        obj.refresh_from_db()
+        self.assertEqual(
+            (obj.available_capacity, obj.reserved_capacity, obj.sold_capacity),
+            (available, reserved, sold)
+        )
+    
+    def test_reserve_release_sell_keep_section_in_step(self):
+        self.section_ticket.reserve_capacity(4)
+        self.section_ticket.release_capacity(1)
+        self.section_ticket.sell_capacity(2)
+        
+        self.assertCounters(self.section_ticket, 7, 1, 2)
+        self.assertCounters(self.section, 7, 1, 2)
+    
+    def test_reserve_beyond_capacity_changes_nothing(self):
+        self.assertFalse(SeatInventory.reserve(self.section_ticket, 11))
+        with self.assertRaises(ValidationError):
+            self.section_ticket.reserve_capacity(11)
+        
+        self.assertCounters(self.section_ticket, 10, 0, 0)
+        self.assertCounters(self.section, 10, 0, 0)
+    
+    def test_section_shortfall_rolls_back_ticket_update(self):
+        EventSection.objects.filter(pk=self.section.pk).update(available_capacity=2, reserved_capacity=8)
+        
+        self.assertFalse(SeatInventory.reserve(self.section_ticket, 3))
+        self.assertCounters(self.section_ticket, 10, 0, 0)
+    
+    def test_capacity_manager_reserve_seats(self):
+        success, section_ticket = CapacityManager.reserve_seats(
+            self.performance, self.ticket_type.id, 'A', 10
+        )
+        self.assertTrue(success)
+        self.assertEqual(section_ticket.available_capacity, 0)
+        
+        success, message = CapacityManager.reserve_seats(
+            self.performance, self.ticket_type.id, 'A', 1
+        )
+        self.assertFalse(success)
+        self.assertIn('Only 0 available', message)
+
+
+class EventPriceMatrixTests(EventTestDataMixin, TestCase):
+    """Test that the bulk price matrix matches the scalar calculator."""
+    
+    def setUp(self):
+        self.create_event_fixture(capacity=10)
+        vip_type = TicketType.objects.create(
+            event=self.event, name='VIP', ticket_type='vip', capacity=10, price_modifier=Decimal('1.50')
+        )
+        vip_section = EventSection.objects.create(
+            performance=self.performance, name='VIP', total_capacity=10,
+            available_capacity=10, base_price=Decimal('250.00')
+        )
+        for section in (self.section, vip_section):
+            SectionTicketType.objects.get_or_create(
+                section=section, ticket_type=vip_type,
+                defaults={'allocated_capacity': 5, 'available_capacity': 5, 'price_modifier': Decimal('1.50')}
+            )
+        option = EventOption.objects.create(event=self.event, name='Parking', price=Decimal('7.50'))
+        self.selected_options = [{'option_id': str(option.id), 'quantity': 2}]
+    
+    def test_matrix_matches_scalar_path(self):
+        kwargs = {'quantity': 3, 'selected_options': self.selected_options, 'is_group_booking': True}
+        with self.assertNumQueries(3):
+            matrix = EventPriceCalculator.calculate_matrix([self.performance], **kwargs)
+        
+        entry = matrix[str(self.performance.id)]
+        calculator = EventPriceCalculator(self.event, self.performance)
+        finals = []
+        for section_name, cells in entry['sections'].items():
+            for ticket_type_id, breakdown in cells.items():
+                self.assertEqual(
+                    breakdown,
+                    calculator.calculate_ticket_price(section_name, ticket_type_id, **kwargs)
+                )
+                finals.append(breakdown['final_price'])
+        
+        self.assertEqual(len(finals), 3)
+        self.assertEqual((entry['min_price'], entry['max_price']), (min(finals), max(finals)))
+
+
+class CompiledPricingRuleTests(EventTestDataMixin, TestCase):
+    """Test the compiled pricing rule evaluator."""
+    
+    def setUp(self):
+        self.create_event_fixture(capacity=10)
+        self.performances = [self.performance]
+        for days in (3, 10, 60):
+            performance_date = date.today() + timedelta(days=days)
+            self.performances.append(EventPerformance.objects.create(
+                event=self.event, date=performance_date, start_date=performance_date,
+                end_date=performance_date, start_time=time(19, 0), end_time=time(22, 0),
+                max_capacity=10
+            ))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.early_bird = EventPricingRule.objects.create(
+                event=self.event, name='Early bird', rule_type='early_bird',
+                adjustment_type='percentage', adjustment_value=Decimal('-10'),
+                conditions={'days_before': 30}, priority=5
+            )
+            self.last_minute = EventPricingRule.objects.create(
+                event=self.event, name='Last minute', rule_type='last_minute',
+                adjustment_type='fixed', adjustment_value=Decimal('15'),
+                conditions={'days_before': 7}, priority=1
+            )
+    
+    def test_compiled_rules_match_model_rules(self):
+        rule_set = PricingRuleCompiler.get_rule_set(self.event)
+        base_price = Decimal('200.00')
+        
+        with self.assertNumQueries(0):
+            results = rule_set.evaluate(self.performances, base_price)
+        
+        for performance in self.performances:
+            expected = [
+                rule for rule in (self.early_bird, self.last_minute)
+                if rule.applies_to(performance)
+            ]
+            result = results[str(performance.id)]
+            self.assertEqual(result['rules'], [rule.name for rule in expected])
+            self.assertEqual(
+                result['final_price'],
+                base_price + sum((rule.calculate_adjustment(base_price) for rule in expected), Decimal('0.00'))
+            )
+    
+    def test_rule_changes_invalidate_compiled_set(self):
+        rule_set = PricingRuleCompiler.get_rule_set(self.event)
+        self.assertIs(PricingRuleCompiler.get_rule_set(self.event), rule_set)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.last_minute.is_active = False
+            self.last_minute.save()
+        
+        recompiled = PricingRuleCompiler.get_rule_set(self.event)
+        self.assertIsNot(recompiled, rule_set)
+        self.assertEqual([rule.name for rule in recompiled.rules], ['Early bird'])
+    
+    def test_calculator_prices_ignore_pricing_rules(self):
+        # Rules are compiled for evaluation only; ticket prices stay as they were.
+        breakdown = EventPriceCalculator(self.event, self.performance).calculate_ticket_price(
+            self.section.name, str(self.ticket_type.id), apply_fees=False, apply_taxes=False
+        )
+        self.assertEqual(breakdown['unit_price'], Decimal('100.00'))
+        self.assertEqual(breakdown['final_price'], Decimal('100.00'))
+        self.assertNotIn('pricing_rules_applied', breakdown)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class EventDetailCacheTests(EventTestDataMixin, TestCase):
+    """Test the event detail fragment cache and its invalidation."""
+    
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_event_fixture(capacity=10)
+        self.client = APIClient()
+        self.url = reverse('event-detail', args=[self.event.slug])
+    
+    def get_detail(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+    
+    def test_cached_response_matches_uncached(self):
+        uncached = self.get_detail()
+        with self.assertNumQueries(1):
+            cached = self.get_detail()
+        self.assertEqual(list(cached), list(uncached))
+        self.assertEqual(cached['title'], uncached['title'])
+        self.assertEqual(cached['capacity_overview'], uncached['capacity_overview'])
+    
+    def test_section_change_invalidates_only_volatile_fragment(self):
+        self.get_detail()
+        versions = EventDetailCache._versions(self.event.pk)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.section.base_price = 250
+            self.section.save()
+        
+        new_versions = EventDetailCache._versions(self.event.pk)
+        self.assertEqual(new_versions[STATIC], versions[STATIC])
+        self.assertNotEqual(new_versions[VOLATILE], versions[VOLATILE])
+        summary = self.get_detail()['pricing_summary'][str(self.ticket_type.id)]
+        self.assertEqual(summary['base_price'], 250.0)
+    
+    def test_inventory_updates_invalidate_capacity(self):
+        self.assertEqual(self.get_detail()['performances'][0]['available_capacity'], 10)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(SeatInventory.reserve(self.section_ticket, 3))
+        
+        self.performance.refresh_from_db()
+        self.assertEqual(
+            self.get_detail()['performances'][0]['available_capacity'], self.performance.available_capacity
+        )
+        self.assertEqual(self.get_detail()['performances'][0]['sections'][0]['available_capacity'], 7)
+    
+    def test_fragments_are_keyed_by_currency(self):
+        self.get_detail()
+        with CaptureQueriesContext(connection) as queries:
+            self.get_detail(currency='EUR')
+        self.assertGreater(len(queries), 1)
+        with self.assertNumQueries(1):
+            self.get_detail(currency='EUR')
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}, SEAT_HOLD_TTL=600)
+class SeatHoldTests(EventTestDataMixin, TestCase):
+    """Seat holds live in the cache until the seats are sold."""
+    
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_event_fixture(capacity=10)
+        self.seats = [
+            Seat.objects.create(
+                performance=self.performance, ticket_type=self.ticket_type, seat_number=str(number),
+                row_number='1', section='A', price=100
+            )
+            for number in range(1, 5)
+        ]
+        self.ids = [str(seat.id) for seat in self.seats]
+    
+    def test_acquire_is_all_or_nothing(self):
+        self.assertEqual(SeatHoldService.acquire(self.performance.id, self.ids[:2], 'alice'), [])
+        
+        self.assertEqual(SeatHoldService.acquire(self.performance.id, self.ids[1:3], 'bob'), [self.ids[1]])
+        self.assertEqual(
+            SeatHoldService.hold_map(self.performance.id, self.ids), {self.ids[0]: 'alice', self.ids[1]: 'alice'}
+        )
+        # Re-acquiring extends the holder's own seats.
+        self.assertEqual(SeatHoldService.acquire(self.performance.id, self.ids[:3], 'alice'), [])
+        self.assertEqual(EventQueryOptimizer.get_available_seats_count(self.performance.id), 1)
+        
+        Seat.objects.filter(pk=self.seats[3].pk).update(status='blocked')
+        self.assertEqual(SeatHoldService.acquire(self.performance.id, self.ids[3:], 'bob'), [self.ids[3]])
+    
+    def test_holds_expire_lazily_and_release_only_own_seats(self):
+        SeatHoldService.acquire(self.performance.id, self.ids[:2], 'alice', ttl=60)
+        self.assertEqual(SeatHoldService.release(self.performance.id, self.ids[:2], 'bob'), 0)
+        self.assertEqual(SeatHoldService.release(self.performance.id, self.ids[:1], 'alice'), 1)
+        
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=clock.time() + 61):
+            self.assertEqual(SeatHoldService.hold_map(self.performance.id, self.ids), {})
+            self.assertEqual(SeatHoldService.acquire(self.performance.id, self.ids[:2], 'bob'), [])
+            # Alice's lapsed hold is not extended over Bob's.
+            self.assertEqual(SeatHoldService.acquire(self.performance.id, self.ids[1:2], 'alice'), [self.ids[1]])
+            self.assertEqual(SeatHoldService.hold_map(self.performance.id, self.ids[1:2]), {self.ids[1]: 'bob'})
+        
+        available = SeatSelectionOptimizer.get_section_availability(self.performance.id, 'A')
+        self.assertEqual(
+            sorted(str(seat['id']) for seat in available[self.ticket_type.name]), sorted(self.ids[2:])
+        )
+    
+    def test_sell_reconciles_holds_to_seats(self):
+        SeatHoldService.acquire(self.performance.id, self.ids[:2], 'alice')
+        SeatHoldService.acquire(self.performance.id, self.ids[2:3], 'bob')
+        
+        with self.assertRaises(ValueError):
+            SeatHoldService.sell(self.performance.id, self.ids[1:3], 'alice')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(SeatHoldService.sell(self.performance.id, self.ids[:2], 'alice'), 2)
+        
+        self.assertEqual(
+            list(Seat.objects.filter(status='sold').order_by('seat_number').values_list('seat_number', flat=True)),
+            ['1', '2']
+        )
+        self.assertEqual(SeatHoldService.hold_map(self.performance.id, self.ids), {self.ids[2]: 'bob'})
+        self.assertEqual(SeatHoldService.acquire(self.performance.id, self.ids[:1], 'carol'), [self.ids[0]])
+    
+    def test_hold_endpoints(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(
+            username='holder', email='holder@example.com', password='pass12345'
+        ))
+        url = reverse('performance-seat-holds', args=[self.performance.id])
+        
+        response = client.post(url, {'seat_ids': self.ids[:2]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        token = response.data['hold_token']
+        
+        response = client.post(url, {'seat_ids': self.ids[1:3]}, format='json')
+        self.assertEqual((response.status_code, response.data['unavailable_seats']), (409, [self.ids[1]]))
+        
+        response = client.get(url, {'hold_token': token})
+        self.assertEqual((response.data['held_seats'], response.data['my_seats']), (sorted(self.ids[:2]),) * 2)
+        
+        response = client.delete(url, {'seat_ids': self.ids[:2], 'hold_token': token}, format='json')
+        self.assertEqual(response.data['released'], 2)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class SeatMapTests(EventTestDataMixin, TestCase):
+    """Seat maps are a cacheable layout plus packed states polled as deltas."""
+    
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_event_fixture(capacity=10)
+            self.seats = [
+                Seat.objects.create(
+                    performance=self.performance, ticket_type=self.ticket_type, seat_number=f'{number:02d}',
+                    row_number='1', section='A', price=100, is_premium=number == 1
+                )
+                for number in range(1, 11)
+            ]
+        self.client = APIClient()
+    
+    def test_layout_is_versioned_by_content(self):
+        layout = SeatMap.layout(self.performance.id)
+        self.assertEqual(layout['ids'], [str(seat.id) for seat in self.seats])
+        self.assertEqual((layout['sections'], layout['flags'][:2]), (['A'], [1, 0]))
+        self.assertEqual(SeatMap.build_layout(self.performance.id)['version'], layout['version'])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.seats[0].delete()
+        self.assertNotEqual(SeatMap.layout(self.performance.id)['version'], layout['version'])
+    
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'seat-map-default'},
+        'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'seat-map-shared'},
+    })
+    def test_versions_are_kept_in_shared_cache(self):
+        SeatMap.status(self.performance.id)
+        
+        for key in (LAYOUT_VERSION_KEY, PERFORMANCE_SEATS_VERSION_KEY):
+            key = key.format(performance_id=self.performance.id)
+            self.assertIsNotNone(caches['shared'].get(key))
+            self.assertIsNone(caches['default'].get(key))
+        
+        # Another process's copy of the available seat IDs is keyed by the
+        # old version, so an invalidation reaches it too.
+        self.assertEqual(EventQueryOptimizer.get_available_seats_count(self.performance.id), 10)
+        Seat.objects.filter(pk=self.seats[0].pk).update(status='sold')
+        EventQueryOptimizer.invalidate_performance_cache(self.performance.id)
+        self.assertEqual(EventQueryOptimizer.get_available_seats_count(self.performance.id), 9)
+    
+    def test_status_polls_return_only_changes(self):
+        full = SeatMap.status(self.performance.id)
+        self.assertEqual(full['counts']['available'], 10)
+        self.assertEqual(len(full['status']), 4)  # 10 seats in 3 bytes, base64
+        self.assertEqual(SeatMap.status(self.performance.id, since=full['version'])['changes'], [])
+        
+        SeatHoldService.acquire(self.performance.id, [self.seats[2].id], 'alice')
+        with self.captureOnCommitCallbacks(execute=True):
+            SeatHoldService.sell(self.performance.id, [self.seats[5].id], 'bob')
+        delta = SeatMap.status(self.performance.id, since=full['version'])
+        self.assertNotIn('status', delta)
+        self.assertEqual(delta['changes'], [[2, HELD], [5, SOLD]])
+        self.assertEqual(
+            list(SeatMap.unpack(SeatMap.status(self.performance.id)['status'], 10)),
+            [0, 0, HELD, 0, 0, SOLD, 0, 0, 0, 0]
+        )
+        self.assertIn('status', SeatMap.status(self.performance.id, since='unknown'))
+    
+    def test_layout_endpoint_is_cacheable(self):
+        url = reverse('performance-seat-map-layout', args=[self.performance.id])
+        response = self.client.get(url)
+        version = response.data['version']
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        
+        response = self.client.get(url, {'version': version}, HTTP_IF_NONE_MATCH=f'"{version}"')
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('immutable', response['Cache-Control'])
+        
+        response = self.client.get(reverse('performance-seat-map', args=[self.performance.id]), {'since': 'x'})
+        self.assertEqual((response.data['layout_version'], response.data['counts']['available']), (version, 10))
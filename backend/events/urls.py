@@ -80,6 +80,18 @@ urlpatterns = [
          EventCapacityViewSet.as_view({'get': 'available_seats'}), 
          name='performance-available-seats'),
     
+    path('performances/<uuid:pk>/seat-map/layout/', 
+         EventCapacityViewSet.as_view({'get': 'seat_map_layout'}), 
+         name='performance-seat-map-layout'),
+    
+    path('performances/<uuid:pk>/seat-map/', 
+         EventCapacityViewSet.as_view({'get': 'seat_map'}), 
+         name='performance-seat-map'),
+    
+    path('performances/<uuid:pk>/seat-holds/', 
+         EventCapacityViewSet.as_view({'get': 'seat_holds', 'post': 'hold_seats', 'delete': 'release_seat_holds'}), 
+         name='performance-seat-holds'),
+    
     # Quick access routes for frontend
     path('events/<slug:slug>/quick-info/', 
          EventViewSet.as_view({'get': 'retrieve'}), 
@@ -9,7 +9,8 @@ from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnl
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
 from django.db.models import Q, Avg, Count, Min, Max
-from django.utils.translation import gettext_lazy as _
+from django.utils.translation import get_language, gettext_lazy as _
+from django.conf import settings
 from .models import (
     Event, EventCategory, Venue, Artist, TicketType, 
     EventPerformance, Seat, EventOption, EventReview,
@@ -23,6 +24,9 @@ from .serializers import (
     EventPricingCalculatorSerializer, EventDiscountSerializer, EventFeeSerializer,
     EventPricingRuleSerializer
 )
+from .detail_cache import EventDetailCache
+from shared.pagination import KeysetPagination
+from shared.search import SearchIndex
 from decimal import Decimal
 from django.core.exceptions import ValidationError
 from django.http import Http404
@@ -200,6 +204,103 @@ class EventCapacityViewSet(viewsets.ViewSet):
                 {'error': 'Performance not found'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
+    
+    @action(detail=True, methods=['get'])
+    def seat_map_layout(self, request, pk=None):
+        """
+        Get the seat layout of a performance.
+        
+        Requested with ``?version=`` equal to the current layout version the
+        response never changes and may be cached indefinitely.
+        """
+        from .seat_map import SeatMap
+        
+        performance = get_object_or_404(EventPerformance, pk=pk)
+        layout = SeatMap.layout(performance.pk)
+        etag = f'"{layout["version"]}"'
+        if request.headers.get('If-None-Match') == etag:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response({'performance_id': performance.id, **layout})
+        response['ETag'] = etag
+        if request.query_params.get('version') == layout['version']:
+            response['Cache-Control'] = 'public, max-age=31536000, immutable'
+        else:
+            response['Cache-Control'] = 'no-cache'
+        return response
+    
+    @action(detail=True, methods=['get'])
+    def seat_map(self, request, pk=None):
+        """
+        Get seat states of a performance, only the changes since ``?since=``
+        when that version is still known.
+        """
+        from .seat_map import SeatMap
+        
+        performance = get_object_or_404(EventPerformance, pk=pk)
+        data = SeatMap.status(performance.pk, since=request.query_params.get('since'))
+        response = Response({'performance_id': performance.id, **data})
+        response['Cache-Control'] = 'no-store'
+        return response
+    
+    @action(detail=True, methods=['get'])
+    def seat_holds(self, request, pk=None):
+        """Get the held seats of a performance (and which are the caller's)."""
+        from .optimizations import EventQueryOptimizer
+        from .seat_holds import SeatHoldService
+        
+        performance = get_object_or_404(EventPerformance, pk=pk)
+        holds = SeatHoldService.hold_map(
+            performance.pk, EventQueryOptimizer.get_available_seat_ids(performance.pk)
+        )
+        hold_token = request.query_params.get('hold_token')
+        return Response({
+            'performance_id': performance.id,
+            'held_seats': sorted(holds),
+            'my_seats': sorted(seat_id for seat_id, holder in holds.items() if hold_token and holder == hold_token),
+        })
+    
+    @action(detail=True, methods=['post'])
+    def hold_seats(self, request, pk=None):
+        """Hold seats of a performance, all or none, for ``SEAT_HOLD_TTL`` seconds."""
+        from .seat_holds import SeatHoldService
+        
+        performance = get_object_or_404(EventPerformance, pk=pk)
+        seat_ids = request.data.get('seat_ids')
+        if not seat_ids or not isinstance(seat_ids, list):
+            return Response({'error': 'seat_ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            seat_ids = SeatHoldService.seat_ids(seat_ids)
+        except ValueError:
+            return Response({'error': 'seat_ids must be seat UUIDs'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        hold_token = request.data.get('hold_token') or SeatHoldService.new_holder()
+        unavailable = SeatHoldService.acquire(performance.pk, seat_ids, hold_token)
+        if unavailable:
+            return Response(
+                {'error': 'Some seats are no longer available', 'unavailable_seats': unavailable},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response({
+            'hold_token': hold_token,
+            'seat_ids': seat_ids,
+            'expires_in': settings.SEAT_HOLD_TTL,
+        })
+    
+    @action(detail=True, methods=['delete'])
+    def release_seat_holds(self, request, pk=None):
+        """Release seats held with ``hold_token``."""
+        from .seat_holds import SeatHoldService
+        
+        performance = get_object_or_404(EventPerformance, pk=pk)
+        hold_token = request.data.get('hold_token')
+        if not hold_token:
+            return Response({'error': 'hold_token is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            seat_ids = SeatHoldService.seat_ids(request.data.get('seat_ids') or [])
+        except ValueError:
+            return Response({'error': 'seat_ids must be seat UUIDs'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'released': SeatHoldService.release(performance.pk, seat_ids, hold_token)})
 
 
 class EventViewSet(viewsets.ModelViewSet):
@@ -211,6 +312,7 @@ class EventViewSet(viewsets.ModelViewSet):
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'date', 'price']
     ordering = ['-created_at']
+    pagination_class = KeysetPagination
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -222,7 +324,7 @@ class EventViewSet(viewsets.ModelViewSet):
         queryset = Event.objects.filter(is_active=True).select_related(
             'category', 'venue'
         ).prefetch_related(
-            'artists', 'ticket_types', 'options', 'performances__sections__ticket_types'
+            'artists', 'ticket_types', 'options', 'performances__sections__ticket_types__ticket_type'
         )
         
         # Apply filters
@@ -236,6 +338,45 @@ class EventViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    def retrieve(self, request, *args, **kwargs):
+        """Serve event detail from the response-fragment cache."""
+        event_id = self._get_event_id()
+        
+        def render(fragments):
+            event = self.get_queryset().get(pk=event_id)
+            return EventDetailCache.render(self.get_serializer(event), fragments)
+        
+        data = EventDetailCache.get(
+            event_id, get_language() or settings.LANGUAGE_CODE, self._get_currency(), render
+        )
+        return Response(data)
+    
+    def _get_event_id(self):
+        """Resolve the slug or ID in the URL to an active event ID."""
+        lookup_value = self.kwargs.get('pk')
+        events = Event.objects.filter(is_active=True)
+        
+        event_id = events.filter(slug=lookup_value).values_list('id', flat=True).first()
+        if event_id is None:
+            try:
+                event_id = events.filter(id=lookup_value).values_list('id', flat=True).first()
+            except (ValidationError, ValueError):
+                event_id = None
+        if event_id is None:
+            raise Http404("Event not found")
+        return event_id
+    
+    def _get_currency(self):
+        """Currency the response is rendered for."""
+        currency = (
+            self.request.query_params.get('currency')
+            or getattr(self.request.user, 'preferred_currency', None)
+            or settings.DEFAULT_CURRENCY
+        ).upper()
+        if currency not in settings.SUPPORTED_CURRENCIES:
+            return settings.DEFAULT_CURRENCY
+        return currency
+    
     @action(detail=True, methods=['get'])
     def capacity_info(self, request, pk=None):
         """Get detailed capacity information for an event."""
@@ -303,16 +444,6 @@ class EventViewSet(viewsets.ModelViewSet):
         """Search events with advanced filters."""
         queryset = self.get_queryset()
         
-        # Search query
-        query = request.query_params.get('q')
-        if query:
-            queryset = queryset.filter(
-                Q(title__icontains=query) |
-                Q(description__icontains=query) |
-                Q(venue__name__icontains=query) |
-                Q(artists__name__icontains=query)
-            ).distinct()
-        
         # Date filters
         date_from = request.query_params.get('date_from')
         if date_from:
@@ -336,6 +467,15 @@ class EventViewSet(viewsets.ModelViewSet):
         if style:
             queryset = queryset.filter(style=style)
         
+        # Performance and section filters join one row per match.
+        if date_from or date_to or min_price or max_price:
+            queryset = queryset.distinct()
+        
+        # Search query, last so its result cap applies to filtered events
+        query = request.query_params.get('q')
+        if query:
+            queryset = SearchIndex.filter(queryset, 'event', query).order_by('-search_rank')
+        
         # Pagination
         page = self.paginate_queryset(queryset)
         if page is not None:
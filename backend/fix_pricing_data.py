@@ -12,7 +12,7 @@ from decimal import Decimal
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'peykan.settings')
 django.setup()
 
-from tours.models import Tour, TourVariant, TourPricing, TourSchedule
+from tours.models import Tour, TourVariant, TourPricing, TourSchedule, TourScheduleVariantCapacity
 from django.core.exceptions import ValidationError
 from django.db import models
 
@@ -67,52 +67,22 @@ def fix_variant_pricing():
             print(f"❌ Failed to fix pricing {pricing}: {e}")
 
 def validate_schedule_capacities():
-    """Validate and fix schedule capacities."""
+    """Validate and fix schedule variant capacities."""
     print("\n🔧 Validating schedule capacities...")
     
-    schedules = TourSchedule.objects.all()
-    print(f"Checking {schedules.count()} schedules...")
+    rows = TourScheduleVariantCapacity.objects.select_related('schedule__tour', 'variant')
+    print(f"Checking {rows.count()} schedule variant capacities...")
     
-    for schedule in schedules:
+    for row in rows:
         try:
-            capacities = schedule.variant_capacities_raw
-            
-            if not isinstance(capacities, dict):
-                schedule.variant_capacities_raw = {}
-                schedule.save()
-                print(f"✅ Fixed schedule {schedule} - reset capacities")
-                continue
-            
-            # Validate each variant capacity
-            fixed_capacities = {}
-            for variant_id, capacity_data in capacities.items():
-                if not isinstance(capacity_data, dict):
-                    continue
-                
-                total = capacity_data.get('total', 0)
-                booked = capacity_data.get('booked', 0)
-                
-                # Ensure positive integers
-                try:
-                    total = max(0, int(total))
-                    booked = max(0, int(booked))
-                    booked = min(booked, total)  # booked cannot exceed total
-                except (ValueError, TypeError):
-                    total = 10
-                    booked = 0
-                
-                fixed_capacities[str(variant_id)] = {
-                    'total': total,
-                    'booked': booked,
-                    'available': total - booked
-                }
-            
-            schedule.variant_capacities_raw = fixed_capacities
-            schedule.save()
-            print(f"✅ Fixed schedule {schedule} - {len(fixed_capacities)} variants")
+            # booked cannot exceed total; save() recomputes available
+            row.total_capacity = max(0, row.total_capacity)
+            row.booked_capacity = min(max(0, row.booked_capacity), row.total_capacity)
+            row.save()
+            print(f"✅ Fixed schedule {row.schedule} - {row.variant.name}")
             
         except Exception as e:
-            print(f"❌ Failed to fix schedule {schedule}: {e}")
+            print(f"❌ Failed to fix schedule {row.schedule}: {e}")
 
 def create_default_pricing():
     """Create default pricing for variants that don't have it."""
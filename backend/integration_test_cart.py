@@ -20,7 +20,7 @@ from django.contrib.auth import authenticate
 from django.test import RequestFactory
 from django.contrib.sessions.backends.db import SessionStore
 from users.models import User
-from tours.models import Tour, TourVariant, TourSchedule, TourCategory
+from tours.models import Tour, TourVariant, TourSchedule, TourScheduleVariantCapacity, TourCategory
 from cart.models import Cart, CartItem, CartService
 from cart.views import AddToCartView
 from rest_framework.test import APIClient
@@ -120,13 +120,13 @@ class CartIntegrationTest:
                 'day_of_week': 0,
                 'max_capacity': 20,  # BaseScheduleModel field
                 'current_capacity': 0,
-                'variant_capacities_raw': {
-                    str(self.variants[0].id): 10,
-                    str(self.variants[1].id): 10
-                },
                 'is_available': True
             }
         )
+        for variant in self.variants[:2]:
+            TourScheduleVariantCapacity.objects.get_or_create(
+                schedule=self.schedule, variant=variant, defaults={'total_capacity': 10}
+            )
         
         self.log(f"Created test data: User={self.user.username}, Tour={self.tour.title}, Variants={len(self.variants)}")
         
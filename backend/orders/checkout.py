@@ -0,0 +1,321 @@
+"""
+Staged checkout pipeline.
+
+``CheckoutPipeline`` turns a cart into an order with a fixed number of
+queries, whatever the cart size:
+
+1. load the cart items and resolve every product with one query per type;
+2. lock every affected event performance, section and section ticket
+   allocation (and tour schedules whose cart reservation is converted) with
+   ``select_for_update``, model by model and in primary-key order, so
+   concurrent checkouts always acquire row locks in the same order and
+   cannot deadlock on each other;
+3. book per-variant tour capacity with one conditional UPDATE, check and
+   apply the remaining capacity changes in memory and write them back with
+   one ``bulk_update`` per model; seats held through the seat-hold endpoint
+   are marked sold;
+4. create the order, ``bulk_create`` its items and delete the cart items in
+   one statement.
+
+Any capacity shortage raises ``ValueError`` and rolls the whole checkout back.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from functools import partial
+
+from django.db import transaction
+
+from .models import Order, OrderItem
+
+
+class CheckoutPipeline:
+    """
+    Create an order from a cart in bulk.
+    """
+
+    def __init__(self, cart, user, agent=None):
+        self.cart = cart
+        self.user = user
+        self.agent = agent
+        self.items = []
+        self.resolver = None
+        self.tour_schedules = {}
+        self.performances = {}
+        self.sections = {}
+        self.allocations = {}
+        self.changed_schedules = set()
+        self.changed_performances = set()
+        self.changed_sections = set()
+        self.changed_allocations = set()
+
+    def run(self):
+        from tours.availability import TourAvailabilityService
+
+        with transaction.atomic(), TourAvailabilityService.batched():
+            self.load()
+            self.lock()
+            self.apply_capacity()
+            order = self.create_order()
+            self.clear_cart()
+        return order
+
+    # Stage 1: load and resolve
+
+    def load(self):
+        from cart.services import CartProductResolver
+
+        self.items = list(self.cart.items.order_by('created_at'))
+        if not self.items:
+            raise ValueError('Cart is empty.')
+        self.resolver = CartProductResolver(self.items)
+
+    def product_details(self, item):
+        product = self.resolver.get_product(item)
+        if product is None:
+            return {'title': '', 'slug': ''}
+        if item.product_type == 'transfer':
+            return {
+                'title': product.name or f"{product.origin} → {product.destination}",
+                'slug': product.slug,
+            }
+        return {'title': product.title, 'slug': product.slug}
+
+    # Stage 2: lock
+
+    def _items_of(self, product_type):
+        return [item for item in self.items if item.product_type == product_type]
+
+    @staticmethod
+    def _lock(queryset, ids):
+        if not ids:
+            return {}
+        rows = queryset.select_for_update().filter(pk__in=ids).order_by('pk')
+        return {row.pk: row for row in rows}
+
+    def lock(self):
+        from events.models import EventPerformance, EventSection, SectionTicketType
+        from tours.models import TourSchedule
+
+        tour_items = [item for item in self._items_of('tour') if item.booking_data.get('schedule_id')]
+        schedule_ids = {str(item.booking_data['schedule_id']) for item in tour_items}
+        if schedule_ids:
+            found = {str(pk) for pk in TourSchedule.objects.filter(pk__in=schedule_ids).values_list('pk', flat=True)}
+            missing = schedule_ids - found
+            if missing:
+                raise ValueError(f"Capacity update failed: tour schedule {sorted(missing)[0]} not found")
+
+        # Per-variant capacity is booked on its own rows; the schedule row is
+        # only needed to release capacity held by a cart reservation.
+        reserved_schedule_ids = {
+            str(item.booking_data['schedule_id']) for item in tour_items if item.is_reserved
+        }
+        self.tour_schedules = {
+            str(pk): schedule
+            for pk, schedule in self._lock(TourSchedule.objects.all(), reserved_schedule_ids).items()
+        }
+
+        event_items = self._items_of('event')
+        performance_ids = {
+            str(item.booking_data.get('performance_id')) for item in event_items
+            if item.booking_data.get('performance_id')
+        }
+        self.performances = {
+            str(pk): performance
+            for pk, performance in self._lock(EventPerformance.objects.all(), performance_ids).items()
+        }
+
+        # Sections are addressed by (performance, name) and allocations by
+        # (section, ticket type); resolve both to primary keys before locking
+        # so the locks are taken in key order.
+        wanted_sections = {
+            (str(item.booking_data.get('performance_id')), item.booking_data.get('section'))
+            for item in event_items
+            if item.booking_data.get('section') and str(item.booking_data.get('performance_id')) in self.performances
+        }
+        if not wanted_sections:
+            return
+        section_ids = [
+            pk for pk, performance_id, name in EventSection.objects.filter(
+                performance_id__in={performance_id for performance_id, _ in wanted_sections},
+                name__in={name for _, name in wanted_sections}
+            ).values_list('pk', 'performance_id', 'name')
+            if (str(performance_id), name) in wanted_sections
+        ]
+        sections = self._lock(EventSection.objects.all(), section_ids)
+        self.sections = {(str(section.performance_id), section.name): section for section in sections.values()}
+
+        ticket_type_ids = {item.variant_id for item in event_items if item.variant_id}
+        allocation_ids = SectionTicketType.objects.filter(
+            section_id__in=list(sections), ticket_type_id__in=ticket_type_ids
+        ).values_list('pk', flat=True)
+        allocations = self._lock(SectionTicketType.objects.all(), list(allocation_ids))
+        self.allocations = {
+            (allocation.section_id, allocation.ticket_type_id): allocation for allocation in allocations.values()
+        }
+
+    # Stage 3: capacity
+
+    def apply_capacity(self):
+        variant_quantities = defaultdict(int)
+        for item in self.items:
+            if item.product_type == 'tour':
+                self._apply_tour(item, variant_quantities)
+            elif item.product_type == 'event':
+                self._apply_event(item)
+        self._book_tour_variants(variant_quantities)
+        self._write_capacity()
+        self._sell_held_seats()
+
+    def _apply_tour(self, item, variant_quantities):
+        schedule_id = item.booking_data.get('schedule_id')
+        if not schedule_id:
+            return
+        if item.variant_id:
+            variant_quantities[(str(schedule_id), str(item.variant_id))] += item.quantity
+
+        schedule = self.tour_schedules.get(str(schedule_id))
+        if schedule is not None and item.is_reserved and schedule.current_capacity >= item.quantity:
+            # The cart reservation held schedule capacity; the booking above replaces it.
+            schedule.current_capacity -= item.quantity
+            self.changed_schedules.add(schedule.pk)
+
+    def _apply_event(self, item):
+        performance = self.performances.get(str(item.booking_data.get('performance_id')))
+        if performance is None:
+            return
+
+        # A reserved item already booked its performance capacity.
+        if not item.is_reserved:
+            if performance.available_capacity < item.quantity:
+                raise ValueError("Capacity update failed: Insufficient capacity for event")
+            performance.current_capacity += item.quantity
+            self.changed_performances.add(performance.pk)
+
+        section = self.sections.get((str(performance.pk), item.booking_data.get('section')))
+        allocation = self.allocations.get((section.pk, item.variant_id)) if section else None
+        if allocation is None:
+            return
+
+        count = len(item.booking_data.get('seats') or []) or item.quantity
+        # Seats held through the reservation endpoint are sold first, the
+        # rest come straight from the available pool.
+        from_reserved = min(count, allocation.reserved_capacity, section.reserved_capacity)
+        from_available = count - from_reserved
+        if allocation.available_capacity < from_available or section.available_capacity < from_available:
+            raise ValueError(f"Capacity update failed: Insufficient seats in section {section.name}")
+        for row in (allocation, section):
+            row.reserved_capacity -= from_reserved
+            row.available_capacity -= from_available
+            row.sold_capacity += count
+        self.changed_allocations.add(allocation.pk)
+        self.changed_sections.add(section.pk)
+
+    def _sell_held_seats(self):
+        """Mark seats picked through the seat-hold endpoint sold."""
+        from events.seat_holds import SeatHoldService
+
+        for item in self._items_of('event'):
+            hold_token = item.booking_data.get('hold_token')
+            performance_id = item.booking_data.get('performance_id')
+            if not hold_token or not performance_id:
+                continue
+            seat_ids = [
+                seat['seat_id'] for seat in item.booking_data.get('seats') or []
+                if isinstance(seat, dict) and seat.get('seat_id')
+            ]
+            if seat_ids:
+                SeatHoldService.sell(performance_id, seat_ids, hold_token)
+
+    @staticmethod
+    def _book_tour_variants(variant_quantities):
+        from tours.capacity import VariantCapacityService
+
+        shortages = VariantCapacityService.book_many(variant_quantities)
+        if shortages:
+            raise ValueError(f"Capacity update failed: Insufficient capacity for variant {shortages[0][1]}")
+
+    def _write_capacity(self):
+        from events.detail_cache import VOLATILE, EventDetailCache
+        from events.models import EventPerformance, EventSection, SectionTicketType
+        from tours.models import TourSchedule
+
+        capacity_fields = ['available_capacity', 'reserved_capacity', 'sold_capacity']
+        writes = (
+            (TourSchedule, self.tour_schedules.values(), self.changed_schedules, ['current_capacity']),
+            (EventPerformance, self.performances.values(), self.changed_performances, ['current_capacity']),
+            (EventSection, self.sections.values(), self.changed_sections, capacity_fields),
+            (SectionTicketType, self.allocations.values(), self.changed_allocations, capacity_fields),
+        )
+        for model, rows, changed, fields in writes:
+            rows = [row for row in rows if row.pk in changed]
+            if rows:
+                model.objects.bulk_update(rows, fields)
+
+        # bulk_update skips model signals, so cached event detail is
+        # invalidated here.
+        event_ids = {
+            performance.event_id for performance in self.performances.values()
+            if performance.pk in self.changed_performances
+        }
+        event_ids.update(
+            self.performances[str(section.performance_id)].event_id
+            for section in self.sections.values() if section.pk in self.changed_sections
+        )
+        for event_id in event_ids:
+            transaction.on_commit(partial(EventDetailCache.invalidate, event_id, [VOLATILE]))
+
+    # Stage 4: order
+
+    def create_order(self):
+        subtotal = sum((item.total_price for item in self.items), Decimal('0.00'))
+        agent = self.agent
+        commission_rate = agent.commission_rate if agent and agent.is_agent else Decimal('0.00')
+
+        order = Order.objects.create(
+            user=self.user,
+            agent=agent,
+            currency=self.cart.currency,
+            customer_name=self.user.get_full_name() or self.user.username,
+            customer_email=self.user.email,
+            customer_phone=self.user.phone_number or '',
+            subtotal=subtotal,
+            tax_amount=Decimal('0.00'),
+            discount_amount=Decimal('0.00'),
+            total_amount=subtotal,
+            agent_commission_rate=commission_rate,
+        )
+
+        order_items = []
+        for item in self.items:
+            details = self.product_details(item)
+            order_items.append(OrderItem(
+                order=order,
+                product_type=item.product_type,
+                product_id=item.product_id,
+                product_title=details['title'],
+                product_slug=details['slug'],
+                booking_date=item.booking_date,
+                booking_time=item.booking_time,
+                variant_id=item.variant_id,
+                variant_name=item.variant_name,
+                quantity=item.quantity,
+                unit_price=item.unit_price,
+                # bulk_create skips OrderItem.save(), which computes the total.
+                total_price=(item.unit_price * item.quantity) + item.options_total,
+                selected_options=item.selected_options,
+                options_total=item.options_total,
+                booking_data=item.booking_data,
+            ))
+        OrderItem.objects.bulk_create(order_items)
+        return order
+
+    def clear_cart(self):
+        from cart.models import CartItem
+        from tours.availability import TourAvailabilityService
+
+        CartItem.objects.filter(pk__in=[item.pk for item in self.items]).delete()
+        TourAvailabilityService.schedule_refresh(
+            (item.product_id, item.variant_id, item.booking_date)
+            for item in self.items if item.product_type == 'tour'
+        )
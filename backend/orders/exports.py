@@ -0,0 +1,78 @@
+"""
+Streaming exports of orders and order items.
+"""
+
+import uuid
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from shared.exports import Export
+
+from .models import Order, OrderItem
+
+
+def visible_orders(user, params=None):
+    """
+    Orders a user may export: all for staff, otherwise their own and those
+    they placed as an agent, optionally narrowed to one ``customer``.
+    """
+    orders = Order.objects.all() if user.is_staff else Order.objects.filter(Q(user=user) | Q(agent=user))
+    customer = (params or {}).get('customer')
+    if customer:
+        try:
+            orders = orders.filter(user_id=uuid.UUID(customer))
+        except ValueError:
+            raise ValidationError({'customer': 'Enter a valid user ID.'})
+    return orders
+
+
+class OrderItemExport(Export):
+    name = 'order-items'
+    columns = (
+        ('id', 'id'),
+        ('order_number', 'order.order_number'),
+        ('product_type', 'product_type'),
+        ('product_id', 'product_id'),
+        ('product_title', 'product_title'),
+        ('booking_date', 'booking_date'),
+        ('booking_time', 'booking_time'),
+        ('variant_name', 'variant_name'),
+        ('quantity', 'quantity'),
+        ('unit_price', 'unit_price'),
+        ('options_total', 'options_total'),
+        ('total_price', 'total_price'),
+        ('currency', 'currency'),
+        ('status', 'status'),
+        ('created_at', 'created_at'),
+    )
+    select_related = ('order',)
+
+    @classmethod
+    def get_queryset(cls, user, params):
+        return OrderItem.objects.filter(order__in=visible_orders(user, params))
+
+
+class OrderExport(Export):
+    name = 'orders'
+    columns = (
+        ('order_number', 'order_number'),
+        ('user_id', 'user_id'),
+        ('agent_id', 'agent_id'),
+        ('customer_name', 'customer_name'),
+        ('customer_email', 'customer_email'),
+        ('status', 'status'),
+        ('payment_status', 'payment_status'),
+        ('subtotal', 'subtotal'),
+        ('tax_amount', 'tax_amount'),
+        ('discount_amount', 'discount_amount'),
+        ('total_amount', 'total_amount'),
+        ('currency', 'currency'),
+        ('agent_commission_amount', 'agent_commission_amount'),
+        ('created_at', 'created_at'),
+    )
+    children = {'items': ('items', OrderItemExport)}
+
+    @classmethod
+    def get_queryset(cls, user, params):
+        return visible_orders(user, params)
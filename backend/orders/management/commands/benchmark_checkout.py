@@ -0,0 +1,177 @@
+"""
+Checkout throughput benchmark.
+
+Builds carts of increasing size (tour items on distinct schedules plus one
+event item with seats), checks each out through
+``OrderService.create_order_from_cart`` and reports latency, queries per
+checkout and checkouts per second for every cart size. With the bulk
+pipeline the query count stays the same as carts grow.
+"""
+
+import statistics
+import time
+import uuid
+from datetime import date, time as dt_time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from cart.models import Cart, CartItem
+from events.models import (
+    Event, EventCategory, EventPerformance, EventSection, SectionTicketType, TicketType, Venue
+)
+from orders.models import Order, OrderService
+from tours.models import Tour, TourCategory, TourSchedule, TourScheduleVariantCapacity, TourVariant
+
+
+class Command(BaseCommand):
+    help = 'Measure checkout latency and throughput for growing cart sizes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1,5,10,25,50', help='Comma-separated tour items per cart')
+        parser.add_argument('--repeat', type=int, default=5, help='Checkouts per cart size')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark fixture afterwards')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError('sizes must be a comma-separated list of integers.')
+        if not sizes or min(sizes) < 1 or options['repeat'] < 1:
+            raise CommandError('sizes and repeat must be positive.')
+
+        fixture = self._create_fixture(max(sizes), options['repeat'] * len(sizes))
+        try:
+            self.stdout.write(self.style.NOTICE(
+                f"Checking out {options['repeat']} carts per size (tour items + 1 event item)"
+            ))
+            self.stdout.write(f"  {'items':>6} {'median ms':>10} {'queries':>8} {'checkouts/s':>12}")
+            for size in sizes:
+                timings = []
+                queries = 0
+                for _ in range(options['repeat']):
+                    cart = self._build_cart(fixture, size)
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        OrderService.create_order_from_cart(cart, fixture['user'])
+                        timings.append(time.perf_counter() - started)
+                    queries = len(captured)
+                median = statistics.median(timings)
+                self.stdout.write(
+                    f"  {size + 1:>6} {median * 1000:>10.1f} {queries:>8} {1 / median if median else 0:>12.1f}"
+                )
+        finally:
+            if not options['keep']:
+                self._delete_fixture(fixture)
+
+        self.stdout.write(self.style.SUCCESS('Checkout benchmark complete.'))
+
+    def _build_cart(self, fixture, size):
+        cart = Cart.objects.create(
+            session_id=f"bench-checkout-{uuid.uuid4().hex[:12]}", user=fixture['user'],
+            expires_at=timezone.now() + timedelta(hours=1)
+        )
+        tour, variant = fixture['tour'], fixture['variant']
+        items = [
+            CartItem(
+                cart=cart, product_type='tour', product_id=tour.id, variant_id=variant.id,
+                variant_name=variant.name, booking_date=schedule.start_date,
+                booking_time=schedule.start_time, quantity=1, unit_price=50, total_price=50,
+                booking_data={'schedule_id': str(schedule.id)}
+            )
+            for schedule in fixture['schedules'][:size]
+        ]
+        items.append(CartItem(
+            cart=cart, product_type='event', product_id=fixture['event'].id,
+            variant_id=fixture['ticket_type'].id, variant_name=fixture['ticket_type'].name,
+            booking_date=fixture['performance'].date, booking_time=dt_time(19, 0),
+            quantity=1, unit_price=100, total_price=100,
+            booking_data={
+                'performance_id': str(fixture['performance'].id),
+                'section': 'A',
+                'seats': [{'seat_id': '1', 'section': 'A'}],
+            }
+        ))
+        CartItem.objects.bulk_create(items)
+        return cart
+
+    def _create_fixture(self, schedule_count, checkouts):
+        suffix = uuid.uuid4().hex[:8]
+        user = get_user_model().objects.create_user(
+            username=f'bench-{suffix}', email=f'bench-{suffix}@example.com', password=uuid.uuid4().hex
+        )
+
+        tour_category = TourCategory.objects.create(
+            slug=f'bench-tours-{suffix}', name='Benchmark', description='Benchmark'
+        )
+        tour = Tour.objects.create(
+            slug=f'bench-tour-{suffix}', title='Benchmark Tour', description='Benchmark',
+            short_description='Benchmark', category=tour_category, price=50, city='Istanbul',
+            country='Turkey', duration_hours=4, pickup_time=dt_time(8, 0), start_time=dt_time(9, 0),
+            end_time=dt_time(13, 0), max_participants=checkouts, booking_cutoff_hours=0
+        )
+        variant = TourVariant.objects.create(tour=tour, name='Normal', base_price=50, capacity=checkouts)
+        schedules = []
+        for offset in range(1, schedule_count + 1):
+            start = date.today() + timedelta(days=offset)
+            schedules.append(TourSchedule(
+                tour=tour, start_date=start, end_date=start, start_time=dt_time(9, 0),
+                end_time=dt_time(13, 0), max_capacity=checkouts, day_of_week=start.weekday()
+            ))
+        TourSchedule.objects.bulk_create(schedules)
+        TourScheduleVariantCapacity.objects.bulk_create([
+            TourScheduleVariantCapacity(
+                schedule=schedule, variant=variant, total_capacity=checkouts, available_capacity=checkouts
+            )
+            for schedule in schedules
+        ])
+
+        event_category = EventCategory.objects.create(
+            slug=f'bench-events-{suffix}', name='Benchmark', description='Benchmark'
+        )
+        venue = Venue.objects.create(
+            slug=f'bench-venue-{suffix}', name='Benchmark Venue', description='Benchmark',
+            address='-', city='Istanbul', country='Turkey', total_capacity=checkouts
+        )
+        event = Event.objects.create(
+            slug=f'bench-event-{suffix}', title='Benchmark Event', description='Benchmark',
+            short_description='Benchmark', category=event_category, venue=venue, style='music',
+            price=100, city='Istanbul', country='Turkey',
+            door_open_time=dt_time(18, 0), start_time=dt_time(19, 0), end_time=dt_time(22, 0)
+        )
+        ticket_type = TicketType.objects.create(
+            event=event, name='Normal', ticket_type='normal', capacity=checkouts
+        )
+        performance_date = date.today() + timedelta(days=30)
+        performance = EventPerformance.objects.create(
+            event=event, date=performance_date, start_date=performance_date, end_date=performance_date,
+            start_time=dt_time(19, 0), end_time=dt_time(22, 0), max_capacity=checkouts
+        )
+        section = EventSection.objects.create(
+            performance=performance, name='A', total_capacity=checkouts,
+            available_capacity=checkouts, base_price=100
+        )
+        SectionTicketType.objects.create(
+            section=section, ticket_type=ticket_type, allocated_capacity=checkouts, available_capacity=checkouts
+        )
+
+        return {
+            'user': user,
+            'tour': tour,
+            'variant': variant,
+            'schedules': list(TourSchedule.objects.filter(tour=tour).order_by('start_date')),
+            'event': event,
+            'ticket_type': ticket_type,
+            'performance': performance,
+        }
+
+    def _delete_fixture(self, fixture):
+        Order.objects.filter(user=fixture['user']).delete()
+        Cart.objects.filter(user=fixture['user']).delete()
+        fixture['tour'].category.delete()
+        fixture['event'].category.delete()
+        fixture['event'].venue.delete()
+        fixture['user'].delete()
@@ -128,6 +128,9 @@ class Order(BaseModel):
         verbose_name = _('Order')
         verbose_name_plural = _('Orders')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id']),
+        ]
     
     def __str__(self):
         return f"Order {self.order_number}"
@@ -297,8 +300,11 @@ class OrderItem(BaseModel):
         try:
             if self.product_type == 'tour':
                 from tours.models import TourSchedule
+                from tours.capacity import VariantCapacityService
                 schedule = TourSchedule.objects.get(id=self.booking_data.get('schedule_id'))
                 schedule.release_capacity(self.quantity)
+                if self.variant_id:
+                    VariantCapacityService.release(schedule.id, self.variant_id, self.quantity)
             
             elif self.product_type == 'event':
                 from events.models import EventPerformance
@@ -353,133 +359,14 @@ class OrderService:
     
     @staticmethod
     def create_order_from_cart(cart, user, payment_data=None, agent=None):
-        """Create order from cart items with transaction safety."""
-        from decimal import Decimal
-        from django.db import transaction
-        from tours.models import TourSchedule
-        from events.models import EventSchedule
-        # Remove: from transfers.models import TransferSchedule
+        """
+        Create order from cart items with transaction safety.
         
-        with transaction.atomic():
-            # Create order
-            order = Order.objects.create(
-                user=user,
-                agent=agent,
-                currency=cart.currency,
-                customer_name=user.get_full_name() or user.username,
-                customer_email=user.email,
-                customer_phone=user.phone_number or '',
-                subtotal=cart.subtotal,
-                total_amount=cart.total,
-            )
-            
-            # Create order items and update capacities
-            for cart_item in cart.items.all():
-                # Get product details
-                product_details = OrderService._get_product_details(cart_item)
-                
-                # Update capacity with select_for_update to prevent race conditions
-                OrderService._update_capacity(cart_item)
-                
-                order_item = OrderItem.objects.create(
-                    order=order,
-                    product_type=cart_item.product_type,
-                    product_id=cart_item.product_id,
-                    product_title=product_details.get('title', ''),
-                    product_slug=product_details.get('slug', ''),
-                    booking_date=cart_item.booking_date,
-                    booking_time=cart_item.booking_time,
-                    variant_id=cart_item.variant_id,
-                    variant_name=cart_item.variant_name,
-                    quantity=cart_item.quantity,
-                    unit_price=cart_item.unit_price,
-                    selected_options=cart_item.selected_options,
-                    options_total=cart_item.options_total,
-                    booking_data=cart_item.booking_data,
-                )
-            
-            # Set agent commission if applicable
-            if agent and agent.is_agent:
-                order.agent_commission_rate = agent.commission_rate
-                order.save()
-            
-            # Clear cart
-            from cart.models import CartService
-            CartService.clear_cart(cart)
-            
-            return order
-    
-    @staticmethod
-    def _update_capacity(cart_item):
-        """Update capacity with proper locking to prevent overbooking."""
-        try:
-            if cart_item.product_type == 'tour':
-                schedule_id = cart_item.booking_data.get('schedule_id')
-                if schedule_id:
-                    schedule = TourSchedule.objects.select_for_update().get(id=schedule_id)
-                    variant_id = str(cart_item.variant_id)
-                    
-                    capacities = schedule.variant_capacities_raw
-                    if variant_id in capacities:
-                        current_booked = capacities[variant_id].get('booked', 0)
-                        new_booked = current_booked + cart_item.quantity
-                        
-                        # Check if capacity is available
-                        total_capacity = capacities[variant_id].get('total', 0)
-                        if new_booked > total_capacity:
-                            raise ValueError(f"Insufficient capacity for variant {variant_id}")
-                        
-                        capacities[variant_id]['booked'] = new_booked
-                        capacities[variant_id]['available'] = total_capacity - new_booked
-                        schedule.variant_capacities_raw = capacities
-                        schedule.save()
-            
-            elif cart_item.product_type == 'event':
-                schedule_id = cart_item.booking_data.get('schedule_id')
-                if schedule_id:
-                    schedule = EventSchedule.objects.select_for_update().get(id=schedule_id)
-                    if schedule.current_capacity < cart_item.quantity:
-                        raise ValueError("Insufficient capacity for event")
-                    
-                    schedule.current_capacity -= cart_item.quantity
-                    schedule.save()
-            
-            # Remove all usages of TransferSchedule
-        
-        except Exception as e:
-            raise ValueError(f"Capacity update failed: {str(e)}")
-    
-    @staticmethod
-    def _get_product_details(cart_item):
-        """Get product details for order item."""
-        try:
-            if cart_item.product_type == 'tour':
-                from tours.models import Tour
-                tour = Tour.objects.get(id=cart_item.product_id)
-                return {
-                    'title': tour.title,
-                    'slug': tour.slug,
-                }
-            
-            elif cart_item.product_type == 'event':
-                from events.models import Event
-                event = Event.objects.get(id=cart_item.product_id)
-                return {
-                    'title': event.title,
-                    'slug': event.slug,
-                }
-            
-            elif cart_item.product_type == 'transfer':
-                from transfers.models import TransferRoute
-                route = TransferRoute.objects.get(id=cart_item.product_id)
-                return {
-                    'title': route.name or f"{route.origin} → {route.destination}",
-                    'slug': route.slug,
-                }
-            
-        except Exception as e:
-            print(f"Error getting product details: {e}")
-            return {'title': '', 'slug': ''}
+        Products, capacity locks, order items and cart cleanup are all
+        handled in bulk by ``CheckoutPipeline``.
+        """
+        from .checkout import CheckoutPipeline
+        return CheckoutPipeline(cart, user, agent=agent).run()
     
     @staticmethod
     def update_order_status(order, new_status, user=None, reason=None):
@@ -0,0 +1,184 @@
+"""
+Tests for the checkout pipeline and order exports.
+"""
+
+import csv
+import io
+import json
+import uuid
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cart.models import Cart, CartItem
+from events.tests import EventTestDataMixin
+from tours.models import TourAvailabilitySnapshot, TourScheduleVariantCapacity
+from tours.tests import TourTestDataMixin
+from .exports import OrderExport
+from .models import Order, OrderItem, OrderService
+
+User = get_user_model()
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class CheckoutPipelineTests(TourTestDataMixin, EventTestDataMixin, TestCase):
+    """Test bulk order creation from a cart."""
+    
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(
+                username='buyer', email='buyer@example.com', password='pass12345'
+            )
+            self.create_tour_fixture(schedule_count=12)
+            self.create_event_fixture(capacity=10)
+            for schedule in self.schedules:
+                TourScheduleVariantCapacity.objects.create(
+                    schedule=schedule, variant=self.variant, total_capacity=10
+                )
+    
+    def make_cart(self, tour_items, seats=2):
+        cart = Cart.objects.create(
+            session_id=f'checkout-{tour_items}', user=self.user,
+            expires_at=timezone.now() + timedelta(hours=1)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            for schedule in self.schedules[:tour_items]:
+                CartItem.objects.create(
+                    cart=cart, product_type='tour', product_id=self.tour.id, variant_id=self.variant.id,
+                    booking_date=schedule.start_date, booking_time=schedule.start_time,
+                    quantity=2, unit_price=50, booking_data={'schedule_id': str(schedule.id)}
+                )
+            CartItem.objects.create(
+                cart=cart, product_type='event', product_id=self.event.id, variant_id=self.ticket_type.id,
+                booking_date=self.performance.date, booking_time=time(19, 0), quantity=1, unit_price=200,
+                booking_data={
+                    'performance_id': str(self.performance.id),
+                    'section': 'A',
+                    'seats': [{'seat_id': str(index), 'section': 'A'} for index in range(seats)],
+                }
+            )
+        return cart
+    
+    def checkout(self, cart):
+        with self.captureOnCommitCallbacks(execute=True):
+            return OrderService.create_order_from_cart(cart, self.user)
+    
+    def test_checkout_creates_items_and_books_capacity(self):
+        cart = self.make_cart(tour_items=3)
+        order = self.checkout(cart)
+        
+        self.assertEqual(order.items.count(), 4)
+        self.assertEqual(order.subtotal, 3 * 100 + 200)
+        tour_item = order.items.filter(product_type='tour').first()
+        self.assertEqual(tour_item.product_title, 'Old City')
+        self.assertEqual(tour_item.total_price, 100)
+        self.assertFalse(cart.items.exists())
+        
+        schedule = self.schedules[0]
+        self.assertEqual(schedule.variant_capacities[str(self.variant.id)]['booked'], 2)
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.current_capacity, 1)
+        self.section_ticket.refresh_from_db()
+        self.assertEqual(
+            (self.section_ticket.available_capacity, self.section_ticket.sold_capacity), (8, 2)
+        )
+        snapshot = TourAvailabilitySnapshot.objects.get(schedule=schedule, variant=self.variant)
+        self.assertEqual(snapshot.held_capacity, 0)
+    
+    def test_shortage_rolls_back_the_whole_checkout(self):
+        cart = self.make_cart(tour_items=2, seats=11)
+        
+        with self.assertRaisesMessage(ValueError, 'Insufficient seats in section A'):
+            self.checkout(cart)
+        
+        self.assertEqual(cart.items.count(), 3)
+        self.assertFalse(self.user.orders.exists())
+        self.assertEqual(self.schedules[0].variant_capacities[str(self.variant.id)]['booked'], 0)
+    
+    def test_variant_shortage_rolls_back_the_whole_checkout(self):
+        TourScheduleVariantCapacity.objects.filter(schedule=self.schedules[1]).update(
+            booked_capacity=9, available_capacity=1
+        )
+        cart = self.make_cart(tour_items=2, seats=1)
+        
+        with self.assertRaisesMessage(ValueError, f'Insufficient capacity for variant {self.variant.id}'):
+            self.checkout(cart)
+        
+        self.assertEqual(self.schedules[0].variant_capacities[str(self.variant.id)]['booked'], 0)
+        self.section_ticket.refresh_from_db()
+        self.assertEqual(self.section_ticket.sold_capacity, 0)
+    
+    def test_query_count_does_not_grow_with_cart_size(self):
+        counts = []
+        for size in (2, 10):
+            cart = self.make_cart(tour_items=size, seats=1)
+            with CaptureQueriesContext(connection) as queries:
+                self.checkout(cart)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class OrderExportTests(TestCase):
+    """Orders stream as NDJSON or CSV with a fixed number of queries."""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def create_orders(self, user, count, items=2):
+        for _ in range(count):
+            order = Order.objects.create(
+                user=user, customer_name='Buyer', customer_email='buyer@example.com',
+                customer_phone='123', subtotal=100
+            )
+            for _ in range(items):
+                OrderItem.objects.create(
+                    order=order, product_type='tour', product_id=uuid.uuid4(), product_title='Old City',
+                    product_slug='old-city', booking_date=date.today(), booking_time=time(9, 0),
+                    unit_price=50, total_price=50
+                )
+    
+    def export(self, fmt, url_name='orders:order_export', **params):
+        response = self.client.get(reverse(url_name, kwargs={'fmt': fmt}), params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+    
+    def test_ndjson_nests_items_and_is_scoped_to_the_user(self):
+        self.create_orders(self.user, 3)
+        self.create_orders(self.other, 1)
+        
+        lines = [json.loads(line) for line in self.export('ndjson').splitlines()]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual({line['user_id'] for line in lines}, {str(self.user.id)})
+        self.assertEqual([len(line['items']) for line in lines], [2, 2, 2])
+        self.assertEqual(lines[0]['items'][0]['order_number'], lines[0]['order_number'])
+        
+        rows = list(csv.reader(io.StringIO(self.export('csv', 'orders:order_item_export'))))
+        self.assertEqual(rows[0][:2], ['id', 'order_number'])
+        self.assertEqual(len(rows), 7)
+        
+        self.assertEqual(self.client.get(reverse('orders:order_export', kwargs={'fmt': 'xml'})).status_code, 404)
+        response = self.client.get(reverse('orders:order_export', kwargs={'fmt': 'csv'}), {'created_from': 'soon'})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_queries_are_per_chunk_not_per_order(self):
+        orders = Order.objects.filter(user=self.user).order_by('created_at')
+        counts = []
+        for batch in (4, 8):
+            self.create_orders(self.user, batch)
+            with CaptureQueriesContext(connection) as queries:
+                lines = list(OrderExport.ndjson_rows(orders))
+            self.assertEqual(len(lines), orders.count())
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
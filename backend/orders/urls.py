@@ -10,5 +10,7 @@ app_name = 'orders'
 urlpatterns = [
     path('', views.OrderListView.as_view(), name='order_list'),
     path('create/', views.CreateOrderView.as_view(), name='order_create'),
+    path('export/<str:fmt>/', views.OrderExportView.as_view(), name='order_export'),
+    path('items/export/<str:fmt>/', views.OrderItemExportView.as_view(), name='order_item_export'),
     path('<str:order_number>/', views.OrderDetailView.as_view(), name='order_detail'),
 ] 
\ No newline at end of file
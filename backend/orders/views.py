@@ -6,16 +6,29 @@ from rest_framework import status, generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
+
+from shared.exports import ExportView
+from shared.pagination import KeysetPagination
+
+from .exports import OrderExport, OrderItemExport
 from .models import Order, OrderItem, OrderService
 from .serializers import OrderSerializer, CreateOrderSerializer
 
 class OrderListView(generics.ListAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
     def get_queryset(self):
         user = self.request.user
         return Order.objects.filter(user=user).order_by('-created_at')
 
+class OrderExportView(ExportView):
+    """Stream the requesting user's orders, with their items in NDJSON."""
+    export_class = OrderExport
+
+class OrderItemExportView(ExportView):
+    export_class = OrderItemExport
+
 class OrderDetailView(generics.RetrieveAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
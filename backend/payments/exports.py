@@ -0,0 +1,30 @@
+"""
+Streaming exports of payments.
+"""
+
+from shared.exports import Export
+
+from .models import Payment
+
+
+class PaymentExport(Export):
+    name = 'payments'
+    columns = (
+        ('payment_id', 'payment_id'),
+        ('order_number', 'order.order_number'),
+        ('payment_method', 'payment_method'),
+        ('amount', 'amount'),
+        ('currency', 'currency'),
+        ('status', 'status'),
+        ('gateway', 'gateway'),
+        ('gateway_transaction_id', 'gateway_transaction_id'),
+        ('customer_name', 'customer_name'),
+        ('customer_email', 'customer_email'),
+        ('created_at', 'created_at'),
+    )
+    select_related = ('order',)
+
+    @classmethod
+    def get_queryset(cls, user, params):
+        from orders.exports import visible_orders
+        return Payment.objects.filter(order__in=visible_orders(user, params))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_keyset_index'),
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['created_at', 'id'], name='payments_pa_created_af5130_idx'),
+        ),
+    ]
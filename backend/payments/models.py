@@ -93,6 +93,9 @@ class Payment(BaseModel):
         verbose_name = _('Payment')
         verbose_name_plural = _('Payments')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
     
     def __str__(self):
         return f"Payment {self.payment_id} - {self.order.order_number}"
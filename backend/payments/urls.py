@@ -10,5 +10,6 @@ app_name = 'payments'
 urlpatterns = [
     path('', views.PaymentListView.as_view(), name='payment_list'),
     path('create/', views.CreatePaymentView.as_view(), name='payment_create'),
+    path('export/<str:fmt>/', views.PaymentExportView.as_view(), name='payment_export'),
     path('<str:payment_id>/', views.PaymentDetailView.as_view(), name='payment_detail'),
 ] 
\ No newline at end of file
@@ -6,15 +6,24 @@ from rest_framework import status, generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
+
+from shared.exports import ExportView
+from shared.pagination import KeysetPagination
+
+from .exports import PaymentExport
 from .models import Payment, PaymentTransaction
 from .serializers import PaymentSerializer, CreatePaymentSerializer
 
 class PaymentListView(generics.ListAPIView):
     serializer_class = PaymentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
     def get_queryset(self):
         user = self.request.user
-        return Payment.objects.filter(user=user).order_by('-created_at')
+        return Payment.objects.filter(order__user=user).order_by('-created_at')
+
+class PaymentExportView(ExportView):
+    export_class = PaymentExport
 
 class PaymentDetailView(generics.RetrieveAPIView):
     serializer_class = PaymentSerializer
@@ -22,7 +31,7 @@ class PaymentDetailView(generics.RetrieveAPIView):
     lookup_field = 'payment_id'
     def get_queryset(self):
         user = self.request.user
-        return Payment.objects.filter(user=user)
+        return Payment.objects.filter(order__user=user)
 
 class CreatePaymentView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -1 +1,5 @@
-# Peykan Tourism Ecommerce Platform 
\ No newline at end of file
+# Peykan Tourism Ecommerce Platform
+
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
@@ -0,0 +1,13 @@
+"""
+Celery application for Peykan Tourism Platform.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'peykan.settings')
+
+app = Celery('peykan')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
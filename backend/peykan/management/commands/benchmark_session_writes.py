@@ -0,0 +1,123 @@
+"""
+Benchmark database writes per anonymous request.
+
+Replays a number of guest visitors hitting the cart count endpoint (which
+goes through ``CartService.get_session_id``) and counts INSERT/UPDATE/DELETE
+statements per request, once with the legacy configuration (database
+sessions saved on every request, ``DatabaseCache``) and once with the
+configured cache/session tier.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+LEGACY_SETTINGS = {
+    'CACHES': {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'cache_table',
+        }
+    },
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'SESSION_SAVE_EVERY_REQUEST': True,
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare DB writes per anonymous request before and after the cache/session tier.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--visitors', type=int, default=20, help='Number of guest visitors')
+        parser.add_argument('--requests', type=int, default=10, help='Requests per visitor')
+        parser.add_argument(
+            '--mode',
+            choices=['both', 'legacy', 'tiered'],
+            default='both',
+            help='legacy: db sessions saved every request; tiered: configured CACHES/SESSION_ENGINE',
+        )
+
+    def handle(self, *args, **options):
+        if options['visitors'] < 1 or options['requests'] < 1:
+            raise CommandError('visitors and requests must be positive.')
+
+        modes = ['legacy', 'tiered'] if options['mode'] == 'both' else [options['mode']]
+        self.stdout.write(self.style.NOTICE(
+            f"Cache backend: {settings.CACHES['default']['BACKEND']} | "
+            f"session engine: {settings.SESSION_ENGINE}"
+        ))
+
+        results = {}
+        for mode in modes:
+            overrides = LEGACY_SETTINGS if mode == 'legacy' else {}
+            with override_settings(ALLOWED_HOSTS=['*'], **overrides):
+                results[mode] = self._run(options['visitors'], options['requests'])
+            self._report(mode, results[mode])
+
+        if len(results) == 2 and results['legacy']['writes']:
+            saved = 1 - results['tiered']['writes'] / results['legacy']['writes']
+            self.stdout.write(self.style.SUCCESS(f'DB writes reduced by {saved:.0%}'))
+
+    def _run(self, visitors, requests_per_visitor):
+        from cart.models import Cart
+
+        url = reverse('cart:cart_count')
+        first_writes = 0
+        repeat_writes = 0
+        session_keys = []
+
+        started = time.perf_counter()
+        for _ in range(visitors):
+            client = Client()
+            for index in range(requests_per_visitor):
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(f'{url} returned {response.status_code}')
+                writes = sum(
+                    1 for query in queries.captured_queries
+                    if query['sql'].lstrip().upper().startswith(WRITE_PREFIXES)
+                )
+                if index == 0:
+                    first_writes += writes
+                else:
+                    repeat_writes += writes
+            session_keys.append(client.cookies[settings.SESSION_COOKIE_NAME].value)
+        elapsed = time.perf_counter() - started
+
+        self._cleanup(Cart, session_keys)
+        total_requests = visitors * requests_per_visitor
+        return {
+            'requests': total_requests,
+            'writes': first_writes + repeat_writes,
+            'first_writes': first_writes,
+            'repeat_writes': repeat_writes,
+            'visitors': visitors,
+            'repeat_requests': total_requests - visitors,
+            'elapsed': elapsed,
+        }
+
+    def _cleanup(self, cart_model, session_keys):
+        from importlib import import_module
+
+        cart_model.objects.filter(session_id__in=session_keys).delete()
+        store_class = import_module(settings.SESSION_ENGINE).SessionStore
+        for session_key in session_keys:
+            store_class(session_key).delete()
+
+    def _report(self, mode, result):
+        per_request = result['writes'] / result['requests']
+        first = result['first_writes'] / result['visitors']
+        repeat = result['repeat_writes'] / result['repeat_requests'] if result['repeat_requests'] else 0
+        self.stdout.write(
+            f"{mode:>7}: {result['requests']} requests in {result['elapsed']:.2f}s | "
+            f"writes/request {per_request:.2f} (first {first:.2f}, repeat {repeat:.2f})"
+        )
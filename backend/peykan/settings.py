@@ -61,6 +61,7 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'shared.instrumentation.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     # 'django.middleware.security.SecurityMiddleware',  # Temporarily disabled
     # 'whitenoise.middleware.WhiteNoiseMiddleware',  # Temporarily disabled
@@ -210,6 +211,31 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FormParser',
     ),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'shared.throttling.EndpointRateThrottle',
+    ),
+    # Reverse proxies in front of the app, so throttles see the client IP.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int) or None,
+}
+
+# Rate limits (shared.throttling) per view ``throttle_scope``: comma-separated
+# ``kind=count/period`` pairs keyed by client ``ip``, request ``target``
+# (email, phone or username) or signed-in ``user``. Period units are s, m, h
+# and d, with an optional multiplier ("3/10m").
+RATE_LIMITS_ENABLED = config('RATE_LIMITS_ENABLED', default=True, cast=bool)
+RATE_LIMITS = {
+    scope: dict(
+        pair.strip().split('=', 1)
+        for pair in config(f'RATE_LIMIT_{scope.upper()}', default=default).split(',') if pair.strip()
+    )
+    for scope, default in {
+        'login': 'ip=20/m,target=5/m',
+        'register': 'ip=10/h',
+        'otp_send': 'ip=10/h,target=3/10m',
+        'otp_verify': 'ip=30/m,target=10/10m',
+        'password_reset': 'ip=10/h,target=3/10m',
+        'cart_add': 'ip=60/m,user=60/m',
+    }.items()
 }
 
 # JWT Settings
@@ -242,20 +268,64 @@ SIMPLE_JWT = {
 }
 
 # Redis Cache Settings
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
-        'LOCATION': 'cache_table',
+REDIS_URL = config('REDIS_URL', default='')
+CACHE_L1_MAX_ENTRIES = config('CACHE_L1_MAX_ENTRIES', default=5000, cast=int)
+CACHE_L1_TIMEOUT = config('CACHE_L1_TIMEOUT', default=30, cast=int)
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            }
+        }
     }
-}
+    CACHES['shared'] = dict(CACHES['default'])
+else:
+    # Two-level tier: in-process LRU (L1) in front of the shared database cache (L2).
+    # The database cache is only meant for development: its add/incr are not
+    # atomic, so seat holds, OTP attempt counters and rate limits need Redis
+    # ('shared' must be Redis in production, see shared.checks).
+    CACHES = {
+        'default': {
+            'BACKEND': 'shared.cache.TieredCache',
+            'OPTIONS': {
+                'L2_ALIAS': 'shared',
+                'L1_MAX_ENTRIES': CACHE_L1_MAX_ENTRIES,
+                'L1_TIMEOUT': CACHE_L1_TIMEOUT,
+            }
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'cache_table',
+            'OPTIONS': {
+                # The defaults (300 entries, a third culled) would evict
+                # holds, OTP codes and counters at random.
+                'MAX_ENTRIES': config('SHARED_CACHE_MAX_ENTRIES', default=1000000, cast=int),
+                'CULL_FREQUENCY': 10,
+            },
+        }
+    }
+
+# Fail the system checks unless 'shared' is Redis (see shared.checks).
+REQUIRE_ATOMIC_SHARED_CACHE = config('REQUIRE_ATOMIC_SHARED_CACHE', default=False, cast=bool)
 
 # Session Settings
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# With Redis, sessions live in the shared cache tier (never the per-process
+# L1); without it they stay in the database. Either way they are only
+# written when modified.
+if REDIS_URL:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
+    SESSION_CACHE_ALIAS = 'shared'
+else:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 SESSION_COOKIE_AGE = 86400  # 24 hours
 SESSION_COOKIE_SECURE = False  # Set to True in production with HTTPS
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = 'Lax'
-SESSION_SAVE_EVERY_REQUEST = True
+SESSION_SAVE_EVERY_REQUEST = False
 
 # Email Settings
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
@@ -269,10 +339,99 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@peykan.com')
 # Currency Settings
 DEFAULT_CURRENCY = config('DEFAULT_CURRENCY', default='USD')
 SUPPORTED_CURRENCIES = config('SUPPORTED_CURRENCIES', default='USD,EUR,TRY,IRR').split(',')
+EXCHANGE_RATE_PROVIDER = config('EXCHANGE_RATE_PROVIDER', default='shared.exchange_rates.HTTPExchangeRateProvider')
+EXCHANGE_RATE_API_URL = config('EXCHANGE_RATE_API_URL', default='https://api.exchangerate-api.com/v4/latest/{base}')
+EXCHANGE_RATE_REFRESH_INTERVAL = config('EXCHANGE_RATE_REFRESH_INTERVAL', default=3600, cast=int)  # seconds
+EXCHANGE_RATE_RELOAD_INTERVAL = config('EXCHANGE_RATE_RELOAD_INTERVAL', default=60, cast=int)  # seconds
+
+# Event detail fragment cache (safety-net TTLs; fragments are invalidated by signals)
+EVENT_DETAIL_CACHE_STATIC_TIMEOUT = config('EVENT_DETAIL_CACHE_STATIC_TIMEOUT', default=3600, cast=int)  # seconds
+EVENT_DETAIL_CACHE_VOLATILE_TIMEOUT = config('EVENT_DETAIL_CACHE_VOLATILE_TIMEOUT', default=300, cast=int)  # seconds
+
+# Full-text search (best-ranked matches kept per query, after the other filters)
+SEARCH_MAX_RESULTS = config('SEARCH_MAX_RESULTS', default=1000, cast=int)
+
+# Request Metrics Settings
+REQUEST_METRICS_ENABLED = config('REQUEST_METRICS_ENABLED', default=True, cast=bool)
+REQUEST_METRICS_HEADERS = config('REQUEST_METRICS_HEADERS', default=DEBUG, cast=bool)
+REQUEST_METRICS_FLUSH_INTERVAL = config('REQUEST_METRICS_FLUSH_INTERVAL', default=30, cast=int)  # seconds
+REQUEST_METRICS_CACHE_ALIAS = 'shared'
+
+# Cart reaper (cart.reaper): expired reservations and carts are cleaned up in
+# batches of CART_REAPER_BATCH_SIZE rows, at most CART_REAPER_MAX_BATCHES per run.
+CART_REAPER_INTERVAL = config('CART_REAPER_INTERVAL', default=60, cast=int)  # seconds
+CART_REAPER_BATCH_SIZE = config('CART_REAPER_BATCH_SIZE', default=500, cast=int)
+CART_REAPER_MAX_BATCHES = config('CART_REAPER_MAX_BATCHES', default=20, cast=int)
+
+# Seat holds (events.seat_holds) live in the shared cache for this many seconds.
+SEAT_HOLD_TTL = config('SEAT_HOLD_TTL', default=600, cast=int)
+
+# OTP codes (users.infrastructure.otp_store): wrong guesses allowed per code,
+# and how long audit rows of expired codes are kept.
+OTP_MAX_ATTEMPTS = config('OTP_MAX_ATTEMPTS', default=5, cast=int)
+OTP_RETENTION_DAYS = config('OTP_RETENTION_DAYS', default=7, cast=int)
+OTP_PURGE_BATCH_SIZE = config('OTP_PURGE_BATCH_SIZE', default=1000, cast=int)
+
+# User activity rows (users.infrastructure.activity_log) are buffered per
+# process and bulk written once this many are queued or the oldest waited
+# this long (sessions are written at once); activity older than the current month and the
+# ACTIVITY_ARCHIVE_AFTER_MONTHS before it moves to the monthly archive.
+ACTIVITY_LOG_BATCH_SIZE = config('ACTIVITY_LOG_BATCH_SIZE', default=200, cast=int)
+ACTIVITY_LOG_FLUSH_INTERVAL = config('ACTIVITY_LOG_FLUSH_INTERVAL', default=5, cast=int)  # seconds
+ACTIVITY_LOG_MAX_BUFFER = config('ACTIVITY_LOG_MAX_BUFFER', default=10000, cast=int)
+ACTIVITY_ARCHIVE_AFTER_MONTHS = config('ACTIVITY_ARCHIVE_AFTER_MONTHS', default=3, cast=int)
+ACTIVITY_ARCHIVE_BATCH_SIZE = config('ACTIVITY_ARCHIVE_BATCH_SIZE', default=1000, cast=int)
+
+# Maximum number of quotes in one transfer batch quote request.
+TRANSFER_QUOTE_BATCH_LIMIT = config('TRANSFER_QUOTE_BATCH_LIMIT', default=100, cast=int)
+
+# Celery Settings
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default=REDIS_URL or 'memory://')
+CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default=REDIS_URL or None)
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'refresh-exchange-rates': {
+        'task': 'shared.tasks.refresh_exchange_rates',
+        'schedule': EXCHANGE_RATE_REFRESH_INTERVAL,
+    },
+    'deliver-notifications': {
+        'task': 'shared.tasks.deliver_notifications',
+        'schedule': 30,
+    },
+    'reap-expired-carts': {
+        'task': 'cart.tasks.reap_expired_carts',
+        'schedule': CART_REAPER_INTERVAL,
+    },
+    'purge-notifications': {
+        'task': 'shared.tasks.purge_notifications',
+        'schedule': 24 * 3600,
+    },
+    'purge-expired-otps': {
+        'task': 'users.tasks.purge_expired_otps',
+        'schedule': 3600,
+    },
+    'archive-user-activity': {
+        'task': 'users.tasks.archive_user_activity',
+        'schedule': 24 * 3600,
+    },
+}
 
 # Kavenegar SMS Settings
 KAVENEGAR_API_KEY = config('KAVENEGAR_API_KEY', default='')
 
+# Notification outbox (shared.notifications)
+SMS_BACKEND = config(
+    'SMS_BACKEND',
+    default='shared.notifications.KavenegarSMSBackend' if KAVENEGAR_API_KEY else 'shared.notifications.ConsoleSMSBackend'
+)
+NOTIFICATION_BATCH_SIZE = config('NOTIFICATION_BATCH_SIZE', default=100, cast=int)
+NOTIFICATION_MAX_ATTEMPTS = config('NOTIFICATION_MAX_ATTEMPTS', default=6, cast=int)
+NOTIFICATION_RETRY_DELAY = config('NOTIFICATION_RETRY_DELAY', default=30, cast=int)  # seconds, doubled per attempt
+NOTIFICATION_RETRY_MAX_DELAY = config('NOTIFICATION_RETRY_MAX_DELAY', default=3600, cast=int)  # seconds
+NOTIFICATION_RETENTION_DAYS = config('NOTIFICATION_RETENTION_DAYS', default=30, cast=int)
+# Trigger the Celery task right after a message is queued; off without a real broker.
+NOTIFICATION_WAKE_WORKER = config('NOTIFICATION_WAKE_WORKER', default=CELERY_BROKER_URL != 'memory://', cast=bool)
+
 # Payment Gateway Settings
 PAYMENT_GATEWAY = config('PAYMENT_GATEWAY', default='mock')
 PAYMENT_SECRET_KEY = config('PAYMENT_SECRET_KEY', default='')
@@ -54,10 +54,14 @@ CACHES = {
         }
     }
 }
+CACHES['shared'] = dict(CACHES['default'])
+# Seat holds, OTP codes and rate limits need the atomic shared cache.
+REQUIRE_ATOMIC_SHARED_CACHE = True
 
 # Session Settings for Production
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
-SESSION_CACHE_ALIAS = 'default'
+SESSION_CACHE_ALIAS = 'shared'
+SESSION_SAVE_EVERY_REQUEST = False
 SESSION_COOKIE_AGE = 86400  # 24 hours
 SESSION_COOKIE_SECURE = True
 SESSION_COOKIE_HTTPONLY = True
@@ -127,6 +131,7 @@ LOGGING = {
 
 # Security middleware
 MIDDLEWARE = [
+    'shared.instrumentation.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -139,6 +144,9 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Request metrics are aggregated, but never exposed as response headers
+REQUEST_METRICS_HEADERS = config('REQUEST_METRICS_HEADERS', default=False, cast=bool)
+
 # WhiteNoise configuration for static files
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
@@ -188,34 +196,18 @@ DATA_UPLOAD_MAX_NUMBER_FIELDS = 1000
 
 # API Rate Limiting
 REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
-    'DEFAULT_PERMISSION_CLASSES': (
-        'rest_framework.permissions.IsAuthenticatedOrReadOnly',
-    ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 20,
-    'DEFAULT_FILTER_BACKENDS': (
-        'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
-        'rest_framework.filters.OrderingFilter',
-    ),
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
-    'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
-    ),
-    'DEFAULT_PARSER_CLASSES': (
-        'rest_framework.parsers.JSONParser',
-        'rest_framework.parsers.MultiPartParser',
-        'rest_framework.parsers.FormParser',
-    ),
-    'DEFAULT_THROTTLE_CLASSES': [
+    # Endpoint limits (RATE_LIMITS) plus coarse global limits per client.
+    'DEFAULT_THROTTLE_CLASSES': (
+        *REST_FRAMEWORK['DEFAULT_THROTTLE_CLASSES'],
         'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
-    ],
+        'rest_framework.throttling.UserRateThrottle',
+    ),
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/hour',
         'user': '1000/hour'
     }
-} 
\ No newline at end of file
+}
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class SharedConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'shared'
-    verbose_name = 'Shared' 
\ No newline at end of file
+    verbose_name = 'Shared'
+
+    def ready(self):
+        from . import checks  # noqa: F401
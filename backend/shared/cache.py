@@ -0,0 +1,237 @@
+"""
+Two-level cache backend for Peykan Tourism Platform.
+
+``TieredCache`` keeps a small in-process LRU (L1) in front of a shared cache
+alias (L2, e.g. ``DatabaseCache`` or Redis). Reads are served from L1 when
+possible and fall through to L2 on a miss; writes go to L2 first and then
+populate L1. L1 entries live at most ``L1_TIMEOUT`` seconds, so a value
+changed by another process is seen after that window at the latest.
+
+Data that must be coherent across processes on every read (sessions,
+reservations) should use the L2 alias directly instead of the tiered one.
+``touch_if_equal`` extends such an entry only while it still holds a given
+value, atomically on Redis.
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+_MISSING = object()
+
+# Extend KEYS[1] by ARGV[2] seconds only while it holds ARGV[1].
+TOUCH_IF_EQUAL_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def touch_if_equal(cache, key, expected, timeout) -> bool:
+    """
+    Set the expiry of ``key`` to ``timeout`` seconds if it holds ``expected``.
+
+    On Redis (django-redis or Django's backend) the compare and the expire
+    run as one script, so an entry that expired and was taken by someone
+    else in between is never extended. Other backends fall back to a get and
+    a touch, which is not atomic (see ``shared.checks``).
+    """
+    client = getattr(cache, 'client', None)
+    if hasattr(client, 'encode'):
+        # django-redis
+        redis_key = client.make_key(key)
+        value = client.encode(expected)
+        redis = client.get_client(write=True)
+    elif hasattr(getattr(cache, '_cache', None), '_serializer'):
+        # django.core.cache.backends.redis.RedisCache
+        redis_key = cache.make_and_validate_key(key)
+        value = cache._cache._serializer.dumps(expected)
+        redis = cache._cache.get_client(redis_key, write=True)
+    else:
+        return cache.get(key) == expected and cache.touch(key, timeout)
+    return bool(redis.eval(TOUCH_IF_EQUAL_SCRIPT, 1, redis_key, value, int(timeout)))
+
+
+class LocalLRU:
+    """
+    Thread-safe, size-bounded in-process store with per-entry expiry.
+
+    Values are pickled on write so callers never share mutable objects
+    through the cache, mirroring ``LocMemCache`` semantics.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, payload = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+        return pickle.loads(payload)
+
+    def set(self, key, value, ttl):
+        if ttl <= 0:
+            self.delete(key)
+            return
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, payload)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TieredCache(BaseCache):
+    """
+    Cache backend combining an in-process LRU with a shared L2 cache alias.
+
+    Configured through ``OPTIONS``:
+
+    - ``L2_ALIAS``: name of the shared cache in ``CACHES`` (default ``'shared'``).
+    - ``L1_MAX_ENTRIES``: maximum number of L1 entries (default 5000).
+    - ``L1_TIMEOUT``: upper bound in seconds for an L1 entry (default 30).
+    """
+
+    def __init__(self, location, params):
+        options = dict(params.get('OPTIONS', {}))
+        self._l2_alias = options.pop('L2_ALIAS', location or 'shared')
+        l1_max_entries = int(options.pop('L1_MAX_ENTRIES', 5000))
+        self._l1_timeout = int(options.pop('L1_TIMEOUT', 30))
+        super().__init__({**params, 'OPTIONS': options})
+        self._l1 = LocalLRU(l1_max_entries)
+        self.stats = {'l1_hits': 0, 'l2_hits': 0, 'misses': 0}
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def _l1_ttl(self, timeout):
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            return self._l1_timeout
+        return min(self._l1_timeout, timeout - time.time())
+
+    def get(self, key, default=None, version=None):
+        cache_key = self.make_and_validate_key(key, version=version)
+        value = self._l1.get(cache_key)
+        if value is not _MISSING:
+            self.stats['l1_hits'] += 1
+            return value
+
+        value = self.l2.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self.stats['misses'] += 1
+            return default
+        self.stats['l2_hits'] += 1
+        self._l1.set(cache_key, value, self._l1_timeout)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        cache_key = self.make_and_validate_key(key, version=version)
+        self.l2.set(key, value, timeout=self._l2_timeout(timeout), version=version)
+        self._l1.set(cache_key, value, self._l1_ttl(timeout))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        cache_key = self.make_and_validate_key(key, version=version)
+        added = self.l2.add(key, value, timeout=self._l2_timeout(timeout), version=version)
+        if added:
+            self._l1.set(cache_key, value, self._l1_ttl(timeout))
+        else:
+            self._l1.delete(cache_key)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._l1.delete(self.make_and_validate_key(key, version=version))
+        return self.l2.touch(key, timeout=self._l2_timeout(timeout), version=version)
+
+    def delete(self, key, version=None):
+        self._l1.delete(self.make_and_validate_key(key, version=version))
+        return self.l2.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        if self._l1.get(self.make_and_validate_key(key, version=version)) is not _MISSING:
+            return True
+        return self.l2.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        # Counters are always resolved in L2 so every process sees the same value.
+        self._l1.delete(self.make_and_validate_key(key, version=version))
+        return self.l2.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        self._l1.delete(self.make_and_validate_key(key, version=version))
+        return self.l2.decr(key, delta, version=version)
+
+    def get_many(self, keys, version=None):
+        found = {}
+        pending = []
+        for key in keys:
+            value = self._l1.get(self.make_and_validate_key(key, version=version))
+            if value is _MISSING:
+                pending.append(key)
+            else:
+                found[key] = value
+        self.stats['l1_hits'] += len(found)
+
+        if pending:
+            fetched = self.l2.get_many(pending, version=version)
+            for key, value in fetched.items():
+                self._l1.set(self.make_and_validate_key(key, version=version), value, self._l1_timeout)
+            self.stats['l2_hits'] += len(fetched)
+            self.stats['misses'] += len(pending) - len(fetched)
+            found.update(fetched)
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.l2.set_many(data, timeout=self._l2_timeout(timeout), version=version)
+        ttl = self._l1_ttl(timeout)
+        for key, value in data.items():
+            if key not in failed:
+                self._l1.set(self.make_and_validate_key(key, version=version), value, ttl)
+        return failed
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            self._l1.delete(self.make_and_validate_key(key, version=version))
+        self.l2.delete_many(keys, version=version)
+
+    def clear(self):
+        self._l1.clear()
+        self.l2.clear()
+
+    def clear_local(self):
+        """Drop only this process's L1 entries."""
+        self._l1.clear()
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
+
+    def _l2_timeout(self, timeout):
+        # Resolve our own default so L2 honours the tiered alias' TIMEOUT.
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
@@ -0,0 +1,34 @@
+"""
+System checks for the shared cache tier.
+
+Seat holds, live OTP codes, rate limit counters and (with Redis) sessions
+rely on the ``'shared'`` cache being visible to every process, keeping its
+entries until they expire and applying ``add``/``incr`` atomically. Only
+Redis gives all three; the database cache is fine for development but not
+for production, where ``REQUIRE_ATOMIC_SHARED_CACHE`` turns this into an
+error that stops the server from starting.
+"""
+
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+
+ATOMIC_CACHE_BACKENDS = {
+    'django_redis.cache.RedisCache',
+    'django.core.cache.backends.redis.RedisCache',
+}
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get('shared', {}).get('BACKEND')
+    if backend in ATOMIC_CACHE_BACKENDS:
+        return []
+    message = (
+        f"The 'shared' cache uses {backend}, which is not atomic or may evict live entries; "
+        "seat holds, OTP codes and rate limits need Redis."
+    )
+    hint = 'Set REDIS_URL.'
+    if getattr(settings, 'REQUIRE_ATOMIC_SHARED_CACHE', False):
+        return [Error(message, hint=hint, id='shared.E001')]
+    return [Warning(message, hint=hint, id='shared.W001')]
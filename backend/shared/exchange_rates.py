@@ -0,0 +1,216 @@
+"""
+Exchange rate snapshots for Peykan Tourism Platform.
+
+Rates are fetched from a pluggable provider by a periodic task and stored as
+versioned ``ExchangeRateSnapshot`` rows. Request handlers only read a
+process-local table of preparsed ``Decimal`` rates; the table is reloaded
+from the database when the published version changes and never touches the
+network.
+"""
+
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, Optional
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.utils.module_loading import import_string
+
+
+BASE_CURRENCY = 'USD'
+VERSION_CACHE_KEY = 'exchange_rates:version'
+
+
+class ExchangeRateProvider:
+    """
+    Base class for exchange rate sources.
+    """
+
+    name = 'base'
+
+    def fetch(self, base_currency: str) -> Dict[str, Decimal]:
+        raise NotImplementedError
+
+
+class HTTPExchangeRateProvider(ExchangeRateProvider):
+    """
+    Fetch rates from the public exchangerate-api.com endpoint.
+    """
+
+    name = 'exchangerate-api'
+    timeout = 10
+
+    def fetch(self, base_currency: str) -> Dict[str, Decimal]:
+        url = settings.EXCHANGE_RATE_API_URL.format(base=base_currency)
+        response = requests.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return {
+            currency: Decimal(str(rate))
+            for currency, rate in response.json().get('rates', {}).items()
+        }
+
+
+class MockExchangeRateProvider(ExchangeRateProvider):
+    """
+    Static rates for development and tests.
+    """
+
+    name = 'mock'
+    RATES = {
+        'USD': '1.0',
+        'EUR': '0.85',
+        'TRY': '15.5',
+        'IRR': '420000',
+    }
+
+    def fetch(self, base_currency: str) -> Dict[str, Decimal]:
+        return {currency: Decimal(rate) for currency, rate in self.RATES.items()}
+
+
+def get_provider() -> ExchangeRateProvider:
+    """Instantiate the provider configured in ``EXCHANGE_RATE_PROVIDER``."""
+    return import_string(settings.EXCHANGE_RATE_PROVIDER)()
+
+
+class RateTable:
+    """
+    Immutable, preparsed rate table for one snapshot version.
+    """
+
+    def __init__(self, version: int, base_currency: str, rates: Dict[str, Decimal]):
+        self.version = version
+        self.base_currency = base_currency
+        self.rates = rates
+        self._factors = {}
+
+    def factor(self, from_currency: str, to_currency: str) -> Decimal:
+        """Return the multiplier converting ``from_currency`` into ``to_currency``."""
+        key = (from_currency, to_currency)
+        factor = self._factors.get(key)
+        if factor is None:
+            one = Decimal('1')
+            from_rate = one if from_currency == self.base_currency else self.rates.get(from_currency, one)
+            to_rate = one if to_currency == self.base_currency else self.rates.get(to_currency, one)
+            factor = to_rate / from_rate
+            self._factors[key] = factor
+        return factor
+
+
+class ExchangeRateStore:
+    """
+    Publishes and reads exchange rate snapshots.
+    """
+
+    _table: Optional[RateTable] = None
+    _checked_at = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def _fallback_table(cls) -> RateTable:
+        # Used until the first snapshot is published.
+        return RateTable(0, BASE_CURRENCY, MockExchangeRateProvider().fetch(BASE_CURRENCY))
+
+    @classmethod
+    def _published_version(cls) -> int:
+        version = cache.get(VERSION_CACHE_KEY)
+        if version is None:
+            from .models import ExchangeRateSnapshot
+            version = ExchangeRateSnapshot.objects.aggregate(latest=Max('version'))['latest'] or 0
+            cache.set(VERSION_CACHE_KEY, version, None)
+        return version
+
+    @classmethod
+    def _load(cls, version: int) -> RateTable:
+        from .models import ExchangeRateSnapshot
+        snapshot = ExchangeRateSnapshot.objects.filter(version=version).first()
+        if snapshot is None:
+            return cls._fallback_table()
+        return RateTable(
+            snapshot.version,
+            snapshot.base_currency,
+            {currency: Decimal(rate) for currency, rate in snapshot.rates.items()},
+        )
+
+    @classmethod
+    def get_table(cls) -> RateTable:
+        """
+        Return the current rate table.
+
+        The published version is checked at most once every
+        ``EXCHANGE_RATE_RELOAD_INTERVAL`` seconds per process.
+        """
+        now = time.monotonic()
+        table = cls._table
+        if table is not None and now - cls._checked_at < settings.EXCHANGE_RATE_RELOAD_INTERVAL:
+            return table
+
+        with cls._lock:
+            version = cls._published_version()
+            if cls._table is None or cls._table.version != version:
+                cls._table = cls._load(version)
+            cls._checked_at = now
+            return cls._table
+
+    @classmethod
+    def publish(cls, rates: Dict[str, Decimal], source: str = '', base_currency: Optional[str] = None):
+        """Store ``rates`` as a new snapshot version and make it current."""
+        from .models import ExchangeRateSnapshot
+
+        base_currency = base_currency or BASE_CURRENCY
+        payload = {currency: str(rate) for currency, rate in rates.items()}
+        for _ in range(3):
+            latest = ExchangeRateSnapshot.objects.aggregate(latest=Max('version'))['latest'] or 0
+            try:
+                with transaction.atomic():
+                    snapshot = ExchangeRateSnapshot.objects.create(
+                        version=latest + 1,
+                        base_currency=base_currency,
+                        rates=payload,
+                        source=source,
+                    )
+                break
+            except IntegrityError:
+                # Another worker published the same version concurrently.
+                continue
+        else:
+            raise RuntimeError('Could not allocate an exchange rate snapshot version.')
+
+        cache.set(VERSION_CACHE_KEY, snapshot.version, None)
+        cls.invalidate()
+        return snapshot
+
+    @classmethod
+    def refresh(cls, provider: Optional[ExchangeRateProvider] = None):
+        """
+        Fetch rates from the provider and publish them.
+
+        Returns:
+            ExchangeRateSnapshot or None: The new snapshot, or None if the
+            provider failed and the previous snapshot stays current.
+        """
+        provider = provider or get_provider()
+        base_currency = BASE_CURRENCY
+        try:
+            rates = provider.fetch(base_currency)
+        except Exception:
+            return None
+        if not rates:
+            return None
+        return cls.publish(rates, source=provider.name, base_currency=base_currency)
+
+    @classmethod
+    def invalidate(cls):
+        """Force the next read in this process to re-check the published version."""
+        cls._checked_at = 0.0
+
+    @classmethod
+    def prune(cls, keep: int = 48) -> int:
+        """Delete all but the newest ``keep`` snapshots."""
+        from .models import ExchangeRateSnapshot
+        stale_ids = ExchangeRateSnapshot.objects.order_by('-version').values_list('id', flat=True)[keep:]
+        deleted, _ = ExchangeRateSnapshot.objects.filter(id__in=list(stale_ids)).delete()
+        return deleted
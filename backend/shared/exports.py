@@ -0,0 +1,148 @@
+"""
+Streaming NDJSON and CSV exports.
+
+An ``Export`` declares the columns of one row per object. ``Export.stream``
+reads the queryset through ``iterator(chunk_size=...)``, a server-side
+cursor on PostgreSQL, and ``prefetch_related`` lookups run once per chunk.
+Rows are encoded one at a time into a ``StreamingHttpResponse``, so memory
+use does not grow with the size of the export.
+
+NDJSON rows also carry the ``children`` of an object (e.g. the items of an
+order) as nested lists; CSV rows are flat, and children have their own
+export.
+"""
+
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.views import APIView
+
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class Echo:
+    """File-like object that returns what is written, for ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+class Export:
+    """
+    Base class for streaming exports.
+
+    Subclasses set ``columns`` to ``(name, path)`` pairs, where ``path`` is a
+    dotted attribute path or a callable taking the object, and implement
+    ``get_queryset``.
+    """
+
+    name = 'export'
+    columns = ()
+    select_related = ()
+    prefetch_related = ()
+    # NDJSON only: key -> (related manager attribute, Export class).
+    children = {}
+    chunk_size = 2000
+
+    @classmethod
+    def get_queryset(cls, user, params):
+        raise NotImplementedError
+
+    @classmethod
+    def filter(cls, queryset, params):
+        """Apply the ``created_from``, ``created_to`` and ``status`` filters."""
+        # Bounds on created_at itself, not its date, so an index can serve them.
+        for param, lookup, days in (('created_from', 'created_at__gte', 0), ('created_to', 'created_at__lt', 1)):
+            if params.get(param):
+                value = parse_date(params[param])
+                if value is None:
+                    raise ValidationError({param: 'Enter a date as YYYY-MM-DD.'})
+                bound = timezone.make_aware(datetime.combine(value + timedelta(days=days), time.min))
+                queryset = queryset.filter(**{lookup: bound})
+        if params.get('status'):
+            queryset = queryset.filter(status=params['status'])
+        return queryset
+
+    @classmethod
+    def objects(cls, queryset):
+        prefetch = list(cls.prefetch_related) + [
+            relation for relation, _ in cls.children.values()
+        ]
+        queryset = queryset.select_related(*cls.select_related).prefetch_related(*prefetch)
+        return queryset.iterator(chunk_size=cls.chunk_size)
+
+    @classmethod
+    def values(cls, obj):
+        return [cls._resolve(obj, path) for _, path in cls.columns]
+
+    @classmethod
+    def document(cls, obj):
+        document = dict(zip((name for name, _ in cls.columns), cls.values(obj)))
+        for key, (relation, export) in cls.children.items():
+            document[key] = [export.document(child) for child in getattr(obj, relation).all()]
+        return document
+
+    @classmethod
+    def ndjson_rows(cls, queryset):
+        encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+        for obj in cls.objects(queryset):
+            yield encoder.encode(cls.document(obj)) + '\n'
+
+    @classmethod
+    def csv_rows(cls, queryset):
+        writer = csv.writer(Echo())
+        yield writer.writerow([name for name, _ in cls.columns])
+        for obj in cls.objects(queryset):
+            yield writer.writerow(['' if value is None else cls._text(value) for value in cls.values(obj)])
+
+    @classmethod
+    def stream(cls, queryset, fmt):
+        """Stream ``queryset`` as an attachment in the given format."""
+        if fmt not in FORMATS:
+            raise Http404(f'Unknown export format: {fmt}')
+        rows = cls.ndjson_rows(queryset) if fmt == 'ndjson' else cls.csv_rows(queryset)
+        response = StreamingHttpResponse(rows, content_type=FORMATS[fmt])
+        filename = f"{cls.name}-{timezone.now():%Y%m%d%H%M%S}.{fmt}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @staticmethod
+    def _resolve(obj, path):
+        if callable(path):
+            return path(obj)
+        for attribute in path.split('.'):
+            if obj is None:
+                return None
+            obj = getattr(obj, attribute)
+        return obj
+
+    @staticmethod
+    def _text(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+        return value
+
+
+class ExportView(APIView):
+    """Stream ``export_class`` for the requesting user as NDJSON or CSV."""
+
+    permission_classes = [permissions.IsAuthenticated]
+    export_class = None
+
+    def get(self, request, fmt):
+        export = self.export_class
+        queryset = export.filter(export.get_queryset(request.user, request.query_params), request.query_params)
+        return export.stream(queryset.order_by('created_at', 'pk'), fmt)
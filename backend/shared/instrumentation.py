@@ -0,0 +1,310 @@
+"""
+Per-request performance instrumentation.
+
+``RequestMetricsMiddleware`` records, for every request, the number of SQL
+queries and the time spent in them, the hits and misses of ``get`` and
+``get_many`` on every configured cache backend and the time spent producing
+serializer data. Metrics are exposed as ``X-*`` response headers when
+``REQUEST_METRICS_HEADERS`` is on and are aggregated per view into the shared
+cache, where the ``request_stats`` management command reads them.
+
+Each process adds what it collected since its last flush to its own key,
+so flushes never overwrite one another. Keys belong to the current stats
+generation; ``request_stats --reset`` starts a new one, which processes pick
+up on their next flush, so totals gathered before a reset never come back.
+"""
+
+import contextvars
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.module_loading import import_string
+
+
+STATS_GENERATION_KEY = 'request_metrics:generation'
+STATS_COUNT_KEY = 'request_metrics:{generation}:count'
+STATS_SLOT_KEY = 'request_metrics:{generation}:slot:{slot}'
+STATS_KEY = 'request_metrics:{generation}:{process}'
+METRIC_FIELDS = ('sql_count', 'sql_time', 'cache_hits', 'cache_misses', 'serializer_time', 'total_time')
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+_MISSING = object()
+
+
+def _empty_entry():
+    return dict.fromkeys(('requests',) + METRIC_FIELDS, 0)
+
+
+class RequestMetrics:
+    """Counters collected while handling one request."""
+
+    __slots__ = ('sql_count', 'sql_time', 'cache_hits', 'cache_misses', 'serializer_time',
+                 'total_time', '_serializer_depth', '_cache_depth')
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.serializer_time = 0.0
+        self.total_time = 0.0
+        self._serializer_depth = 0
+        self._cache_depth = 0
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in METRIC_FIELDS}
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.sql_count += 1
+
+
+def current_metrics():
+    """Return the metrics of the request being handled, if any."""
+    return _current.get()
+
+
+def install_serializer_timing():
+    """
+    Time ``BaseSerializer.data`` for the current request.
+
+    Only the outermost ``.data`` access is timed, so serializers that build
+    nested data through other serializers are not counted twice.
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data
+    if getattr(original.fget, '_request_metrics', False):
+        return
+
+    def data(self):
+        metrics = _current.get()
+        if metrics is None:
+            return original.fget(self)
+        metrics._serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            metrics._serializer_depth -= 1
+            if not metrics._serializer_depth:
+                metrics.serializer_time += time.perf_counter() - started
+
+    data._request_metrics = True
+    BaseSerializer.data = property(data)
+
+
+def _counting_get(original):
+    def get(self, key, default=None, version=None, **kwargs):
+        metrics = _current.get()
+        if metrics is None or metrics._cache_depth:
+            return original(self, key, default, version=version, **kwargs)
+        metrics._cache_depth += 1
+        try:
+            value = original(self, key, _MISSING, version=version, **kwargs)
+        finally:
+            metrics._cache_depth -= 1
+        if value is _MISSING:
+            metrics.cache_misses += 1
+            return default
+        metrics.cache_hits += 1
+        return value
+
+    return get
+
+
+def _counting_get_many(original):
+    def get_many(self, keys, version=None, **kwargs):
+        metrics = _current.get()
+        if metrics is None or metrics._cache_depth:
+            return original(self, keys, version=version, **kwargs)
+        keys = list(keys)
+        metrics._cache_depth += 1
+        try:
+            found = original(self, keys, version=version, **kwargs)
+        finally:
+            metrics._cache_depth -= 1
+        metrics.cache_hits += len(found)
+        metrics.cache_misses += len(keys) - len(found)
+        return found
+
+    return get_many
+
+
+def install_cache_lookup_counting():
+    """
+    Count the hits and misses of ``get`` and ``get_many`` for the current
+    request on the backend class of every alias in ``CACHES``.
+
+    Only the outermost lookup is counted, so a tiered cache falling through
+    to its L2 alias, or a backend implementing ``get`` with ``get_many``,
+    counts each key once.
+    """
+    for params in settings.CACHES.values():
+        backend = import_string(params['BACKEND'])
+        if backend.__dict__.get('_request_metrics', False):
+            continue
+        backend.get = _counting_get(backend.get)
+        backend.get_many = _counting_get_many(backend.get_many)
+        backend._request_metrics = True
+
+
+class StatsAggregator:
+    """
+    Per-process aggregate of request metrics, flushed to the shared cache.
+
+    Only the metrics gathered since the last flush are kept in memory; each
+    flush adds them to this process's key for the current generation. The
+    process registers its key once per generation in a numbered slot taken
+    with ``incr``, so concurrent registrations never drop one another.
+    """
+
+    def __init__(self, flush_interval):
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stats = defaultdict(_empty_entry)
+        self._flushed_at = time.monotonic()
+        self._registered_key = None
+
+    @property
+    def process(self):
+        # Read at flush time: workers forked after startup share the instance.
+        return f'{socket.gethostname()}:{os.getpid()}'
+
+    @property
+    def cache(self):
+        return caches[settings.REQUEST_METRICS_CACHE_ALIAS]
+
+    def add(self, view_name, metrics):
+        with self._lock:
+            entry = self._stats[view_name]
+            entry['requests'] += 1
+            for field in METRIC_FIELDS:
+                entry[field] += getattr(metrics, field)
+            due = time.monotonic() - self._flushed_at >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            delta, self._stats = self._stats, defaultdict(_empty_entry)
+            self._flushed_at = time.monotonic()
+        if not delta:
+            return
+        cache = self.cache
+        # Only this process writes its key; the lock keeps its threads from
+        # losing each other's additions.
+        with self._flush_lock:
+            generation = self.generation(cache)
+            key = STATS_KEY.format(generation=generation, process=self.process)
+            if self._registered_key != key:
+                self.register(cache, generation, key)
+                self._registered_key = key
+            totals = cache.get(key) or {}
+            for view, entry in delta.items():
+                merged = totals.setdefault(view, _empty_entry())
+                for field, value in entry.items():
+                    merged[field] += value
+            cache.set(key, totals, None)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    @staticmethod
+    def generation(cache):
+        generation = cache.get(STATS_GENERATION_KEY)
+        if generation is None:
+            cache.add(STATS_GENERATION_KEY, uuid.uuid4().hex, None)
+            generation = cache.get(STATS_GENERATION_KEY)
+        return generation
+
+    @staticmethod
+    def register(cache, generation, key):
+        count_key = STATS_COUNT_KEY.format(generation=generation)
+        cache.add(count_key, 0, None)
+        slot = cache.incr(count_key)
+        cache.set(STATS_SLOT_KEY.format(generation=generation, slot=slot), key, None)
+
+    @classmethod
+    def keys(cls, cache, generation):
+        """Stats keys registered in a generation, plus its bookkeeping keys."""
+        count = cache.get(STATS_COUNT_KEY.format(generation=generation)) or 0
+        slots = [STATS_SLOT_KEY.format(generation=generation, slot=slot) for slot in range(1, count + 1)]
+        return list(cache.get_many(slots).values()), slots
+
+    @classmethod
+    def collect(cls, cache):
+        """Merge the stats flushed by every process in the current generation."""
+        merged = defaultdict(_empty_entry)
+        keys, _ = cls.keys(cache, cls.generation(cache))
+        for stats in cache.get_many(keys).values():
+            for view, entry in stats.items():
+                for field, value in entry.items():
+                    merged[view][field] += value
+        return dict(merged)
+
+    @classmethod
+    def clear(cls, cache):
+        """Start a new generation and drop the keys of the current one."""
+        generation = cls.generation(cache)
+        cache.set(STATS_GENERATION_KEY, uuid.uuid4().hex, None)
+        keys, slots = cls.keys(cache, generation)
+        cache.delete_many(keys + slots + [STATS_COUNT_KEY.format(generation=generation)])
+
+
+class RequestMetricsMiddleware:
+    """
+    Collect SQL, cache and serializer metrics for each request.
+    """
+
+    aggregator = None
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.expose_headers = settings.REQUEST_METRICS_HEADERS
+        if RequestMetricsMiddleware.aggregator is None:
+            RequestMetricsMiddleware.aggregator = StatsAggregator(settings.REQUEST_METRICS_FLUSH_INTERVAL)
+        install_serializer_timing()
+        install_cache_lookup_counting()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            metrics.total_time = time.perf_counter() - started
+            _current.reset(token)
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = (match.view_name or match._func_path) if match else 'unresolved'
+        self.aggregator.add(f'{request.method} {view_name}', metrics)
+
+        if self.expose_headers:
+            response['X-SQL-Count'] = str(metrics.sql_count)
+            response['X-SQL-Time-Ms'] = f'{metrics.sql_time * 1000:.1f}'
+            response['X-Cache-Hits'] = str(metrics.cache_hits)
+            response['X-Cache-Misses'] = str(metrics.cache_misses)
+            response['X-Serializer-Time-Ms'] = f'{metrics.serializer_time * 1000:.1f}'
+        return response
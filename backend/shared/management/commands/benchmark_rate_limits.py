@@ -0,0 +1,116 @@
+"""
+Load test the endpoint rate limits.
+
+Replays bot traffic against the forgot-password and add-to-cart endpoints
+and counts INSERT/UPDATE/DELETE statements, once with ``RATE_LIMITS``
+disabled and once enabled, for growing request counts:
+
+* ``reset-one-ip``: one address requesting password reset codes for many
+  addresses (limited per IP);
+* ``reset-botnet``: every request from a new address, all for the same
+  account (limited per target);
+* ``cart-one-ip``: one address adding to new carts without cookies
+  (limited per IP).
+
+With limits on, writes stop growing once a client is over its limit. When
+the shared cache is the database cache, the limiter's own counter writes
+show up in the ``cache`` column.
+
+Everything runs inside one transaction that is rolled back at the end.
+"""
+
+import time
+import uuid
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from shared.throttling import RateLimiter
+
+
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+SCENARIOS = ('reset-one-ip', 'reset-botnet', 'cart-one-ip')
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare DB writes under bot traffic with and without endpoint rate limits.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', default='50,200,800', help='Comma-separated request counts')
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated scenarios')
+
+    def handle(self, *args, **options):
+        try:
+            counts = sorted(int(count) for count in options['requests'].split(','))
+        except ValueError:
+            raise CommandError('requests must be a comma-separated list of integers.')
+        scenarios = [scenario.strip() for scenario in options['scenarios'].split(',') if scenario.strip()]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if not counts or counts[0] < 1 or unknown:
+            raise CommandError(f'requests must be positive and scenarios one of {", ".join(SCENARIOS)}.')
+
+        try:
+            with transaction.atomic():
+                self._run(scenarios, counts)
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Generated rows rolled back.')
+        self.stdout.write(self.style.SUCCESS('Rate limit benchmark complete.'))
+
+    def _run(self, scenarios, counts):
+        self.stdout.write(self.style.NOTICE(
+            f"{'scenario':<14}{'requests':>9}{'limits':>8}{'429s':>7}{'writes':>8}{'cache':>7}{'ms':>8}"
+        ))
+        for scenario in scenarios:
+            for count in counts:
+                for enabled in (False, True):
+                    RateLimiter.reset()
+                    with override_settings(ALLOWED_HOSTS=['*'], RATE_LIMITS_ENABLED=enabled):
+                        rejected, writes, cache_writes, elapsed = self._attack(scenario, count)
+                    self.stdout.write(
+                        f"{scenario:<14}{count:>9}{'on' if enabled else 'off':>8}{rejected:>7}{writes:>8}"
+                        f"{cache_writes:>7}{elapsed * 1000:>8.0f}"
+                    )
+
+    def _attack(self, scenario, count):
+        from users.models import User
+
+        # A fresh network and account per run, so counters of earlier runs
+        # do not apply.
+        network = uuid.uuid4().int
+        run = uuid.uuid4().hex[:8]
+        email = f'bench-{run}@example.com'
+        User.objects.create_user(username=email, email=email, password=uuid.uuid4().hex)
+        cache_table = getattr(caches['shared'], '_table', None)
+        rejected = writes = cache_writes = 0
+        started = time.perf_counter()
+        for index in range(count):
+            if scenario == 'reset-botnet':
+                address = f'10.{network % 250}.{index // 250 % 250}.{index % 250 + 1}'
+            else:
+                address = f'10.{network % 250}.{network // 250 % 250}.1'
+            client = Client(REMOTE_ADDR=address, raise_request_exception=False)
+            with CaptureQueriesContext(connection) as queries:
+                if scenario == 'cart-one-ip':
+                    response = client.post(reverse('cart:add_to_cart'), {
+                        'product_type': 'tour', 'product_id': str(uuid.uuid4()), 'quantity': 1,
+                    }, content_type='application/json')
+                else:
+                    target = email if scenario == 'reset-botnet' else f'{run}-{index}@example.com'
+                    response = client.post(
+                        reverse('users:forgot_password'), {'email': target}, content_type='application/json'
+                    )
+            rejected += response.status_code == 429
+            for query in queries.captured_queries:
+                if query['sql'].lstrip().upper().startswith(WRITE_PREFIXES):
+                    writes += 1
+                    cache_writes += bool(cache_table) and cache_table in query['sql']
+        return rejected, writes, cache_writes, time.perf_counter() - started
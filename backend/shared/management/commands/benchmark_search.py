@@ -0,0 +1,160 @@
+"""
+Search latency benchmark.
+
+Generates tours with English and Persian translations in growing numbers,
+indexes them and compares the search index with the ``icontains`` OR-chain
+over translated fields that the search endpoints used before. Each query is
+timed as the endpoints run it: a count plus the first page of 20 results.
+
+Everything is created inside one transaction that is rolled back at the end
+unless ``--keep`` is given.
+"""
+
+import random
+import statistics
+import time
+import uuid
+from datetime import time as dt_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from shared.search import SearchIndex
+from tours.models import Tour, TourCategory
+
+
+WORDS = {
+    'en': [
+        'old', 'city', 'bazaar', 'palace', 'bosphorus', 'cruise', 'museum', 'walking', 'food', 'night',
+        'historic', 'mosque', 'sunset', 'island', 'market', 'garden', 'tower', 'ferry', 'spice', 'street',
+    ],
+    'fa': [
+        'شهر', 'قدیمی', 'بازار', 'کاخ', 'بسفر', 'کشتی', 'موزه', 'پیاده', 'غذا', 'شب',
+        'تاریخی', 'مسجد', 'غروب', 'جزیره', 'باغ', 'برج', 'ادویه', 'خیابان', 'گردش', 'هنر',
+    ],
+}
+PAGE_SIZE = 20
+# Share of words drawn from the keyword lists above; the rest are filler
+# words, so keywords are about as selective as in real descriptions.
+KEYWORD_RATE = 0.03
+FILLER = [f'{a}{b}{c}' for a in 'bdklmnrst' for b in 'aeiou' for c in ('lan', 'ret', 'som', 'vin', 'dur', 'kap')]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare search index latency with icontains filtering for growing catalogs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000', help='Comma-separated tour counts')
+        parser.add_argument('--queries', default='bosphorus cruise,old,spice market,بازار', help='Comma-separated queries')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated tours')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError('sizes must be a comma-separated list of integers.')
+        if not sizes or sizes[0] < 1 or options['repeat'] < 1:
+            raise CommandError('sizes and repeat must be positive.')
+        queries = [query.strip() for query in options['queries'].split(',') if query.strip()]
+
+        try:
+            with transaction.atomic():
+                self._run(sizes, queries, options['repeat'])
+                if not options['keep']:
+                    raise Rollback
+        except Rollback:
+            self.stdout.write('Generated tours rolled back.')
+
+        self.stdout.write(self.style.SUCCESS('Search benchmark complete.'))
+
+    def _run(self, sizes, queries, repeat):
+        category = TourCategory.objects.create(
+            slug=f'bench-search-{uuid.uuid4().hex[:8]}', name='Benchmark', description='Benchmark'
+        )
+        generator = random.Random(42)
+        created = 0
+        for size in sizes:
+            started = time.perf_counter()
+            tour_ids = self._create_tours(category, created, size - created, generator)
+            created = size
+            generated = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for offset in range(0, len(tour_ids), 1000):
+                SearchIndex.update('tour', tour_ids[offset:offset + 1000])
+            indexed = time.perf_counter() - started
+            self.stdout.write(self.style.NOTICE(
+                f'{size} tours (generated in {generated:.1f}s, indexed in {indexed:.1f}s)'
+            ))
+
+            self.stdout.write(f"  {'query':<20} {'icontains ms':>13} {'index ms':>9} {'hits':>7} {'speedup':>8}")
+            for query in queries:
+                legacy_ms, legacy_hits = self._time(self._legacy(query), repeat)
+                index_ms, index_hits = self._time(
+                    SearchIndex.filter(Tour.objects.filter(is_active=True), 'tour', query).order_by(
+                        '-search_rank', '-created_at'
+                    ),
+                    repeat
+                )
+                speedup = legacy_ms / index_ms if index_ms else 0
+                self.stdout.write(
+                    f'  {query:<20} {legacy_ms:>13.1f} {index_ms:>9.1f} {index_hits:>7} {speedup:>7.1f}x'
+                    + ('' if legacy_hits == index_hits else f'  (icontains: {legacy_hits} hits)')
+                )
+
+    @staticmethod
+    def _legacy(query):
+        return Tour.objects.filter(is_active=True).filter(
+            Q(translations__title__icontains=query) |
+            Q(translations__description__icontains=query) |
+            Q(translations__short_description__icontains=query) |
+            Q(translations__highlights__icontains=query)
+        ).distinct().order_by('-created_at')
+
+    @staticmethod
+    def _time(queryset, repeat):
+        timings = []
+        hits = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            hits = queryset.count()
+            list(queryset[:PAGE_SIZE])
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000, hits
+
+    @staticmethod
+    def _sentence(generator, language, length):
+        return ' '.join(
+            generator.choice(WORDS[language] if generator.random() < KEYWORD_RATE else FILLER)
+            for _ in range(length)
+        )
+
+    def _create_tours(self, category, start, count, generator):
+        Translation = Tour._parler_meta.root_model
+        tours = [
+            Tour(
+                slug=f'{category.slug}-{start + index}', category=category, price=50, city='Istanbul',
+                country='Turkey', duration_hours=4, pickup_time=dt_time(8, 0), start_time=dt_time(9, 0),
+                end_time=dt_time(13, 0), max_participants=20
+            )
+            for index in range(count)
+        ]
+        Tour.objects.bulk_create(tours, batch_size=1000)
+        Translation.objects.bulk_create([
+            Translation(
+                master_id=tour.pk, language_code=language,
+                title=self._sentence(generator, language, 3),
+                short_description=self._sentence(generator, language, 8),
+                description=self._sentence(generator, language, 40),
+                highlights=self._sentence(generator, language, 6),
+            )
+            for tour in tours
+            for language in WORDS
+        ], batch_size=1000)
+        return [tour.pk for tour in tours]
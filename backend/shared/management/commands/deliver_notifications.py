@@ -0,0 +1,36 @@
+"""
+Deliver queued email and SMS notifications.
+
+Runs the same batches as the ``deliver_notifications`` Celery task, for
+deployments without a worker: once, or continuously with ``--loop``.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from shared.notifications import Outbox
+
+
+class Command(BaseCommand):
+    help = 'Send due messages from the notification outbox.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Messages per batch (defaults to NOTIFICATION_BATCH_SIZE)')
+        parser.add_argument('--loop', action='store_true', help='Keep delivering until interrupted')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds to sleep when the outbox is empty')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('batch-size must be positive.')
+
+        while True:
+            counts = Outbox.deliver(options['batch_size'])
+            if any(counts.values()):
+                self.stdout.write(self.style.SUCCESS(
+                    f"Sent {counts['sent']}, retrying {counts['retrying']}, failed {counts['failed']}."
+                ))
+            if not options['loop']:
+                break
+            if not any(counts.values()):
+                time.sleep(options['interval'])
@@ -0,0 +1,42 @@
+"""
+Rebuild the full-text search index.
+
+Signals keep the index fresh as products change; run this after the initial
+migration, after bulk imports that bypass model signals, or to repair the
+index.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from shared.models import SearchDocument
+from shared.search import SOURCES, SearchIndex
+
+
+class Command(BaseCommand):
+    help = 'Reindex tours, events and transfer routes for full-text search.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type', action='append', dest='product_types',
+            help=f"Product type to reindex ({', '.join(SOURCES)}); repeatable, defaults to all",
+        )
+        parser.add_argument(
+            '--if-empty', action='store_true',
+            help='Only reindex product types that have no documents yet',
+        )
+
+    def handle(self, *args, **options):
+        product_types = options['product_types'] or list(SOURCES)
+        unknown = set(product_types) - set(SOURCES)
+        if unknown:
+            raise CommandError(f"Unknown product type: {', '.join(sorted(unknown))}")
+        if options['if_empty']:
+            indexed = set(SearchDocument.objects.values_list('product_type', flat=True).distinct())
+            product_types = [product_type for product_type in product_types if product_type not in indexed]
+            if not product_types:
+                self.stdout.write(self.style.SUCCESS('Search index already populated.'))
+                return
+
+        self.stdout.write(self.style.NOTICE(f"Reindexing {', '.join(product_types)}..."))
+        written = SearchIndex.rebuild(product_types)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} search documents.'))
@@ -0,0 +1,35 @@
+"""
+Publish a new exchange rate snapshot.
+
+Runs the same refresh as the periodic Celery task; useful for seeding a fresh
+database or for deployments without a beat scheduler.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from shared.exchange_rates import ExchangeRateStore, get_provider
+
+
+class Command(BaseCommand):
+    help = 'Fetch exchange rates and publish them as a new snapshot version.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--provider',
+            help='Dotted path of a provider class (defaults to EXCHANGE_RATE_PROVIDER)',
+        )
+        parser.add_argument('--keep', type=int, default=48, help='Number of snapshots to keep')
+
+    def handle(self, *args, **options):
+        provider = import_string(options['provider'])() if options['provider'] else get_provider()
+        self.stdout.write(self.style.NOTICE(f'Fetching rates from {provider.name}...'))
+
+        snapshot = ExchangeRateStore.refresh(provider)
+        if snapshot is None:
+            raise CommandError('Provider returned no rates; the current snapshot was kept.')
+
+        pruned = ExchangeRateStore.prune(keep=options['keep'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Published {snapshot} with {len(snapshot.rates)} rates; pruned {pruned} old snapshots.'
+        ))
@@ -0,0 +1,61 @@
+"""
+Show aggregated per-view request metrics.
+
+Reads the stats flushed by ``RequestMetricsMiddleware`` from every process
+and prints per-view averages for SQL count, SQL time, cache hits/misses and
+serializer time.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+
+from shared.instrumentation import StatsAggregator
+
+
+SORT_FIELDS = ['sql_count', 'sql_time', 'serializer_time', 'total_time', 'requests', 'cache_misses']
+
+
+class Command(BaseCommand):
+    help = 'Show per-view SQL, cache and serializer metrics collected by RequestMetricsMiddleware.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sort', choices=SORT_FIELDS, default='sql_count', help='Average to sort by')
+        parser.add_argument('--limit', type=int, default=25, help='Number of views to show')
+        parser.add_argument('--reset', action='store_true', help='Clear collected stats afterwards')
+
+    def handle(self, *args, **options):
+        cache = caches[settings.REQUEST_METRICS_CACHE_ALIAS]
+        stats = StatsAggregator.collect(cache)
+        if not stats:
+            self.stdout.write(self.style.NOTICE('No request metrics collected yet.'))
+            return
+
+        rows = []
+        for view, entry in stats.items():
+            requests = entry['requests'] or 1
+            rows.append({
+                'view': view,
+                'requests': entry['requests'],
+                'sql_count': entry['sql_count'] / requests,
+                'sql_time': entry['sql_time'] * 1000 / requests,
+                'cache_hits': entry['cache_hits'] / requests,
+                'cache_misses': entry['cache_misses'] / requests,
+                'serializer_time': entry['serializer_time'] * 1000 / requests,
+                'total_time': entry['total_time'] * 1000 / requests,
+            })
+        rows.sort(key=lambda row: row[options['sort']], reverse=True)
+
+        self.stdout.write(self.style.NOTICE(
+            f"{'view':<55} {'reqs':>6} {'sql':>7} {'sql ms':>8} {'hits':>6} {'miss':>6} {'ser ms':>8} {'total ms':>9}"
+        ))
+        for row in rows[:options['limit']]:
+            self.stdout.write(
+                f"{row['view'][:55]:<55} {row['requests']:>6} {row['sql_count']:>7.1f} {row['sql_time']:>8.1f} "
+                f"{row['cache_hits']:>6.1f} {row['cache_misses']:>6.1f} {row['serializer_time']:>8.1f} "
+                f"{row['total_time']:>9.1f}"
+            )
+
+        if options['reset']:
+            StatsAggregator.clear(cache)
+            self.stdout.write(self.style.SUCCESS('Request metrics cleared.'))
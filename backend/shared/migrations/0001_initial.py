@@ -0,0 +1,33 @@
+# Generated by Django 5.0.2 on 2026-10-17 03:55
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRateSnapshot',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Is active')),
+                ('version', models.PositiveIntegerField(unique=True, verbose_name='Version')),
+                ('base_currency', models.CharField(default='USD', max_length=3, verbose_name='Base currency')),
+                ('rates', models.JSONField(default=dict, verbose_name='Rates')),
+                ('source', models.CharField(blank=True, max_length=100, verbose_name='Source')),
+            ],
+            options={
+                'verbose_name': 'Exchange Rate Snapshot',
+                'verbose_name_plural': 'Exchange Rate Snapshots',
+                'ordering': ['-version'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_type', models.CharField(max_length=20, verbose_name='Product type')),
+                ('object_id', models.UUIDField(verbose_name='Object ID')),
+                ('language', models.CharField(max_length=10, verbose_name='Language')),
+                ('title', models.TextField(blank=True, verbose_name='Title')),
+                ('body', models.TextField(blank=True, verbose_name='Body')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+            ],
+            options={
+                'verbose_name': 'Search Document',
+                'verbose_name_plural': 'Search Documents',
+                'indexes': [models.Index(fields=['object_id'], name='shared_search_object_idx')],
+                'unique_together': {('product_type', 'object_id', 'language')},
+            },
+        ),
+    ]
@@ -0,0 +1,93 @@
+"""
+Create the backend-specific full-text index over ``SearchDocument``.
+
+PostgreSQL gets a generated, weighted ``tsvector`` column (title A, body B)
+built with the text search configuration of the document language, plus a
+GIN index. SQLite gets an external-content FTS5 table kept in sync by
+triggers. Other backends fall back to substring matching and need nothing.
+"""
+
+from django.db import migrations
+
+
+# PostgreSQL has no Persian configuration; Persian documents use 'simple'.
+POSTGRES_CONFIG = (
+    "CASE language WHEN 'en' THEN 'english'::regconfig "
+    "WHEN 'tr' THEN 'turkish'::regconfig ELSE 'simple'::regconfig END"
+)
+
+POSTGRES_FORWARD = [
+    f"""
+    ALTER TABLE shared_searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector({POSTGRES_CONFIG}, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector({POSTGRES_CONFIG}, coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX shared_searchdocument_vector_idx ON shared_searchdocument USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS shared_searchdocument_vector_idx",
+    "ALTER TABLE shared_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE shared_searchdocument_fts USING fts5(
+        title, body, content='shared_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    # Title matches weigh ten times more than body matches.
+    "INSERT INTO shared_searchdocument_fts(shared_searchdocument_fts, rank) VALUES('rank', 'bm25(10.0, 1.0)')",
+    """
+    CREATE TRIGGER shared_searchdocument_ai AFTER INSERT ON shared_searchdocument BEGIN
+        INSERT INTO shared_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER shared_searchdocument_ad AFTER DELETE ON shared_searchdocument BEGIN
+        INSERT INTO shared_searchdocument_fts(shared_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER shared_searchdocument_au AFTER UPDATE ON shared_searchdocument BEGIN
+        INSERT INTO shared_searchdocument_fts(shared_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO shared_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    "INSERT INTO shared_searchdocument_fts(shared_searchdocument_fts) VALUES('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS shared_searchdocument_au",
+    "DROP TRIGGER IF EXISTS shared_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS shared_searchdocument_ai",
+    "DROP TABLE IF EXISTS shared_searchdocument_fts",
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD})
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0002_search_document'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
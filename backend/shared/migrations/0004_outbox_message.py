@@ -0,0 +1,35 @@
+# Generated by Django 5.0.2 on 2026-10-17 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(choices=[('email', 'Email'), ('sms', 'SMS')], max_length=10, verbose_name='Channel')),
+                ('recipient', models.CharField(max_length=255, verbose_name='Recipient')),
+                ('subject', models.CharField(blank=True, max_length=255, verbose_name='Subject')),
+                ('body', models.TextField(verbose_name='Body')),
+                ('html_body', models.TextField(blank=True, verbose_name='HTML body')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('next_attempt_at', models.DateTimeField(verbose_name='Next attempt at')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent at')),
+            ],
+            options={
+                'verbose_name': 'Outbox Message',
+                'verbose_name_plural': 'Outbox Messages',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='shared_outbox_due_idx')],
+            },
+        ),
+    ]
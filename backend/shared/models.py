@@ -0,0 +1,101 @@
+"""
+Shared models for Peykan Tourism Platform.
+"""
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from core.models import BaseModel
+
+
+class ExchangeRateSnapshot(BaseModel):
+    """
+    Versioned set of exchange rates against a base currency.
+
+    Rates are stored as decimal strings so they round-trip exactly.
+    """
+
+    version = models.PositiveIntegerField(unique=True, verbose_name=_('Version'))
+    base_currency = models.CharField(max_length=3, default='USD', verbose_name=_('Base currency'))
+    rates = models.JSONField(default=dict, verbose_name=_('Rates'))
+    source = models.CharField(max_length=100, blank=True, verbose_name=_('Source'))
+
+    class Meta:
+        verbose_name = _('Exchange Rate Snapshot')
+        verbose_name_plural = _('Exchange Rate Snapshots')
+        ordering = ['-version']
+
+    def __str__(self):
+        return f"Rates v{self.version} ({self.base_currency})"
+
+
+class SearchDocument(models.Model):
+    """
+    Searchable text of one product in one language.
+
+    Maintained by ``shared.search.SearchIndex``. The full-text index itself is
+    backend specific and created by migrations: a weighted ``tsvector``
+    column with a GIN index on PostgreSQL, an external-content FTS5 table on
+    SQLite.
+    """
+
+    product_type = models.CharField(max_length=20, verbose_name=_('Product type'))
+    object_id = models.UUIDField(verbose_name=_('Object ID'))
+    language = models.CharField(max_length=10, verbose_name=_('Language'))
+    title = models.TextField(blank=True, verbose_name=_('Title'))
+    body = models.TextField(blank=True, verbose_name=_('Body'))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_('Updated at'))
+
+    class Meta:
+        verbose_name = _('Search Document')
+        verbose_name_plural = _('Search Documents')
+        unique_together = ['product_type', 'object_id', 'language']
+        indexes = [
+            models.Index(fields=['object_id'], name='shared_search_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_type}:{self.object_id} ({self.language})"
+
+
+class OutboxMessage(models.Model):
+    """
+    Email or SMS waiting to be delivered by the notification worker.
+
+    Written by ``shared.notifications.Outbox`` in the caller's transaction and
+    sent in batches by ``Outbox.deliver``, with retries and backoff.
+    """
+
+    CHANNEL_CHOICES = [
+        ('email', _('Email')),
+        ('sms', _('SMS')),
+    ]
+    STATUS_CHOICES = [
+        ('pending', _('Pending')),
+        ('sending', _('Sending')),
+        ('sent', _('Sent')),
+        ('failed', _('Failed')),
+    ]
+
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES, verbose_name=_('Channel'))
+    recipient = models.CharField(max_length=255, verbose_name=_('Recipient'))
+    subject = models.CharField(max_length=255, blank=True, verbose_name=_('Subject'))
+    body = models.TextField(verbose_name=_('Body'))
+    html_body = models.TextField(blank=True, verbose_name=_('HTML body'))
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name=_('Status'))
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_('Attempts'))
+    # Due time of the next attempt; while sending, the end of the worker's lease.
+    next_attempt_at = models.DateTimeField(verbose_name=_('Next attempt at'))
+    last_error = models.TextField(blank=True, verbose_name=_('Last error'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Created at'))
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Sent at'))
+
+    class Meta:
+        verbose_name = _('Outbox Message')
+        verbose_name_plural = _('Outbox Messages')
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='shared_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} to {self.recipient} ({self.status})"
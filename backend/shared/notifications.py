@@ -0,0 +1,236 @@
+"""
+Transactional outbox for email and SMS notifications.
+
+Request handlers call ``Outbox.enqueue_email`` / ``Outbox.enqueue_sms``,
+which only insert an ``OutboxMessage`` row in the caller's transaction, so
+SMTP and SMS latency or outages never reach the API and a rolled-back
+request sends nothing. After commit the Celery worker is woken up.
+
+``Outbox.deliver`` claims a batch of due messages, sends the emails over one
+SMTP connection and the SMS through one backend session, and reschedules
+failures with exponential backoff until ``NOTIFICATION_MAX_ATTEMPTS``. It
+runs from the ``deliver_notifications`` Celery task (also scheduled by beat)
+or the ``deliver_notifications`` management command.
+
+SMS go through the backend named by ``SMS_BACKEND``: Kavenegar in
+production, console output in development, or ``LocMemSMSBackend`` in tests.
+"""
+
+import logging
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboxMessage
+
+
+logger = logging.getLogger(__name__)
+
+# How long a worker owns claimed messages before another may retry them.
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+class SMSDeliveryError(Exception):
+    """An SMS could not be sent. The message never contains credentials."""
+
+
+class SMSBackend:
+    """
+    Base class for SMS senders. ``send`` raises on failure.
+    """
+
+    def send(self, phone: str, message: str) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class KavenegarSMSBackend(SMSBackend):
+    """Kavenegar HTTP API over one keep-alive session."""
+
+    url = 'https://api.kavenegar.com/v1/{api_key}/sms/send.json'
+
+    def __init__(self):
+        self.session = requests.Session()
+
+    def send(self, phone, message):
+        # The API key is part of the URL, and requests puts the URL into its
+        # error messages, which the outbox logs and stores in last_error.
+        try:
+            response = self.session.post(
+                self.url.format(api_key=settings.KAVENEGAR_API_KEY),
+                data={'receptor': phone, 'message': message},
+                timeout=10,
+            )
+        except requests.RequestException as exc:
+            raise SMSDeliveryError(f'Kavenegar request failed: {type(exc).__name__}') from None
+        if response.status_code >= 400:
+            raise SMSDeliveryError(f'Kavenegar returned HTTP {response.status_code}')
+
+    def close(self):
+        self.session.close()
+
+
+class ConsoleSMSBackend(SMSBackend):
+    """Print messages, for development."""
+
+    def send(self, phone, message):
+        print(f"Mock SMS to {phone}: {message}")
+
+
+class LocMemSMSBackend(SMSBackend):
+    """Keep messages in ``LocMemSMSBackend.outbox``, for tests."""
+
+    outbox = []
+
+    def send(self, phone, message):
+        self.outbox.append((phone, message))
+
+
+def get_sms_backend():
+    return import_string(settings.SMS_BACKEND)()
+
+
+class Outbox:
+    """
+    Service class for queueing and delivering notifications.
+    """
+
+    @classmethod
+    def enqueue_email(cls, recipient, subject, body, html_body=''):
+        return cls._enqueue(channel='email', recipient=recipient, subject=subject, body=body, html_body=html_body)
+
+    @classmethod
+    def enqueue_sms(cls, phone, message):
+        return cls._enqueue(channel='sms', recipient=phone, body=message)
+
+    @classmethod
+    def _enqueue(cls, **fields):
+        message = OutboxMessage.objects.create(next_attempt_at=timezone.now(), **fields)
+        transaction.on_commit(cls.wake_worker)
+        return message
+
+    @staticmethod
+    def wake_worker():
+        """Ask a Celery worker to deliver now instead of at the next beat."""
+        if not settings.NOTIFICATION_WAKE_WORKER:
+            return
+        from .tasks import deliver_notifications
+        try:
+            deliver_notifications.delay()
+        except Exception:
+            # The beat schedule or the management command delivers it later.
+            logger.warning('Could not wake the notification worker.', exc_info=True)
+
+    @classmethod
+    def claim(cls, batch_size):
+        """
+        Lease up to ``batch_size`` due messages to this worker.
+
+        Messages whose lease ran out (a worker died mid-batch) are due again.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            due = OutboxMessage.objects.filter(
+                status__in=('pending', 'sending'), next_attempt_at__lte=now
+            ).order_by('next_attempt_at', 'id')
+            if connections[due.db].features.has_select_for_update_skip_locked:
+                due = due.select_for_update(skip_locked=True)
+            ids = list(due.values_list('id', flat=True)[:batch_size])
+            OutboxMessage.objects.filter(id__in=ids).update(
+                status='sending', attempts=F('attempts') + 1, next_attempt_at=now + CLAIM_LEASE
+            )
+        return list(OutboxMessage.objects.filter(id__in=ids).order_by('id'))
+
+    @classmethod
+    def deliver(cls, batch_size=None):
+        """
+        Send one batch of due messages.
+
+        Returns:
+            dict: Number of messages ``sent``, ``retrying`` and ``failed``.
+        """
+        messages = cls.claim(batch_size or settings.NOTIFICATION_BATCH_SIZE)
+        errors = {}
+        emails = [message for message in messages if message.channel == 'email']
+        sms = [message for message in messages if message.channel == 'sms']
+        if emails:
+            errors.update(cls._send_emails(emails))
+        if sms:
+            errors.update(cls._send_sms(sms))
+
+        now = timezone.now()
+        sent = [message.id for message in messages if message.id not in errors]
+        OutboxMessage.objects.filter(id__in=sent).update(status='sent', sent_at=now, last_error='')
+        counts = {'sent': len(sent), 'retrying': 0, 'failed': 0}
+        for message in messages:
+            if message.id not in errors:
+                continue
+            logger.warning('Notification %s to %s failed: %s', message.id, message.recipient, errors[message.id])
+            if message.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+                status, next_attempt_at = 'failed', now
+            else:
+                status, next_attempt_at = 'pending', now + cls.backoff(message.attempts)
+            OutboxMessage.objects.filter(id=message.id).update(
+                status=status, next_attempt_at=next_attempt_at, last_error=errors[message.id][:1000]
+            )
+            counts['failed' if status == 'failed' else 'retrying'] += 1
+        return counts
+
+    @staticmethod
+    def backoff(attempts):
+        """Delay before the next attempt after ``attempts`` failed ones."""
+        delay = settings.NOTIFICATION_RETRY_DELAY * 2 ** (attempts - 1)
+        return timedelta(seconds=min(delay, settings.NOTIFICATION_RETRY_MAX_DELAY))
+
+    @staticmethod
+    def purge(days=None):
+        """Delete sent messages older than ``days`` (``NOTIFICATION_RETENTION_DAYS``)."""
+        cutoff = timezone.now() - timedelta(days=days or settings.NOTIFICATION_RETENTION_DAYS)
+        deleted, _ = OutboxMessage.objects.filter(status='sent', sent_at__lt=cutoff).delete()
+        return deleted
+
+    @staticmethod
+    def _send_emails(messages):
+        errors = {}
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as exc:
+            return {message.id: f'Connection failed: {exc}' for message in messages}
+        try:
+            for message in messages:
+                email = EmailMultiAlternatives(
+                    subject=message.subject, body=message.body, from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[message.recipient], connection=connection,
+                )
+                if message.html_body:
+                    email.attach_alternative(message.html_body, 'text/html')
+                try:
+                    email.send()
+                except Exception as exc:
+                    errors[message.id] = str(exc) or exc.__class__.__name__
+        finally:
+            connection.close()
+        return errors
+
+    @staticmethod
+    def _send_sms(messages):
+        errors = {}
+        backend = get_sms_backend()
+        try:
+            for message in messages:
+                try:
+                    backend.send(message.recipient, message.body)
+                except Exception as exc:
+                    errors[message.id] = str(exc) or exc.__class__.__name__
+        finally:
+            backend.close()
+        return errors
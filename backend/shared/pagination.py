@@ -0,0 +1,281 @@
+"""
+Keyset (cursor) pagination for product and account listings.
+
+``KeysetPagination`` pages through a queryset by the values of its ordering
+keys instead of an ``OFFSET``: the cursor stores the keys of the last row on
+the page, and the next page is read with a ``WHERE`` on those keys, so deep
+pages cost the same as the first one. The primary key is appended to the
+ordering as a tie-breaker, which makes the order total and the pages stable
+while rows are inserted.
+
+The ordering is taken from the queryset (``order_by``, the model's default
+ordering, or ``ordering`` on the paginator). Keys may be model fields,
+forward relations or annotations; they must not be NULL, so orderings on
+nullable fields and on expressions fall back to page-number pagination.
+
+No ``COUNT(*)`` is run unless the client asks for one with ``?count=exact``
+or ``?count=estimate``. Requests with a ``page`` parameter are still served
+with page-number pagination for existing clients.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PageNumberPagination(pagination.PageNumberPagination):
+    """Page-number pagination with a client-selectable page size."""
+
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class KeysetUnsupported(Exception):
+    """The queryset ordering cannot be used as a keyset."""
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Cursor pagination on the ordering keys of the queryset.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    # Used when neither the queryset nor its model defines an ordering.
+    ordering = ('-created_at',)
+    # Estimated counts off PostgreSQL are exact counts up to this cap.
+    estimate_cap = 1000
+    legacy_class = PageNumberPagination
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.legacy = None
+        try:
+            self.keys = self.get_keys(queryset)
+        except KeysetUnsupported:
+            return self._paginate_legacy(queryset, request, view)
+        if pagination.PageNumberPagination.page_query_param in request.query_params \
+                and self.cursor_query_param not in request.query_params:
+            return self._paginate_legacy(self._ordered(queryset, reverse=False), request, view)
+
+        limit = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.count, self.count_estimated = self.get_count(queryset, request)
+
+        position, reverse = self.decode_cursor(request)
+        ordered = self._ordered(queryset, reverse)
+        if position is not None:
+            ordered = ordered.filter(self._after(position, reverse))
+
+        rows = list(ordered[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        return Response({
+            'count': self.count,
+            'count_estimated': self.count_estimated,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'nullable': True},
+                'count_estimated': {'type': 'boolean'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param, 'required': False, 'in': 'query',
+                'description': 'Pagination cursor from the next or previous link.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param, 'required': False, 'in': 'query',
+                'description': 'Number of results per page.',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.count_query_param, 'required': False, 'in': 'query',
+                'description': "'exact' or 'estimate' to include a result count.",
+                'schema': {'type': 'string', 'enum': ['exact', 'estimate']},
+            },
+        ]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(page_size, self.max_page_size) if page_size > 0 else self.page_size
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._link(self.page[0], reverse=True)
+
+    def get_keys(self, queryset):
+        """
+        Resolve the ordering of ``queryset`` to ``(name, descending, field)``
+        keys, ending with the primary key.
+        """
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering) or list(self.ordering)
+        keys = []
+        for item in ordering:
+            if not isinstance(item, str) or item == '?':
+                raise KeysetUnsupported(item)
+            descending = item.startswith('-')
+            name = item.lstrip('-')
+            if name == 'pk' or name == queryset.model._meta.pk.name:
+                keys.append(('pk', descending, queryset.model._meta.pk))
+                return keys
+            keys.append((name, descending, self._key_field(queryset, name)))
+        keys.append(('pk', keys[-1][1] if keys else False, queryset.model._meta.pk))
+        return keys
+
+    def get_count(self, queryset, request):
+        """Return ``(count, estimated)`` as requested by the client."""
+        mode = request.query_params.get(self.count_query_param)
+        if mode == 'exact':
+            return queryset.count(), False
+        if mode == 'estimate':
+            return self.estimate_count(queryset), True
+        return None, False
+
+    def estimate_count(self, queryset):
+        """
+        Planner row estimate on PostgreSQL; elsewhere an exact count that
+        stops at ``estimate_cap``.
+        """
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql':
+            sql, params = queryset.order_by().query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+        return queryset.order_by()[:self.estimate_cap].count()
+
+    def encode_cursor(self, row, reverse):
+        position = [self._dump(self._value(row, name)) for name, _, _ in self.keys]
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        """Return ``(position, reverse)`` of the requested cursor."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            position, reverse = payload['p'], bool(payload['r'])
+            if len(position) != len(self.keys):
+                raise ValueError(position)
+            position = [field.to_python(value) for (_, _, field), value in zip(self.keys, position)]
+        except (binascii.Error, UnicodeDecodeError, KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def _paginate_legacy(self, queryset, request, view):
+        self.legacy = self.legacy_class()
+        return self.legacy.paginate_queryset(queryset, request, view)
+
+    def _link(self, row, reverse):
+        url = replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(row, reverse))
+        return remove_query_param(url, pagination.PageNumberPagination.page_query_param)
+
+    def _after(self, position, reverse):
+        """Rows strictly after ``position`` in (possibly reversed) key order."""
+        condition = Q()
+        equal = Q()
+        for (name, descending, _), value in zip(self.keys, position):
+            lookup = 'lt' if descending ^ reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        # The bound on the leading key lets the database seek its index.
+        name, descending, _ = self.keys[0]
+        return Q(**{f"{name}__{'lte' if descending ^ reverse else 'gte'}": position[0]}) & condition
+
+    def _ordered(self, queryset, reverse):
+        return queryset.order_by(*(
+            f'-{name}' if descending ^ reverse else name for name, descending, _ in self.keys
+        ))
+
+    @staticmethod
+    def _key_field(queryset, name):
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        opts = queryset.model._meta
+        parts = name.split('__')
+        try:
+            for part in parts[:-1]:
+                relation = opts.get_field(part)
+                if not (relation.many_to_one or relation.one_to_one) or relation.null or not relation.concrete:
+                    raise KeysetUnsupported(name)
+                opts = relation.related_model._meta
+            field = opts.get_field(parts[-1])
+        except FieldDoesNotExist:
+            raise KeysetUnsupported(name)
+        if field.null or not field.concrete or field.is_relation:
+            raise KeysetUnsupported(name)
+        return field
+
+    @staticmethod
+    def _value(row, name):
+        if name == 'pk':
+            return row.pk
+        for part in name.split('__'):
+            row = getattr(row, part)
+        return row
+
+    @staticmethod
+    def _dump(value):
+        if isinstance(value, (datetime, date, time)):
+            return value.isoformat()
+        if isinstance(value, (bool, int, float, str)):
+            return value
+        return str(value)
@@ -0,0 +1,225 @@
+"""
+Full-text search index for tours, events and transfer routes.
+
+Every product is stored as one ``SearchDocument`` per translation language:
+a title plus a body of descriptive text, built by the source registered for
+its product type in ``SOURCES``. Model signals call ``SearchIndex.update``
+inside the writing transaction, so the index commits or rolls back together
+with the product.
+
+``SearchIndex.search`` ranks the matches of a query in any language with one
+query against the index, and ``SearchIndex.filter`` restricts a product
+queryset to them, annotated with ``search_rank`` (higher is better). The
+products of the queryset are matched inside that query, so apply the other
+filters first: the ``SEARCH_MAX_RESULTS`` cap then keeps the best of the
+products that pass them. Matching
+uses the GIN-indexed ``tsvector`` column on PostgreSQL and the FTS5 table on
+SQLite (see ``shared/migrations/0003_search_index.py``); other backends fall
+back to substring matching on the documents. Query terms match as prefixes.
+"""
+
+import re
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, transaction
+from django.db.models import Case, FloatField, Value, When
+from django.utils.module_loading import import_string
+
+from .models import SearchDocument
+
+
+SOURCES = {
+    'tour': 'tours.search.TourSearchSource',
+    'event': 'events.search.EventSearchSource',
+    'transfer': 'transfers.search.TransferRouteSearchSource',
+}
+
+BATCH_SIZE = 500
+MAX_TERMS = 8
+
+# Text search configuration per document language; must match the generated
+# column in shared/migrations/0003_search_index.py.
+POSTGRES_CONFIGS = {'en': 'english', 'tr': 'turkish'}
+POSTGRES_DEFAULT_CONFIG = 'simple'
+
+DOCUMENTS_TABLE = SearchDocument._meta.db_table
+FTS_TABLE = f'{DOCUMENTS_TABLE}_fts'
+
+TERM_RE = re.compile(r'\w+')
+
+
+def join_text(*parts):
+    """Join the non-empty text parts of a document body."""
+    return ' '.join(str(part) for part in parts if part)
+
+
+class SearchIndex:
+    """
+    Service class for maintaining and querying the search index.
+    """
+
+    @staticmethod
+    def source(product_type):
+        return import_string(SOURCES[product_type])
+
+    @classmethod
+    def update(cls, product_type, object_ids):
+        """
+        Rebuild the documents of the given objects from their current data.
+
+        Returns:
+            int: Number of documents written.
+        """
+        object_ids = list(set(object_ids))
+        if not object_ids:
+            return 0
+        documents = [
+            SearchDocument(product_type=product_type, object_id=object_id, language=language, title=title, body=body)
+            for object_id, language, title, body in cls.source(product_type).documents(object_ids)
+        ]
+        with transaction.atomic():
+            SearchDocument.objects.filter(product_type=product_type, object_id__in=object_ids).delete()
+            SearchDocument.objects.bulk_create(documents, batch_size=BATCH_SIZE)
+        return len(documents)
+
+    @staticmethod
+    def remove(product_type, object_ids, language=None):
+        """Drop the documents of deleted objects, or of one deleted translation."""
+        documents = SearchDocument.objects.filter(product_type=product_type, object_id__in=list(object_ids))
+        if language is not None:
+            documents = documents.filter(language=language)
+        documents.delete()
+
+    @classmethod
+    def rebuild(cls, product_types=None):
+        """
+        Reindex every object of the given product types (all by default).
+
+        Returns:
+            int: Number of documents written.
+        """
+        written = 0
+        for product_type in product_types or SOURCES:
+            model = cls.source(product_type).model
+            with transaction.atomic():
+                SearchDocument.objects.filter(product_type=product_type).delete()
+                batch = []
+                for object_id in model.objects.order_by('pk').values_list('pk', flat=True).iterator(BATCH_SIZE):
+                    batch.append(object_id)
+                    if len(batch) == BATCH_SIZE:
+                        written += cls.update(product_type, batch)
+                        batch = []
+                written += cls.update(product_type, batch)
+        return written
+
+    @staticmethod
+    def terms(query):
+        """Normalized search terms of a user query."""
+        # str.lower() turns the Turkish dotted capital I into 'i' plus a
+        # combining dot, which would split the word.
+        text = (query or '').replace('İ', 'i').lower()
+        return TERM_RE.findall(text)[:MAX_TERMS]
+
+    @classmethod
+    def search(cls, product_type, query, limit=None, using='default', candidates=None):
+        """
+        Rank the products of a type matching ``query`` in any language.
+
+        ``candidates`` is an optional queryset of the product model; only
+        its products are ranked.
+
+        Returns:
+            list: ``(object_id, rank)`` pairs, best match first, at most
+            ``limit`` (``SEARCH_MAX_RESULTS`` by default) long.
+        """
+        terms = cls.terms(query)
+        if not terms:
+            return []
+
+        connection = connections[using]
+        if connection.vendor == 'postgresql':
+            source, match, match_params, rank, rank_params = cls._postgres(terms)
+        elif connection.vendor == 'sqlite':
+            source, match, match_params, rank, rank_params = cls._sqlite(terms)
+        else:
+            source, match, match_params, rank, rank_params = cls._substring(terms)
+
+        if candidates is not None:
+            try:
+                candidate_sql, candidate_params = candidates.order_by().values('pk').query.get_compiler(
+                    using=using
+                ).as_sql()
+            except EmptyResultSet:
+                return []
+            match = f'{match} AND d.object_id IN ({candidate_sql})'
+            match_params = [*match_params, *candidate_params]
+
+        # One set-based pass over the index; a product's rank is the rank of
+        # its best matching translation.
+        sql = (
+            f'SELECT d.object_id, MAX({rank}) AS search_rank FROM {source} '
+            f'WHERE d.product_type = %s AND {match} '
+            f'GROUP BY d.object_id ORDER BY search_rank DESC, d.object_id LIMIT %s'
+        )
+        params = [*rank_params, product_type, *match_params, limit or settings.SEARCH_MAX_RESULTS]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [(uuid.UUID(str(object_id)), float(rank)) for object_id, rank in cursor.fetchall()]
+
+    @classmethod
+    def filter(cls, queryset, product_type, query):
+        """
+        Restrict ``queryset`` to products matching ``query`` in any language.
+
+        The result is annotated with ``search_rank`` (higher is better); order
+        by ``-search_rank`` for relevance. Only the best
+        ``SEARCH_MAX_RESULTS`` matches among the products of ``queryset`` are
+        kept, so filter ``queryset`` before, not after this call.
+        """
+        hits = cls.search(product_type, query, using=queryset.db, candidates=queryset)
+        if not hits:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+        search_rank = Case(
+            *(When(pk=object_id, then=Value(rank)) for object_id, rank in hits),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=[object_id for object_id, _ in hits]).annotate(search_rank=search_rank)
+
+    @staticmethod
+    def _postgres(terms):
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        configs = list(POSTGRES_CONFIGS.items())
+
+        conditions = [
+            f"(d.language = '{language}' AND d.search_vector @@ to_tsquery('{config}', %s))"
+            for language, config in configs
+        ]
+        others = ', '.join(f"'{language}'" for language, _ in configs)
+        conditions.append(
+            f"(d.language NOT IN ({others}) AND d.search_vector @@ to_tsquery('{POSTGRES_DEFAULT_CONFIG}', %s))"
+        )
+        match = f"({' OR '.join(conditions)})"
+
+        cases = ' '.join(f"WHEN '{language}' THEN to_tsquery('{config}', %s)" for language, config in configs)
+        rank = (
+            f"ts_rank_cd(d.search_vector, CASE d.language {cases} "
+            f"ELSE to_tsquery('{POSTGRES_DEFAULT_CONFIG}', %s) END)"
+        )
+        params = [tsquery] * (len(configs) + 1)
+        return f'{DOCUMENTS_TABLE} d', match, params, rank, params
+
+    @staticmethod
+    def _sqlite(terms):
+        fts_query = ' '.join(f'"{term}"*' for term in terms)
+        source = f'{FTS_TABLE} JOIN {DOCUMENTS_TABLE} d ON d.id = {FTS_TABLE}.rowid'
+        # FTS5 ranks with bm25, where lower is better.
+        return source, f'{FTS_TABLE} MATCH %s', [fts_query], f'-{FTS_TABLE}.rank', []
+
+    @staticmethod
+    def _substring(terms):
+        match = ' AND '.join('(LOWER(d.title) LIKE %s OR LOWER(d.body) LIKE %s)' for _ in terms)
+        params = [f'%{term}%' for term in terms for _ in range(2)]
+        return f'{DOCUMENTS_TABLE} d', match, params, '0.0', []
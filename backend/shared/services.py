@@ -2,72 +2,36 @@
 Shared services for Peykan Tourism Platform.
 """
 
-import requests
 from decimal import Decimal
 from django.conf import settings
 from django.core.cache import cache
 from django.utils.translation import get_language
-from typing import Dict, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
 import random
 import string
 from datetime import timedelta
 from django.utils import timezone
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
 
+from .exchange_rates import BASE_CURRENCY, ExchangeRateStore
+from .notifications import Outbox
+
 
 class CurrencyConverterService:
     """
     Service for currency conversion.
-    Uses external API for real-time rates with caching.
+    Reads preparsed rates from the published exchange rate snapshot; rates are
+    refreshed in the background by ``shared.tasks.refresh_exchange_rates``.
     """
     
-    CACHE_TIMEOUT = 3600  # 1 hour
-    BASE_CURRENCY = 'USD'
-    
-    @classmethod
-    def get_exchange_rates(cls) -> Dict[str, float]:
-        """
-        Get exchange rates from cache or API.
-        """
-        cache_key = 'exchange_rates'
-        rates = cache.get(cache_key)
-        
-        if rates is None:
-            rates = cls._fetch_exchange_rates()
-            if rates:
-                cache.set(cache_key, rates, cls.CACHE_TIMEOUT)
-        
-        return rates or {}
-    
-    @classmethod
-    def _fetch_exchange_rates(cls) -> Dict[str, float]:
-        """
-        Fetch exchange rates from external API.
-        """
-        try:
-            # Using a free exchange rate API
-            url = f"https://api.exchangerate-api.com/v4/latest/{cls.BASE_CURRENCY}"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            return data.get('rates', {})
-        except Exception as e:
-            # Fallback to mock rates for development
-            return cls._get_mock_rates()
+    BASE_CURRENCY = BASE_CURRENCY
     
     @classmethod
-    def _get_mock_rates(cls) -> Dict[str, float]:
+    def get_exchange_rates(cls) -> Dict[str, Decimal]:
         """
-        Mock exchange rates for development.
+        Get the current exchange rates against the base currency.
         """
-        return {
-            'USD': 1.0,
-            'EUR': 0.85,
-            'TRY': 15.5,
-            'IRR': 420000,
-        }
+        return ExchangeRateStore.get_table().rates
     
     @classmethod
     def convert_currency(
@@ -82,21 +46,23 @@ class CurrencyConverterService:
         if from_currency == to_currency:
             return amount
         
-        rates = cls.get_exchange_rates()
+        return amount * ExchangeRateStore.get_table().factor(from_currency, to_currency)
+    
+    @classmethod
+    def convert_many(
+        cls,
+        amounts: Iterable[Decimal],
+        from_currency: str,
+        to_currency: str
+    ) -> List[Decimal]:
+        """
+        Convert several amounts with a single rate lookup.
+        """
+        if from_currency == to_currency:
+            return list(amounts)
         
-        if from_currency == cls.BASE_CURRENCY:
-            # Converting from base currency
-            rate = rates.get(to_currency, 1.0)
-            return amount * Decimal(str(rate))
-        elif to_currency == cls.BASE_CURRENCY:
-            # Converting to base currency
-            rate = rates.get(from_currency, 1.0)
-            return amount / Decimal(str(rate))
-        else:
-            # Converting between two non-base currencies
-            from_rate = rates.get(from_currency, 1.0)
-            to_rate = rates.get(to_currency, 1.0)
-            return amount * Decimal(str(to_rate)) / Decimal(str(from_rate))
+        factor = ExchangeRateStore.get_table().factor(from_currency, to_currency)
+        return [amount * factor for amount in amounts]
     
     @classmethod
     def format_price(
@@ -210,56 +176,19 @@ class NotificationService:
     @classmethod
     def send_sms(cls, phone: str, message: str) -> bool:
         """
-        Send SMS using Kavenegar or mock service.
-        """
-        if settings.KAVENEGAR_API_KEY:
-            return cls._send_sms_kavenegar(phone, message)
-        else:
-            return cls._send_sms_mock(phone, message)
-    
-    @classmethod
-    def _send_sms_kavenegar(cls, phone: str, message: str) -> bool:
-        """
-        Send SMS using Kavenegar API.
-        """
-        try:
-            url = "https://api.kavenegar.com/v1/{}/sms/send.json".format(
-                settings.KAVENEGAR_API_KEY
-            )
-            data = {
-                'receptor': phone,
-                'message': message,
-            }
-            response = requests.post(url, data=data, timeout=10)
-            return response.status_code == 200
-        except Exception:
-            return False
-    
-    @classmethod
-    def _send_sms_mock(cls, phone: str, message: str) -> bool:
-        """
-        Mock SMS service for development.
+        Queue an SMS; ``shared.notifications`` delivers it through Kavenegar
+        or the mock backend.
         """
-        print(f"Mock SMS to {phone}: {message}")
+        Outbox.enqueue_sms(phone, message)
         return True
     
     @classmethod
     def send_email(cls, email: str, subject: str, message: str) -> bool:
         """
-        Send email.
-        """
-        try:
-            from django.core.mail import send_mail
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.EMAIL_HOST_USER,
-                recipient_list=[email],
-                fail_silently=False,
-            )
-            return True
-        except Exception:
-            return False
+        Queue an email.
+        """
+        Outbox.enqueue_email(email, subject, message)
+        return True
 
 
 class CacheService:
@@ -322,7 +251,7 @@ def generate_otp_code(length=6):
 
 
 def send_verification_email(user_email, otp_code, user_name=None):
-    """Send email verification OTP."""
+    """Queue the email verification OTP."""
     subject = 'تأیید ایمیل - پلتفرم پیکان توریسم'
     
     # HTML template for email
@@ -372,23 +301,12 @@ def send_verification_email(user_email, otp_code, user_name=None):
     تیم پیکان توریسم
     """
     
-    try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user_email],
-            html_message=html_message,
-            fail_silently=False,
-        )
-        return True
-    except Exception as e:
-        print(f"Error sending email to {user_email}: {e}")
-        return False
+    Outbox.enqueue_email(user_email, subject, message, html_body=html_message)
+    return True
 
 
 def send_password_reset_email(user_email, otp_code, user_name=None):
-    """Send password reset OTP."""
+    """Queue the password reset OTP."""
     subject = 'بازنشانی رمز عبور - پلتفرم پیکان توریسم'
     
     # HTML template for email
@@ -446,23 +364,12 @@ def send_password_reset_email(user_email, otp_code, user_name=None):
     تیم پیکان توریسم
     """
     
-    try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user_email],
-            html_message=html_message,
-            fail_silently=False,
-        )
-        return True
-    except Exception as e:
-        print(f"Error sending password reset email to {user_email}: {e}")
-        return False
+    Outbox.enqueue_email(user_email, subject, message, html_body=html_message)
+    return True
 
 
 def send_welcome_email(user_email, user_name):
-    """Send welcome email after successful registration."""
+    """Queue the welcome email after successful registration."""
     subject = 'خوش آمدید به پیکان توریسم!'
     
     # HTML template for email
@@ -527,16 +434,5 @@ def send_welcome_email(user_email, user_name):
     تیم پیکان توریسم
     """
     
-    try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user_email],
-            html_message=html_message,
-            fail_silently=False,
-        )
-        return True
-    except Exception as e:
-        print(f"Error sending welcome email to {user_email}: {e}")
-        return False 
\ No newline at end of file
+    Outbox.enqueue_email(user_email, subject, message, html_body=html_message)
+    return True 
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""
+Background tasks for shared services.
+"""
+
+from celery import shared_task
+
+from .exchange_rates import ExchangeRateStore
+from .notifications import Outbox
+
+
+@shared_task(ignore_result=True)
+def refresh_exchange_rates():
+    """Fetch exchange rates from the configured provider and publish a new snapshot."""
+    snapshot = ExchangeRateStore.refresh()
+    if snapshot is not None:
+        ExchangeRateStore.prune()
+    return snapshot.version if snapshot else None
+
+
+@shared_task(ignore_result=True)
+def deliver_notifications():
+    """Send the due messages of the notification outbox."""
+    return Outbox.deliver()
+
+
+@shared_task(ignore_result=True)
+def purge_notifications():
+    """Delete old sent messages from the notification outbox."""
+    return Outbox.purge()
@@ -0,0 +1,143 @@
+"""
+Query budgets for hot endpoints.
+
+Each endpoint is requested against a seeded dataset and must stay within its
+SQL query budget. When an optimization lowers a count, lower the budget with
+it; a test failing here means a change introduced extra queries.
+"""
+
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cart.models import Cart, CartItem
+from events.models import EventPerformance, EventSection, SectionTicketType, TicketType
+from events.tests import EventTestDataMixin
+from tours.models import TourItinerary, TourOption, TourReview, TourVariant
+from tours.tests import TourTestDataMixin
+
+User = get_user_model()
+
+
+QUERY_BUDGETS = {
+    'event-detail': 51,
+    'event-detail:cached': 1,
+    # The declared prefetch plan's 8, plus the variant capacity rows, which
+    # live in their own table and are prefetched for all schedules at once.
+    'tours:tour_detail': 9,
+    'tours:tour_schedules': 4,
+    'cart:cart_detail': 8,
+}
+
+
+@override_settings(
+    CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    },
+    # As in production, where sessions live in the shared (Redis) cache.
+    SESSION_ENGINE='django.contrib.sessions.backends.cache',
+    SESSION_CACHE_ALIAS='shared',
+    REQUEST_METRICS_HEADERS=True,
+)
+class QueryBudgetTests(TourTestDataMixin, EventTestDataMixin, TestCase):
+    """Hot endpoints must stay within their query budgets."""
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.seed()
+        self.client = APIClient()
+
+    def seed(self):
+        self.user = User.objects.create_user(username='budget', email='budget@example.com', password='pass12345')
+
+        self.create_tour_fixture(schedule_count=6)
+        TourVariant.objects.create(tour=self.tour, name='VIP', base_price=90, capacity=5)
+        for order in (1, 2):
+            TourItinerary.objects.create(
+                tour=self.tour, slug=f'stop-{order}', order=order, duration_minutes=60,
+                location='Sultanahmet', title=f'Stop {order}', description='Stop'
+            )
+        TourOption.objects.create(tour=self.tour, name='Lunch', price=15)
+        TourReview.objects.create(
+            tour=self.tour, user=self.user, rating=5, title='Great', comment='Great', is_verified=True
+        )
+
+        self.create_event_fixture(capacity=20)
+        vip_type = TicketType.objects.create(
+            event=self.event, name='VIP', ticket_type='vip', capacity=20, price_modifier=Decimal('1.50')
+        )
+        for days in range(31, 35):
+            performance_date = date.today() + timedelta(days=days)
+            performance = EventPerformance.objects.create(
+                event=self.event, date=performance_date, start_date=performance_date,
+                end_date=performance_date, start_time=time(19, 0), end_time=time(22, 0), max_capacity=20
+            )
+            for name in ('A', 'B'):
+                section = EventSection.objects.create(
+                    performance=performance, name=name, total_capacity=20,
+                    available_capacity=20, base_price=100
+                )
+                for ticket_type in (self.ticket_type, vip_type):
+                    SectionTicketType.objects.create(
+                        section=section, ticket_type=ticket_type,
+                        allocated_capacity=10, available_capacity=10
+                    )
+
+        cart = Cart.objects.create(
+            session_id='budget', user=self.user, expires_at=timezone.now() + timedelta(hours=1)
+        )
+        for schedule in self.schedules[:4]:
+            CartItem.objects.create(
+                cart=cart, product_type='tour', product_id=self.tour.id, variant_id=self.variant.id,
+                booking_date=schedule.start_date, booking_time=schedule.start_time,
+                quantity=1, unit_price=50
+            )
+        CartItem.objects.create(
+            cart=cart, product_type='event', product_id=self.event.id, variant_id=self.ticket_type.id,
+            booking_date=self.performance.date, booking_time=time(19, 0), quantity=2, unit_price=100
+        )
+
+    def assertWithinBudget(self, view_name, url):
+        budget = QUERY_BUDGETS[view_name]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        self.assertLessEqual(
+            len(queries), budget, f'{view_name} ran {len(queries)} queries (budget {budget})'
+        )
+        return response
+
+    def test_event_detail(self):
+        self.assertWithinBudget('event-detail', reverse('event-detail', args=[self.event.slug]))
+
+    def test_event_detail_cached(self):
+        url = reverse('event-detail', args=[self.event.slug])
+        self.client.get(url)
+        self.assertWithinBudget('event-detail:cached', url)
+
+    def test_tour_detail(self):
+        self.assertWithinBudget('tours:tour_detail', reverse('tours:tour_detail', args=[self.tour.slug]))
+
+    def test_tour_schedules(self):
+        self.assertWithinBudget('tours:tour_schedules', reverse('tours:tour_schedules', args=[self.tour.id]))
+
+    def test_cart_detail(self):
+        self.client.force_authenticate(self.user)
+        self.assertWithinBudget('cart:cart_detail', reverse('cart:cart_detail'))
+
+    def test_metrics_headers_match_captured_queries(self):
+        url = reverse('tours:tour_schedules', args=[self.tour.id])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(int(response['X-SQL-Count']), len(queries))
+        self.assertIn('X-Serializer-Time-Ms', response)
+        self.assertIn('X-Cache-Misses', response)
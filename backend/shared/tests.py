@@ -0,0 +1,603 @@
+import importlib
+import os
+import sys
+from decimal import Decimal
+from unittest import mock
+
+import requests
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .cache import TOUCH_IF_EQUAL_SCRIPT, TieredCache, touch_if_equal
+from .checks import check_shared_cache
+from .exchange_rates import VERSION_CACHE_KEY, ExchangeRateStore, MockExchangeRateProvider
+from .instrumentation import RequestMetrics, StatsAggregator, _current, install_cache_lookup_counting
+from .models import ExchangeRateSnapshot, OutboxMessage, SearchDocument
+from .notifications import KavenegarSMSBackend, LocMemSMSBackend, Outbox, SMSBackend
+from .search import SearchIndex
+from .services import CurrencyConverterService, NotificationService, send_verification_email
+from .throttling import RateLimiter, parse_rate
+
+
+TIERED_CACHES = {
+    'default': {
+        'BACKEND': 'shared.cache.TieredCache',
+        'OPTIONS': {'L2_ALIAS': 'shared', 'L1_MAX_ENTRIES': 2, 'L1_TIMEOUT': 30},
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tiered-cache-tests',
+    },
+}
+
+
+@override_settings(CACHES=TIERED_CACHES)
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        self.cache = caches['default']
+        self.cache.clear()
+
+    def test_reads_fall_through_to_l2_and_populate_l1(self):
+        self.assertIsInstance(self.cache, TieredCache)
+        caches['shared'].set('rate', 42)
+        stats = dict(self.cache.stats)
+
+        self.assertEqual(self.cache.get('rate'), 42)
+        self.assertEqual(self.cache.stats['l2_hits'], stats['l2_hits'] + 1)
+        caches['shared'].delete('rate')
+        # Served from L1 until it expires or is evicted.
+        self.assertEqual(self.cache.get('rate'), 42)
+        self.assertEqual(self.cache.stats['l1_hits'], stats['l1_hits'] + 1)
+
+    def test_writes_are_shared_and_l1_is_bounded(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.set('c', 3)
+        self.assertEqual(caches['shared'].get('a'), 1)
+        self.assertEqual(len(self.cache._l1), 2)
+
+        self.cache.delete('c')
+        self.assertIsNone(self.cache.get('c'))
+        self.assertIsNone(caches['shared'].get('c'))
+
+    def test_mutating_a_cached_value_does_not_leak(self):
+        value = {'items': [1]}
+        self.cache.set('payload', value)
+        value['items'].append(2)
+        self.assertEqual(self.cache.get('payload'), {'items': [1]})
+
+
+@override_settings(CACHES=TIERED_CACHES, REQUEST_METRICS_CACHE_ALIAS='shared')
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        install_cache_lookup_counting()
+
+    def metrics(self, **fields):
+        metrics = RequestMetrics()
+        for field, value in fields.items():
+            setattr(metrics, field, value)
+        return metrics
+
+    def test_cache_lookups_are_counted_once_on_every_backend(self):
+        caches['default'].set('a', 1)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            caches['default'].get('a')
+            # The miss falls through to L2 but counts once.
+            self.assertEqual(caches['default'].get('missing', 'fallback'), 'fallback')
+            caches['default'].get_many(['a', 'b'])
+            caches['shared'].get('a')
+        finally:
+            _current.reset(token)
+        self.assertEqual((metrics.cache_hits, metrics.cache_misses), (3, 2))
+
+    def test_flushes_add_deltas_and_reset_starts_over(self):
+        aggregator = StatsAggregator(flush_interval=3600)
+        other = StatsAggregator(flush_interval=3600)
+        for _ in range(2):
+            aggregator.add('GET view', self.metrics(sql_count=2))
+            aggregator.flush()
+        with mock.patch.object(StatsAggregator, 'process', 'other-host:1'):
+            other.add('GET view', self.metrics(sql_count=1))
+            other.flush()
+        stats = StatsAggregator.collect(caches['shared'])
+        self.assertEqual((stats['GET view']['requests'], stats['GET view']['sql_count']), (3, 5))
+
+        StatsAggregator.clear(caches['shared'])
+        self.assertEqual(StatsAggregator.collect(caches['shared']), {})
+        aggregator.flush()
+        aggregator.add('GET view', self.metrics(sql_count=7))
+        aggregator.flush()
+        stats = StatsAggregator.collect(caches['shared'])
+        self.assertEqual((stats['GET view']['requests'], stats['GET view']['sql_count']), (1, 7))
+
+
+class TouchIfEqualTests(TestCase):
+    def test_only_extends_matching_value(self):
+        cache = caches['shared']
+        cache.set('hold', 'alice', 10)
+        self.assertTrue(touch_if_equal(cache, 'hold', 'alice', 60))
+        self.assertFalse(touch_if_equal(cache, 'hold', 'bob', 60))
+        self.assertFalse(touch_if_equal(cache, 'missing', 'alice', 60))
+
+    def test_redis_backends_compare_and_expire_in_one_script(self):
+        from django.core.cache.backends.redis import RedisCache
+        from django_redis.cache import RedisCache as DjangoRedisCache
+
+        django_redis_cache = DjangoRedisCache('redis://localhost:6379/0', {})
+        redis_cache = RedisCache('redis://localhost:6379/0', {})
+        for cache, client, decode in (
+            (django_redis_cache, django_redis_cache.client, django_redis_cache.client.decode),
+            (redis_cache, redis_cache._cache, redis_cache._cache._serializer.loads),
+        ):
+            redis = mock.Mock(**{'eval.return_value': 1})
+            with mock.patch.object(client, 'get_client', return_value=redis):
+                self.assertTrue(touch_if_equal(cache, 'hold', 'alice', 60))
+            script, key_count, key, value, timeout = redis.eval.call_args.args
+            self.assertEqual((script, key_count, timeout), (TOUCH_IF_EQUAL_SCRIPT, 1, 60))
+            self.assertEqual(str(key), str(cache.make_key('hold')))
+            self.assertEqual(decode(value), 'alice')
+
+
+class SessionWriteTests(TestCase):
+    def test_repeat_anonymous_requests_do_not_write(self):
+        url = reverse('cart:cart_count')
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        writes = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))
+        ]
+        self.assertEqual(writes, [])
+
+
+class ExchangeRateSnapshotTests(TestCase):
+    def setUp(self):
+        cache.delete(VERSION_CACHE_KEY)
+        ExchangeRateStore.invalidate()
+
+    def test_refresh_publishes_versioned_snapshots(self):
+        first = ExchangeRateStore.refresh(MockExchangeRateProvider())
+        second = ExchangeRateStore.refresh(MockExchangeRateProvider())
+
+        self.assertEqual(second.version, first.version + 1)
+        self.assertEqual(ExchangeRateStore.get_table().version, second.version)
+        self.assertEqual(ExchangeRateSnapshot.objects.count(), 2)
+
+    def test_conversions_never_touch_the_network(self):
+        ExchangeRateStore.publish({'USD': Decimal('1'), 'EUR': Decimal('0.5'), 'TRY': Decimal('30')})
+
+        with mock.patch('shared.exchange_rates.requests.get', side_effect=AssertionError('network')):
+            self.assertEqual(CurrencyConverterService.convert_currency(Decimal('10'), 'USD', 'EUR'), Decimal('5.0'))
+            self.assertEqual(CurrencyConverterService.convert_currency(Decimal('10'), 'EUR', 'TRY'), Decimal('600'))
+            self.assertEqual(
+                CurrencyConverterService.convert_many([Decimal('1'), Decimal('2')], 'USD', 'TRY'),
+                [Decimal('30'), Decimal('60')]
+            )
+
+    def test_failed_refresh_keeps_current_snapshot(self):
+        snapshot = ExchangeRateStore.publish({'EUR': Decimal('0.9')})
+        provider = MockExchangeRateProvider()
+
+        with mock.patch.object(provider, 'fetch', side_effect=ConnectionError):
+            self.assertIsNone(ExchangeRateStore.refresh(provider))
+        self.assertEqual(ExchangeRateStore.get_table().version, snapshot.version)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class SearchIndexTests(TestCase):
+    """Search documents follow product changes and back the search endpoints."""
+
+    def setUp(self):
+        from events.models import Artist
+        from events.tests import EventTestDataMixin
+        from tours.tests import TourTestDataMixin
+        from transfers.models import TransferRoute
+
+        fixtures = type('Fixtures', (TourTestDataMixin, EventTestDataMixin), {})()
+        fixtures.create_tour_fixture(schedule_count=1)
+        fixtures.create_event_fixture()
+        self.tour, self.event = fixtures.tour, fixtures.event
+
+        # Fixtures are created in the default language, Persian.
+        self.tour.set_current_language('tr')
+        self.tour.title = 'Eski Şehir'
+        self.tour.description = 'Kapalıçarşı ve Sultanahmet gezisi'
+        self.tour.short_description = 'Gezi'
+        self.tour.save()
+
+        self.artist = Artist.objects.create(slug='sezen', name='Sezen Aksu', bio='Singer')
+        self.event.artists.add(self.artist)
+
+        self.route = TransferRoute.objects.create(
+            slug='airport-taksim', name='Airport Transfer', origin='Istanbul Airport', destination='Taksim Square'
+        )
+
+    def search(self, product_type, model, query):
+        return list(SearchIndex.filter(model.objects.all(), product_type, query).order_by('-search_rank'))
+
+    def test_documents_are_written_per_language(self):
+        languages = set(SearchDocument.objects.filter(
+            product_type='tour', object_id=self.tour.id
+        ).values_list('language', flat=True))
+        self.assertEqual(languages, {'fa', 'tr'})
+
+        from tours.models import Tour
+        self.assertEqual(self.search('tour', Tour, 'old cit'), [self.tour])
+        self.assertEqual(self.search('tour', Tour, 'ŞEHİR'), [self.tour])
+        self.assertEqual(self.search('tour', Tour, 'sultanahmet'), [self.tour])
+        self.assertEqual(self.search('tour', Tour, 'history'), [self.tour])
+        self.assertEqual(self.search('tour', Tour, 'old sultanahmet'), [])
+        self.assertEqual(self.search('tour', Tour, '  '), [])
+
+    def test_title_matches_rank_first(self):
+        from tours.models import Tour
+        other = Tour.objects.get(pk=self.tour.pk)
+        other.pk = None
+        other.slug = 'walking'
+        other.save()
+        other.set_current_language('en')
+        other.title = 'Walking'
+        other.description = 'Through the old city'
+        other.short_description = 'Walk'
+        other.save()
+
+        results = SearchIndex.filter(Tour.objects.all(), 'tour', 'city').order_by('-search_rank')
+        self.assertEqual([tour.pk for tour in results], [self.tour.pk, other.pk])
+        self.assertGreater(results[0].search_rank, results[1].search_rank)
+
+        # The result cap keeps the best matches among the filtered products.
+        Tour.objects.filter(pk=other.pk).update(price=1)
+        with self.settings(SEARCH_MAX_RESULTS=1):
+            self.assertEqual(list(SearchIndex.filter(Tour.objects.filter(slug='walking'), 'tour', 'city')), [other])
+            response = APIClient().post(reverse('tours:tour_search'), {'query': 'city', 'max_price': 1}, format='json')
+        self.assertEqual([tour['id'] for tour in response.data['results']], [str(other.pk)])
+        self.assertEqual(SearchIndex.search('tour', 'city', candidates=Tour.objects.none()), [])
+
+    def test_related_changes_reindex_products(self):
+        from events.models import Event
+        self.assertEqual(self.search('event', Event, 'aksu'), [self.event])
+
+        self.artist.name = 'Tarkan'
+        self.artist.save()
+        self.assertEqual(self.search('event', Event, 'aksu'), [])
+        self.assertEqual(self.search('event', Event, 'tarkan'), [self.event])
+
+        self.event.artists.remove(self.artist)
+        self.assertEqual(self.search('event', Event, 'tarkan'), [])
+
+        self.event.venue.name = 'Harbiye'
+        self.event.venue.save()
+        self.assertEqual(self.search('event', Event, 'harbiye'), [self.event])
+
+    def test_deleting_products_removes_documents(self):
+        self.tour.delete_translation('tr')
+        self.assertFalse(SearchDocument.objects.filter(object_id=self.tour.id, language='tr').exists())
+        self.assertTrue(SearchDocument.objects.filter(object_id=self.tour.id, language='fa').exists())
+
+        self.route.delete()
+        self.assertFalse(SearchDocument.objects.filter(product_type='transfer').exists())
+
+    def test_rebuild_restores_documents(self):
+        SearchDocument.objects.all().delete()
+        self.assertEqual(SearchIndex.rebuild(), 4)
+        self.assertEqual(SearchDocument.objects.filter(product_type='tour').count(), 2)
+
+    def test_search_endpoints_use_index(self):
+        from transfers.services import TransferRouteService
+        client = APIClient()
+
+        response = client.post(reverse('tours:tour_search'), {'query': 'eski'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([tour['id'] for tour in response.data['results']], [str(self.tour.id)])
+
+        response = client.get(reverse('event-search'), {'q': 'sezen'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([event['id'] for event in response.data['results']], [str(self.event.id)])
+
+        self.assertEqual(list(TransferRouteService.search_routes(query='taksim')), [self.route])
+
+
+class KeysetPaginationTests(TestCase):
+    """Listings page by cursor over their ordering keys."""
+
+    def setUp(self):
+        from tours.models import Tour
+        from tours.tests import TourTestDataMixin
+
+        fixtures = TourTestDataMixin()
+        fixtures.create_tour_fixture(schedule_count=0)
+        self.tours = [fixtures.tour]
+        for index, price in enumerate([30, 50, 70, 50]):
+            tour = Tour.objects.get(pk=fixtures.tour.pk)
+            tour.pk = None
+            tour.slug = f'tour-{index}'
+            tour.price = price
+            tour.save()
+            self.tours.append(tour)
+        # Identical timestamps make the primary key the deciding key.
+        Tour.objects.update(created_at=fixtures.tour.created_at)
+        self.client = APIClient()
+
+    def walk(self, response, request):
+        ids = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids.extend(tour['id'] for tour in response.data['results'])
+            if not response.data['next']:
+                return ids, response
+            response = request(response.data['next'])
+
+    def test_pages_follow_the_ordering_keys(self):
+        expected = [str(pk) for pk in sorted((tour.pk for tour in self.tours), reverse=True)]
+        response = self.client.get(reverse('tours:tour_list'), {'page_size': 2})
+        self.assertIsNone(response.data['count'])
+        self.assertIsNone(response.data['previous'])
+
+        ids, last = self.walk(response, self.client.get)
+        self.assertEqual(ids, expected)
+
+        previous = self.client.get(last.data['previous'])
+        self.assertEqual([tour['id'] for tour in previous.data['results']], expected[2:4])
+        first = self.client.get(previous.data['previous'])
+        self.assertEqual([tour['id'] for tour in first.data['results']], expected[:2])
+        self.assertIsNone(first.data['previous'])
+
+    def test_search_sorts_page_by_cursor(self):
+        url = reverse('tours:tour_search')
+        response = self.client.post(f'{url}?page_size=2', {'sort_by': 'price_desc'}, format='json')
+        ids, _ = self.walk(response, lambda link: self.client.post(link, {'sort_by': 'price_desc'}, format='json'))
+
+        expected = sorted(self.tours, key=lambda tour: (tour.price, tour.pk), reverse=True)
+        self.assertEqual(ids, [str(tour.pk) for tour in expected])
+
+    def test_counts_and_page_numbers_on_request(self):
+        url = reverse('tours:tour_list')
+        response = self.client.get(url, {'count': 'exact'})
+        self.assertEqual((response.data['count'], response.data['count_estimated']), (5, False))
+        response = self.client.get(url, {'count': 'estimate'})
+        self.assertEqual((response.data['count'], response.data['count_estimated']), (5, True))
+
+        response = self.client.get(url, {'page': 2, 'page_size': 2})
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(len(response.data['results']), 2)
+
+        self.assertEqual(self.client.get(url, {'cursor': 'garbage'}).status_code, 404)
+
+    def test_tour_list_without_paging_params_is_a_plain_array(self):
+        response = self.client.get(reverse('tours:tour_list'))
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 5)
+
+
+class FailingSMSBackend(SMSBackend):
+    def send(self, phone, message):
+        raise ConnectionError('gateway unavailable')
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    SMS_BACKEND='shared.notifications.LocMemSMSBackend',
+    NOTIFICATION_WAKE_WORKER=False,
+    NOTIFICATION_MAX_ATTEMPTS=3,
+    NOTIFICATION_RETRY_DELAY=30,
+)
+class NotificationOutboxTests(TestCase):
+    def setUp(self):
+        LocMemSMSBackend.outbox.clear()
+
+    def test_senders_only_enqueue(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertTrue(send_verification_email('user@example.com', '123456', 'Sara'))
+            self.assertTrue(NotificationService.send_sms('+989121234567', 'code 123456'))
+
+        self.assertEqual(len(callbacks), 2)
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(LocMemSMSBackend.outbox, [])
+        self.assertEqual(
+            sorted(OutboxMessage.objects.values_list('channel', 'status')), [('email', 'pending'), ('sms', 'pending')]
+        )
+
+    def test_deliver_sends_batch_over_one_connection(self):
+        for index in range(3):
+            Outbox.enqueue_email(f'user{index}@example.com', 'Subject', 'Body', html_body='<p>Body</p>')
+        Outbox.enqueue_sms('+989121234567', 'Hello')
+
+        with mock.patch('shared.notifications.get_connection', wraps=mail.get_connection) as get_connection:
+            counts = Outbox.deliver()
+
+        self.assertEqual(counts, {'sent': 4, 'retrying': 0, 'failed': 0})
+        get_connection.assert_called_once()
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [
+            'user0@example.com', 'user1@example.com', 'user2@example.com'
+        ])
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertEqual(LocMemSMSBackend.outbox, [('+989121234567', 'Hello')])
+        self.assertFalse(OutboxMessage.objects.exclude(status='sent').exists())
+        self.assertEqual(Outbox.deliver(), {'sent': 0, 'retrying': 0, 'failed': 0})
+
+    @override_settings(SMS_BACKEND='shared.tests.FailingSMSBackend')
+    def test_failures_back_off_then_fail(self):
+        message = Outbox.enqueue_sms('+989121234567', 'Hello')
+
+        self.assertEqual(Outbox.deliver()['retrying'], 1)
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('pending', 1))
+        self.assertIn('gateway unavailable', message.last_error)
+        self.assertGreater(message.next_attempt_at, message.created_at)
+        # Not due again until the backoff has passed.
+        self.assertEqual(Outbox.deliver(), {'sent': 0, 'retrying': 0, 'failed': 0})
+
+        for expected in ('retrying', 'failed'):
+            OutboxMessage.objects.filter(pk=message.pk).update(next_attempt_at=message.created_at)
+            self.assertEqual(Outbox.deliver()[expected], 1)
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('failed', 3))
+        self.assertEqual(Outbox.backoff(1).total_seconds(), 30)
+        self.assertEqual(Outbox.backoff(3).total_seconds(), 120)
+
+    @override_settings(KAVENEGAR_API_KEY='secret-api-key')
+    def test_kavenegar_errors_do_not_leak_api_key(self):
+        backend = KavenegarSMSBackend()
+        failures = [
+            mock.patch.object(backend.session, 'post', side_effect=requests.ConnectionError(
+                'Max retries exceeded with url: /v1/secret-api-key/sms/send.json'
+            )),
+            mock.patch.object(backend.session, 'post', return_value=mock.Mock(status_code=503)),
+        ]
+        for failure in failures:
+            with failure, mock.patch('shared.notifications.get_sms_backend', return_value=backend):
+                message = Outbox.enqueue_sms('+989121234567', 'Hello')
+                with self.assertLogs('shared.notifications', 'WARNING') as logs:
+                    Outbox.deliver()
+            message.refresh_from_db()
+            self.assertTrue(message.last_error)
+            self.assertNotIn('secret-api-key', message.last_error)
+            self.assertNotIn('secret-api-key', '\n'.join(logs.output))
+        self.assertIn('HTTP 503', message.last_error)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'rate-limit-tests'},
+}, RATE_LIMITS={'password_reset': {'ip': '100/m', 'target': '2/m'}, 'login': {'ip': '3/m'}})
+class RateLimitTests(TestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        RateLimiter.reset()
+        self.addCleanup(RateLimiter.reset)
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('5/m'), (5, 60))
+        self.assertEqual(parse_rate('3/10min'), (3, 600))
+        self.assertEqual(parse_rate('100/day'), (100, 86400))
+        with self.assertRaises(ValueError):
+            parse_rate('5 per minute')
+
+    def test_sliding_window(self):
+        start = 6000.0  # the start of a one-minute window
+        for offset in range(3):
+            self.assertIsNone(RateLimiter.hit('test', '3/m', now=start + offset))
+        self.assertGreater(RateLimiter.hit('test', '3/m', now=start + 3), 0)
+        # Halfway through the next window half of the previous one still counts.
+        RateLimiter.reset()
+        self.assertIsNone(RateLimiter.hit('test', '3/m', now=start + 90))
+        self.assertIsNone(RateLimiter.hit('test', '3/m', now=start + 90))
+        self.assertGreater(RateLimiter.hit('test', '3/m', now=start + 90), 0)
+        RateLimiter.reset()
+        self.assertIsNone(RateLimiter.hit('test', '3/m', now=start + 115))
+
+    def test_blocked_clients_are_rejected_without_cache_access(self):
+        for _ in range(3):
+            RateLimiter.hit('test', '3/m', now=6000.0)
+        with mock.patch.object(RateLimiter, 'cache', side_effect=AssertionError('cache used')):
+            self.assertGreater(RateLimiter.hit('test', '3/m', now=6001.0), 0)
+
+    def test_falls_back_to_process_counters_without_cache(self):
+        broken = mock.Mock(**{'get_many.side_effect': ConnectionError('cache down')})
+        with mock.patch.object(RateLimiter, 'cache', return_value=broken):
+            for _ in range(3):
+                self.assertIsNone(RateLimiter.hit('test', '3/m', now=6000.0))
+            self.assertGreater(RateLimiter.hit('test', '3/m', now=6001.0), 0)
+
+    def test_endpoint_rejects_over_limit_before_database_access(self):
+        client = APIClient()
+        url = reverse('users:forgot_password')
+        for _ in range(2):
+            client.post(url, {'email': 'Target@example.com'}, format='json')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(url, {'email': ' target@example.com'}, format='json')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(queries.captured_queries, [])
+        # Other targets from the same address are still served.
+        self.assertNotEqual(client.post(url, {'email': 'other@example.com'}, format='json').status_code, 429)
+
+    def test_blocked_target_is_not_counted_against_new_addresses(self):
+        url = reverse('users:forgot_password')
+        for index in range(3):
+            APIClient(REMOTE_ADDR=f'10.0.1.{index}').post(url, {'email': 'target@example.com'}, format='json')
+
+        with mock.patch.object(RateLimiter, 'cache', side_effect=AssertionError('cache used')):
+            response = APIClient(REMOTE_ADDR='10.0.2.1').post(url, {'email': 'target@example.com'}, format='json')
+        self.assertEqual(response.status_code, 429)
+
+    def test_limits_are_per_ip(self):
+        url = reverse('users:login')
+        for _ in range(3):
+            self.assertNotEqual(
+                APIClient(REMOTE_ADDR='10.0.0.1').post(url, {}, format='json').status_code, 429
+            )
+        self.assertEqual(APIClient(REMOTE_ADDR='10.0.0.1').post(url, {}, format='json').status_code, 429)
+        self.assertNotEqual(APIClient(REMOTE_ADDR='10.0.0.2').post(url, {}, format='json').status_code, 429)
+
+    @override_settings(RATE_LIMITS={'login': {'ip': '3/m'}, 'otp_send': {'ip': '1/m'}})
+    def test_token_and_sensitive_field_endpoints_are_limited(self):
+        # The JWT token endpoint counts against the same login limit.
+        client = APIClient(REMOTE_ADDR='10.0.0.3')
+        client.post(reverse('users:login'), {}, format='json')
+        for _ in range(2):
+            self.assertNotEqual(client.post(reverse('users:token_obtain_pair'), {}, format='json').status_code, 429)
+        self.assertEqual(client.post(reverse('users:token_obtain_pair'), {}, format='json').status_code, 429)
+
+        url = reverse('users:sensitive_field_request')
+        client.force_authenticate(get_user_model().objects.create_user(
+            username='limited', email='limited@example.com', password='pass12345'
+        ))
+        self.assertNotEqual(client.post(url, {}, format='json').status_code, 429)
+        self.assertEqual(client.post(url, {}, format='json').status_code, 429)
+
+    @override_settings(RATE_LIMITS_ENABLED=False)
+    def test_limits_can_be_disabled(self):
+        url = reverse('users:login')
+        for _ in range(5):
+            self.assertNotEqual(APIClient().post(url, {}, format='json').status_code, 429)
+
+    def test_production_settings_keep_endpoint_limits(self):
+        environ = {
+            name: 'x' for name in (
+                'SECRET_KEY', 'EMAIL_HOST', 'EMAIL_HOST_USER', 'EMAIL_HOST_PASSWORD', 'DEFAULT_FROM_EMAIL',
+                'JWT_SECRET_KEY', 'PAYMENT_SECRET_KEY', 'KAVENEGAR_API_KEY',
+            )
+        }
+        environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        self.addCleanup(sys.modules.pop, 'peykan.settings_production', None)
+        with mock.patch.dict(os.environ, environ):
+            production = importlib.import_module('peykan.settings_production')
+
+        rest_framework = production.REST_FRAMEWORK
+        self.assertIn('shared.throttling.EndpointRateThrottle', rest_framework['DEFAULT_THROTTLE_CLASSES'])
+        self.assertIn('NUM_PROXIES', rest_framework)
+        self.assertEqual(
+            rest_framework['DEFAULT_AUTHENTICATION_CLASSES'],
+            ('rest_framework_simplejwt.authentication.JWTAuthentication',)
+        )
+
+
+class SharedCacheCheckTests(TestCase):
+    def test_database_cache_is_an_error_when_atomic_cache_is_required(self):
+        caches_setting = {'shared': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 't'}}
+        with override_settings(CACHES=caches_setting, REQUIRE_ATOMIC_SHARED_CACHE=True):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['shared.E001'])
+        with override_settings(CACHES=caches_setting, REQUIRE_ATOMIC_SHARED_CACHE=False):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['shared.W001'])
+        redis = {'shared': {'BACKEND': 'django_redis.cache.RedisCache', 'LOCATION': 'redis://localhost:6379/1'}}
+        with override_settings(CACHES=redis, REQUIRE_ATOMIC_SHARED_CACHE=True):
+            self.assertEqual(check_shared_cache(None), [])
+
@@ -0,0 +1,266 @@
+"""
+Rate limiting for abuse-prone endpoints.
+
+``EndpointRateThrottle`` (a DRF throttle, installed by default) applies the
+limits configured in ``RATE_LIMITS`` for the view's ``throttle_scope``. A
+scope limits requests per client IP (``ip``), per target email, phone or
+username in the request body (``target``) and per signed-in user
+(``user``), each with a rate such as ``"5/m"`` or ``"3/10m"``. Views without
+a scope are not limited.
+
+Counts use a sliding window: the counters of the current and the previous
+fixed window, the previous one weighted by how much of it still overlaps.
+``RateLimiter`` keeps them in the shared cache, so limits hold across
+processes, and mirrors them in a small per-process table that
+
+* rejects a client this process already saw over its limit without any
+  cache round trip, and
+* keeps limiting if the shared cache is unreachable.
+
+A client this process blocked on any key (its IP, or the account a botnet
+of rotating IPs targets) is rejected before the other keys are counted.
+``RateLimitedMixin`` defers authentication until after the IP and target
+limits passed, so shed requests are answered before any database access.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.exceptions import ParseError
+from rest_framework.throttling import BaseThrottle
+
+
+logger = logging.getLogger(__name__)
+
+KEY = 'ratelimit:{name}:{window}'
+RATE_PATTERN = re.compile(r'^\s*(\d+)\s*/\s*(\d*)\s*([smhd])\w*\s*$')
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+TARGET_FIELDS = ('email', 'phone', 'username')
+
+
+def parse_rate(rate):
+    """
+    ``"<count>/<period>"`` -> ``(count, seconds)``; the period is a unit
+    (``s``, ``m``, ``h``, ``d``, or a word starting with one) with an
+    optional multiplier, e.g. ``"3/10m"``.
+
+    Raises:
+        ValueError: If the rate is malformed.
+    """
+    match = RATE_PATTERN.match(rate)
+    if not match:
+        raise ValueError(f'Invalid rate limit: {rate!r}')
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * PERIODS[unit]
+
+
+class LocalWindows:
+    """Per-process sliding window counters, bounded to ``max_entries`` keys."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, name, window):
+        """``(previous, current, blocked_until)`` of a key in ``window``."""
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is None:
+                return 0, 0, 0.0
+            entry_window, current, previous, blocked_until = entry
+            if entry_window == window:
+                return previous, current, blocked_until
+            if entry_window == window - 1:
+                return current, 0, blocked_until
+            return 0, 0, blocked_until
+
+    def update(self, name, window, previous, current, blocked_until=0.0):
+        with self.lock:
+            self.entries[name] = (window, current, previous, blocked_until)
+            self.entries.move_to_end(name)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class RateLimiter:
+    """
+    Service class for sliding window rate limits.
+    """
+
+    local = LocalWindows()
+
+    @staticmethod
+    def cache():
+        return caches['shared']
+
+    @classmethod
+    def hit(cls, name, rate, now=None):
+        """
+        Count a request against ``name`` unless it is over ``rate``.
+
+        Returns:
+            float: Seconds until the next request would be allowed, or
+            ``None`` if this one is allowed and was counted.
+        """
+        limit, period = parse_rate(rate)
+        now = time.time() if now is None else now
+        window = int(now // period)
+        overlap = 1 - (now % period) / period
+
+        previous, current, blocked_until = cls.local.get(name, window)
+        if blocked_until > now:
+            return blocked_until - now
+        if previous * overlap + current >= limit:
+            return cls._block(name, window, previous, current, limit, period, now, overlap)
+
+        keys = [KEY.format(name=name, window=window - 1), KEY.format(name=name, window=window)]
+        try:
+            cache = cls.cache()
+            counts = cache.get_many(keys)
+            shared_previous, shared_current = counts.get(keys[0], 0), counts.get(keys[1], 0)
+            if shared_previous * overlap + shared_current >= limit:
+                return cls._block(name, window, shared_previous, shared_current, limit, period, now, overlap)
+            if cache.add(keys[1], 1, 2 * period):
+                shared_current = 1
+            else:
+                shared_current = cache.incr(keys[1])
+            previous, current = max(previous, shared_previous), max(current + 1, shared_current)
+        except Exception:
+            # Fall back to this process's counters until the cache is back.
+            logger.warning('Rate limit cache unavailable; limiting per process.', exc_info=True)
+            current += 1
+        cls.local.update(name, window, previous, current)
+        return None
+
+    @classmethod
+    def blocked(cls, name, rate, now=None):
+        """
+        Seconds ``name`` is still blocked for in this process, or ``None``;
+        never touches the shared cache.
+        """
+        period = parse_rate(rate)[1]
+        now = time.time() if now is None else now
+        blocked_until = cls.local.get(name, int(now // period))[2]
+        return blocked_until - now if blocked_until > now else None
+
+    @classmethod
+    def _block(cls, name, window, previous, current, limit, period, now, overlap):
+        # The estimate drops below the limit once enough of the previous
+        # window slid out; if the current window alone is full, at its end.
+        if current < limit and previous:
+            wait = (previous * overlap + current - limit) / previous * period
+        else:
+            wait = (window + 1) * period - now
+        wait = max(wait, 1.0)
+        cls.local.update(name, window, previous, current, now + wait)
+        return wait
+
+    @classmethod
+    def reset(cls):
+        """Forget this process's counters (the shared ones expire on their own)."""
+        cls.local.clear()
+
+
+class EndpointRateThrottle(BaseThrottle):
+    """
+    Throttle requests with the ``RATE_LIMITS`` of the view's ``throttle_scope``.
+
+    ``throttle_scope`` is a scope name, or a dict of scope names by HTTP
+    method for views that serve several actions.
+    """
+
+    def __init__(self):
+        self.retry_after = None
+
+    @staticmethod
+    def get_scope(request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if isinstance(scope, dict):
+            scope = scope.get(request.method)
+        return scope
+
+    @staticmethod
+    def get_target(request):
+        try:
+            data = request.data
+        except ParseError:
+            return None
+        if not hasattr(data, 'get'):
+            return None
+        for field in TARGET_FIELDS:
+            value = data.get(field)
+            if isinstance(value, str) and value.strip():
+                return hashlib.sha1(value.strip().lower().encode()).hexdigest()[:20]
+        return None
+
+    def get_ident_for(self, kind, request):
+        if kind == 'ip':
+            return self.get_ident(request)
+        if kind == 'target':
+            return self.get_target(request)
+        if kind == 'user':
+            return request.user.pk if request.user and request.user.is_authenticated else None
+        return None
+
+    def allow_request(self, request, view):
+        if not settings.RATE_LIMITS_ENABLED:
+            return True
+        scope = self.get_scope(request, view)
+        limits = settings.RATE_LIMITS.get(scope) if scope else None
+        if not limits:
+            return True
+        # A client blocked on one key is rejected before the other keys
+        # count it, e.g. a botnet rotating IPs against one target.
+        checks = []
+        for kind in ('ip', 'target', 'user'):
+            if not limits.get(kind):
+                continue
+            if kind == 'user':
+                # Authenticates the request, so only once the others passed.
+                if not self.check(checks):
+                    return False
+                checks = []
+            ident = self.get_ident_for(kind, request)
+            if ident is not None:
+                checks.append((f'{scope}:{kind}:{ident}', limits[kind]))
+        return self.check(checks)
+
+    def check(self, checks):
+        for name, rate in checks:
+            self.retry_after = RateLimiter.blocked(name, rate)
+            if self.retry_after is not None:
+                return False
+        for name, rate in checks:
+            self.retry_after = RateLimiter.hit(name, rate)
+            if self.retry_after is not None:
+                return False
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+
+class RateLimitedMixin:
+    """
+    Authenticate only once the IP and target limits of ``throttle_scope``
+    passed, so requests over the limit never reach the database.
+    """
+
+    def perform_authentication(self, request):
+        pass
+
+    def check_throttles(self, request):
+        super().check_throttles(request)
+        # Authenticate now, as APIView.initial would have before throttling.
+        request.user
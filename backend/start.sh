@@ -9,10 +9,28 @@ done
 
 echo "Database is ready!"
 
+# Background processes share the image: "start.sh worker" runs the Celery
+# worker (notifications, cache refreshes), "start.sh beat" the scheduler
+# for CELERY_BEAT_SCHEDULE. Run exactly one beat.
+case "$1" in
+  worker)
+    echo "Starting Celery worker..."
+    exec celery -A peykan worker --loglevel=info --concurrency="${CELERY_WORKER_CONCURRENCY:-2}"
+    ;;
+  beat)
+    echo "Starting Celery beat..."
+    exec celery -A peykan beat --loglevel=info --schedule=/tmp/celerybeat-schedule
+    ;;
+esac
+
 # Run migrations
 echo "Running migrations..."
 python manage.py migrate --noinput
 
+# Build the search index on first start; signals keep it current afterwards
+echo "Building search index..."
+python manage.py rebuild_search_index --if-empty
+
 # Collect static files
 echo "Collecting static files..."
 python manage.py collectstatic --noinput --settings=peykan.settings_production
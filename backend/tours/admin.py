@@ -9,8 +9,8 @@ from django.urls import reverse
 from django.db.models import Count, Sum, Avg
 from parler.admin import TranslatableAdmin
 from .models import (
-    TourCategory, Tour, TourVariant, TourSchedule, TourItinerary, 
-    TourPricing, TourOption, TourReview, TourBooking
+    TourCategory, Tour, TourVariant, TourSchedule, TourScheduleVariantCapacity,
+    TourItinerary, TourPricing, TourOption, TourReview, TourBooking
 )
 
 
@@ -30,6 +30,15 @@ class TourScheduleInline(admin.TabularInline):
     fields = ['start_date', 'day_of_week', 'is_available', 'max_capacity']
 
 
+class TourScheduleVariantCapacityInline(admin.TabularInline):
+    """Inline admin for TourScheduleVariantCapacity."""
+    
+    model = TourScheduleVariantCapacity
+    extra = 0
+    fields = ['variant', 'total_capacity', 'booked_capacity', 'available_capacity']
+    readonly_fields = ['booked_capacity', 'available_capacity']
+
+
 class TourItineraryInline(admin.TabularInline):
     """Inline admin for TourItinerary."""
     
@@ -216,12 +225,13 @@ class TourScheduleAdmin(admin.ModelAdmin):
             'fields': ('tour', 'start_date', 'day_of_week')
         }),
         (_('Capacity'), {
-            'fields': ('max_capacity', 'variant_capacities_raw')
+            'fields': ('max_capacity',)
         }),
         (_('Status'), {
             'fields': ('is_available',)
         }),
     )
+    inlines = [TourScheduleVariantCapacityInline]
     
     def booking_count(self, obj):
         """Get number of bookings for this schedule."""
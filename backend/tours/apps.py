@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class ToursConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tours'
-    verbose_name = 'Tours' 
\ No newline at end of file
+    verbose_name = 'Tours'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
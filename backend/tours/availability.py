@@ -0,0 +1,256 @@
+"""
+Tour availability snapshot service.
+
+Maintains ``TourAvailabilitySnapshot`` rows (one per schedule × active
+variant) holding the capacity held in carts, booked and still available.
+Variants with per-schedule capacity rows are booked from those counters (see
+``tours.capacity``); for the others, confirmed orders count as booked. Cart and order signals refresh only the affected
+(tour, variant, date) key; ``rebuild`` recomputes whole tours set-based.
+Bulk operations can wrap their writes in ``TourAvailabilityService.batched()``
+so the keys they touch are refreshed together once, on commit.
+"""
+
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import TourAvailabilitySnapshot, TourSchedule, TourVariant
+
+
+# Order statuses whose items count as booked capacity.
+BOOKED_ORDER_STATUSES = ['confirmed', 'paid', 'completed']
+
+_batch = threading.local()
+
+
+class TourAvailabilityService:
+    """
+    Service class for reading and maintaining tour availability snapshots.
+    """
+
+    @staticmethod
+    def _held_totals(tour_ids, dates=None, variant_ids=None):
+        from cart.models import CartItem
+        queryset = CartItem.objects.filter(product_type='tour', product_id__in=tour_ids)
+        if dates is not None:
+            queryset = queryset.filter(booking_date__in=dates)
+        if variant_ids is not None:
+            queryset = queryset.filter(variant_id__in=variant_ids)
+        return {
+            (row['product_id'], row['variant_id'], row['booking_date']): row['total'] or 0
+            for row in queryset.values('product_id', 'variant_id', 'booking_date').annotate(total=Sum('quantity'))
+        }
+
+    @staticmethod
+    def _booked_totals(tour_ids, dates=None, variant_ids=None):
+        from orders.models import OrderItem
+        queryset = OrderItem.objects.filter(
+            product_type='tour',
+            product_id__in=tour_ids,
+            order__status__in=BOOKED_ORDER_STATUSES
+        )
+        if dates is not None:
+            queryset = queryset.filter(booking_date__in=dates)
+        if variant_ids is not None:
+            queryset = queryset.filter(variant_id__in=variant_ids)
+        return {
+            (row['product_id'], row['variant_id'], row['booking_date']): row['total'] or 0
+            for row in queryset.values('product_id', 'variant_id', 'booking_date').annotate(total=Sum('quantity'))
+        }
+
+    @staticmethod
+    def build_snapshot(schedule, variant, held, booked):
+        """
+        Build an unsaved snapshot for a schedule/variant pair.
+
+        Variants with a ``TourScheduleVariantCapacity`` row take booked and
+        available capacity from its counters, which checkout books against;
+        ``booked`` (from order items) only counts for the others.
+        """
+        counters = schedule.variant_capacities.get(str(variant.id))
+        if counters:
+            total_capacity = int(counters['total'])
+            booked = int(counters['booked'])
+            available = int(counters['available']) - held
+        else:
+            total_capacity = int(variant.capacity or 0)
+            available = total_capacity - held - booked
+        return TourAvailabilitySnapshot(
+            tour_id=schedule.tour_id,
+            schedule=schedule,
+            variant=variant,
+            booking_date=schedule.start_date,
+            total_capacity=total_capacity,
+            held_capacity=held,
+            booked_capacity=booked,
+            available_capacity=max(0, available),
+        )
+
+    @classmethod
+    def build(cls, tour_ids=None, schedule_ids=None, variant_ids=None):
+        """
+        Compute unsaved snapshots, optionally restricted to tours, schedules or
+        variants, without writing anything.
+
+        Returns:
+            tuple: The schedules covered and their snapshots.
+        """
+        schedules = TourSchedule.objects.prefetch_related('variant_capacity_rows')
+        if tour_ids is not None:
+            schedules = schedules.filter(tour_id__in=tour_ids)
+        if schedule_ids is not None:
+            schedules = schedules.filter(id__in=schedule_ids)
+        schedules = list(schedules)
+        if not schedules:
+            return [], []
+
+        affected_tour_ids = {schedule.tour_id for schedule in schedules}
+        variants = TourVariant.objects.filter(tour_id__in=affected_tour_ids, is_active=True)
+        if variant_ids is not None:
+            variants = variants.filter(id__in=variant_ids)
+        variants_by_tour = defaultdict(list)
+        for variant in variants:
+            variants_by_tour[variant.tour_id].append(variant)
+
+        dates = {schedule.start_date for schedule in schedules} if schedule_ids is not None else None
+        held_totals = cls._held_totals(affected_tour_ids, dates, variant_ids)
+        booked_totals = cls._booked_totals(affected_tour_ids, dates, variant_ids)
+
+        snapshots = []
+        for schedule in schedules:
+            for variant in variants_by_tour[schedule.tour_id]:
+                key = (schedule.tour_id, variant.id, schedule.start_date)
+                snapshots.append(cls.build_snapshot(
+                    schedule, variant, held_totals.get(key, 0), booked_totals.get(key, 0)
+                ))
+        return schedules, snapshots
+
+    @classmethod
+    def rebuild(cls, tour_ids=None, schedule_ids=None, variant_ids=None):
+        """
+        Recompute snapshots, optionally restricted to tours, schedules or variants.
+
+        Rows are upserted on (schedule, variant), so concurrent refreshes of
+        the same key cannot collide; rows of variants that are no longer
+        active are deleted.
+
+        Returns:
+            int: Number of snapshot rows written.
+        """
+        schedules, snapshots = cls.build(tour_ids, schedule_ids, variant_ids)
+        if not schedules:
+            return 0
+
+        stale = TourAvailabilitySnapshot.objects.filter(schedule__in=schedules).exclude(
+            variant_id__in={snapshot.variant_id for snapshot in snapshots}
+        )
+        if variant_ids is not None:
+            stale = stale.filter(variant_id__in=variant_ids)
+
+        with transaction.atomic():
+            stale.delete()
+            TourAvailabilitySnapshot.objects.bulk_create(
+                snapshots,
+                update_conflicts=True,
+                unique_fields=['schedule', 'variant'],
+                update_fields=[
+                    'tour', 'booking_date', 'total_capacity', 'held_capacity', 'booked_capacity',
+                    'available_capacity', 'updated_at',
+                ],
+            )
+        return len(snapshots)
+
+    @classmethod
+    def refresh_key(cls, tour_id, variant_id, booking_date):
+        """Refresh the snapshot for one (tour, variant, date) key after a change."""
+        if not tour_id or not variant_id or not booking_date:
+            return 0
+        schedule_ids = list(
+            TourSchedule.objects.filter(tour_id=tour_id, start_date=booking_date).values_list('id', flat=True)
+        )
+        if not schedule_ids:
+            return 0
+        return cls.rebuild(tour_ids=[tour_id], schedule_ids=schedule_ids, variant_ids=[variant_id])
+
+    @classmethod
+    def refresh_keys(cls, keys):
+        """Refresh many (tour, variant, date) keys with a single rebuild."""
+        keys = {key for key in keys if all(key)}
+        if not keys:
+            return 0
+        tour_ids = {key[0] for key in keys}
+        schedule_ids = list(TourSchedule.objects.filter(
+            tour_id__in=tour_ids, start_date__in={key[2] for key in keys}
+        ).values_list('id', flat=True))
+        if not schedule_ids:
+            return 0
+        return cls.rebuild(tour_ids=tour_ids, schedule_ids=schedule_ids)
+
+    @classmethod
+    def schedule_refresh(cls, keys):
+        """Refresh keys once the transaction commits, or add them to the current batch."""
+        keys = {key for key in keys if key}
+        pending = getattr(_batch, 'keys', None)
+        if pending is not None:
+            pending.update(keys)
+            return
+        for key in keys:
+            transaction.on_commit(partial(cls.refresh_key, *key))
+
+    @classmethod
+    @contextmanager
+    def batched(cls):
+        """
+        Collect the keys scheduled inside the block and refresh them with one
+        rebuild on commit. Must be used inside the transaction doing the writes.
+        """
+        if getattr(_batch, 'keys', None) is not None:
+            yield
+            return
+        _batch.keys = set()
+        try:
+            yield
+        finally:
+            keys, _batch.keys = _batch.keys, None
+        if keys:
+            transaction.on_commit(partial(cls.refresh_keys, keys))
+
+    @classmethod
+    def get_snapshots(cls, tour, schedules, variants):
+        """
+        Return snapshots for schedules × variants keyed by (schedule_id, variant_id).
+
+        Pairs with no snapshot yet (e.g. schedules created before the last
+        rebuild) are computed for the response without being stored; the
+        signals of the writes that created them store their rows.
+        """
+        schedule_ids = [schedule.id for schedule in schedules]
+        snapshots = {
+            (snapshot.schedule_id, snapshot.variant_id): snapshot
+            for snapshot in TourAvailabilitySnapshot.objects.filter(
+                tour=tour, schedule_id__in=schedule_ids
+            )
+        }
+        missing = {
+            schedule_id
+            for schedule_id in schedule_ids
+            for variant in variants
+            if (schedule_id, variant.id) not in snapshots
+        }
+        if missing:
+            for snapshot in cls.build(tour_ids=[tour.id], schedule_ids=missing)[1]:
+                snapshots.setdefault((snapshot.schedule_id, snapshot.variant_id), snapshot)
+        return snapshots
+
+    @classmethod
+    def get_snapshot(cls, schedule, variant):
+        """Return the snapshot for a single schedule/variant pair."""
+        snapshot = TourAvailabilitySnapshot.objects.filter(schedule=schedule, variant=variant).first()
+        if snapshot is None:
+            built = cls.build(tour_ids=[schedule.tour_id], schedule_ids=[schedule.id], variant_ids=[variant.id])[1]
+            snapshot = built[0] if built else None
+        return snapshot
@@ -0,0 +1,101 @@
+"""
+Per-variant schedule capacity.
+
+Counters on ``TourScheduleVariantCapacity`` are moved with conditional UPDATE
+statements (``SET booked = booked + n, available = available - n WHERE
+available >= n``), so a booking never reads-then-writes a counter and
+bookings for different variants of one schedule touch different rows.
+"""
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import TourScheduleVariantCapacity
+
+
+class InsufficientCapacity(Exception):
+    """Raised internally to roll back a partially applied booking."""
+    pass
+
+
+class VariantCapacityService:
+    """
+    Service class for booking and releasing per-variant schedule capacity.
+    """
+
+    @staticmethod
+    def _rows(pairs):
+        """Capacity rows for (schedule_id, variant_id) pairs, keyed by pair."""
+        schedule_ids = {str(schedule_id) for schedule_id, _ in pairs}
+        variant_ids = {str(variant_id) for _, variant_id in pairs}
+        rows = TourScheduleVariantCapacity.objects.filter(
+            schedule_id__in=schedule_ids, variant_id__in=variant_ids
+        ).values_list('pk', 'schedule_id', 'variant_id')
+        wanted = {(str(schedule_id), str(variant_id)) for schedule_id, variant_id in pairs}
+        return {
+            (str(schedule_id), str(variant_id)): pk
+            for pk, schedule_id, variant_id in rows
+            if (str(schedule_id), str(variant_id)) in wanted
+        }
+
+    @classmethod
+    def book_many(cls, quantities):
+        """
+        Book capacity for many (schedule_id, variant_id) pairs in one statement.
+
+        Args:
+            quantities: Dict mapping (schedule_id, variant_id) to a count.
+
+        Returns:
+            list: Pairs that did not have enough capacity. Nothing is booked
+            unless the list is empty. Pairs without a capacity row are not
+            tracked per variant and always succeed.
+        """
+        quantities = {
+            (str(schedule_id), str(variant_id)): count
+            for (schedule_id, variant_id), count in quantities.items()
+            if count > 0
+        }
+        rows = cls._rows(quantities)
+        if not rows:
+            return []
+
+        amount = Case(
+            *(When(pk=pk, then=Value(quantities[pair])) for pair, pk in rows.items()),
+            output_field=IntegerField(),
+        )
+        try:
+            with transaction.atomic():
+                updated = TourScheduleVariantCapacity.objects.filter(
+                    pk__in=rows.values(), available_capacity__gte=amount
+                ).update(
+                    booked_capacity=F('booked_capacity') + amount,
+                    available_capacity=F('available_capacity') - amount,
+                )
+                if updated != len(rows):
+                    raise InsufficientCapacity
+        except InsufficientCapacity:
+            available = dict(
+                TourScheduleVariantCapacity.objects.filter(pk__in=rows.values()).values_list(
+                    'pk', 'available_capacity'
+                )
+            )
+            return [pair for pair, pk in rows.items() if available.get(pk, 0) < quantities[pair]]
+        return []
+
+    @classmethod
+    def book(cls, schedule_id, variant_id, count=1):
+        """Book ``count`` seats of a variant on a schedule."""
+        return not cls.book_many({(schedule_id, variant_id): count})
+
+    @staticmethod
+    def release(schedule_id, variant_id, count=1):
+        """Return ``count`` booked seats of a variant on a schedule."""
+        if count <= 0:
+            return count == 0
+        return bool(TourScheduleVariantCapacity.objects.filter(
+            schedule_id=schedule_id, variant_id=variant_id, booked_capacity__gte=count
+        ).update(
+            booked_capacity=F('booked_capacity') - count,
+            available_capacity=F('available_capacity') + count,
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tours.availability import TourAvailabilityService
+from tours.models import Tour
+
+
+class Command(BaseCommand):
+    help = 'Recompute tour availability snapshots from cart and order items.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tour',
+            action='append',
+            dest='tours',
+            help='Slug of a tour to rebuild (repeatable). Rebuilds all tours by default.',
+        )
+
+    def handle(self, *args, **options):
+        tour_ids = None
+        if options['tours']:
+            tour_ids = list(Tour.objects.filter(slug__in=options['tours']).values_list('id', flat=True))
+            if not tour_ids:
+                raise CommandError('No tours found for the given slugs.')
+
+        self.stdout.write(self.style.NOTICE('Rebuilding tour availability snapshots...'))
+        count = TourAvailabilityService.rebuild(tour_ids=tour_ids)
+        self.stdout.write(self.style.SUCCESS(f'{count} availability snapshots written.'))
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.2 on 2026-10-17 03:49
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0005_rename_variant_capacities_field'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TourAvailabilitySnapshot',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Is active')),
+                ('booking_date', models.DateField(verbose_name='Booking date')),
+                ('total_capacity', models.PositiveIntegerField(default=0, verbose_name='Total capacity')),
+                ('held_capacity', models.PositiveIntegerField(default=0, verbose_name='Held capacity (carts)')),
+                ('booked_capacity', models.PositiveIntegerField(default=0, verbose_name='Booked capacity (orders)')),
+                ('available_capacity', models.PositiveIntegerField(default=0, verbose_name='Available capacity')),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_snapshots', to='tours.tourschedule', verbose_name='Schedule')),
+                ('tour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_snapshots', to='tours.tour', verbose_name='Tour')),
+                ('variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_snapshots', to='tours.tourvariant', verbose_name='Variant')),
+            ],
+            options={
+                'verbose_name': 'Tour Availability Snapshot',
+                'verbose_name_plural': 'Tour Availability Snapshots',
+                'indexes': [models.Index(fields=['tour', 'booking_date'], name='tours_toura_tour_id_92d0e8_idx')],
+                'unique_together': {('schedule', 'variant')},
+            },
+        ),
+    ]
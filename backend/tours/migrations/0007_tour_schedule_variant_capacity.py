@@ -0,0 +1,114 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:13
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def _to_int(value):
+    try:
+        return max(0, int(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def copy_json_capacities(apps, schema_editor):
+    """
+    Copy ``variant_capacities_raw`` into one row per (schedule, variant).
+
+    The JSON held either a plain total or a ``{'total', 'booked', 'available'}``
+    dict, keyed by variant ID or, in older seed data, by variant name.
+    Entries that match no variant of the schedule's tour are dropped.
+    """
+    TourSchedule = apps.get_model('tours', 'TourSchedule')
+    TourVariant = apps.get_model('tours', 'TourVariant')
+    TourScheduleVariantCapacity = apps.get_model('tours', 'TourScheduleVariantCapacity')
+
+    variants_by_tour = {}
+    for variant in TourVariant.objects.all().only('id', 'tour_id', 'name'):
+        lookup = variants_by_tour.setdefault(variant.tour_id, {})
+        lookup[str(variant.id)] = variant.id
+        lookup.setdefault(variant.name.lower(), variant.id)
+
+    rows = []
+    schedules = TourSchedule.objects.exclude(variant_capacities_raw={}).only(
+        'id', 'tour_id', 'variant_capacities_raw'
+    )
+    for schedule in schedules.iterator(chunk_size=BATCH_SIZE):
+        capacities = schedule.variant_capacities_raw
+        if not isinstance(capacities, dict):
+            continue
+        lookup = variants_by_tour.get(schedule.tour_id, {})
+        seen = set()
+        for key, value in capacities.items():
+            variant_id = lookup.get(str(key)) or lookup.get(str(key).lower())
+            if variant_id is None or variant_id in seen:
+                continue
+            seen.add(variant_id)
+            if isinstance(value, dict):
+                total = _to_int(value.get('total'))
+                booked = min(_to_int(value.get('booked')), total)
+            else:
+                total, booked = _to_int(value), 0
+            rows.append(TourScheduleVariantCapacity(
+                schedule_id=schedule.id, variant_id=variant_id, total_capacity=total,
+                booked_capacity=booked, available_capacity=total - booked
+            ))
+        if len(rows) >= BATCH_SIZE:
+            TourScheduleVariantCapacity.objects.bulk_create(rows)
+            rows = []
+    TourScheduleVariantCapacity.objects.bulk_create(rows)
+
+
+def restore_json_capacities(apps, schema_editor):
+    TourSchedule = apps.get_model('tours', 'TourSchedule')
+    TourScheduleVariantCapacity = apps.get_model('tours', 'TourScheduleVariantCapacity')
+
+    capacities = {}
+    for row in TourScheduleVariantCapacity.objects.all().iterator(chunk_size=BATCH_SIZE):
+        capacities.setdefault(row.schedule_id, {})[str(row.variant_id)] = {
+            'total': row.total_capacity,
+            'booked': row.booked_capacity,
+            'available': row.available_capacity,
+        }
+    schedules = list(TourSchedule.objects.filter(id__in=capacities))
+    for schedule in schedules:
+        schedule.variant_capacities_raw = capacities[schedule.id]
+    TourSchedule.objects.bulk_update(schedules, ['variant_capacities_raw'], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0006_tour_availability_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TourScheduleVariantCapacity',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Is active')),
+                ('total_capacity', models.PositiveIntegerField(default=0, verbose_name='Total capacity')),
+                ('booked_capacity', models.PositiveIntegerField(default=0, verbose_name='Booked capacity')),
+                ('available_capacity', models.PositiveIntegerField(default=0, verbose_name='Available capacity')),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='variant_capacity_rows', to='tours.tourschedule', verbose_name='Schedule')),
+                ('variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_capacities', to='tours.tourvariant', verbose_name='Variant')),
+            ],
+            options={
+                'verbose_name': 'Tour Schedule Variant Capacity',
+                'verbose_name_plural': 'Tour Schedule Variant Capacities',
+                'unique_together': {('schedule', 'variant')},
+            },
+        ),
+        migrations.RunPython(copy_json_capacities, restore_json_capacities),
+        migrations.RemoveField(
+            model_name='tourschedule',
+            name='variant_capacities_raw',
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0007_tour_schedule_variant_capacity'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tour',
+            index=models.Index(fields=['created_at', 'id'], name='tours_tour_created_8b6fa7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tour',
+            index=models.Index(fields=['price', 'id'], name='tours_tour_price_7b2b3c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tour',
+            index=models.Index(fields=['duration_hours', 'id'], name='tours_tour_duratio_bab251_idx'),
+        ),
+    ]
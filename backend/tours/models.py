@@ -111,6 +111,12 @@ class Tour(BaseProductModel):
     class Meta:
         verbose_name = _('Tour')
         verbose_name_plural = _('Tours')
+        # Keyset pagination keys of the tour listings and search sorts.
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['price', 'id']),
+            models.Index(fields=['duration_hours', 'id']),
+        ]
     
     def __str__(self):
         return self.title or self.slug
@@ -215,12 +221,6 @@ class TourSchedule(BaseScheduleModel):
         verbose_name=_('Day of week')
     )
     
-    # Variant capacities
-    variant_capacities_raw = models.JSONField(
-        default=dict,
-        verbose_name=_('Variant capacities')
-    )
-    
     class Meta:
         verbose_name = _('Tour Schedule')
         verbose_name_plural = _('Tour Schedules')
@@ -229,19 +229,65 @@ class TourSchedule(BaseScheduleModel):
     def __str__(self):
         return f"{self.tour.title} - {self.start_date}"
     
-    def save(self, *args, **kwargs):
-        # Ensure variant_capacities_raw keys are strings before saving
-        if self.variant_capacities_raw:
-            self.variant_capacities_raw = {str(k): v for k, v in self.variant_capacities_raw.items()}
-        super().save(*args, **kwargs)
-
     @property
     def variant_capacities(self):
-        """Safe property that always returns string keys."""
-        orig = self.variant_capacities_raw
-        if not isinstance(orig, dict):
-            return {}
-        return {str(k): v for k, v in orig.items()}
+        """
+        Capacity counters per variant ID.
+        
+        Read from ``variant_capacity_rows``; prefetch that relation when
+        serializing many schedules.
+        """
+        return {
+            str(row.variant_id): {
+                'total': row.total_capacity,
+                'booked': row.booked_capacity,
+                'available': row.available_capacity,
+            }
+            for row in self.variant_capacity_rows.all()
+        }
+
+
+class TourScheduleVariantCapacity(BaseModel):
+    """
+    Capacity of one variant on one schedule.
+    
+    Bookings move the counters of a single row with conditional updates
+    (see ``tours.capacity``), so bookings for different variants of the same
+    departure never contend for a shared row. Variants without a row on a
+    schedule are not capacity-tracked per variant.
+    """
+    
+    schedule = models.ForeignKey(
+        TourSchedule, 
+        on_delete=models.CASCADE, 
+        related_name='variant_capacity_rows',
+        verbose_name=_('Schedule')
+    )
+    variant = models.ForeignKey(
+        TourVariant, 
+        on_delete=models.CASCADE, 
+        related_name='schedule_capacities',
+        verbose_name=_('Variant')
+    )
+    
+    # Capacity counters
+    total_capacity = models.PositiveIntegerField(default=0, verbose_name=_('Total capacity'))
+    booked_capacity = models.PositiveIntegerField(default=0, verbose_name=_('Booked capacity'))
+    available_capacity = models.PositiveIntegerField(default=0, verbose_name=_('Available capacity'))
+    
+    class Meta:
+        verbose_name = _('Tour Schedule Variant Capacity')
+        verbose_name_plural = _('Tour Schedule Variant Capacities')
+        unique_together = ['schedule', 'variant']
+    
+    def __str__(self):
+        return f"{self.schedule} - {self.variant.name}: {self.available_capacity}/{self.total_capacity}"
+    
+    def save(self, *args, **kwargs):
+        # Admin and seed data set totals; booking counters move through
+        # conditional updates, which keep ``available`` in step themselves.
+        self.available_capacity = max(0, self.total_capacity - self.booked_capacity)
+        super().save(*args, **kwargs)
 
 
 class TourItinerary(BaseTranslatableModel):
@@ -553,4 +599,50 @@ class TourBooking(BaseBookingModel):
     
     @property
     def grand_total(self):
-        return self.subtotal + self.options_total 
\ No newline at end of file
+        return self.subtotal + self.options_total 
+
+class TourAvailabilitySnapshot(BaseModel):
+    """
+    Precomputed availability per schedule and variant.
+    
+    Kept up to date by cart and order signals (see ``tours.availability``)
+    so schedule listings read capacity from a single indexed query instead of
+    aggregating cart and order items per variant.
+    """
+    
+    tour = models.ForeignKey(
+        Tour, 
+        on_delete=models.CASCADE, 
+        related_name='availability_snapshots',
+        verbose_name=_('Tour')
+    )
+    schedule = models.ForeignKey(
+        TourSchedule, 
+        on_delete=models.CASCADE, 
+        related_name='availability_snapshots',
+        verbose_name=_('Schedule')
+    )
+    variant = models.ForeignKey(
+        TourVariant, 
+        on_delete=models.CASCADE, 
+        related_name='availability_snapshots',
+        verbose_name=_('Variant')
+    )
+    booking_date = models.DateField(verbose_name=_('Booking date'))
+    
+    # Capacity counters
+    total_capacity = models.PositiveIntegerField(default=0, verbose_name=_('Total capacity'))
+    held_capacity = models.PositiveIntegerField(default=0, verbose_name=_('Held capacity (carts)'))
+    booked_capacity = models.PositiveIntegerField(default=0, verbose_name=_('Booked capacity (orders)'))
+    available_capacity = models.PositiveIntegerField(default=0, verbose_name=_('Available capacity'))
+    
+    class Meta:
+        verbose_name = _('Tour Availability Snapshot')
+        verbose_name_plural = _('Tour Availability Snapshots')
+        unique_together = ['schedule', 'variant']
+        indexes = [
+            models.Index(fields=['tour', 'booking_date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.schedule} - {self.variant.name}: {self.available_capacity}"
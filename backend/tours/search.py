@@ -0,0 +1,40 @@
+"""
+Search documents for tours.
+"""
+
+from shared.search import join_text
+
+from .models import Tour, TourCategory
+
+
+class TourSearchSource:
+    """
+    Build one search document per tour translation.
+    """
+
+    model = Tour
+
+    @staticmethod
+    def documents(tour_ids):
+        """Yield ``(tour_id, language, title, body)`` for the given tours."""
+        tours = {
+            pk: (category_id, city, country)
+            for pk, category_id, city, country in Tour.objects.filter(pk__in=tour_ids).values_list(
+                'pk', 'category_id', 'city', 'country'
+            )
+        }
+        category_names = {
+            (master_id, language): name
+            for master_id, language, name in TourCategory._parler_meta.root_model.objects.filter(
+                master_id__in={category_id for category_id, _, _ in tours.values()}
+            ).values_list('master_id', 'language_code', 'name')
+        }
+        translations = Tour._parler_meta.root_model.objects.filter(master_id__in=list(tours)).values_list(
+            'master_id', 'language_code', 'title', 'short_description', 'description', 'highlights'
+        )
+        for tour_id, language, title, short_description, description, highlights in translations:
+            category_id, city, country = tours[tour_id]
+            yield tour_id, language, title, join_text(
+                short_description, description, highlights,
+                category_names.get((category_id, language)), city, country
+            )
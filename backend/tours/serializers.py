@@ -8,7 +8,7 @@ from .models import (
     Tour, TourCategory, TourVariant, TourSchedule, 
     TourOption, TourReview, TourPricing, TourItinerary
 )
-from django.db.models import Avg
+from django.db.models import Avg, Count, Prefetch, Q
 import copy
 
 
@@ -88,8 +88,11 @@ class TourScheduleSerializer(serializers.ModelSerializer):
         return cutoff_datetime.isoformat()
     
     def get_variant_capacities(self, obj):
-        """Get variant_capacities from the safe property."""
-        return obj.variant_capacities
+        """Available capacity per variant ID."""
+        return {
+            variant_id: counters['available']
+            for variant_id, counters in obj.variant_capacities.items()
+        }
 
 
 class TourReviewSerializer(serializers.ModelSerializer):
@@ -175,9 +178,29 @@ class TourDetailSerializer(serializers.ModelSerializer):
             'review_count', 'is_available_today', 'pricing_summary'
         ]
     
+    @staticmethod
+    def prefetch_plan(queryset):
+        """
+        Eager-load everything the serializer reads.
+        
+        Ratings are annotated and every relation is prefetched, so a tour
+        renders in a fixed number of queries however many variants,
+        schedules, options and reviews it has.
+        """
+        verified = Q(reviews__is_verified=True)
+        return queryset.select_related('category').annotate(
+            verified_average_rating=Avg('reviews__rating', filter=verified),
+            verified_review_count=Count('reviews', filter=verified),
+        ).prefetch_related(
+            Prefetch('variants', queryset=TourVariant.objects.prefetch_related('pricing')),
+            Prefetch('schedules', queryset=TourSchedule.objects.prefetch_related('variant_capacity_rows')),
+            Prefetch('itinerary', queryset=TourItinerary.objects.order_by('order').prefetch_related('translations')),
+            'options',
+            Prefetch('reviews', queryset=TourReview.objects.select_related('user')),
+        )
+    
     def get_itinerary(self, obj):
         """Get tour itinerary items."""
-        itinerary_items = TourItinerary.objects.filter(tour=obj).order_by('order')
         return [
             {
                 'id': str(item.id),
@@ -188,65 +211,63 @@ class TourDetailSerializer(serializers.ModelSerializer):
                 'location': item.location,
                 'image': item.image.url if item.image else None
             }
-            for item in itinerary_items
+            for item in obj.itinerary.all()
         ]
     
     def get_average_rating(self, obj):
         """Calculate average rating from reviews."""
-        avg_rating = obj.reviews.filter(is_verified=True).aggregate(
-            avg_rating=Avg('rating')
-        )['avg_rating']
+        if hasattr(obj, 'verified_average_rating'):
+            avg_rating = obj.verified_average_rating
+        else:
+            avg_rating = obj.reviews.filter(is_verified=True).aggregate(
+                avg_rating=Avg('rating')
+            )['avg_rating']
         return float(avg_rating) if avg_rating else None
     
     def get_review_count(self, obj):
         """Get count of verified reviews."""
+        if hasattr(obj, 'verified_review_count'):
+            return obj.verified_review_count
         return obj.reviews.filter(is_verified=True).count()
     
     def get_is_available_today(self, obj):
         """Check if tour is available today."""
-        return obj.is_available_today
+        from datetime import date
+        today = date.today()
+        return any(
+            schedule.is_available and schedule.start_date >= today
+            for schedule in obj.schedules.all()
+        )
     
     def get_pricing_summary(self, obj):
         summary = {}
-        for variant in obj.variants.filter(is_active=True):
+        options = [
+            {
+                'name': option.name,
+                'price': float(option.price),
+                'price_percentage': float(option.price_percentage)
+            }
+            for option in obj.options.all() if option.is_available
+        ]
+        for variant in obj.variants.all():
+            if not variant.is_active:
+                continue
             variant_data = {
                 'base_price': float(variant.base_price),
                 'age_groups': {},
-                'options': []
+                'options': copy.deepcopy(options)
             }
-            for pricing in variant.pricing.filter():
+            for pricing in variant.pricing.all():
                 variant_data['age_groups'][pricing.age_group] = {
                     'factor': float(pricing.factor),
                     'final_price': float(variant.base_price) * float(pricing.factor),
                     'is_free': pricing.is_free
                 }
-            for option in obj.options.filter(is_available=True):
-                option_data = {
-                    'name': option.name,
-                    'price': float(option.price),
-                    'price_percentage': float(option.price_percentage)
-                }
-                variant_data['options'].append(option_data)
             summary[str(variant.id)] = variant_data
         return summary
     
     def get_schedules(self, obj):
-        # Use TourScheduleSerializer to serialize each schedule safely
-        schedules = obj.schedules.all()
-        return [TourScheduleSerializer(s).data for s in schedules]
-    
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        # Patch schedules if present
-        schedules = data.get('schedules')
-        if isinstance(schedules, list):
-            for sched in schedules:
-                vc = sched.get('variant_capacities')
-                if not isinstance(vc, dict):
-                    sched['variant_capacities'] = {}
-                else:
-                    sched['variant_capacities'] = {str(k): v for k, v in vc.items()}
-        return data
+        return TourScheduleSerializer(obj.schedules.all(), many=True).data
 
 
 class TourSearchSerializer(serializers.Serializer):
@@ -278,6 +299,7 @@ class TourSearchSerializer(serializers.Serializer):
             ('rating_desc', _('Rating: High to Low')),
             ('created_desc', _('Newest First')),
             ('created_asc', _('Oldest First')),
+            ('relevance', _('Relevance')),
         ],
         required=False,
         default='created_desc'
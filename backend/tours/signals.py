@@ -0,0 +1,118 @@
+"""
+Signal handlers keeping tour availability snapshots and search documents in sync.
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from shared.search import SearchIndex
+
+from .availability import TourAvailabilityService
+from .models import Tour, TourCategory, TourSchedule, TourScheduleVariantCapacity, TourVariant
+
+
+# Tour fields, besides translations, that feed its search documents.
+SEARCH_FIELDS = {'category', 'category_id', 'city', 'country'}
+
+
+def _availability_key(item):
+    if item.product_type != 'tour':
+        return None
+    return (item.product_id, item.variant_id, item.booking_date)
+
+
+def _refresh_keys(*keys):
+    """Refresh the given (tour, variant, date) keys once the transaction commits."""
+    TourAvailabilityService.schedule_refresh(keys)
+
+
+@receiver(post_init, sender='cart.CartItem')
+@receiver(post_init, sender='orders.OrderItem')
+def remember_item_availability_key(sender, instance, **kwargs):
+    """Remember the key an item was loaded with so moves refresh both keys."""
+    instance._availability_key = _availability_key(instance)
+
+
+@receiver(post_save, sender='cart.CartItem')
+@receiver(post_save, sender='orders.OrderItem')
+@receiver(post_delete, sender='cart.CartItem')
+@receiver(post_delete, sender='orders.OrderItem')
+def refresh_item_availability(sender, instance, **kwargs):
+    """Refresh held/booked counts when a tour cart or order item changes."""
+    current_key = _availability_key(instance)
+    _refresh_keys(getattr(instance, '_availability_key', None), current_key)
+    instance._availability_key = current_key
+
+
+@receiver(post_init, sender='orders.Order')
+def remember_order_status(sender, instance, **kwargs):
+    instance._availability_status = instance.status
+
+
+@receiver(post_save, sender='orders.Order')
+def refresh_order_availability(sender, instance, created, **kwargs):
+    """Booked counts depend on order status, so refresh its tour items on transitions."""
+    if created or instance.status == getattr(instance, '_availability_status', None):
+        return
+    instance._availability_status = instance.status
+    _refresh_keys(*(
+        _availability_key(item) for item in instance.items.filter(product_type='tour')
+    ))
+
+
+@receiver(post_save, sender=TourSchedule)
+def refresh_schedule_availability(sender, instance, **kwargs):
+    """Capacities live on the schedule, so rebuild its snapshots on save."""
+    transaction.on_commit(partial(
+        TourAvailabilityService.rebuild, tour_ids=[instance.tour_id], schedule_ids=[instance.id]
+    ))
+
+
+@receiver(post_save, sender=TourScheduleVariantCapacity)
+@receiver(post_delete, sender=TourScheduleVariantCapacity)
+def refresh_variant_capacity_availability(sender, instance, **kwargs):
+    """Editing a variant's schedule capacity changes its snapshot total."""
+    transaction.on_commit(partial(
+        TourAvailabilityService.rebuild, tour_ids=[instance.schedule.tour_id],
+        schedule_ids=[instance.schedule_id], variant_ids=[instance.variant_id]
+    ))
+
+
+@receiver(post_save, sender=TourVariant)
+def refresh_variant_availability(sender, instance, **kwargs):
+    """Variant capacity and activation affect every schedule of the tour."""
+    transaction.on_commit(partial(
+        TourAvailabilityService.rebuild, tour_ids=[instance.tour_id], variant_ids=[instance.id]
+    ))
+
+
+@receiver(post_save, sender=Tour)
+def index_tour(sender, instance, update_fields=None, **kwargs):
+    """Reindex a tour unless the save skipped every indexed field."""
+    if update_fields and not SEARCH_FIELDS & set(update_fields):
+        return
+    SearchIndex.update('tour', [instance.pk])
+
+
+@receiver(post_save, sender=Tour._parler_meta.root_model)
+def index_tour_translation(sender, instance, **kwargs):
+    SearchIndex.update('tour', [instance.master_id])
+
+
+@receiver(post_delete, sender=Tour._parler_meta.root_model)
+def remove_tour_translation(sender, instance, **kwargs):
+    SearchIndex.remove('tour', [instance.master_id], instance.language_code)
+
+
+@receiver(post_delete, sender=Tour)
+def remove_tour_from_index(sender, instance, **kwargs):
+    SearchIndex.remove('tour', [instance.pk])
+
+
+@receiver(post_save, sender=TourCategory._parler_meta.root_model)
+def index_category_tours(sender, instance, **kwargs):
+    """Category names are part of the documents of its tours."""
+    SearchIndex.update('tour', Tour.objects.filter(category_id=instance.master_id).values_list('pk', flat=True))
@@ -0,0 +1,252 @@
+"""
+Tests for tour availability snapshots and per-variant schedule capacity.
+"""
+
+from datetime import date, time, timedelta
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cart.models import Cart, CartItem
+from orders.models import Order, OrderItem
+from .availability import TourAvailabilityService
+from .capacity import VariantCapacityService
+from .models import (
+    Tour, TourCategory, TourOption, TourPricing, TourVariant, TourSchedule, TourScheduleVariantCapacity,
+    TourAvailabilitySnapshot
+)
+
+User = get_user_model()
+
+
+class TourTestDataMixin:
+    """Minimal tour with variants and schedules."""
+    
+    def create_tour_fixture(self, schedule_count=3, variant_capacity=10):
+        category = TourCategory.objects.create(slug='history', name='History', description='History')
+        self.tour = Tour.objects.create(
+            slug='old-city', title='Old City', description='Walk', short_description='Walk',
+            category=category, price=50, city='Istanbul', country='Turkey',
+            duration_hours=4, pickup_time=time(8, 0), start_time=time(9, 0), end_time=time(13, 0),
+            max_participants=20, booking_cutoff_hours=0
+        )
+        self.variant = TourVariant.objects.create(
+            tour=self.tour, name='Normal', base_price=50, capacity=variant_capacity
+        )
+        self.schedules = [self.add_schedule(offset) for offset in range(1, schedule_count + 1)]
+    
+    def add_schedule(self, days_ahead):
+        start = date.today() + timedelta(days=days_ahead)
+        return TourSchedule.objects.create(
+            tour=self.tour, start_date=start, end_date=start, start_time=time(9, 0),
+            end_time=time(13, 0), max_capacity=20, day_of_week=start.weekday()
+        )
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class TourAvailabilitySnapshotTests(TourTestDataMixin, TestCase):
+    """Snapshots follow cart and order changes and serve the schedules view."""
+    
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_tour_fixture()
+        self.schedule = self.schedules[0]
+        self.cart = Cart.objects.create(session_id='availability', expires_at=timezone.now() + timedelta(hours=1))
+        self.user = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+    
+    def snapshot(self):
+        return TourAvailabilitySnapshot.objects.get(schedule=self.schedule, variant=self.variant)
+    
+    def add_cart_item(self, quantity):
+        with self.captureOnCommitCallbacks(execute=True):
+            return CartItem.objects.create(
+                cart=self.cart, product_type='tour', product_id=self.tour.id,
+                variant_id=self.variant.id, booking_date=self.schedule.start_date,
+                booking_time=self.schedule.start_time, quantity=quantity, unit_price=50
+            )
+    
+    def test_cart_items_update_held_capacity(self):
+        item = self.add_cart_item(3)
+        self.assertEqual((self.snapshot().held_capacity, self.snapshot().available_capacity), (3, 7))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            item.delete()
+        self.assertEqual((self.snapshot().held_capacity, self.snapshot().available_capacity), (0, 10))
+    
+    def test_order_status_transition_updates_booked_capacity(self):
+        order = Order.objects.create(
+            user=self.user, subtotal=100, total_amount=100,
+            customer_name='Buyer', customer_email='buyer@example.com', customer_phone='1'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            OrderItem.objects.create(
+                order=order, product_type='tour', product_id=self.tour.id, product_title='Old City',
+                product_slug='old-city', booking_date=self.schedule.start_date,
+                booking_time=self.schedule.start_time, variant_id=self.variant.id,
+                quantity=2, unit_price=50, total_price=100
+            )
+        self.assertEqual(self.snapshot().booked_capacity, 0)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = 'confirmed'
+            order.save()
+        self.assertEqual((self.snapshot().booked_capacity, self.snapshot().available_capacity), (2, 8))
+    
+    def test_capacity_rows_are_authoritative_for_booked_capacity(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            TourScheduleVariantCapacity.objects.create(schedule=self.schedule, variant=self.variant, total_capacity=6)
+        self.add_cart_item(1)
+        # Checkout books pending orders against the capacity row.
+        self.assertTrue(VariantCapacityService.book(self.schedule.id, self.variant.id, 2))
+        TourAvailabilityService.rebuild(schedule_ids=[self.schedule.id])
+        
+        snapshot = self.snapshot()
+        self.assertEqual(
+            (snapshot.total_capacity, snapshot.held_capacity, snapshot.booked_capacity, snapshot.available_capacity),
+            (6, 1, 2, 3)
+        )
+    
+    def test_rebuild_recomputes_from_items(self):
+        self.add_cart_item(4)
+        TourAvailabilitySnapshot.objects.all().delete()
+        
+        written = TourAvailabilityService.rebuild(tour_ids=[self.tour.id])
+        
+        self.assertEqual(written, len(self.schedules))
+        self.assertEqual(self.snapshot().held_capacity, 4)
+    
+    def test_rebuild_upserts_and_reads_do_not_write(self):
+        snapshot_id = self.snapshot().pk
+        TourAvailabilityService.rebuild(tour_ids=[self.tour.id])
+        TourAvailabilityService.rebuild(tour_ids=[self.tour.id])
+        self.assertEqual(self.snapshot().pk, snapshot_id)
+        
+        TourAvailabilitySnapshot.objects.filter(schedule=self.schedule).delete()
+        url = reverse('tours:tour_schedules', kwargs={'tour_id': self.tour.id})
+        with CaptureQueriesContext(connection) as queries:
+            response = APIClient().get(url)
+        self.assertEqual(response.data['schedules'][0]['variants'][0]['available_capacity'], 10)
+        self.assertFalse([query for query in queries.captured_queries if query['sql'].startswith(('INSERT', 'DELETE'))])
+    
+    def test_schedules_view_query_count_is_flat(self):
+        url = reverse('tours:tour_schedules', kwargs={'tour_id': self.tour.id})
+        client = APIClient()
+        client.get(url)
+        with CaptureQueriesContext(connection) as few:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            for offset in range(10, 20):
+                self.add_schedule(offset)
+        client.get(url)
+        with CaptureQueriesContext(connection) as many:
+            response = client.get(url)
+        
+        self.assertEqual(len(response.data['schedules']), len(self.schedules) + 10)
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+        variant_info = response.data['schedules'][0]['variants'][0]
+        self.assertEqual(variant_info['available_capacity'], 10)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class TourDetailQueryTests(TourTestDataMixin, TestCase):
+    """Tour detail renders in a fixed number of queries."""
+    
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_tour_fixture(schedule_count=1)
+        self.url = reverse('tours:tour_detail', kwargs={'slug': self.tour.slug})
+    
+    def test_query_count_does_not_grow_with_related_rows(self):
+        client = APIClient()
+        with CaptureQueriesContext(connection) as few:
+            response = client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(4):
+                variant = TourVariant.objects.create(tour=self.tour, name=f'V{index}', base_price=60, capacity=5)
+                TourPricing.objects.create(tour=self.tour, variant=variant, age_group='child', factor='0.5')
+                TourOption.objects.create(tour=self.tour, name=f'Option {index}', price=10)
+                self.add_schedule(index + 5)
+        with CaptureQueriesContext(connection) as many:
+            response = client.get(self.url)
+        
+        self.assertEqual(len(response.data['variants']), 5)
+        self.assertEqual(len(response.data['pricing_summary']), 5)
+        self.assertEqual(len(response.data['pricing_summary'][str(variant.id)]['options']), 4)
+        self.assertLessEqual(len(few.captured_queries), 9)
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class VariantCapacityTests(TourTestDataMixin, TestCase):
+    """Per-variant capacity is booked and released with conditional updates."""
+    
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_tour_fixture(schedule_count=2)
+            self.vip = TourVariant.objects.create(tour=self.tour, name='VIP', base_price=90, capacity=2)
+            for schedule in self.schedules:
+                TourScheduleVariantCapacity.objects.create(schedule=schedule, variant=self.variant, total_capacity=3)
+                TourScheduleVariantCapacity.objects.create(schedule=schedule, variant=self.vip, total_capacity=2)
+        self.schedule = self.schedules[0]
+    
+    def counters(self, variant, schedule=None):
+        return (schedule or self.schedule).variant_capacities[str(variant.id)]
+    
+    def test_book_and_release_move_counters(self):
+        self.assertTrue(VariantCapacityService.book(self.schedule.id, self.variant.id, 2))
+        self.assertFalse(VariantCapacityService.book(self.schedule.id, self.variant.id, 2))
+        self.assertEqual(self.counters(self.variant), {'total': 3, 'booked': 2, 'available': 1})
+        
+        self.assertTrue(VariantCapacityService.release(self.schedule.id, self.variant.id, 2))
+        self.assertFalse(VariantCapacityService.release(self.schedule.id, self.variant.id, 1))
+        self.assertEqual(self.counters(self.variant), {'total': 3, 'booked': 0, 'available': 3})
+    
+    def test_book_many_is_all_or_nothing(self):
+        other = self.schedules[1]
+        shortages = VariantCapacityService.book_many({
+            (self.schedule.id, self.variant.id): 3,
+            (self.schedule.id, self.vip.id): 3,
+            (other.id, self.variant.id): 1,
+        })
+        
+        self.assertEqual(shortages, [(str(self.schedule.id), str(self.vip.id))])
+        self.assertEqual(self.counters(self.variant)['booked'], 0)
+        self.assertEqual(self.counters(self.variant, other)['booked'], 0)
+        
+        # One lookup and one UPDATE, inside a savepoint.
+        with self.assertNumQueries(4):
+            shortages = VariantCapacityService.book_many({
+                (self.schedule.id, self.variant.id): 3,
+                (self.schedule.id, self.vip.id): 2,
+                (other.id, self.variant.id): 1,
+            })
+        self.assertEqual(shortages, [])
+        self.assertEqual(self.counters(self.vip)['available'], 0)
+        self.assertEqual(self.counters(self.variant, other)['available'], 2)
+    
+    def test_snapshot_total_follows_capacity_row(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            row = TourScheduleVariantCapacity.objects.get(schedule=self.schedule, variant=self.vip)
+            row.total_capacity = 7
+            row.save()
+        
+        snapshot = TourAvailabilitySnapshot.objects.get(schedule=self.schedule, variant=self.vip)
+        self.assertEqual(snapshot.total_capacity, 7)
+        self.assertEqual(row.available_capacity, 7)
@@ -8,10 +8,15 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Avg, Count, Sum
+from django.db.models import Q, Avg, Count, Sum, FloatField, Value
+from django.db.models.functions import Coalesce
 from datetime import date, timedelta
 
+from shared.pagination import KeysetPagination
+from shared.search import SearchIndex
+
 from .models import Tour, TourCategory, TourVariant, TourSchedule, TourOption, TourReview, TourPricing
+from .availability import TourAvailabilityService
 from .serializers import (
     TourListSerializer, TourDetailSerializer, TourCategorySerializer,
     TourVariantSerializer, TourOptionSerializer, TourScheduleSerializer,
@@ -44,23 +49,35 @@ class TourListView(generics.ListAPIView):
     serializer_class = TourListSerializer
     permission_classes = [permissions.AllowAny]
     queryset = Tour.objects.all()  # Remove is_active filter temporarily
-    pagination_class = None
+    pagination_class = KeysetPagination
     filter_backends = []
     search_fields = []
     ordering_fields = []
+    
+    @property
+    def paginator(self):
+        """
+        Page only when the client asks for it; existing clients get the
+        plain array of all tours they always got.
+        """
+        paging_params = {
+            KeysetPagination.cursor_query_param, KeysetPagination.page_size_query_param,
+            KeysetPagination.count_query_param, KeysetPagination.legacy_class.page_query_param,
+        }
+        if paging_params.isdisjoint(self.request.query_params):
+            return None
+        return super().paginator
 
 
 class TourDetailView(generics.RetrieveAPIView):
     """Get tour details by slug."""
     
-    queryset = Tour.objects.filter(is_active=True).select_related('category')
     serializer_class = TourDetailSerializer
     permission_classes = [permissions.AllowAny]
     lookup_field = 'slug'
     
-    def get_object(self):
-        slug = self.kwargs.get('slug')
-        return get_object_or_404(Tour, slug=slug, is_active=True)
+    def get_queryset(self):
+        return TourDetailSerializer.prefetch_plan(Tour.objects.filter(is_active=True))
 
 
 class TourSearchView(APIView):
@@ -76,23 +93,14 @@ class TourSearchView(APIView):
         queryset = Tour.objects.filter(is_active=True).select_related('category')
         
         # Apply search filters
-        if data.get('query'):
-            query = data['query']
-            queryset = queryset.filter(
-                Q(title__icontains=query) |
-                Q(description__icontains=query) |
-                Q(short_description__icontains=query) |
-                Q(highlights__icontains=query)
-            )
-        
         if data.get('category'):
             queryset = queryset.filter(category_id=data['category'])
         
         if data.get('min_price'):
-            queryset = queryset.filter(base_price__gte=data['min_price'])
+            queryset = queryset.filter(price__gte=data['min_price'])
         
         if data.get('max_price'):
-            queryset = queryset.filter(base_price__lte=data['max_price'])
+            queryset = queryset.filter(price__lte=data['max_price'])
         
         if data.get('min_duration'):
             queryset = queryset.filter(duration_hours__gte=data['min_duration'])
@@ -118,19 +126,26 @@ class TourSearchView(APIView):
         if data.get('includes_meal') is not None:
             queryset = queryset.filter(includes_meal=data['includes_meal'])
         
-        # Apply sorting
-        sort_by = data.get('sort_by', 'created_desc')
-        if sort_by == 'price_asc':
-            queryset = queryset.order_by('base_price')
+        # Full-text match last, so its result cap applies to filtered tours
+        if data.get('query'):
+            queryset = SearchIndex.filter(queryset, 'tour', data['query'])
+        
+        # Apply sorting; every sort key is non-null so results can be
+        # paged by cursor.
+        sort_by = data.get('sort_by') or ('relevance' if data.get('query') else 'created_desc')
+        if sort_by == 'relevance' and data.get('query'):
+            queryset = queryset.order_by('-search_rank', '-created_at')
+        elif sort_by == 'price_asc':
+            queryset = queryset.order_by('price')
         elif sort_by == 'price_desc':
-            queryset = queryset.order_by('-base_price')
+            queryset = queryset.order_by('-price')
         elif sort_by == 'duration_asc':
             queryset = queryset.order_by('duration_hours')
         elif sort_by == 'duration_desc':
             queryset = queryset.order_by('-duration_hours')
         elif sort_by == 'rating_desc':
             queryset = queryset.annotate(
-                avg_rating=Avg('reviews__rating')
+                avg_rating=Coalesce(Avg('reviews__rating'), Value(0.0), output_field=FloatField())
             ).order_by('-avg_rating')
         elif sort_by == 'created_asc':
             queryset = queryset.order_by('created_at')
@@ -138,10 +153,8 @@ class TourSearchView(APIView):
             queryset = queryset.order_by('-created_at')
         
         # Paginate results
-        from rest_framework.pagination import PageNumberPagination
-        paginator = PageNumberPagination()
-        paginator.page_size = 20
-        page = paginator.paginate_queryset(queryset, request)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
         
         serializer = TourListSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
@@ -156,7 +169,9 @@ class TourScheduleListView(generics.ListAPIView):
     def get_queryset(self):
         tour_slug = self.kwargs.get('tour_slug')
         tour = get_object_or_404(Tour, slug=tour_slug, is_active=True)
-        return tour.schedules.filter(is_available=True)
+        return tour.schedules.filter(is_available=True).select_related('tour').prefetch_related(
+            'variant_capacity_rows'
+        )
 
 
 class TourReviewListView(generics.ListAPIView):
@@ -357,50 +372,28 @@ def tour_schedules_view(request, tour_id):
         is_available=True
     ).order_by('start_date')
     
+    schedules = list(schedules)
+    variants = list(tour.variants.filter(is_active=True))
+    snapshots = TourAvailabilityService.get_snapshots(tour, schedules, variants)
+    
     schedule_data = []
     for schedule in schedules:
-        # Get variant capacity information
+        # Get variant capacity information from the precomputed snapshots
         variants_info = []
-        for variant in tour.variants.filter(is_active=True):
-            variant_capacity = schedule.variant_capacities.get(str(variant.id), variant.capacity)
-            
-            # Calculate booked capacity for this variant on this schedule
-            from cart.models import CartItem
-            from orders.models import OrderItem
-            
-            # Count items in carts (temporary reservations)
-            cart_bookings = CartItem.objects.filter(
-                product_type='tour',
-                product_id=tour.id,
-                variant_id=variant.id,
-                booking_date=schedule.start_date
-            ).aggregate(
-                total=Sum('quantity')
-            )['total'] or 0
-            
-            # Count confirmed orders
-            order_bookings = OrderItem.objects.filter(
-                product_type='tour',
-                product_id=tour.id,
-                variant_id=variant.id,
-                booking_date=schedule.start_date,
-                order__status__in=['confirmed', 'paid', 'completed']
-            ).aggregate(
-                total=Sum('quantity')
-            )['total'] or 0
-            
-            booked_capacity = cart_bookings + order_bookings
-            available_capacity = max(0, variant_capacity - booked_capacity)
+        for variant in variants:
+            snapshot = snapshots.get((schedule.id, variant.id))
+            if snapshot is None:
+                continue
             
             variants_info.append({
                 'id': str(variant.id),
                 'name': variant.name,
                 'description': variant.description,
                 'base_price': float(variant.base_price),
-                'total_capacity': variant_capacity,
-                'booked_capacity': booked_capacity,
-                'available_capacity': available_capacity,
-                'is_available': available_capacity > 0,
+                'total_capacity': snapshot.total_capacity,
+                'booked_capacity': snapshot.held_capacity + snapshot.booked_capacity,
+                'available_capacity': snapshot.available_capacity,
+                'is_available': snapshot.available_capacity > 0,
                 'includes_transfer': variant.includes_transfer,
                 'includes_guide': variant.includes_guide,
                 'includes_meal': variant.includes_meal,
@@ -480,34 +473,11 @@ def check_tour_availability_view(request):
     # Calculate total participants requested
     total_participants = participants['adult'] + participants['child'] + participants['infant']
     
-    # Check variant capacity
-    variant_capacity = schedule.variant_capacities.get(str(variant.id), variant.capacity)
-    
-    # Calculate current bookings
-    from cart.models import CartItem
-    from orders.models import OrderItem
-    
-    cart_bookings = CartItem.objects.filter(
-        product_type='tour',
-        product_id=tour.id,
-        variant_id=variant.id,
-        booking_date=schedule.start_date
-    ).aggregate(
-        total=Sum('quantity')
-    )['total'] or 0
-    
-    order_bookings = OrderItem.objects.filter(
-        product_type='tour',
-        product_id=tour.id,
-        variant_id=variant.id,
-        booking_date=schedule.start_date,
-        order__status__in=['confirmed', 'paid', 'completed']
-    ).aggregate(
-        total=Sum('quantity')
-    )['total'] or 0
-    
-    booked_capacity = cart_bookings + order_bookings
-    available_capacity = max(0, variant_capacity - booked_capacity)
+    # Check variant capacity against the precomputed snapshot
+    snapshot = TourAvailabilityService.get_snapshot(schedule, variant)
+    variant_capacity = snapshot.total_capacity
+    booked_capacity = snapshot.held_capacity + snapshot.booked_capacity
+    available_capacity = snapshot.available_capacity
     
     # Check if requested participants fit
     if total_participants > available_capacity:
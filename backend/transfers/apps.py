@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class TransfersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'transfers'
-    verbose_name = 'Transfers' 
\ No newline at end of file
+    verbose_name = 'Transfers'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
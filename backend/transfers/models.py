@@ -13,6 +13,15 @@ from parler.models import TranslatedFields
 import uuid
 
 
+def time_category(hour):
+    """Time category of a pickup hour: ``peak``, ``midnight`` or ``normal``."""
+    if 7 <= hour <= 9 or 17 <= hour <= 19:
+        return 'peak'
+    elif 22 <= hour <= 23 or 0 <= hour <= 6:
+        return 'midnight'
+    return 'normal'
+
+
 class TransferRoute(BaseTranslatableModel):
     """
     Simple transfer routes with origin and destination.
@@ -123,9 +132,10 @@ class TransferRoute(BaseTranslatableModel):
     
     def calculate_time_surcharge(self, base_price, hour):
         """Calculate time-based surcharge."""
-        if 7 <= hour <= 9 or 17 <= hour <= 19:  # Peak hours
+        category = time_category(hour)
+        if category == 'peak':
             return base_price * (Decimal(str(self.peak_hour_surcharge)) / Decimal('100'))
-        elif 22 <= hour <= 23 or 0 <= hour <= 6:  # Midnight
+        elif category == 'midnight':
             return base_price * (Decimal(str(self.midnight_surcharge)) / Decimal('100'))
         else:  # Normal hours
             return Decimal('0.00')
@@ -248,57 +258,33 @@ class TransferRoutePricing(BaseModel):
             # Default to transfer pricing
             return self._calculate_transfer_price(**kwargs)
     
-    def _calculate_transfer_price(self, hour=None, is_round_trip=False, selected_options=None, **kwargs):
-        """Calculate transfer-specific pricing."""
-        base_price = Decimal(str(self.base_price))
-        
-        # Time-based surcharges
-        time_surcharge = Decimal('0.00')
-        if hour is not None:
-            time_surcharge = self.route.calculate_time_surcharge(base_price, hour)
-        
-        # Round trip discount
-        round_trip_discount = Decimal('0.00')
-        if is_round_trip and self.route.round_trip_discount_enabled:
-            total_before_discount = base_price + time_surcharge
-            round_trip_discount = total_before_discount * (Decimal(str(self.route.round_trip_discount_percentage)) / Decimal('100'))
+    def _calculate_transfer_price(self, hour=None, is_round_trip=False, selected_options=None, options=None,
+                                  table=None, **kwargs):
+        """
+        Calculate transfer-specific pricing.
         
-        # Options calculation
-        options_total = Decimal('0.00')
-        options_breakdown = []
-        if selected_options:
-            for option_data in selected_options:
-                option_id = option_data.get('option_id')
-                quantity = int(option_data.get('quantity', 1))
-                
-                try:
-                    from .models import TransferOption
-                    option = TransferOption.objects.get(id=option_id, is_active=True)
-                    option_price = option.calculate_price(base_price)
-                    option_total = Decimal(str(option_price)) * quantity
-                    options_total += option_total
-                    options_breakdown.append({
-                        'option_id': str(option.id),
-                        'name': str(option.name),
-                        'price': float(option_price),
-                        'quantity': quantity,
-                        'total': float(option_total)
-                    })
-                except TransferOption.DoesNotExist:
-                    continue
+        ``options`` may hold pre-fetched active TransferOption instances keyed by
+        their string id; otherwise all selected options are loaded in one query.
+        ``table`` may hold this pricing's price table from TransferQuoteEngine.
+        """
+        from .quotes import TransferQuoteEngine
         
-        # Final calculation
-        subtotal = base_price + time_surcharge
-        final_price = subtotal + options_total - round_trip_discount
+        quote = TransferQuoteEngine.quote(
+            self, hour=hour, is_round_trip=is_round_trip, selected_options=selected_options, options=options,
+            table=table
+        )
         
         return {
-            'base_price': float(base_price),
-            'time_surcharge': float(time_surcharge),
-            'round_trip_discount': float(round_trip_discount),
-            'options_total': float(options_total),
-            'subtotal': float(subtotal),
-            'final_price': float(final_price),
-            'options_breakdown': options_breakdown,
+            'base_price': float(quote['base_price']),
+            'time_surcharge': float(quote['time_surcharge']),
+            'round_trip_discount': float(quote['round_trip_discount']),
+            'options_total': float(quote['options_total']),
+            'subtotal': float(quote['subtotal']),
+            'final_price': float(quote['final_price']),
+            'options_breakdown': [
+                dict(option, price=float(option['price']), total=float(option['total']))
+                for option in quote['options_breakdown']
+            ],
             'pricing_type': 'transfer',
             'calculation_method': 'base_plus_surcharges'
         }
@@ -0,0 +1,202 @@
+"""
+Precomputed price tables for transfer quotes.
+
+The price of a transfer only depends on the route's surcharge and discount
+settings, the vehicle's base price, the pickup hour and whether it is a round
+trip. ``TransferQuoteEngine`` computes, for each route pricing (route ×
+vehicle type), a table of the 24 pickup hours with their time category,
+surcharge and round-trip discount, and keeps it in the cache. A quote is then
+a table lookup plus the selected options, which are resolved with one query
+for all of them.
+
+Tables are cached under a per-route version that the signals in
+``transfers.signals`` bump whenever the route or one of its pricings is saved
+or deleted, so stale tables are never read. The versions live in the
+``shared`` cache so every process sees a bump at once. All amounts are ``Decimal`` and
+computed exactly as ``TransferRoute.calculate_time_surcharge`` does; only the
+legacy float breakdown of ``TransferRoutePricing.calculate_price`` converts.
+"""
+
+import uuid
+from decimal import Decimal
+
+from django.core.cache import cache, caches
+
+from .models import TransferOption, time_category
+
+
+TABLE_KEY = 'transfer_quote_table:{pricing_id}:{version}'
+ROUTE_VERSION_KEY = 'transfer_quote_version:{route_id}'
+
+ZERO = Decimal('0.00')
+HUNDRED = Decimal('100')
+
+
+class TransferQuoteEngine:
+    """
+    Service class for quoting transfers from cached price tables.
+    """
+
+    @staticmethod
+    def _versions_cache():
+        return caches['shared']
+
+    @classmethod
+    def _route_versions(cls, route_ids):
+        keys = {ROUTE_VERSION_KEY.format(route_id=route_id): route_id for route_id in set(route_ids)}
+        if not keys:
+            return {}
+        versions_cache = cls._versions_cache()
+        versions = versions_cache.get_many(list(keys))
+        for key in keys.keys() - versions.keys():
+            versions_cache.add(key, uuid.uuid4().hex, None)
+            versions[key] = versions_cache.get(key)
+        return {route_id: versions[key] for key, route_id in keys.items()}
+
+    @classmethod
+    def invalidate_route(cls, route_id):
+        """Drop the cached tables of every pricing of a route."""
+        cls._versions_cache().set(ROUTE_VERSION_KEY.format(route_id=route_id), uuid.uuid4().hex, None)
+
+    @staticmethod
+    def build_table(pricing):
+        """
+        Price table of a route pricing.
+
+        Returns:
+            dict: ``base_price``, ``round_trip_rate`` and ``hours``, a list of
+            ``(category, surcharge_percentage, surcharge, round_trip_discount)``
+            for each pickup hour.
+        """
+        route = pricing.route
+        base_price = Decimal(str(pricing.base_price))
+        percentages = {
+            'peak': Decimal(str(route.peak_hour_surcharge)),
+            'midnight': Decimal(str(route.midnight_surcharge)),
+            'normal': ZERO,
+        }
+        round_trip_rate = ZERO
+        if route.round_trip_discount_enabled:
+            round_trip_rate = Decimal(str(route.round_trip_discount_percentage)) / HUNDRED
+
+        hours = []
+        for hour in range(24):
+            category = time_category(hour)
+            surcharge = ZERO
+            if category != 'normal':
+                surcharge = base_price * (percentages[category] / HUNDRED)
+            hours.append((category, percentages[category], surcharge, (base_price + surcharge) * round_trip_rate))
+        return {'base_price': base_price, 'round_trip_rate': round_trip_rate, 'hours': hours}
+
+    @classmethod
+    def tables(cls, pricings):
+        """
+        Price tables of many route pricings, built for those not cached yet.
+
+        Returns:
+            dict: Pricing ID -> table.
+        """
+        pricings = list(pricings)
+        versions = cls._route_versions(pricing.route_id for pricing in pricings if pricing.pk is not None)
+        keys = {}
+        tables = {}
+        for pricing in pricings:
+            if pricing.pk is None:
+                tables[pricing.pk] = cls.build_table(pricing)
+                continue
+            keys[TABLE_KEY.format(pricing_id=pricing.pk, version=versions[pricing.route_id])] = pricing
+
+        cached = cache.get_many(list(keys)) if keys else {}
+        missing = {}
+        for key, pricing in keys.items():
+            if key in cached:
+                tables[pricing.pk] = cached[key]
+            else:
+                tables[pricing.pk] = missing[key] = cls.build_table(pricing)
+        if missing:
+            cache.set_many(missing, None)
+        return tables
+
+    @classmethod
+    def table(cls, pricing):
+        return cls.tables([pricing])[pricing.pk]
+
+    @staticmethod
+    def option_ids(selected_options):
+        """Valid option UUIDs referenced by ``selected_options``."""
+        ids = set()
+        for option_data in selected_options or []:
+            option_id = option_data.get('option_id') if isinstance(option_data, dict) else None
+            try:
+                ids.add(uuid.UUID(str(option_id)))
+            except (TypeError, ValueError):
+                continue
+        return ids
+
+    @staticmethod
+    def load_options(option_ids):
+        """
+        Active options by string ID, with their translations, in one query.
+        """
+        if not option_ids:
+            return {}
+        options = TransferOption.objects.filter(is_active=True).prefetch_related('translations').in_bulk(option_ids)
+        return {str(pk): option for pk, option in options.items()}
+
+    @classmethod
+    def quote(cls, pricing, hour=None, is_round_trip=False, selected_options=None, options=None, table=None):
+        """
+        Decimal price breakdown of a transfer.
+
+        ``options`` may hold pre-fetched active options keyed by string ID and
+        ``table`` the pricing's price table; whatever is not given is loaded.
+        Unknown or inactive options are skipped.
+
+        Returns:
+            dict: ``base_price``, ``time_surcharge``, ``round_trip_discount``,
+            ``options_total``, ``subtotal`` and ``final_price`` as ``Decimal``,
+            plus ``options_breakdown``, ``time_category`` and
+            ``surcharge_percentage``.
+        """
+        table = table or cls.table(pricing)
+        base_price = table['base_price']
+        if hour is not None and 0 <= hour < 24:
+            category, percentage, time_surcharge, round_trip_discount = table['hours'][hour]
+        else:
+            category, percentage, time_surcharge = 'normal', ZERO, ZERO
+            round_trip_discount = base_price * table['round_trip_rate']
+        if not is_round_trip:
+            round_trip_discount = ZERO
+
+        if options is None and selected_options:
+            options = cls.load_options(cls.option_ids(selected_options))
+        options_total = ZERO
+        options_breakdown = []
+        for option_data in selected_options or []:
+            option = options.get(str(option_data.get('option_id')))
+            if option is None:
+                continue
+            quantity = int(option_data.get('quantity', 1))
+            option_price = Decimal(str(option.calculate_price(base_price)))
+            option_total = option_price * quantity
+            options_total += option_total
+            options_breakdown.append({
+                'option_id': str(option.id),
+                'name': str(option.name),
+                'price': option_price,
+                'quantity': quantity,
+                'total': option_total,
+            })
+
+        subtotal = base_price + time_surcharge
+        return {
+            'base_price': base_price,
+            'time_surcharge': time_surcharge,
+            'round_trip_discount': round_trip_discount,
+            'options_total': options_total,
+            'subtotal': subtotal,
+            'final_price': subtotal + options_total - round_trip_discount,
+            'options_breakdown': options_breakdown,
+            'time_category': category,
+            'surcharge_percentage': percentage,
+        }
@@ -0,0 +1,31 @@
+"""
+Search documents for transfer routes.
+"""
+
+from shared.search import join_text
+
+from .models import TransferRoute
+
+
+class TransferRouteSearchSource:
+    """
+    Build one search document per transfer route translation.
+    """
+
+    model = TransferRoute
+
+    @staticmethod
+    def documents(route_ids):
+        """Yield ``(route_id, language, title, body)`` for the given routes."""
+        routes = {
+            pk: (origin, destination)
+            for pk, origin, destination in TransferRoute.objects.filter(pk__in=route_ids).values_list(
+                'pk', 'origin', 'destination'
+            )
+        }
+        translations = TransferRoute._parler_meta.root_model.objects.filter(master_id__in=list(routes)).values_list(
+            'master_id', 'language_code', 'name', 'description'
+        )
+        for route_id, language, name, description in translations:
+            origin, destination = routes[route_id]
+            yield route_id, language, name or f"{origin} → {destination}", join_text(description, origin, destination)
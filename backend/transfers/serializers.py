@@ -3,6 +3,7 @@ DRF Serializers for Transfers app.
 """
 
 from rest_framework import serializers
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from .models import (
     TransferRoute, TransferRoutePricing, TransferOption, TransferBooking
@@ -187,6 +188,32 @@ class TransferPriceCalculationSerializer(serializers.Serializer):
         return attrs
 
 
+class TransferQuoteItemSerializer(serializers.Serializer):
+    """Serializer for one quote of a batch; routes and pricings are looked up in bulk."""
+    
+    route_id = serializers.UUIDField()
+    vehicle_type = serializers.CharField()
+    booking_time = serializers.TimeField()
+    return_time = serializers.TimeField(required=False, allow_null=True)
+    selected_options = serializers.ListField(
+        child=serializers.DictField(),
+        required=False,
+        default=list
+    )
+
+
+class TransferQuoteBatchSerializer(serializers.Serializer):
+    """Serializer for batch price calculation; items are validated one by one."""
+    
+    quotes = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+    
+    def validate_quotes(self, value):
+        limit = settings.TRANSFER_QUOTE_BATCH_LIMIT
+        if len(value) > limit:
+            raise serializers.ValidationError(_('At most %(limit)d quotes per request.') % {'limit': limit})
+        return value
+
+
 class TransferPriceResponseSerializer(serializers.Serializer):
     """Serializer for transfer price calculation response."""
     
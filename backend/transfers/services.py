@@ -2,14 +2,16 @@
 Transfer services for business logic separation.
 """
 
-from decimal import Decimal, InvalidOperation
+from decimal import InvalidOperation
 from datetime import datetime, timedelta
-from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 import logging
 
+from shared.search import SearchIndex
+
 from .models import TransferRoute, TransferRoutePricing, TransferOption, TransferBooking
+from .quotes import TransferQuoteEngine, time_category
 
 logger = logging.getLogger(__name__)
 
@@ -18,14 +20,23 @@ class TransferPricingService:
     """Service for transfer pricing calculations."""
     
     @staticmethod
-    def calculate_price(route, pricing, booking_time, return_time=None, selected_options=None):
-        """Calculate transfer price with detailed breakdown using pricing_metadata."""
+    def calculate_price(route, pricing, booking_time, return_time=None, selected_options=None, options=None,
+                        table=None):
+        """
+        Calculate transfer price with detailed breakdown using pricing_metadata.
+        
+        ``options`` (active options by string id) and ``table`` (the pricing's
+        price table) may be passed in when they were loaded in bulk.
+        """
         try:
+            table = table or TransferQuoteEngine.table(pricing)
             # Use the new pricing_metadata-based calculation
             pricing_result = pricing.calculate_price(
                 hour=booking_time.hour,
                 is_round_trip=bool(return_time),
-                selected_options=selected_options
+                selected_options=selected_options,
+                options=options,
+                table=table
             )
             
             # Structure the response according to TransferPriceResponseSerializer expectations
@@ -55,7 +66,7 @@ class TransferPricingService:
                 'time_info': {
                     'booking_hour': booking_time.hour,
                     'time_category': TransferPricingService._get_time_category(booking_time.hour),
-                    'surcharge_percentage': float(TransferPricingService._get_surcharge_percentage(route, booking_time.hour))
+                    'surcharge_percentage': float(table['hours'][booking_time.hour][1])
                 }
             }
             
@@ -69,22 +80,57 @@ class TransferPricingService:
     @staticmethod
     def _get_time_category(hour):
         """Get time category based on hour."""
-        if 7 <= hour <= 9 or 17 <= hour <= 19:
-            return 'peak'
-        elif 22 <= hour <= 23 or 0 <= hour <= 6:
-            return 'midnight'
-        else:
-            return 'normal'
+        return time_category(hour)
 
     @staticmethod
-    def _get_surcharge_percentage(route, hour):
-        """Get surcharge percentage based on time."""
-        if 7 <= hour <= 9 or 17 <= hour <= 19:
-            return Decimal(str(route.peak_hour_surcharge))
-        elif 22 <= hour <= 23 or 0 <= hour <= 6:
-            return Decimal(str(route.midnight_surcharge))
-        else:
-            return Decimal('0.00')
+    def calculate_prices(items):
+        """
+        Calculate many transfer prices at once.
+        
+        ``items`` are validated quote requests with ``route_id``,
+        ``vehicle_type``, ``booking_time`` and optionally ``return_time`` and
+        ``selected_options``. Routes, pricings and options of all items are
+        loaded together, so the number of queries does not grow with the
+        number of items.
+        
+        Returns:
+            list: One ``{'quote': ...}`` (shaped like ``calculate_price``) or
+            ``{'error': ...}`` per item, in order.
+        """
+        route_ids = {item['route_id'] for item in items}
+        routes = TransferRoute.objects.filter(is_active=True).prefetch_related('translations').in_bulk(route_ids)
+        pricings = {}
+        for pricing in TransferRoutePricing.objects.filter(route_id__in=list(routes), is_active=True):
+            pricing.route = routes[pricing.route_id]
+            pricings[(pricing.route_id, pricing.vehicle_type)] = pricing
+        tables = TransferQuoteEngine.tables(pricings.values())
+        option_ids = set()
+        for item in items:
+            option_ids |= TransferQuoteEngine.option_ids(item.get('selected_options'))
+        options = TransferQuoteEngine.load_options(option_ids)
+        
+        results = []
+        for item in items:
+            route = routes.get(item['route_id'])
+            pricing = pricings.get((item['route_id'], item['vehicle_type']))
+            if route is None:
+                results.append({'error': str(_('Route not found.'))})
+            elif pricing is None:
+                results.append({'error': str(_('Pricing not found for this route and vehicle type.'))})
+            else:
+                try:
+                    results.append({'quote': TransferPricingService.calculate_price(
+                        route=route,
+                        pricing=pricing,
+                        booking_time=item['booking_time'],
+                        return_time=item.get('return_time'),
+                        selected_options=item.get('selected_options', []),
+                        options=options,
+                        table=tables[pricing.pk]
+                    )})
+                except ValidationError as e:
+                    results.append({'error': e.messages[0]})
+        return results
 
 
 class TransferRouteService:
@@ -122,13 +168,6 @@ class TransferRouteService:
         try:
             queryset = TransferRoute.objects.filter(is_active=True)
             
-            if query:
-                queryset = queryset.filter(
-                    Q(name__icontains=query) |
-                    Q(origin__icontains=query) |
-                    Q(destination__icontains=query)
-                )
-            
             if origin:
                 queryset = queryset.filter(origin__icontains=origin)
             
@@ -138,6 +177,10 @@ class TransferRouteService:
             if vehicle_type:
                 queryset = queryset.filter(pricing__vehicle_type=vehicle_type)
             
+            # Full-text match last, so its result cap applies to filtered routes
+            if query:
+                queryset = SearchIndex.filter(queryset, 'transfer', query).order_by('-search_rank')
+            
             return queryset.distinct()
         except Exception as e:
             logger.error(f"Error searching routes: {str(e)}")
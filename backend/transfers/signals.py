@@ -0,0 +1,55 @@
+"""
+Signal handlers keeping transfer route search documents and quote tables
+in sync.
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from shared.search import SearchIndex
+
+from .models import TransferRoute, TransferRoutePricing
+from .quotes import TransferQuoteEngine
+
+
+# Route fields, besides translations, that feed its search documents.
+SEARCH_FIELDS = {'origin', 'destination'}
+
+
+@receiver(post_save, sender=TransferRoute)
+def index_route(sender, instance, update_fields=None, **kwargs):
+    """Reindex a route unless the save skipped every indexed field."""
+    if update_fields and not SEARCH_FIELDS & set(update_fields):
+        return
+    SearchIndex.update('transfer', [instance.pk])
+
+
+@receiver(post_save, sender=TransferRoute._parler_meta.root_model)
+def index_route_translation(sender, instance, **kwargs):
+    SearchIndex.update('transfer', [instance.master_id])
+
+
+@receiver(post_delete, sender=TransferRoute._parler_meta.root_model)
+def remove_route_translation(sender, instance, **kwargs):
+    SearchIndex.remove('transfer', [instance.master_id], instance.language_code)
+
+
+@receiver(post_delete, sender=TransferRoute)
+def remove_route_from_index(sender, instance, **kwargs):
+    SearchIndex.remove('transfer', [instance.pk])
+
+
+@receiver(post_save, sender=TransferRoute)
+@receiver(post_delete, sender=TransferRoute)
+def invalidate_route_quotes(sender, instance, **kwargs):
+    """Surcharges and discounts of a route feed all its price tables."""
+    transaction.on_commit(partial(TransferQuoteEngine.invalidate_route, instance.pk))
+
+
+@receiver(post_save, sender=TransferRoutePricing)
+@receiver(post_delete, sender=TransferRoutePricing)
+def invalidate_pricing_quotes(sender, instance, **kwargs):
+    transaction.on_commit(partial(TransferQuoteEngine.invalidate_route, instance.route_id))
@@ -3,9 +3,10 @@ Comprehensive tests for Transfer booking flow.
 """
 
 import json
+import uuid
 from decimal import Decimal
 from datetime import date, time, datetime, timedelta
-from django.test import TestCase, TransactionTestCase
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APITestCase
@@ -13,6 +14,7 @@ from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from .models import TransferRoute, TransferRoutePricing, TransferOption, TransferBooking
+from .quotes import ROUTE_VERSION_KEY, TransferQuoteEngine
 from .services import TransferPricingService, TransferRouteService, TransferBookingService
 from cart.models import Cart, CartItem, CartService
 from orders.models import Order, OrderItem, OrderService
@@ -802,4 +804,168 @@ class TransferServiceTests(TestCase):
         )
         
         self.assertEqual(cancelled_booking.status, 'cancelled')
-        self.assertEqual(cancelled_booking.id, booking.id) 
\ No newline at end of file
+        self.assertEqual(cancelled_booking.id, booking.id) 
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class TransferQuoteEngineTests(TestCase):
+    """Test quotes served from cached price tables."""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.route = TransferRoute.objects.create(
+            origin="Quote Airport",
+            destination="Quote Center",
+            peak_hour_surcharge=Decimal('12.50'),
+            midnight_surcharge=Decimal('7.25'),
+            round_trip_discount_enabled=True,
+            round_trip_discount_percentage=Decimal('10.00')
+        )
+        self.pricing = TransferRoutePricing.objects.create(
+            route=self.route,
+            vehicle_type='sedan',
+            vehicle_name='Sedan',
+            base_price=Decimal('33.33'),
+            max_passengers=4,
+            max_luggage=3
+        )
+        self.options = [
+            TransferOption.objects.create(name="Child Seat", description="Seat", price_type='fixed', price=Decimal('0.10')),
+            TransferOption.objects.create(
+                name="Meet & Greet", description="Sign", price_type='percentage', price_percentage=Decimal('3.00')
+            ),
+        ]
+    
+    def test_quote_is_decimal_exact(self):
+        selected = [{'option_id': str(self.options[0].id), 'quantity': 3}, {'option_id': str(self.options[1].id)}]
+        quote = TransferQuoteEngine.quote(self.pricing, hour=8, is_round_trip=True, selected_options=selected)
+        
+        surcharge = Decimal('33.33') * Decimal('0.125')
+        discount = (Decimal('33.33') + surcharge) * Decimal('0.1')
+        options_total = Decimal('0.30') + Decimal('33.33') * Decimal('0.03')
+        self.assertEqual(quote['time_category'], 'peak')
+        self.assertEqual(quote['time_surcharge'], surcharge)
+        self.assertEqual(quote['round_trip_discount'], discount)
+        self.assertEqual(quote['options_total'], options_total)
+        self.assertEqual(quote['final_price'], Decimal('33.33') + surcharge + options_total - discount)
+    
+    def test_table_matches_route_surcharges(self):
+        table = TransferQuoteEngine.table(self.pricing)
+        for hour in range(24):
+            self.assertEqual(table['hours'][hour][2], self.route.calculate_time_surcharge(Decimal('33.33'), hour))
+    
+    def test_options_resolved_in_one_query(self):
+        TransferQuoteEngine.table(self.pricing)
+        selected = [{'option_id': str(option.id)} for option in self.options] + [{'option_id': 'not-a-uuid'}]
+        # One query for the options and one for their translations.
+        with self.assertNumQueries(2):
+            result = self.pricing.calculate_price(hour=14, selected_options=selected)
+        self.assertEqual(len(result['options_breakdown']), 2)
+        
+        with self.assertNumQueries(0):
+            self.pricing.calculate_price(hour=3, is_round_trip=True)
+    
+    def test_saving_pricing_invalidates_table(self):
+        self.assertEqual(TransferQuoteEngine.quote(self.pricing, hour=12)['final_price'], Decimal('33.33'))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pricing.base_price = Decimal('40.00')
+            self.pricing.save()
+        self.assertEqual(TransferQuoteEngine.quote(self.pricing, hour=12)['final_price'], Decimal('40.00'))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.route.round_trip_discount_enabled = False
+            self.route.save()
+        self.assertEqual(TransferQuoteEngine.quote(self.pricing, hour=12, is_round_trip=True)['round_trip_discount'], 0)
+    
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'quote-default'},
+        'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'quote-shared'},
+    })
+    def test_route_versions_are_kept_in_shared_cache(self):
+        from django.core.cache import caches
+        TransferQuoteEngine.table(self.pricing)
+        
+        key = ROUTE_VERSION_KEY.format(route_id=self.route.id)
+        self.assertIsNotNone(caches['shared'].get(key))
+        self.assertIsNone(caches['default'].get(key))
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}, TRANSFER_QUOTE_BATCH_LIMIT=20)
+class TransferQuoteBatchTests(APITestCase):
+    """Test the batch quote endpoint."""
+    
+    def setUp(self):
+        self.url = reverse('transfer-route-quotes')
+        self.routes = []
+        for index in range(6):
+            route = TransferRoute.objects.create(
+                name=f"Batch Route {index}", origin=f"Batch Origin {index}", destination=f"Batch Destination {index}",
+                peak_hour_surcharge=20
+            )
+            for vehicle_type, base_price in (('sedan', 50), ('van', 80)):
+                TransferRoutePricing.objects.create(
+                    route=route, vehicle_type=vehicle_type, vehicle_name=vehicle_type,
+                    base_price=base_price + index, max_passengers=4, max_luggage=2
+                )
+            self.routes.append(route)
+        self.option = TransferOption.objects.create(name="Water", description="Water", price_type='fixed', price=2)
+    
+    def quotes(self, routes):
+        return [
+            {
+                'route_id': str(route.id), 'vehicle_type': vehicle_type, 'booking_time': '08:00',
+                'selected_options': [{'option_id': str(self.option.id), 'quantity': 1}],
+            }
+            for route in routes for vehicle_type in ('sedan', 'van')
+        ]
+    
+    def test_batch_returns_quotes_in_order(self):
+        response = self.client.post(self.url, {'quotes': self.quotes(self.routes[:2])}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 4)
+        first = response.data['results'][0]['quote']
+        self.assertEqual(first['price_breakdown']['final_price'], 62.0)
+        self.assertEqual(first['time_info']['time_category'], 'peak')
+        self.assertEqual(response.data['results'][3]['quote']['price_breakdown']['final_price'], 81 * 1.2 + 2)
+    
+    def test_query_count_does_not_grow_with_batch_size(self):
+        self.client.post(self.url, {'quotes': self.quotes(self.routes[:1])}, format='json')
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(self.url, {'quotes': self.quotes(self.routes[:1])}, format='json')
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(self.url, {'quotes': self.quotes(self.routes)}, format='json')
+        
+        self.assertEqual([('quote' in result) for result in response.data['results']], [True] * 12)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+    
+    def test_errors_are_reported_per_item(self):
+        quotes = self.quotes(self.routes[:1])
+        quotes.append({'route_id': str(self.routes[0].id), 'vehicle_type': 'bus', 'booking_time': '10:00'})
+        quotes.append({'route_id': str(uuid.uuid4()), 'vehicle_type': 'sedan', 'booking_time': '10:00'})
+        quotes.append({'route_id': str(self.routes[0].id), 'vehicle_type': 'sedan'})
+        response = self.client.post(self.url, {'quotes': quotes}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertIn('quote', results[0])
+        self.assertIn('quote', results[1])
+        self.assertEqual(results[2]['error'], 'Pricing not found for this route and vehicle type.')
+        self.assertEqual(results[3]['error'], 'Route not found.')
+        self.assertIn('booking_time', results[4]['error'])
+    
+    def test_batch_size_is_limited(self):
+        response = self.client.post(self.url, {'quotes': self.quotes(self.routes) * 2}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
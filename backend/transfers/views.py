@@ -7,16 +7,18 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django.db.models import Q, Min
 from decimal import Decimal
 
+from shared.pagination import KeysetPagination
+
 from .models import TransferRoute, TransferRoutePricing, TransferOption, TransferBooking
 from .serializers import (
     TransferRouteSerializer, TransferRouteDetailSerializer,
     TransferBookingSerializer, TransferBookingCreateSerializer,
     TransferSearchSerializer, TransferPriceCalculationSerializer,
     TransferPriceResponseSerializer, PopularRouteSerializer,
-    TransferOptionSerializer
+    TransferOptionSerializer, TransferQuoteBatchSerializer, TransferQuoteItemSerializer
 )
 from .services import TransferPricingService
 
@@ -44,8 +46,9 @@ class TransferRouteViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_fields = ['origin', 'destination', 'is_popular']
     search_fields = ['origin', 'destination']
     ordering_fields = ['origin', 'destination', 'created_at']
-    ordering = ['origin']
+    ordering = ['origin', 'destination']
     permission_classes = [AllowAny]
+    pagination_class = KeysetPagination
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -98,14 +101,15 @@ class TransferRouteViewSet(viewsets.ReadOnlyModelViewSet):
             if data.get('max_price'):
                 queryset = queryset.filter(pricing__base_price__lte=data['max_price'])
             
-            # Apply sorting
+            # Apply sorting; price sorts use the lowest matching vehicle
+            # price, which also keeps one row per route for the cursor.
             sort_by = data.get('sort_by', 'origin')
-            if sort_by == 'price_asc':
-                queryset = queryset.order_by('pricing__base_price')
-            elif sort_by == 'price_desc':
-                queryset = queryset.order_by('-pricing__base_price')
+            if sort_by in ('price_asc', 'price_desc'):
+                queryset = queryset.filter(pricing__isnull=False).annotate(
+                    lowest_price=Min('pricing__base_price')
+                ).order_by('lowest_price' if sort_by == 'price_asc' else '-lowest_price')
             elif sort_by == 'origin':
-                queryset = queryset.order_by('origin')
+                queryset = queryset.order_by('origin', 'destination')
             
             # Paginate results
             page = self.paginate_queryset(queryset)
@@ -156,6 +160,32 @@ class TransferRouteViewSet(viewsets.ReadOnlyModelViewSet):
                 )
         
         return Response(calculation_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['post'])
+    def quotes(self, request):
+        """
+        Calculate prices for many route and vehicle combinations at once.
+        
+        Each entry of ``results`` holds either ``quote`` (as returned by
+        ``calculate_price``) or ``error`` for the quote at the same position.
+        """
+        batch_serializer = TransferQuoteBatchSerializer(data=request.data)
+        if not batch_serializer.is_valid():
+            return Response(batch_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        items = []
+        results = []
+        for quote_data in batch_serializer.validated_data['quotes']:
+            item_serializer = TransferQuoteItemSerializer(data=quote_data)
+            if item_serializer.is_valid():
+                items.append(item_serializer.validated_data)
+                results.append(None)
+            else:
+                results.append({'error': item_serializer.errors})
+        
+        quotes = iter(TransferPricingService.calculate_prices(items))
+        results = [result or next(quotes) for result in results]
+        return Response({'count': len(results), 'results': results})
 
 
 class TransferBookingViewSet(viewsets.ModelViewSet):
@@ -8,7 +8,7 @@ from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
 from django.urls import reverse
 from django.db.models import Count, Sum
-from .models import User, UserActivity, OTPCode
+from .models import User, UserActivity, UserActivityArchive, OTPCode
 
 
 class UserActivityInline(admin.TabularInline):
@@ -152,28 +152,45 @@ class UserActivityAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related('user')
 
 
+@admin.register(UserActivityArchive)
+class UserActivityArchiveAdmin(admin.ModelAdmin):
+    """Admin for archived UserActivity rows, browsed by user and month."""
+    
+    list_display = ['user', 'activity_type', 'ip_address', 'created_at']
+    list_filter = ['month', 'activity_type']
+    search_fields = ['user__username', 'user__email']
+    ordering = ['-created_at']
+    list_select_related = ['user']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(OTPCode)
 class OTPCodeAdmin(admin.ModelAdmin):
     """Admin for OTPCode model."""
     
     list_display = [
-        'user', 'code', 'otp_type', 'is_used', 'is_expired', 
+        'user', 'otp_type', 'is_used', 'attempts', 'is_expired', 
         'created_at', 'expires_at'
     ]
     list_filter = [
         'otp_type', 'is_used', 'created_at', 'expires_at'
     ]
     search_fields = [
-        'user__username', 'user__email', 'code'
+        'user__username', 'user__email', 'email', 'phone'
     ]
     ordering = ['-created_at']
     readonly_fields = [
-        'user', 'code', 'otp_type', 'is_used', 'expires_at', 'created_at'
+        'user', 'otp_type', 'is_used', 'attempts', 'expires_at', 'created_at'
     ]
     
     fieldsets = (
         (_('OTP Information'), {
-            'fields': ('user', 'code', 'otp_type', 'is_used')
+            'fields': ('user', 'email', 'phone', 'otp_type', 'is_used', 'attempts')
         }),
         (_('Timestamps'), {
             'fields': ('created_at', 'expires_at'),
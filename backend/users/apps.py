@@ -4,4 +4,11 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
-    verbose_name = 'Users' 
\ No newline at end of file
+    verbose_name = 'Users'
+
+    def ready(self):
+        from django.core.signals import request_finished
+
+        from .infrastructure.activity_log import ActivityLog
+
+        request_finished.connect(ActivityLog.flush_if_due, dispatch_uid='users.activity_log.flush')
@@ -84,6 +84,11 @@ class OTPRepository(ABC):
         """Get valid OTP by target, type and code"""
         pass
     
+    @abstractmethod
+    def consume_valid_otp(self, target: str, otp_type: str, code: str) -> Optional[OTPCode]:
+        """Get valid OTP by target, type and code and mark it as used, at most once"""
+        pass
+    
     @abstractmethod
     def get_user_otps(self, user_id: uuid.UUID, otp_type: str = None) -> List[OTPCode]:
         """Get all OTPs for a user"""
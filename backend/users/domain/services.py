@@ -287,13 +287,8 @@ class DjangoOTPService(OTPService):
         """Verify OTP code"""
         try:
             otp_code_vo = OTPCodeVO(code)
-            otp = self.otp_repository.get_valid_otp(target, otp_type.value, str(otp_code_vo))
-            if otp and otp.is_valid:
-                # Mark as used
-                otp.mark_as_used()
-                self.otp_repository.update(otp)
-                return otp
-            return None
+            # Checking and marking as used is one step, so a code works only once
+            return self.otp_repository.consume_valid_otp(target, otp_type.value, str(otp_code_vo))
         except ValueError:
             return None
     
@@ -0,0 +1,244 @@
+"""
+Infrastructure Layer - Buffered activity log
+
+``UserActivity`` rows are audit records nothing reads back on the request
+path, so they are not written when they happen. ``ActivityLog`` queues them
+in a per-process buffer and writes them with one ``bulk_create`` once
+``ACTIVITY_LOG_BATCH_SIZE`` rows are queued or the oldest one waited
+``ACTIVITY_LOG_FLUSH_INTERVAL`` seconds. The size check runs on
+``request_finished``, after the response was sent, so requests never wait on
+audit writes; a daemon timer started with the first queued row flushes on
+time even when no more requests come. The buffer is also flushed at exit.
+
+``UserSession`` rows are written at once: logouts and session listings may
+be served by any process and must see them.
+
+Rows of users deleted in the meantime are dropped. If a flush fails the
+rows are queued again, up to ``ACTIVITY_LOG_MAX_BUFFER``; beyond that the
+oldest are dropped with a warning.
+
+``archive_old_activity`` moves activity rows of whole months older than
+``ACTIVITY_ARCHIVE_AFTER_MONTHS`` to ``UserActivityArchive``, which only
+indexes users by month, so the live table and its indexes stay small.
+"""
+
+import atexit
+import ipaddress
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import date, datetime
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+
+def clean_ip(value):
+    """``value`` as a normalised IP address, or ``None`` if it is not one."""
+    try:
+        return str(ipaddress.ip_address(str(value).strip()))
+    except ValueError:
+        return None
+
+
+class ActivityLog:
+    """Per-process write buffer for user activities"""
+
+    _lock = threading.Lock()
+    _activities = []
+    _oldest = None
+    _timer = None
+
+    @staticmethod
+    def record_session(user_id, ip_address: str, user_agent: str, session_key: str = None,
+                       session_id=None, **fields):
+        """Write a ``UserSession`` row now and return it."""
+        from ..models import UserSession
+
+        return UserSession.objects.create(
+            id=session_id or uuid.uuid4(),
+            user_id=user_id,
+            session_key=session_key or f"session_{uuid.uuid4().hex}",
+            # The column is not nullable and forwarded headers may hold
+            # anything.
+            ip_address=clean_ip(ip_address) or '0.0.0.0',
+            user_agent=user_agent or '',
+            **fields
+        )
+
+    @classmethod
+    def record_activity(cls, user_id, activity_type: str, ip_address: str = None, user_agent: str = '',
+                        description: str = '', metadata: dict = None):
+        """Queue a ``UserActivity`` row; returns it unsaved."""
+        from ..models import UserActivity
+
+        activity = UserActivity(
+            user_id=user_id,
+            activity_type=activity_type,
+            description=description,
+            # One malformed address would fail the whole batch.
+            ip_address=clean_ip(ip_address),
+            user_agent=user_agent or '',
+            metadata=metadata or {},
+        )
+        with cls._lock:
+            cls._activities.append(activity)
+            if cls._oldest is None:
+                cls._oldest = time.monotonic()
+            cls._schedule()
+        return activity
+
+    @classmethod
+    def _schedule(cls):
+        # Called with the lock held, whenever the buffer is not empty.
+        if cls._timer is None:
+            cls._timer = threading.Timer(settings.ACTIVITY_LOG_FLUSH_INTERVAL, cls._flush_on_timer)
+            cls._timer.daemon = True
+            cls._timer.start()
+
+    @classmethod
+    def _flush_on_timer(cls):
+        with cls._lock:
+            cls._timer = None
+        try:
+            cls.flush()
+        finally:
+            # The timer thread's own connection.
+            connections.close_all()
+
+    @classmethod
+    def pending(cls) -> int:
+        with cls._lock:
+            return len(cls._activities)
+
+    @classmethod
+    def is_due(cls) -> bool:
+        with cls._lock:
+            if cls._oldest is None:
+                return False
+            return (
+                len(cls._activities) >= settings.ACTIVITY_LOG_BATCH_SIZE
+                or time.monotonic() - cls._oldest >= settings.ACTIVITY_LOG_FLUSH_INTERVAL
+            )
+
+    @classmethod
+    def flush_if_due(cls, **kwargs) -> int:
+        """``request_finished`` receiver: flush once a threshold is reached."""
+        return cls.flush() if cls.is_due() else 0
+
+    @classmethod
+    def flush(cls) -> int:
+        """
+        Write every queued row with one ``bulk_create``.
+
+        Returns:
+            int: Number of rows written.
+        """
+        from ..models import User, UserActivity
+
+        with cls._lock:
+            activities = cls._activities[:]
+            cls._activities.clear()
+            cls._oldest = None
+        if not activities:
+            return 0
+
+        try:
+            # Foreign keys are only checked at commit, so rows of users that
+            # were deleted meanwhile are filtered out beforehand.
+            user_ids = set(User.objects.filter(
+                pk__in={row.user_id for row in activities}
+            ).values_list('pk', flat=True))
+            activities = [row for row in activities if row.user_id in user_ids]
+            UserActivity.objects.bulk_create(activities)
+        except Exception:
+            logger.exception('Could not write %d buffered user activity rows.', len(activities))
+            cls._requeue(activities)
+            return 0
+        return len(activities)
+
+    @classmethod
+    def _requeue(cls, activities):
+        with cls._lock:
+            cls._activities[:0] = activities
+            overflow = len(cls._activities) - settings.ACTIVITY_LOG_MAX_BUFFER
+            if overflow > 0:
+                logger.warning('User activity buffer full, dropping %d rows.', overflow)
+                del cls._activities[:overflow]
+            if cls._activities:
+                cls._oldest = time.monotonic()
+                cls._schedule()
+
+    @classmethod
+    def discard(cls) -> None:
+        """Drop every queued row without writing it."""
+        with cls._lock:
+            cls._activities.clear()
+            cls._oldest = None
+            if cls._timer is not None:
+                cls._timer.cancel()
+                cls._timer = None
+
+    @staticmethod
+    def archive_old_activity(months: int = None, batch_size: int = None) -> int:
+        """
+        Move activity rows older than the current month and the ``months``
+        months before it to ``UserActivityArchive``, one primary-key batch at
+        a time.
+
+        Returns:
+            int: Number of rows moved.
+        """
+        from ..models import UserActivity, UserActivityArchive
+
+        months = settings.ACTIVITY_ARCHIVE_AFTER_MONTHS if months is None else months
+        batch_size = batch_size or settings.ACTIVITY_ARCHIVE_BATCH_SIZE
+        today = timezone.localdate()
+        year, month = divmod(today.year * 12 + today.month - 1 - months, 12)
+        cutoff = timezone.make_aware(datetime(year, month + 1, 1))
+
+        fields = [field.attname for field in UserActivity._meta.concrete_fields]
+        moved = 0
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    UserActivity.objects.filter(created_at__lt=cutoff).order_by('pk').values(*fields)[:batch_size]
+                )
+                if not rows:
+                    return moved
+                archived = []
+                for row in rows:
+                    created_at = timezone.localtime(row['created_at'])
+                    archived.append(UserActivityArchive(month=date(created_at.year, created_at.month, 1), **row))
+                UserActivityArchive.objects.bulk_create(archived)
+                UserActivity.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+            moved += len(rows)
+            if len(rows) < batch_size:
+                return moved
+
+
+def _flush_at_exit():
+    try:
+        ActivityLog.flush()
+    except Exception:
+        # The database may already be gone at interpreter shutdown.
+        pass
+
+
+def _reset_after_fork():
+    # The parent still owns (and flushes) its queued rows, and its timer
+    # thread does not exist in the child.
+    ActivityLog._lock = threading.Lock()
+    ActivityLog._activities = []
+    ActivityLog._oldest = None
+    ActivityLog._timer = None
+
+
+atexit.register(_flush_at_exit)
+os.register_at_fork(after_in_child=_reset_after_fork)
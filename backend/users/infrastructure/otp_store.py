@@ -0,0 +1,143 @@
+"""
+Infrastructure Layer - Cache-backed OTP store
+
+Live OTP codes are kept in the shared cache, one entry per (OTP type,
+target) holding the code's HMAC digest and expiring with the code, so a
+verify is a single cache read instead of a query over the growing
+``user_otps`` table. Issuing a new code for the same target replaces the
+previous one.
+
+Attempts are counted on the code's ``user_otps`` row with a conditional
+``UPDATE``, which is atomic on every database, so concurrent guesses cannot
+exceed ``OTP_MAX_ATTEMPTS``; once they are used up the code is burned.
+Otherwise the rows are only an audit trail: the digest (never the code) and
+when the code was used. ``purge_expired`` deletes old rows in primary-key
+batches for the ``purge_expired_otps`` task.
+"""
+
+import hashlib
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+
+ENTRY_KEY = 'otp:{otp_type}:{target}'
+
+
+class OTPStore:
+    """Cache store for live OTP codes"""
+
+    @staticmethod
+    def cache():
+        # Codes must be visible to every process, so never the per-process L1.
+        return caches['shared']
+
+    @staticmethod
+    def digest(otp_type: str, target: str, code: str) -> str:
+        """HMAC of a code, bound to its type and target"""
+        return salted_hmac('users.otp', f'{otp_type}:{target}:{code}', algorithm='sha256').hexdigest()
+
+    @staticmethod
+    def _key(otp_type: str, target: str) -> str:
+        return ENTRY_KEY.format(otp_type=otp_type, target=hashlib.sha256(target.encode()).hexdigest())
+
+    @classmethod
+    def put(cls, otp_type: str, target: str, entry: dict) -> None:
+        """
+        Store the live code of a target, replacing any previous one.
+
+        ``entry`` holds ``id``, ``user_id``, ``digest``, ``expires_at`` and
+        ``created_at``.
+        """
+        ttl = max(int((entry['expires_at'] - timezone.now()).total_seconds()), 1)
+        cls.cache().set(cls._key(otp_type, target), entry, ttl)
+
+    @classmethod
+    def get(cls, otp_type: str, target: str) -> Optional[dict]:
+        return cls.cache().get(cls._key(otp_type, target))
+
+    @classmethod
+    def match(cls, otp_type: str, target: str, code: str) -> Optional[dict]:
+        """Return the live entry of a target if ``code`` matches it, without counting an attempt."""
+        entry = cls.get(otp_type, target)
+        if entry is None or entry['expires_at'] <= timezone.now():
+            return None
+        if not constant_time_compare(entry['digest'], cls.digest(otp_type, target, code)):
+            return None
+        return entry
+
+    @classmethod
+    def check(cls, otp_type: str, target: str, code: str) -> Optional[dict]:
+        """
+        Return the live entry of a target if ``code`` matches it.
+
+        Every call counts as an attempt; once ``OTP_MAX_ATTEMPTS`` is
+        reached the code is dropped.
+        """
+        from ..models import OTPCode
+
+        entry = cls.get(otp_type, target)
+        if entry is None or entry['expires_at'] <= timezone.now():
+            return None
+        counted = OTPCode.objects.filter(
+            pk=entry['id'], is_used=False, attempts__lt=settings.OTP_MAX_ATTEMPTS
+        ).update(attempts=F('attempts') + 1)
+        if not counted:
+            cls.discard(otp_type, target, entry['id'])
+            return None
+        if not constant_time_compare(entry['digest'], cls.digest(otp_type, target, code)):
+            return None
+        return entry
+
+    @classmethod
+    def consume(cls, otp_type: str, target: str, code: str) -> Optional[dict]:
+        """
+        Like ``check``, but also removes the entry so that a code can only
+        be used once, even by concurrent requests.
+        """
+        entry = cls.check(otp_type, target, code)
+        if entry is None:
+            return None
+        # Only one caller gets True back from the delete.
+        if not cls.cache().delete(cls._key(otp_type, target)):
+            return None
+        return entry
+
+    @classmethod
+    def discard(cls, otp_type: str, target: str, otp_id=None) -> None:
+        """Drop the live code of a target (only if it is ``otp_id`` when given)."""
+        key = cls._key(otp_type, target)
+        cache = cls.cache()
+        if otp_id is not None:
+            entry = cache.get(key)
+            if entry is None or entry['id'] != otp_id:
+                return
+        cache.delete(key)
+
+    @staticmethod
+    def purge_expired(older_than: timedelta = None, batch_size: int = None) -> int:
+        """
+        Delete audit rows of codes that expired ``older_than`` ago, one
+        primary-key batch at a time.
+
+        Returns:
+            int: Number of rows deleted.
+        """
+        from ..models import OTPCode
+
+        cutoff = timezone.now() - (older_than or timedelta(0))
+        batch_size = batch_size or settings.OTP_PURGE_BATCH_SIZE
+        deleted = 0
+        while True:
+            ids = list(OTPCode.objects.filter(expires_at__lt=cutoff).values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            count, _ = OTPCode.objects.filter(pk__in=ids).delete()
+            deleted += count
+            if len(ids) < batch_size:
+                return deleted
@@ -3,15 +3,19 @@ Infrastructure Layer - Repository Implementations
 Concrete implementations using Django ORM
 """
 
+from dataclasses import replace
+from functools import partial
 from typing import Optional, List
 from datetime import datetime, timedelta
 import uuid
 import random
 import string
 
+from django.conf import settings
 from django.contrib.auth.hashers import make_password, check_password
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import F
 
 from ..domain.repositories import (
     UserRepository, OTPRepository, UserProfileRepository, UserSessionRepository
@@ -19,6 +23,8 @@ from ..domain.repositories import (
 from ..domain.entities import User, OTPCode, UserProfile, UserSession, UserRole, OTPType
 from ..domain.value_objects import Email, PhoneNumber, Password
 from ..models import User as UserModel, OTPCode as OTPCodeModel, UserProfile as UserProfileModel, UserSession as UserSessionModel
+from .activity_log import ActivityLog
+from .otp_store import OTPStore
 
 
 class DjangoUserRepository(UserRepository):
@@ -224,23 +230,43 @@ class DjangoUserRepository(UserRepository):
 
 
 class DjangoOTPCodeRepository(OTPRepository):
-    """Django ORM implementation of OTPRepository for OTPCode"""
+    """
+    OTPRepository for OTPCode: live codes in OTPStore, audit rows in the ORM
+
+    Rows that still hold a plain ``code`` (issued before codes were hashed,
+    or by the legacy ``otp/`` views) are verified against the table.
+    """
+    
+    @staticmethod
+    def _target(otp) -> Optional[str]:
+        return otp.email or otp.phone
     
     def create(self, otp: OTPCode) -> OTPCode:
         """Create a new OTPCode"""
         try:
+            target = self._target(otp)
+            digest = OTPStore.digest(otp.otp_type.value, target, otp.code) if target else ''
             django_otp = OTPCodeModel.objects.create(
                 id=otp.id,
                 user_id=otp.user_id,
                 email=otp.email,
                 phone=otp.phone,
                 otp_type=otp.otp_type.value,
-                code=otp.code,
+                code_hash=digest,
                 is_used=otp.is_used,
                 expires_at=otp.expires_at,
                 used_at=otp.used_at,
             )
-            return self._to_domain_entity(django_otp)
+            if target and not otp.is_used:
+                transaction.on_commit(partial(OTPStore.put, otp.otp_type.value, target, {
+                    'id': django_otp.id,
+                    'user_id': django_otp.user_id,
+                    'digest': digest,
+                    'expires_at': django_otp.expires_at,
+                    'created_at': django_otp.created_at,
+                }))
+            # The caller still needs the plain code to send it.
+            return replace(self._to_domain_entity(django_otp), code=otp.code)
         except Exception as e:
             raise Exception(f"Failed to create OTPCode: {e}")
     
@@ -253,31 +279,51 @@ class DjangoOTPCodeRepository(OTPRepository):
             return None
     
     def get_valid_otp(self, target: str, otp_type: str, code: str) -> Optional[OTPCode]:
-        """Get valid OTPCode by target, type and code"""
+        """Get valid OTPCode by target, type and code (does not count as an attempt)"""
+        entry = OTPStore.match(otp_type, target, code)
+        if entry is not None:
+            return self._entry_to_domain_entity(entry, target, otp_type, code)
+        legacy = self._legacy_otps(target, otp_type).filter(code=code).first()
+        return self._to_domain_entity(legacy) if legacy else None
+    
+    def consume_valid_otp(self, target: str, otp_type: str, code: str) -> Optional[OTPCode]:
+        """Get valid OTPCode by target, type and code and mark it as used"""
         try:
-            # Determine if target is email or phone
-            is_email = '@' in target
-            
-            query = {
-                'otp_type': otp_type,
-                'code': code,
-                'is_used': False,
-                'expires_at__gt': timezone.now(),
-            }
-            
-            if is_email:
-                query['email'] = target
-            else:
-                query['phone'] = target
-            
-            django_otp = OTPCodeModel.objects.filter(**query).order_by('-created_at').first()
-            
-            if django_otp:
-                return self._to_domain_entity(django_otp)
-            return None
-            
+            entry = OTPStore.consume(otp_type, target, code)
+            if entry is None:
+                return self._consume_legacy_otp(target, otp_type, code)
+            otp = self._entry_to_domain_entity(entry, target, otp_type, code)
+            otp.mark_as_used()
+            OTPCodeModel.objects.filter(id=otp.id).update(is_used=True, used_at=otp.used_at)
+            return otp
         except Exception as e:
-            raise Exception(f"Failed to get valid OTPCode: {e}")
+            raise Exception(f"Failed to consume OTPCode: {e}")
+    
+    def _legacy_otps(self, target: str, otp_type: str):
+        """Live rows that keep their plain code (issued before codes were hashed, or by the legacy OTP views)"""
+        lookup = 'email' if '@' in target else 'phone'
+        return OTPCodeModel.objects.filter(**{
+            lookup: target,
+            'otp_type': otp_type,
+            'code_hash': '',
+            'is_used': False,
+            'expires_at__gt': timezone.now(),
+        }).exclude(code='').order_by('-created_at')
+    
+    def _consume_legacy_otp(self, target: str, otp_type: str, code: str) -> Optional[OTPCode]:
+        """Verify a plain-code row; wrong codes count as an attempt on every live row of the target"""
+        legacy = self._legacy_otps(target, otp_type)
+        django_otp = legacy.filter(code=code).first()
+        if django_otp is None:
+            legacy.filter(attempts__lt=settings.OTP_MAX_ATTEMPTS).update(attempts=F('attempts') + 1)
+            return None
+        # Conditional, so only one concurrent caller can use the row.
+        if not OTPCodeModel.objects.filter(
+            id=django_otp.id, is_used=False, attempts__lt=settings.OTP_MAX_ATTEMPTS
+        ).update(attempts=F('attempts') + 1, is_used=True, used_at=timezone.now()):
+            return None
+        django_otp.refresh_from_db()
+        return self._to_domain_entity(django_otp)
     
     def get_latest_otp(self, user_id: uuid.UUID, otp_type: OTPType, email: str = None, phone: str = None) -> Optional[OTPCode]:
         """Get latest OTPCode for user and type"""
@@ -306,6 +352,7 @@ class DjangoOTPCodeRepository(OTPRepository):
         try:
             django_otp = OTPCodeModel.objects.get(id=otp_id)
             django_otp.mark_as_used()
+            self._discard(django_otp)
             return True
         except OTPCodeModel.DoesNotExist:
             return False
@@ -327,6 +374,10 @@ class DjangoOTPCodeRepository(OTPRepository):
                 query['phone'] = phone
             
             OTPCodeModel.objects.filter(**query).update(is_used=True, used_at=timezone.now())
+            for target in filter(None, (email, phone)):
+                entry = OTPStore.get(otp_type.value, target)
+                if entry is not None and entry['user_id'] == user_id:
+                    OTPStore.discard(otp_type.value, target, entry['id'])
             return True
             
         except Exception as e:
@@ -335,8 +386,7 @@ class DjangoOTPCodeRepository(OTPRepository):
     def cleanup_expired_otps(self) -> int:
         """Clean up expired OTPCodes and return count of deleted OTPCodes"""
         try:
-            count, _ = OTPCodeModel.objects.filter(expires_at__lt=timezone.now()).delete()
-            return count
+            return OTPStore.purge_expired()
         except Exception as e:
             raise Exception(f"Failed to cleanup expired OTPCode: {e}")
     
@@ -345,6 +395,7 @@ class DjangoOTPCodeRepository(OTPRepository):
         try:
             django_otp = OTPCodeModel.objects.get(id=otp_id)
             django_otp.delete()
+            self._discard(django_otp)
             return True
         except OTPCodeModel.DoesNotExist:
             return False
@@ -354,8 +405,7 @@ class DjangoOTPCodeRepository(OTPRepository):
     def delete_expired_otps(self) -> int:
         """Delete expired OTPCodes and return count"""
         try:
-            count, _ = OTPCodeModel.objects.filter(expires_at__lt=timezone.now()).delete()
-            return count
+            return OTPStore.purge_expired()
         except Exception as e:
             raise Exception(f"Failed to delete expired OTPCodes: {e}")
     
@@ -377,6 +427,7 @@ class DjangoOTPCodeRepository(OTPRepository):
             django_otp = OTPCodeModel.objects.get(id=otp_id)
             django_otp.is_used = True
             django_otp.save()
+            self._discard(django_otp)
             return True
         except OTPCodeModel.DoesNotExist:
             return False
@@ -390,6 +441,8 @@ class DjangoOTPCodeRepository(OTPRepository):
             django_otp.is_used = otp.is_used
             django_otp.expires_at = otp.expires_at
             django_otp.save()
+            if otp.is_used:
+                self._discard(django_otp)
             return self._to_domain_entity(django_otp)
         except OTPCodeModel.DoesNotExist:
             raise Exception(f"OTPCode with id {otp.id} not found")
@@ -400,6 +453,27 @@ class DjangoOTPCodeRepository(OTPRepository):
         """Generate a random 6-digit OTPCode code"""
         return ''.join(random.choices(string.digits, k=6))
     
+    def _discard(self, django_otp: OTPCodeModel):
+        """Drop the live code of a row from the store"""
+        target = self._target(django_otp)
+        if target:
+            OTPStore.discard(django_otp.otp_type, target, django_otp.id)
+    
+    def _entry_to_domain_entity(self, entry: dict, target: str, otp_type: str, code: str) -> OTPCode:
+        """Convert an OTPStore entry to domain entity"""
+        is_email = '@' in target
+        return OTPCode(
+            id=entry['id'],
+            user_id=entry['user_id'],
+            email=target if is_email else None,
+            phone=None if is_email else target,
+            otp_type=OTPType(otp_type),
+            code=code,
+            is_used=False,
+            expires_at=entry['expires_at'],
+            created_at=entry['created_at'],
+        )
+    
     def _to_domain_entity(self, django_otp: OTPCodeModel) -> OTPCode:
         """Convert Django model to domain entity"""
         return OTPCode(
@@ -509,8 +583,8 @@ class DjangoUserSessionRepository(UserSessionRepository):
     
     def create(self, session: UserSession) -> UserSession:
         """Create a new user session"""
-        session_model = UserSessionModel.objects.create(
-            id=session.id,
+        session_model = ActivityLog.record_session(
+            session_id=session.id,
             user_id=session.user_id,
             session_key=session.session_key,
             ip_address=session.ip_address,
@@ -20,7 +20,7 @@ from ..domain.services import (
 from ..domain.entities import OTPType
 from ..domain.repositories import OTPRepository
 from shared.services import (
-    send_verification_email, send_password_reset_email, send_welcome_email
+    NotificationService, send_verification_email, send_password_reset_email, send_welcome_email
 )
 
 
@@ -135,11 +135,8 @@ class DjangoPhoneVerificationService(PhoneVerificationService):
             # Generate OTP
             otp = self.otp_service.generate_otp(user_id, phone, OTPType.PHONE_VERIFICATION)
             
-            # In a real implementation, you would integrate with an SMS service
-            # For now, we'll just print the OTP for development
-            print(f"📱 SMS to {phone}: Your verification code is {otp.code}")
-            
-            return True
+            # Queued in the notification outbox and sent by the worker
+            return NotificationService.send_sms(phone, f"Your verification code is {otp.code}")
             
         except Exception as e:
             print(f"❌ Failed to send verification SMS: {e}")
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.2 on 2026-10-17 05:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_useractivity_alter_otpcode_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='otpcode',
+            name='user_otps_email_c268bf_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='otpcode',
+            name='user_otps_phone_92a3d3_idx',
+        ),
+        migrations.AddField(
+            model_name='otpcode',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Attempts'),
+        ),
+        migrations.AddField(
+            model_name='otpcode',
+            name='code_hash',
+            field=models.CharField(blank=True, max_length=64, verbose_name='Code Hash'),
+        ),
+        migrations.AlterField(
+            model_name='otpcode',
+            name='code',
+            field=models.CharField(blank=True, max_length=6, verbose_name='OTP Code'),
+        ),
+        migrations.AddIndex(
+            model_name='otpcode',
+            index=models.Index(fields=['otp_type', 'email', '-created_at'], name='user_otps_email_lookup_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otpcode',
+            index=models.Index(fields=['otp_type', 'phone', '-created_at'], name='user_otps_phone_lookup_idx'),
+        ),
+    ]
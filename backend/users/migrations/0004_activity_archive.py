@@ -0,0 +1,36 @@
+# Generated by Django 5.0.2 on 2026-10-17 05:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_otp_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserActivityArchive',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('month', models.DateField(verbose_name='Month')),
+                ('activity_type', models.CharField(choices=[('login', 'Login'), ('logout', 'Logout'), ('password_change', 'Password Change'), ('email_verification', 'Email Verification'), ('phone_verification', 'Phone Verification'), ('profile_update', 'Profile Update'), ('password_reset_request', 'Password Reset Request'), ('password_reset_complete', 'Password Reset Complete')], max_length=30, verbose_name='Activity Type')),
+                ('description', models.TextField(blank=True, verbose_name='Description')),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True, verbose_name='IP Address')),
+                ('user_agent', models.TextField(blank=True, verbose_name='User Agent')),
+                ('metadata', models.JSONField(blank=True, default=dict, verbose_name='Metadata')),
+                ('created_at', models.DateTimeField(verbose_name='Created At')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_activities', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Archived User Activity',
+                'verbose_name_plural': 'Archived User Activities',
+                'db_table': 'user_activities_archive',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'month'], name='user_activity_archive_idx')],
+            },
+        ),
+    ]
@@ -166,7 +166,11 @@ class OTPCode(models.Model):
     email = models.EmailField(blank=True, null=True, verbose_name=_('Email'))
     phone = models.CharField(max_length=15, blank=True, null=True, verbose_name=_('Phone'))
     otp_type = models.CharField(max_length=20, choices=OTP_TYPE_CHOICES, verbose_name=_('OTP Type'))
-    code = models.CharField(max_length=6, verbose_name=_('OTP Code'))
+    # Live codes are kept hashed in the cache (users.infrastructure.otp_store);
+    # rows issued through it keep only the digest.
+    code = models.CharField(max_length=6, blank=True, verbose_name=_('OTP Code'))
+    code_hash = models.CharField(max_length=64, blank=True, verbose_name=_('Code Hash'))
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name=_('Attempts'))
     is_used = models.BooleanField(default=False, verbose_name=_('Is Used'))
     expires_at = models.DateTimeField(verbose_name=_('Expires At'))
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Created At'))
@@ -178,8 +182,9 @@ class OTPCode(models.Model):
         db_table = 'user_otps'
         indexes = [
             models.Index(fields=['user', 'otp_type']),
-            models.Index(fields=['email', 'otp_type']),
-            models.Index(fields=['phone', 'otp_type']),
+            # Latest code of a target and type, as looked up on verify.
+            models.Index(fields=['otp_type', 'email', '-created_at'], name='user_otps_email_lookup_idx'),
+            models.Index(fields=['otp_type', 'phone', '-created_at'], name='user_otps_phone_lookup_idx'),
             models.Index(fields=['expires_at']),
         ]
     
@@ -326,4 +331,37 @@ class UserActivity(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.user.email} - {self.activity_type} - {self.created_at}" 
\ No newline at end of file
+        return f"{self.user.email} - {self.activity_type} - {self.created_at}"
+
+
+class UserActivityArchive(models.Model):
+    """
+    User activity rows moved out of ``user_activities`` by month
+    (see ``users.infrastructure.activity_log``).
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='archived_activities', db_index=False, verbose_name=_('User')
+    )
+    month = models.DateField(verbose_name=_('Month'))
+    activity_type = models.CharField(
+        max_length=30, choices=UserActivity.ACTIVITY_TYPE_CHOICES, verbose_name=_('Activity Type')
+    )
+    description = models.TextField(blank=True, verbose_name=_('Description'))
+    ip_address = models.GenericIPAddressField(blank=True, null=True, verbose_name=_('IP Address'))
+    user_agent = models.TextField(blank=True, verbose_name=_('User Agent'))
+    metadata = models.JSONField(default=dict, blank=True, verbose_name=_('Metadata'))
+    created_at = models.DateTimeField(verbose_name=_('Created At'))
+
+    class Meta:
+        verbose_name = _('Archived User Activity')
+        verbose_name_plural = _('Archived User Activities')
+        db_table = 'user_activities_archive'
+        indexes = [
+            models.Index(fields=['user', 'month'], name='user_activity_archive_idx'),
+        ]
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.user_id} - {self.activity_type} - {self.created_at}"
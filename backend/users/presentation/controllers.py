@@ -13,6 +13,8 @@ from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
 from django.views import View
 
+from shared.throttling import RateLimitedMixin
+
 from ..application.use_cases import (
     RegisterUserUseCase, LoginUserUseCase, LogoutUserUseCase,
     VerifyEmailUseCase, VerifyPhoneUseCase, ResetPasswordUseCase,
@@ -136,10 +138,11 @@ class AuthenticationController:
         return DjangoPhoneVerificationService(self.otp_service)
 
 
-class RegisterView(APIView):
+class RegisterView(RateLimitedMixin, APIView):
     """User registration endpoint"""
     
     permission_classes = [AllowAny]
+    throttle_scope = 'register'
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -210,10 +213,11 @@ class RegisterView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class LoginView(APIView):
+class LoginView(RateLimitedMixin, APIView):
     """User login endpoint"""
     
     permission_classes = [AllowAny]
+    throttle_scope = 'login'
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -344,10 +348,11 @@ class LogoutView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class VerifyEmailView(APIView):
+class VerifyEmailView(RateLimitedMixin, APIView):
     """Email verification endpoint"""
     
     permission_classes = [AllowAny]
+    throttle_scope = {'POST': 'otp_verify', 'PUT': 'otp_send'}
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -405,10 +410,11 @@ class VerifyEmailView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class VerifyPhoneView(APIView):
+class VerifyPhoneView(RateLimitedMixin, APIView):
     """Phone verification endpoint"""
     
     permission_classes = [AllowAny]
+    throttle_scope = {'POST': 'otp_verify', 'PUT': 'otp_send'}
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -465,10 +471,11 @@ class VerifyPhoneView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class ForgotPasswordView(APIView):
+class ForgotPasswordView(RateLimitedMixin, APIView):
     """Forgot password endpoint - Request password reset OTP"""
     
     permission_classes = [AllowAny]
+    throttle_scope = 'password_reset'
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -507,10 +514,11 @@ class ForgotPasswordView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class ResetPasswordView(APIView):
+class ResetPasswordView(RateLimitedMixin, APIView):
     """Password reset endpoint"""
     
     permission_classes = [AllowAny]
+    throttle_scope = 'otp_verify'
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -697,10 +705,11 @@ class UserProfileView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class SensitiveFieldUpdateView(APIView):
+class SensitiveFieldUpdateView(RateLimitedMixin, APIView):
     """Sensitive field update endpoint - Request OTP for sensitive field changes"""
     
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'otp_send'
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -746,10 +755,11 @@ class SensitiveFieldUpdateView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class SensitiveFieldVerifyView(APIView):
+class SensitiveFieldVerifyView(RateLimitedMixin, APIView):
     """Sensitive field verification endpoint - Verify OTP and update field"""
     
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'otp_verify'
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -0,0 +1,23 @@
+"""
+Background tasks for users.
+"""
+
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+
+from .infrastructure.activity_log import ActivityLog
+from .infrastructure.otp_store import OTPStore
+
+
+@shared_task(ignore_result=True)
+def purge_expired_otps():
+    """Delete OTP audit rows that expired more than ``OTP_RETENTION_DAYS`` ago."""
+    return OTPStore.purge_expired(older_than=timedelta(days=settings.OTP_RETENTION_DAYS))
+
+
+@shared_task(ignore_result=True)
+def archive_user_activity():
+    """Move activity older than ``ACTIVITY_ARCHIVE_AFTER_MONTHS`` whole months to the archive."""
+    return ActivityLog.archive_old_activity()
@@ -0,0 +1,230 @@
+"""
+Tests for the users app.
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from shared.throttling import RateLimiter
+
+from .domain.entities import OTPType
+from .domain.services import DjangoOTPService
+from .infrastructure.activity_log import ActivityLog
+from .infrastructure.otp_store import OTPStore
+from .infrastructure.repositories import DjangoOTPCodeRepository, DjangoUserSessionRepository
+from .models import OTPCode, UserActivity, UserActivityArchive, UserSession
+
+User = get_user_model()
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}, OTP_MAX_ATTEMPTS=3)
+class OTPStoreTests(TestCase):
+    """Test OTP codes kept hashed in the cache with an audit trail."""
+    
+    def setUp(self):
+        OTPStore.cache().clear()
+        self.user = User.objects.create_user(username='otp-user', email='otp@example.com', password='pass12345')
+        self.service = DjangoOTPService(DjangoOTPCodeRepository())
+    
+    def generate(self, target='otp@example.com'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.service.generate_otp(self.user.id, target, OTPType.EMAIL_VERIFICATION)
+    
+    def test_code_is_only_stored_hashed(self):
+        otp = self.generate()
+        
+        row = OTPCode.objects.get(id=otp.id)
+        self.assertEqual(len(otp.code), 6)
+        self.assertEqual(row.code, '')
+        self.assertEqual(row.code_hash, OTPStore.digest('email_verification', 'otp@example.com', otp.code))
+    
+    def test_code_verifies_once_without_reading_the_table(self):
+        otp = self.generate()
+        
+        # The attempt is counted and the audit row marked used; nothing is looked up.
+        with self.assertNumQueries(2):
+            verified = self.service.verify_otp('otp@example.com', otp.code, OTPType.EMAIL_VERIFICATION)
+        self.assertEqual(verified.id, otp.id)
+        self.assertEqual(verified.user_id, self.user.id)
+        self.assertIsNone(self.service.verify_otp('otp@example.com', otp.code, OTPType.EMAIL_VERIFICATION))
+        
+        row = OTPCode.objects.get(id=otp.id)
+        self.assertTrue(row.is_used)
+        self.assertEqual(row.attempts, 1)
+    
+    def test_new_code_replaces_previous_one(self):
+        first = self.generate()
+        second = self.generate()
+        
+        self.assertNotEqual(first.id, second.id)
+        self.assertEqual(OTPStore.get('email_verification', 'otp@example.com')['id'], second.id)
+        self.assertIsNotNone(self.service.verify_otp('otp@example.com', second.code, OTPType.EMAIL_VERIFICATION))
+    
+    def test_code_is_burned_after_max_attempts(self):
+        otp = self.generate()
+        wrong = '000000' if otp.code != '000000' else '111111'
+        
+        for _ in range(3):
+            self.assertIsNone(self.service.verify_otp('otp@example.com', wrong, OTPType.EMAIL_VERIFICATION))
+        self.assertIsNone(self.service.verify_otp('otp@example.com', otp.code, OTPType.EMAIL_VERIFICATION))
+        self.assertEqual(OTPCode.objects.get(id=otp.id).attempts, 3)
+    
+    def test_attempts_are_counted_in_the_table(self):
+        otp = self.generate()
+        # Attempts made by other processes are seen at once.
+        OTPCode.objects.filter(id=otp.id).update(attempts=3)
+        
+        self.assertIsNone(self.service.verify_otp('otp@example.com', otp.code, OTPType.EMAIL_VERIFICATION))
+        self.assertIsNone(OTPStore.get('email_verification', 'otp@example.com'))
+        self.assertEqual(OTPCode.objects.get(id=otp.id).attempts, 3)
+    
+    def test_get_valid_otp_does_not_count_attempts(self):
+        otp = self.generate()
+        repository = DjangoOTPCodeRepository()
+        
+        for _ in range(5):
+            self.assertEqual(repository.get_valid_otp('otp@example.com', 'email_verification', otp.code).id, otp.id)
+        self.assertEqual(OTPCode.objects.get(id=otp.id).attempts, 0)
+        self.assertIsNotNone(self.service.verify_otp('otp@example.com', otp.code, OTPType.EMAIL_VERIFICATION))
+    
+    def test_plain_code_rows_still_verify(self):
+        legacy = OTPCode.objects.create(
+            user=self.user, email='otp@example.com', otp_type='email_verification', code='123456',
+            expires_at=timezone.now() + timedelta(minutes=10)
+        )
+        repository = DjangoOTPCodeRepository()
+        
+        self.assertEqual(repository.get_valid_otp('otp@example.com', 'email_verification', '123456').id, legacy.id)
+        self.assertIsNone(self.service.verify_otp('otp@example.com', '654321', OTPType.EMAIL_VERIFICATION))
+        verified = self.service.verify_otp('otp@example.com', '123456', OTPType.EMAIL_VERIFICATION)
+        self.assertEqual(verified.id, legacy.id)
+        self.assertIsNone(self.service.verify_otp('otp@example.com', '123456', OTPType.EMAIL_VERIFICATION))
+        
+        legacy.refresh_from_db()
+        self.assertTrue(legacy.is_used)
+        self.assertEqual(legacy.attempts, 2)
+    
+    def test_plain_code_rows_are_burned_after_max_attempts(self):
+        OTPCode.objects.create(
+            user=self.user, email='otp@example.com', otp_type='email_verification', code='123456',
+            expires_at=timezone.now() + timedelta(minutes=10)
+        )
+        
+        for _ in range(3):
+            self.assertIsNone(self.service.verify_otp('otp@example.com', '654321', OTPType.EMAIL_VERIFICATION))
+        self.assertIsNone(self.service.verify_otp('otp@example.com', '123456', OTPType.EMAIL_VERIFICATION))
+    
+    def test_purge_deletes_expired_rows_in_batches(self):
+        now = timezone.now()
+        OTPCode.objects.bulk_create([
+            OTPCode(user=self.user, email='otp@example.com', otp_type='email_verification',
+                    expires_at=now - timedelta(days=days))
+            for days in (0, 1, 3, 8, 9, 10, 30)
+        ])
+        live = self.generate()
+        
+        self.assertEqual(OTPStore.purge_expired(older_than=timedelta(days=7), batch_size=2), 4)
+        self.assertEqual(DjangoOTPCodeRepository().delete_expired_otps(), 3)
+        self.assertEqual(list(OTPCode.objects.values_list('id', flat=True)), [live.id])
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}, ACTIVITY_LOG_BATCH_SIZE=100, ACTIVITY_LOG_FLUSH_INTERVAL=3600)
+class ActivityLogTests(TestCase):
+    """Test buffered activity rows and their monthly archive."""
+    
+    def setUp(self):
+        ActivityLog.discard()
+        RateLimiter.reset()
+        self.addCleanup(ActivityLog.discard)
+        self.user = User.objects.create_user(username='log-user', email='log@example.com', password='pass12345')
+    
+    def login(self):
+        return APIClient(HTTP_USER_AGENT='tests').post(
+            reverse('users:login'), {'username': 'log-user', 'password': 'pass12345'}, format='json'
+        )
+    
+    def test_login_writes_no_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.login().status_code, 200)
+        self.assertFalse([query for query in queries.captured_queries if query['sql'].startswith('INSERT')])
+        self.assertEqual(ActivityLog.pending(), 0)
+    
+    def test_activity_writes_are_deferred_and_batched(self):
+        for _ in range(3):
+            ActivityLog.record_activity(self.user.id, 'login', '10.0.0.1', 'tests')
+        self.assertFalse(UserActivity.objects.exists())
+        self.assertEqual(ActivityLog.pending(), 3)
+        
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(ActivityLog.flush(), 3)
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(UserActivity.objects.filter(user=self.user, activity_type='login').count(), 3)
+    
+    def test_timer_flushes_without_further_requests(self):
+        with mock.patch('users.infrastructure.activity_log.threading.Timer') as timer:
+            ActivityLog.record_activity(self.user.id, 'login', '10.0.0.1')
+            ActivityLog.record_activity(self.user.id, 'logout', '10.0.0.1')
+        timer.assert_called_once_with(3600, ActivityLog._flush_on_timer)
+        timer.return_value.start.assert_called_once_with()
+        
+        with mock.patch('users.infrastructure.activity_log.connections.close_all') as close_all:
+            ActivityLog._flush_on_timer()
+        close_all.assert_called_once_with()
+        self.assertEqual(UserActivity.objects.count(), 2)
+        self.assertIsNone(ActivityLog._timer)
+    
+    @override_settings(ACTIVITY_LOG_BATCH_SIZE=2)
+    def test_buffer_is_flushed_after_the_request_once_full(self):
+        ActivityLog.record_activity(self.user.id, 'login', '10.0.0.1')
+        self.login()
+        self.assertFalse(UserActivity.objects.exists())
+        ActivityLog.record_activity(self.user.id, 'logout', '10.0.0.1')
+        self.login()
+        self.assertEqual(UserActivity.objects.count(), 2)
+        self.assertEqual(ActivityLog.pending(), 0)
+    
+    def test_rows_of_deleted_users_are_dropped(self):
+        other = User.objects.create_user(username='gone', email='gone@example.com', password='pass12345')
+        ActivityLog.record_activity(other.id, 'login', '10.0.0.1')
+        ActivityLog.record_activity(self.user.id, 'login', 'not-an-ip')
+        other.delete()
+        
+        self.assertEqual(ActivityLog.flush(), 1)
+        self.assertIsNone(UserActivity.objects.get().ip_address)
+    
+    def test_sessions_are_written_at_once(self):
+        ActivityLog.record_session(self.user.id, 'not-an-ip', 'tests')
+        
+        self.assertEqual(ActivityLog.pending(), 0)
+        self.assertEqual(UserSession.objects.get().ip_address, '0.0.0.0')
+        self.assertEqual(DjangoUserSessionRepository().deactivate_user_sessions(self.user.id), 1)
+    
+    def test_old_months_are_archived(self):
+        old, recent = UserActivity.objects.bulk_create([
+            UserActivity(user=self.user, activity_type='login'),
+            UserActivity(user=self.user, activity_type='logout'),
+        ])
+        UserActivity.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=200))
+        
+        self.assertEqual(ActivityLog.archive_old_activity(months=3, batch_size=1), 1)
+        self.assertEqual(list(UserActivity.objects.values_list('pk', flat=True)), [recent.pk])
+        archived = UserActivityArchive.objects.get()
+        self.assertEqual(archived.pk, old.pk)
+        self.assertEqual(archived.month.day, 1)
+        self.assertEqual(archived.activity_type, 'login')
+
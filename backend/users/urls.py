@@ -5,7 +5,6 @@ URL configuration for users app.
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
     TokenRefreshView,
     TokenVerifyView,
 )
@@ -22,7 +21,7 @@ from .presentation.controllers import (
 # Import from DRF views (working implementation) - Keep for compatibility
 from .views import (
     OTPVerifyView, PasswordResetView, PasswordResetRequestView,
-    OTPRequestView
+    OTPRequestView, RateLimitedTokenObtainPairView
 )
 
 # API Router - Commented out until ViewSets are implemented
@@ -35,7 +34,7 @@ from .views import (
 # Authentication URLs
 auth_urlpatterns = [
     # JWT Token endpoints
-    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('token/', RateLimitedTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('token/verify/', TokenVerifyView.as_view(), name='token_verify'),
     
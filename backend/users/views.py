@@ -7,12 +7,15 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import authenticate
 from django.utils import timezone
 from datetime import timedelta
 import random
 import string
 
+from shared.throttling import RateLimitedMixin
+
 from .models import User, UserProfile, OTPCode
 from .serializers import (
     UserSerializer, UserCreateSerializer, UserUpdateSerializer,
@@ -102,6 +105,12 @@ class LoginView(APIView):
         })
 
 
+class RateLimitedTokenObtainPairView(RateLimitedMixin, TokenObtainPairView):
+    """JWT token pair for a username and password, limited like login."""
+    
+    throttle_scope = 'login'
+
+
 class UserProfileView(generics.RetrieveUpdateAPIView):
     """User profile management."""
     
@@ -122,10 +131,11 @@ class UserUpdateView(generics.UpdateAPIView):
         return self.request.user
 
 
-class OTPRequestView(APIView):
+class OTPRequestView(RateLimitedMixin, APIView):
     """Request OTP for verification."""
     
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'otp_send'
     
     def post(self, request):
         serializer = OTPRequestSerializer(data=request.data)
@@ -172,10 +182,11 @@ class OTPRequestView(APIView):
         })
 
 
-class OTPVerifyView(APIView):
+class OTPVerifyView(RateLimitedMixin, APIView):
     """Verify OTP code."""
     
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'otp_verify'
     
     def post(self, request):
         serializer = OTPVerifySerializer(data=request.data)
@@ -262,10 +273,11 @@ class OTPVerifyView(APIView):
         })
 
 
-class PasswordResetRequestView(APIView):
+class PasswordResetRequestView(RateLimitedMixin, APIView):
     """Request password reset OTP."""
     
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'password_reset'
     
     def post(self, request):
         email = request.data.get('email')
@@ -304,10 +316,11 @@ class PasswordResetRequestView(APIView):
         })
 
 
-class PasswordResetView(APIView):
+class PasswordResetView(RateLimitedMixin, APIView):
     """Reset password using OTP."""
     
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'otp_verify'
     
     def post(self, request):
         serializer = PasswordResetSerializer(data=request.data)